@@ -0,0 +1,363 @@
+# analytics/columnar.py
+
+import os
+import time
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import func, or_, select
+
+from database.models import (
+    MATCH_TYPES, STIPULATIONS, VICTORY_TYPES, ChampionshipHistory, Event, Match, MatchParticipant, Wrestler,
+)
+
+# Rows per round trip while loading; each chunk becomes arrays before the next one is fetched
+LOAD_CHUNK_ROWS = int(os.getenv("ANALYTICS_CHUNK_ROWS", "50000"))
+# Cards stamped this long before the newest stamp already loaded are re-read too: a load that
+# commits after ours can carry an older events.updated_at than the ones we saw
+CHANGE_OVERLAP = timedelta(seconds=float(os.getenv("ANALYTICS_CHANGE_OVERLAP", "600")))
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Missing values: integer columns use sentinels (ids are positive), floats use NaN
+NULL_INT = -1
+NULL_DAY = np.iinfo(np.int32).min
+
+
+class Dictionary:
+    """
+    Dictionary encoding of an enum column: each value is stored as its int8
+    position in values, so filtering on match_type compares small integers
+    instead of strings. keys are what the database stores, when that isn't
+    the value itself (victory_type_id is a 1-based position in VICTORY_TYPES).
+    """
+
+    def __init__(self, name: str, values: tuple, keys: tuple = None):
+        self.name = name
+        self.values = tuple(values)
+        self._codes = {key: code for code, key in enumerate(keys if keys is not None else values)}
+
+    def code(self, value: str) -> int:
+        """The code of a decoded value, e.g. MATCH_TYPE.code("SINGLES"); raises ValueError for unknown values."""
+        try:
+            return self.values.index(value)
+        except ValueError:
+            raise ValueError(f"Unknown {self.name} {value!r}, expected one of {', '.join(self.values)}") from None
+
+    def encode(self, keys: list) -> np.ndarray:
+        return np.array([NULL_INT if key is None else self._codes[key] for key in keys], dtype=np.int8)
+
+    def decode(self, codes: np.ndarray) -> list:
+        return [self.values[code] if code != NULL_INT else None for code in codes.tolist()]
+
+    def __repr__(self):
+        return f"<Dictionary(name='{self.name}', values={len(self.values)})>"
+
+
+MATCH_TYPE = Dictionary("match_type", MATCH_TYPES)
+STIPULATION = Dictionary("stipulation", STIPULATIONS)
+VICTORY_TYPE = Dictionary("victory_type", VICTORY_TYPES, keys=tuple(range(1, len(VICTORY_TYPES) + 1)))
+
+
+def _ints(values: list) -> np.ndarray:
+    return np.array([NULL_INT if value is None else value for value in values], dtype=np.int32)
+
+
+def _days(values: list) -> np.ndarray:
+    """Dates as days since 1970-01-01, so date arithmetic and year grouping are integer operations."""
+    return np.array([NULL_DAY if value is None else value.toordinal() - EPOCH_ORDINAL for value in values],
+                    dtype=np.int32)
+
+
+def _seconds(values: list) -> np.ndarray:
+    return np.array([NULL_INT if value is None else value.hour * 3600 + value.minute * 60 + value.second
+                     for value in values], dtype=np.int32)
+
+
+def _floats(values: list) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float32)
+
+
+def _flags(values: list) -> np.ndarray:
+    return np.array([NULL_INT if value is None else int(value) for value in values], dtype=np.int8)
+
+
+def _objects(values: list) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+# kind -> (dtype, converter from a list of database values)
+KINDS = {
+    "int": (np.int32, _ints),
+    "day": (np.int32, _days),
+    "seconds": (np.int32, _seconds),
+    "float": (np.float32, _floats),
+    "flag": (np.int8, _flags),
+    "object": (object, _objects),
+}
+
+# Per table: (column name, source column, kind or Dictionary). The first column is the row id
+MATCH_COLUMNS = (
+    ("id", Match.id, "int"),
+    ("event_id", Match.event_id, "int"),
+    ("promotion_id", Match.promotion_id, "int"),
+    ("day", Match.date, "day"),
+    ("match_type", Match.match_type, MATCH_TYPE),
+    ("stipulation", Match.stipulation, STIPULATION),
+    ("victory_type", Match.victory_type_id, VICTORY_TYPE),
+    ("title_defense", Match.title_defense, "flag"),
+    ("title_id", Match.title_id_nullable, "int"),
+    ("length_seconds", Match.match_length, "seconds"),
+    ("rating", Match.match_rating, "float"),
+    ("card_position", Match.position_on_event_card, "int"),
+    ("victor_team", Match.victor_team_number, "int"),
+)
+PARTICIPANT_COLUMNS = (
+    ("id", MatchParticipant.id, "int"),
+    ("match_id", MatchParticipant.match_id, "int"),
+    ("wrestler_id", MatchParticipant.wrestler_id, "int"),
+    ("team_number", MatchParticipant.team_number, "int"),
+)
+REIGN_COLUMNS = (
+    ("id", ChampionshipHistory.id, "int"),
+    ("championship_id", ChampionshipHistory.championship_id, "int"),
+    ("champion_id", ChampionshipHistory.champion_id, "int"),
+    ("reign_number", ChampionshipHistory.reign_number, "int"),
+    ("day_won", ChampionshipHistory.date_won, "day"),
+    ("day_lost", ChampionshipHistory.date_lost, "day"),
+    ("defenses", ChampionshipHistory.number_of_defenses, "int"),
+)
+WRESTLER_COLUMNS = (
+    ("id", Wrestler.id, "int"),
+    ("name", Wrestler.name, "object"),
+    ("promotion_id", Wrestler.promotion_id, "int"),
+    ("is_active", Wrestler.is_active, "flag"),
+)
+
+
+def id_positions(loaded: np.ndarray, ids: np.ndarray) -> np.ndarray:
+    """Positions of ids in the ascending ids loaded (NULL_INT where missing), by binary search."""
+    if not len(loaded):
+        return np.full(len(ids), NULL_INT, dtype=np.intp)
+    positions = np.minimum(np.searchsorted(loaded, ids), len(loaded) - 1)
+    return np.where(loaded[positions] == ids, positions, NULL_INT)
+
+
+def _dtype(kind) -> type:
+    return np.int8 if isinstance(kind, Dictionary) else KINDS[kind][0]
+
+
+def _convert(kind, values: list) -> np.ndarray:
+    return kind.encode(values) if isinstance(kind, Dictionary) else KINDS[kind][1](values)
+
+
+class ColumnTable:
+    """
+    Equal-length NumPy columns of one table. Appends grow each column's
+    buffer by doubling, so loading newly scraped rows costs the rows, not a
+    copy of everything loaded before.
+    """
+
+    def __init__(self, name: str, schema: tuple):
+        self.name = name
+        self.schema = schema
+        self.kinds = {column: kind for column, _, kind in schema}
+        self.rows = 0
+        self._buffers = {column: np.empty(0, dtype=_dtype(kind)) for column, _, kind in schema}
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._buffers[column][:self.rows]
+
+    @property
+    def columns(self) -> dict:
+        return {column: self[column] for column in self._buffers}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(buffer[:self.rows].nbytes for buffer in self._buffers.values())
+
+    @property
+    def last_id(self):
+        return int(self["id"][-1]) if self.rows else None
+
+    def append(self, arrays: dict):
+        count = len(arrays["id"])
+        if not count:
+            return
+        needed = self.rows + count
+        for column, buffer in self._buffers.items():
+            if needed > len(buffer):
+                grown = np.empty(max(needed, 2 * len(buffer)), dtype=buffer.dtype)
+                grown[:self.rows] = buffer[:self.rows]
+                self._buffers[column] = buffer = grown
+            buffer[self.rows:needed] = arrays[column]
+        self.rows = needed
+
+    def append_rows(self, rows: list):
+        """Append database rows, in schema order, converting each column to its array type."""
+        if rows:
+            values = list(zip(*rows))
+            self.append({column: _convert(kind, list(values[i])) for i, (column, _, kind) in enumerate(self.schema)})
+
+    def filter(self, mask: np.ndarray) -> dict:
+        """The columns of the rows where mask is true."""
+        return {column: values[mask] for column, values in self.columns.items()}
+
+    def take(self, mask: np.ndarray) -> dict:
+        """Remove the rows where mask is true; returns their columns."""
+        taken = self.filter(mask)
+        kept = self.rows - len(taken["id"])
+        if len(taken["id"]):
+            for column, buffer in self._buffers.items():
+                buffer[:kept] = buffer[:self.rows][~mask]
+            self.rows = kept
+        return taken
+
+    def sort(self):
+        """Put the rows back in id order after reloaded rows were appended behind newer ones."""
+        ids = self["id"]
+        if self.rows > 1 and not np.all(ids[1:] > ids[:-1]):
+            order = np.argsort(ids, kind="stable")
+            for column, buffer in self._buffers.items():
+                buffer[:self.rows] = buffer[:self.rows][order]
+
+    def decode(self, column: str, values: np.ndarray = None) -> list:
+        """Dictionary-encoded codes back to their values, e.g. match_type codes to "SINGLES"."""
+        return self.kinds[column].decode(self[column] if values is None else values)
+
+    def positions(self, ids: np.ndarray) -> np.ndarray:
+        """Row positions of ids (NULL_INT where not loaded); ids are kept ascending, so this is a binary search."""
+        return id_positions(self["id"], ids)
+
+    def __repr__(self):
+        return f"<ColumnTable(name='{self.name}', rows={self.rows}, bytes={self.nbytes})>"
+
+
+class ColumnarStore:
+    """
+    matches, participants, championship reigns and wrestlers as NumPy columns,
+    for StatMuse-style aggregates (analytics/stats.py) over every match at
+    once. append_new loads the rows with ids past the last one loaded, and
+    re-reads the matches and participants of every card re-merged or relinked
+    since (events.updated_at); the rows it replaced are kept in replaced until
+    the next refresh. Reigns are only ever inserted, so they take new ids
+    alone. wrestlers is a small dimension and is reloaded.
+    """
+
+    FACT_TABLES = {"matches": MATCH_COLUMNS, "participants": PARTICIPANT_COLUMNS, "reigns": REIGN_COLUMNS}
+
+    def __init__(self):
+        self.tables = {name: ColumnTable(name, schema) for name, schema in self.FACT_TABLES.items()}
+        self.tables["wrestlers"] = ColumnTable("wrestlers", WRESTLER_COLUMNS)
+        self.loaded_at = None
+        # Newest events.updated_at loaded, {table: columns} of the rows the last append_new replaced,
+        # and the loaded_at of the store they were replaced in (None after a full load)
+        self.changed_at = None
+        self.replaced = {}
+        self.replaced_since = None
+
+    @property
+    def matches(self) -> ColumnTable:
+        return self.tables["matches"]
+
+    @property
+    def participants(self) -> ColumnTable:
+        return self.tables["participants"]
+
+    @property
+    def reigns(self) -> ColumnTable:
+        return self.tables["reigns"]
+
+    @property
+    def wrestlers(self) -> ColumnTable:
+        return self.tables["wrestlers"]
+
+    def _load(self, connection, table: ColumnTable, condition=None) -> int:
+        stmt = select(*(source for _, source, _ in table.schema)).order_by(table.schema[0][1])
+        if condition is not None:
+            stmt = stmt.where(condition)
+        loaded = 0
+        result = connection.execution_options(stream_results=True, yield_per=LOAD_CHUNK_ROWS).execute(stmt)
+        for rows in result.partitions(LOAD_CHUNK_ROWS):
+            table.append_rows(rows)
+            loaded += len(rows)
+        table.sort()
+        return loaded
+
+    def _changed_events(self, connection) -> tuple:
+        """(ids of the events whose cards changed since the last load, the subquery that selected them)."""
+        if self.changed_at is None:
+            changed = Event.updated_at.is_not(None)
+        else:
+            changed = Event.updated_at >= self.changed_at - CHANGE_OVERLAP
+        subquery = select(Event.id).where(changed)
+        return np.array(connection.execute(subquery).scalars().all(), dtype=np.int32), subquery
+
+    def _reload_wrestlers(self, connection) -> int:
+        self.tables["wrestlers"] = ColumnTable("wrestlers", WRESTLER_COLUMNS)
+        return self._load(connection, self.tables["wrestlers"])
+
+    def load(self, connection) -> dict:
+        """Load every table from scratch. Returns {table: rows loaded}."""
+        for name, schema in self.FACT_TABLES.items():
+            self.tables[name] = ColumnTable(name, schema)
+        self.loaded_at = self.changed_at = None
+        return self.append_new(connection)
+
+    def append_new(self, connection) -> dict:
+        """
+        Append the matches, participants and reigns added since the last load,
+        replace the matches and participants of cards changed since (a victor
+        or team corrected, a match or participant dropped, a wrestler linked),
+        and reload the wrestlers. Returns {table: rows loaded}. Run it inside
+        one transaction (REPEATABLE READ on PostgreSQL) so a participant is
+        never loaded before its match.
+        """
+        last_ids = {name: self.tables[name].last_id for name in self.FACT_TABLES}
+        newer = {name: None if last_id is None else self.FACT_TABLES[name][0][1] > last_id
+                 for name, last_id in last_ids.items()}
+        changed_at = connection.execute(select(func.max(Event.updated_at))).scalar()
+        self.replaced, self.replaced_since = {}, self.loaded_at
+        if self.loaded_at is not None:
+            event_ids, changed_events = self._changed_events(connection)
+            if len(event_ids):
+                matches = self.matches.take(np.isin(self.matches["event_id"], event_ids))
+                self.replaced = {"matches": matches,
+                                 "participants": self.participants.take(
+                                     np.isin(self.participants["match_id"], matches["id"]))}
+                reread = {"matches": Match.event_id.in_(changed_events),
+                          "participants": MatchParticipant.match_id.in_(
+                              select(Match.id).where(Match.event_id.in_(changed_events)))}
+                for name, condition in reread.items():
+                    newer[name] = condition if newer[name] is None else or_(newer[name], condition)
+        loaded = {name: self._load(connection, self.tables[name], newer[name]) for name in self.FACT_TABLES}
+        loaded["wrestlers"] = self._reload_wrestlers(connection)
+        self.loaded_at = time.time()
+        self.changed_at = changed_at if changed_at is not None else self.changed_at
+        return loaded
+
+    @property
+    def nbytes(self) -> int:
+        return sum(table.nbytes for table in self.tables.values())
+
+    def __repr__(self):
+        sizes = ", ".join(f"{name}={len(table)}" for name, table in self.tables.items())
+        return f"<ColumnarStore({sizes}, bytes={self.nbytes})>"
+
+
+def load_store(engine, store: ColumnarStore = None, full: bool = False) -> tuple:
+    """
+    Load (or with store, refresh) a ColumnarStore from one consistent snapshot
+    of engine's database; full reloads store from scratch instead.
+    """
+    store = store if store is not None else ColumnarStore()
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection = connection.execution_options(isolation_level="REPEATABLE READ")
+        with connection.begin():
+            loaded = store.append_new(connection) if store.loaded_at and not full else store.load(connection)
+    return store, loaded
@@ -0,0 +1,349 @@
+# analytics/head_to_head.py
+
+import os
+from datetime import date
+
+import numpy as np
+
+from analytics.columnar import EPOCH_ORDINAL, NULL_DAY, NULL_INT, ColumnarStore, id_positions
+from analytics.ops import group_starts, ranges
+
+# Participant pairs generated per batch while indexing; a 30-man battle royal alone is 870
+PAIR_CHUNK_ROWS = int(os.getenv("HEAD_TO_HEAD_CHUNK_PAIRS", "2000000"))
+
+# Per ordered pair of wrestlers who appeared in a match together: how often they met as
+# opponents and how those matches went for the first of the pair, how often they were
+# on the same team, and the last day they met as opponents (NULL_DAY if never)
+COUNT_COLUMNS = ("meetings", "wins", "losses", "draws", "partnered")
+EDGE_COLUMNS = COUNT_COLUMNS + ("last_met",)
+
+
+def _aggregate(keys: np.ndarray, columns: dict) -> tuple:
+    """Sum the counts and keep the latest last_met of equal (wrestler << 32 | other) keys: (keys, columns)."""
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(group_starts(keys))
+    if not len(starts):
+        return keys, {column: values[:0] for column, values in columns.items()}
+    merged = {column: np.add.reduceat(columns[column][order], starts).astype(np.int32) for column in COUNT_COLUMNS}
+    merged["last_met"] = np.maximum.reduceat(columns["last_met"][order], starts)
+    return keys[starts], merged
+
+
+def _roster_pairs(match_ids: np.ndarray, wrestler_ids: np.ndarray, teams: np.ndarray, match_days: np.ndarray,
+                  victor_teams: np.ndarray) -> tuple:
+    """Aggregated pairs of participant rows sorted by match: each is paired with every other row of its match."""
+    starts = np.flatnonzero(group_starts(match_ids))
+    sizes = np.diff(np.r_[starts, len(match_ids)])
+    roster_sizes = np.repeat(sizes, sizes)
+    left = np.repeat(np.arange(len(match_ids)), roster_sizes)
+    right = ranges(np.repeat(starts, sizes), roster_sizes)
+    distinct = wrestler_ids[left] != wrestler_ids[right]
+    left, right = left[distinct], right[distinct]
+
+    # A participant without a team_number is on a team of their own
+    team, other_team = teams[left], teams[right]
+    partnered = (team == other_team) & (team != NULL_INT)
+    opponents = ~partnered
+    victor_team = victor_teams[left]
+    decided = victor_team != NULL_INT
+    # Beaten by a third team counts as a meeting, but neither a win nor a loss against each other
+    columns = {
+        "meetings": opponents,
+        "wins": opponents & decided & (team == victor_team),
+        "losses": opponents & decided & (other_team == victor_team),
+        "draws": opponents & ~decided,
+        "partnered": partnered,
+    }
+    columns = {column: values.astype(np.int32) for column, values in columns.items()}
+    columns["last_met"] = np.where(opponents, match_days[left], NULL_DAY).astype(np.int32)
+    keys = (wrestler_ids[left].astype(np.int64) << 32) | wrestler_ids[right].astype(np.int64)
+    return _aggregate(keys, columns)
+
+
+def pair_edges(store: ColumnarStore, rows: np.ndarray = None) -> tuple:
+    """
+    (keys, columns) of every ordered pair of linked wrestlers among the
+    participant rows (a mask; all of them by default), aggregated per pair.
+    Pass whole matches: rows only pair with rows of the same match.
+    """
+    return _edges(store.participants.columns, store.matches.columns, rows)
+
+
+def _edges(participants: dict, matches: dict, rows: np.ndarray = None) -> tuple:
+    """
+    pair_edges over participant and match columns. A match with k linked
+    participants yields k * (k - 1) pairs, generated for whole batches of
+    matches at once rather than by self-joining participants; a batch stops
+    at about PAIR_CHUNK_ROWS pairs, so battle royals don't multiply into
+    memory all at once.
+    """
+    if rows is not None:
+        participants = {column: values[rows] for column, values in participants.items()}
+    match_ids, wrestler_ids = participants["match_id"], participants["wrestler_id"]
+    match_rows = id_positions(matches["id"], match_ids)
+    keep = (wrestler_ids != NULL_INT) & (match_rows != NULL_INT)
+    order = np.flatnonzero(keep)[np.argsort(match_ids[keep], kind="stable")]
+    match_ids, wrestler_ids, match_rows = match_ids[order], wrestler_ids[order], match_rows[order]
+    teams = participants["team_number"][order]
+    match_days, victor_teams = matches["day"][match_rows], matches["victor_team"][match_rows]
+
+    # Batch boundaries fall between matches, after every PAIR_CHUNK_ROWS pairs
+    starts = np.flatnonzero(group_starts(match_ids))
+    sizes = np.diff(np.r_[starts, len(match_ids)])
+    pairs_before = np.cumsum(sizes.astype(np.int64) ** 2) - sizes.astype(np.int64) ** 2
+    batches = np.flatnonzero(group_starts(pairs_before // PAIR_CHUNK_ROWS))
+    bounds = np.r_[starts[batches], len(match_ids)]
+    chunks = [_roster_pairs(*(column[start:end] for column in (match_ids, wrestler_ids, teams, match_days,
+                                                               victor_teams)))
+              for start, end in zip(bounds[:-1], bounds[1:])]
+    if len(chunks) == 1:
+        return chunks[0]
+    if not chunks:
+        return _roster_pairs(match_ids, wrestler_ids, teams, match_days, victor_teams)
+    return _aggregate(np.concatenate([keys for keys, _ in chunks]),
+                      {column: np.concatenate([columns[column] for _, columns in chunks]) for column in EDGE_COLUMNS})
+
+
+class HeadToHeadIndex:
+    """
+    Head-to-head records and co-appearances of every pair of wrestlers, in
+    CSR form: the pairs of nodes[i] (ascending wrestler ids) are rows
+    indptr[i]:indptr[i + 1] of targets (node positions of the other
+    wrestler, ascending) and the EDGE_COLUMNS arrays. A pairwise lookup is
+    two binary searches, top opponents a sort of one wrestler's row.
+
+    update re-derives only the matches the store replaced or gained
+    participants in since the last update: their old pairs are taken out
+    and their pairs from all current participants merged in. Call it after
+    every load_store(engine, store) refresh; an index that missed one (or
+    a full reload) is rebuilt.
+    """
+
+    def __init__(self):
+        self.nodes = np.zeros(0, dtype=np.int32)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.targets = np.zeros(0, dtype=np.int32)
+        self.columns = {column: np.zeros(0, dtype=np.int32) for column in EDGE_COLUMNS}
+        # The last participant id indexed, and the loaded_at of the store it was indexed from
+        self.last_participant_id = None
+        self.loaded_at = None
+
+    @classmethod
+    def build(cls, store: ColumnarStore) -> "HeadToHeadIndex":
+        index = cls()
+        index.update(store)
+        return index
+
+    def update(self, store: ColumnarStore) -> int:
+        """Bring the index up to date with the store's last refresh. Returns pairs added."""
+        if store.loaded_at == self.loaded_at:
+            return 0
+        if self.loaded_at is not None and store.replaced_since != self.loaded_at:
+            self.__init__()
+        participants = store.participants
+        last_participant_id, self.last_participant_id = self.last_participant_id, participants.last_id
+        self.loaded_at = store.loaded_at
+        if last_participant_id is None:
+            keys, columns = pair_edges(store)
+            self._set_edges(keys, columns)
+            return len(keys)
+
+        # Matches with new participant rows may already have indexed ones; replaced matches were reloaded whole
+        match_ids = participants["match_id"]
+        replaced = store.replaced.get("matches", {"id": np.zeros(0, dtype=np.int32)})["id"]
+        touched = np.union1d(replaced, match_ids[participants["id"] > last_participant_id])
+        rows = np.isin(match_ids, touched)
+        kept = rows & (participants["id"] <= last_participant_id) & ~np.isin(match_ids, replaced)
+        old_keys, old_columns = pair_edges(store, kept)
+        if len(replaced):
+            keys, columns = _edges(store.replaced["participants"], store.replaced["matches"])
+            old_keys, old_columns = _aggregate(
+                np.concatenate([old_keys, keys]),
+                {column: np.concatenate([old_columns[column], columns[column]]) for column in EDGE_COLUMNS})
+        new_keys, new_columns = pair_edges(store, rows)
+
+        # One delta per pair: new counts minus old ones, and the new meetings' last day
+        negated = {column: -values for column, values in old_columns.items()}
+        negated["last_met"] = np.full(len(old_keys), NULL_DAY, dtype=np.int32)
+        delta_keys, delta = _aggregate(np.concatenate([new_keys, old_keys]),
+                                       {column: np.concatenate([new_columns[column], negated[column]])
+                                        for column in EDGE_COLUMNS})
+        added = self._merge(delta_keys, delta)
+        self._recount_last_met(store, old_keys, old_columns["last_met"], delta_keys, delta["last_met"])
+        self._drop_unmet()
+        return added
+
+    def _recount_last_met(self, store: ColumnarStore, old_keys: np.ndarray, old_last_met: np.ndarray,
+                          delta_keys: np.ndarray, new_last_met: np.ndarray):
+        """
+        last_met can't be subtracted: where a taken-out meeting was the
+        latest and no new one matches it, recompute it from every match of
+        the wrestlers involved.
+        """
+        new_last_met = new_last_met[np.searchsorted(delta_keys, old_keys)]
+        stale = (old_last_met != NULL_DAY) & (new_last_met < old_last_met)
+        if not stale.any():
+            return
+        keys, positions = old_keys[stale], np.searchsorted(self._keys(), old_keys[stale])
+        participants = store.participants
+        wrestler_matches = participants["match_id"][np.isin(participants["wrestler_id"], keys >> 32)]
+        edge_keys, columns = pair_edges(store, np.isin(participants["match_id"], wrestler_matches))
+        found = id_positions(edge_keys, keys)
+        last_met = np.full(len(keys), NULL_DAY, dtype=np.int32)
+        last_met[found != NULL_INT] = columns["last_met"][found[found != NULL_INT]]
+        self.columns["last_met"][positions] = last_met
+
+    def _drop_unmet(self):
+        """Remove the pairs whose counts were all taken out again."""
+        unmet = np.all([self.columns[column] == 0 for column in COUNT_COLUMNS], axis=0)
+        if unmet.any():
+            keep = ~unmet
+            self._set_edges(self._keys()[keep], {column: values[keep] for column, values in self.columns.items()})
+
+    def _keys(self) -> np.ndarray:
+        wrestler_ids = np.repeat(self.nodes, np.diff(self.indptr)).astype(np.int64)
+        return (wrestler_ids << 32) | self.nodes[self.targets].astype(np.int64)
+
+    def _merge(self, keys: np.ndarray, columns: dict) -> int:
+        """
+        Add aggregated pairs to the index: counts of pairs already there are
+        added in place, new pairs inserted at their sorted positions. No
+        re-sort of the existing pairs, so an update costs one pass over them.
+        """
+        existing = self._keys()
+        positions = np.searchsorted(existing, keys)
+        found = np.zeros(len(keys), dtype=bool)
+        inside = positions < len(existing)
+        found[inside] = existing[positions[inside]] == keys[inside]
+
+        at = positions[found]
+        for column in COUNT_COLUMNS:
+            self.columns[column][at] += columns[column][found]
+        np.maximum.at(self.columns["last_met"], at, columns["last_met"][found])
+
+        new = ~found
+        if not new.any():
+            return 0
+        at, keys = positions[new], keys[new]
+        wrestler_ids = (keys >> 32).astype(np.int32)
+        nodes = np.union1d(self.nodes, wrestler_ids).astype(np.int32)
+        # Old node positions shift past any wrestlers met for the first time
+        moved = np.searchsorted(nodes, self.nodes)
+        degrees = np.zeros(len(nodes), dtype=np.int64)
+        degrees[moved] = np.diff(self.indptr)
+        degrees += np.bincount(np.searchsorted(nodes, wrestler_ids), minlength=len(nodes))
+        self.targets = np.insert(moved[self.targets], at,
+                                 np.searchsorted(nodes, (keys & 0xFFFFFFFF).astype(np.int32))).astype(np.int32)
+        self.columns = {column: np.insert(values, at, columns[column][new]) for column, values in self.columns.items()}
+        self.nodes = nodes
+        self.indptr = np.r_[0, np.cumsum(degrees)].astype(np.int64)
+        return len(keys)
+
+    def _set_edges(self, keys: np.ndarray, columns: dict):
+        """Rebuild the CSR arrays from edges sorted by key."""
+        wrestler_ids = (keys >> 32).astype(np.int32)
+        other_ids = (keys & 0xFFFFFFFF).astype(np.int32)
+        # Pairs are symmetric, so every other wrestler is also a node
+        self.nodes = wrestler_ids[group_starts(wrestler_ids)]
+        self.indptr = np.r_[np.searchsorted(wrestler_ids, self.nodes), len(keys)].astype(np.int64)
+        self.targets = np.searchsorted(self.nodes, other_ids).astype(np.int32)
+        self.columns = columns
+
+    def _node(self, wrestler_id: int) -> int:
+        node = int(np.searchsorted(self.nodes, wrestler_id))
+        return node if node < len(self.nodes) and self.nodes[node] == wrestler_id else None
+
+    def _row(self, wrestler_id: int) -> slice:
+        node = self._node(wrestler_id)
+        return slice(0, 0) if node is None else slice(int(self.indptr[node]), int(self.indptr[node + 1]))
+
+    def _edge(self, position: int) -> dict:
+        last_met = int(self.columns["last_met"][position])
+        return {"wrestler_id": int(self.nodes[self.targets[position]]),
+                **{column: int(self.columns[column][position]) for column in COUNT_COLUMNS},
+                "last_met": date.fromordinal(last_met + EPOCH_ORDINAL) if last_met != NULL_DAY else None}
+
+    def record(self, wrestler_id: int, other_id: int) -> dict:
+        """wrestler_id's record against other_id (and matches as partners); None if they never shared a match."""
+        row, other = self._row(wrestler_id), self._node(other_id)
+        if other is None:
+            return None
+        targets = self.targets[row]
+        position = int(np.searchsorted(targets, other))
+        if position == len(targets) or targets[position] != other:
+            return None
+        return self._edge(row.start + position)
+
+    def top(self, wrestler_id: int, k: int = 10, by: str = "meetings") -> list:
+        """The k wrestlers with the most meetings (or wins, losses, draws, partnered) with wrestler_id."""
+        if by not in COUNT_COLUMNS:
+            raise ValueError(f"Unknown count {by!r}, expected one of {', '.join(COUNT_COLUMNS)}")
+        row = self._row(wrestler_id)
+        counts = self.columns[by][row]
+        candidates = np.flatnonzero(counts > 0)
+        if k < len(candidates):
+            candidates = candidates[np.argpartition(-counts[candidates], k - 1)[:k]]
+        # Most first, the more recent opponent first among equals
+        order = np.lexsort((-self.columns["last_met"][row][candidates], -counts[candidates]))
+        return [self._edge(row.start + int(position)) for position in candidates[order]]
+
+    def _expand(self, frontier: np.ndarray, parents: np.ndarray) -> np.ndarray:
+        """One breadth-first step: mark the unvisited opponents of frontier with their parent; returns them."""
+        degrees = self.indptr[frontier + 1] - self.indptr[frontier]
+        positions = ranges(self.indptr[frontier], degrees)
+        sources = np.repeat(frontier, degrees)
+        met = self.columns["meetings"][positions] > 0
+        reached, sources = self.targets[positions][met], sources[met]
+        new = parents[reached] == NULL_INT
+        reached, first = np.unique(reached[new], return_index=True)
+        parents[reached] = sources[new][first]
+        return reached
+
+    def opponent_path(self, wrestler_id: int, other_id: int, max_hops: int = 6) -> list:
+        """
+        Shortest chain of opponents from wrestler_id to other_id, both
+        included (wrestler_id faced the second, who faced the third, ...), or
+        None if there is none within max_hops. Breadth-first from both ends,
+        a whole frontier per step, always growing the smaller one.
+        """
+        source, target = self._node(wrestler_id), self._node(other_id)
+        if source is None or target is None:
+            return None
+        if source == target:
+            return [wrestler_id]
+        sides = []
+        for start in (source, target):
+            parents = np.full(len(self.nodes), NULL_INT, dtype=np.int64)
+            parents[start] = start
+            sides.append([parents, np.array([start])])
+        for _ in range(max_hops):
+            grow, other = sorted(sides, key=lambda side: len(side[1]))
+            if not len(grow[1]):
+                return None
+            grow[1] = self._expand(grow[1], grow[0])
+            meeting = grow[1][other[0][grow[1]] != NULL_INT]
+            if len(meeting):
+                return self._join(int(meeting[0]), *(parents for parents, _ in sides))
+        return None
+
+    def _join(self, meeting: int, forward: np.ndarray, backward: np.ndarray) -> list:
+        """The path source -> meeting -> target, following both searches' parents."""
+        path = [meeting]
+        while forward[path[-1]] != path[-1]:
+            path.append(int(forward[path[-1]]))
+        path.reverse()
+        while backward[path[-1]] != path[-1]:
+            path.append(int(backward[path[-1]]))
+        return [int(self.nodes[node]) for node in path]
+
+    @property
+    def nbytes(self) -> int:
+        return (self.nodes.nbytes + self.indptr.nbytes + self.targets.nbytes
+                + sum(values.nbytes for values in self.columns.values()))
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __repr__(self):
+        return f"<HeadToHeadIndex(wrestlers={len(self.nodes)}, pairs={len(self)}, bytes={self.nbytes})>"
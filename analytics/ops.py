@@ -0,0 +1,156 @@
+# analytics/ops.py
+
+import numpy as np
+
+# Vectorized building blocks for analytics/stats.py. Every function works on whole
+# columns at once; none of them loops over rows in Python.
+
+AGGREGATES = ("count", "sum", "mean", "min", "max")
+
+
+def group_keys(*keys: np.ndarray) -> tuple:
+    """
+    (distinct key columns, group number of every row) for one or more key
+    columns. Several keys are folded into one int64 code per row first, which
+    sorts far faster than unique rows of a 2-D array.
+    """
+    if len(keys) == 1:
+        unique, inverse = np.unique(keys[0], return_inverse=True)
+        return (unique,), inverse.reshape(-1)
+    factors = [np.unique(key, return_inverse=True) for key in keys]
+    combined = np.zeros(len(keys[0]), dtype=np.int64)
+    for unique, inverse in factors:
+        combined = combined * len(unique) + inverse.reshape(-1)
+    codes, inverse = np.unique(combined, return_inverse=True)
+    distinct = []
+    for unique, _ in reversed(factors):
+        distinct.append(unique[codes % len(unique)])
+        codes = codes // len(unique)
+    return tuple(reversed(distinct)), inverse.reshape(-1)
+
+
+class Grouping:
+    """
+    GROUP BY over key columns, sorted out once and shared by every aggregate
+    taken over the same groups. NaN values are left out of sum, mean, min and
+    max; a group with nothing left has a NaN mean, min and max.
+    """
+
+    def __init__(self, *keys: np.ndarray):
+        self.keys, self.inverse = group_keys(*keys)
+        self.size = len(self.keys[0])
+
+    def count(self) -> np.ndarray:
+        return np.bincount(self.inverse, minlength=self.size)
+
+    def _valid(self, values: np.ndarray) -> tuple:
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        return self.inverse[valid], values[valid]
+
+    def sum(self, values: np.ndarray) -> np.ndarray:
+        inverse, values = self._valid(values)
+        return np.bincount(inverse, weights=values, minlength=self.size)
+
+    def mean(self, values: np.ndarray) -> np.ndarray:
+        inverse, values = self._valid(values)
+        sums = np.bincount(inverse, weights=values, minlength=self.size)
+        counts = np.bincount(inverse, minlength=self.size)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def _extreme(self, values: np.ndarray, reduce) -> np.ndarray:
+        inverse, values = self._valid(values)
+        results = np.full(self.size, np.nan)
+        if len(values):
+            order = np.argsort(inverse, kind="stable")
+            groups = inverse[order]
+            starts = np.flatnonzero(group_starts(groups))
+            results[groups[starts]] = reduce.reduceat(values[order], starts)
+        return results
+
+    def min(self, values: np.ndarray) -> np.ndarray:
+        return self._extreme(values, np.minimum)
+
+    def max(self, values: np.ndarray) -> np.ndarray:
+        return self._extreme(values, np.maximum)
+
+    def reduce(self, values: np.ndarray = None, how: str = "count") -> np.ndarray:
+        if how not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate {how!r}, expected one of {', '.join(AGGREGATES)}")
+        return self.count() if how == "count" else getattr(self, how)(values)
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<Grouping(keys={len(self.keys)}, groups={self.size}, rows={len(self.inverse)})>"
+
+
+def group_reduce(keys: tuple, values: np.ndarray = None, how: str = "count") -> tuple:
+    """GROUP BY keys with one aggregate of values: (distinct key columns, results)."""
+    grouping = Grouping(*keys)
+    return grouping.keys, grouping.reduce(values, how)
+
+
+def group_starts(groups: np.ndarray) -> np.ndarray:
+    """True on the first row of every run of equal group values (rows sorted by group)."""
+    return np.r_[True, groups[1:] != groups[:-1]] if len(groups) else np.zeros(0, dtype=bool)
+
+
+def rolling_sum(values: np.ndarray, window: int, groups: np.ndarray = None) -> tuple:
+    """
+    (sum, count) over the last window rows up to and including each row, not
+    crossing into the previous group. Rows must be sorted by group, then by
+    whatever order the window runs in (e.g. match date).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    index = np.arange(len(values))
+    lower = np.maximum(index - window + 1, 0)
+    if groups is not None:
+        first_row = np.maximum.accumulate(np.where(group_starts(groups), index, 0))
+        lower = np.maximum(lower, first_row)
+    totals = np.concatenate(([0.0], np.cumsum(values)))
+    return totals[index + 1] - totals[lower], index + 1 - lower
+
+
+def rolling_mean(values: np.ndarray, window: int, groups: np.ndarray = None) -> np.ndarray:
+    sums, counts = rolling_sum(values, window, groups)
+    return sums / counts
+
+
+def run_lengths(flags: np.ndarray, groups: np.ndarray = None) -> np.ndarray:
+    """
+    Length of the run of true flags ending at each row (0 where the flag is
+    false), restarting at every group: a wrestler's win streak after each
+    match, with rows sorted by wrestler and date.
+    """
+    flags = np.asarray(flags, dtype=bool)
+    index = np.arange(len(flags))
+    # The row a run counts from: just before a group's first row, or the last false row
+    base = np.full(len(flags), -1)
+    if groups is not None:
+        starts = group_starts(groups)
+        base[starts] = index[starts] - 1
+    base[~flags] = index[~flags]
+    return index - np.maximum.accumulate(base)
+
+
+def last_of_groups(groups: np.ndarray) -> np.ndarray:
+    """Positions of the last row of every group (rows sorted by group)."""
+    return np.r_[np.flatnonzero(groups[1:] != groups[:-1]), len(groups) - 1] if len(groups) else np.zeros(0, int)
+
+
+def ranges(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """np.arange(start, start + length) of every pair, concatenated: gathering CSR rows or match rosters at once."""
+    lengths = np.asarray(lengths, dtype=np.int64)
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    block_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(np.asarray(starts, dtype=np.int64), lengths) + (np.arange(total) - block_starts)
+
+
+def days_to_years(days: np.ndarray) -> np.ndarray:
+    """Calendar years of days since 1970-01-01."""
+    return days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int32) + 1970
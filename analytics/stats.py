@@ -0,0 +1,140 @@
+# analytics/stats.py
+
+from datetime import date
+
+import numpy as np
+
+from analytics.columnar import EPOCH_ORDINAL, MATCH_TYPE, NULL_DAY, NULL_INT, ColumnarStore
+from analytics.ops import Grouping, days_to_years, last_of_groups, rolling_mean, run_lengths
+
+# StatMuse-style aggregates over a ColumnarStore, each a handful of whole-column operations
+
+
+class ParticipantResults:
+    """One row per linked participant: its wrestler, its match's date and card position, and the result."""
+
+    def __init__(self, store: ColumnarStore, match_type: str = None, promotion_id: int = None):
+        participants, matches = store.participants, store.matches
+        match_rows = matches.positions(participants["match_id"])
+        keep = (participants["wrestler_id"] != NULL_INT) & (match_rows != NULL_INT)
+        if match_type is not None:
+            keep &= matches["match_type"][match_rows] == MATCH_TYPE.code(match_type)
+        if promotion_id is not None:
+            keep &= matches["promotion_id"][match_rows] == promotion_id
+        match_rows = match_rows[keep]
+
+        victor_team = matches["victor_team"][match_rows]
+        self.wrestler_id = participants["wrestler_id"][keep]
+        self.match_id = participants["match_id"][keep]
+        self.day = matches["day"][match_rows]
+        self.card_position = matches["card_position"][match_rows]
+        # A match without a victor (a draw, no contest) is neither a win nor a loss
+        self.decided = victor_team != NULL_INT
+        self.won = self.decided & (participants["team_number"][keep] == victor_team)
+
+    def chronological(self) -> np.ndarray:
+        """Row order by wrestler, then date and card position (a card's opener first)."""
+        # Packed into unique int64 keys, so two plain quicksorts stand in for a (slow) four-key lexsort:
+        # first by date, card position and match id, then by wrestler keeping that order
+        day = np.clip(self.day.astype(np.int64), -(1 << 22), (1 << 22) - 1) + (1 << 22)
+        position = np.clip(self.card_position.astype(np.int64) + 1, 0, 255)
+        order = np.argsort((day << 40) | (position << 32) | self.match_id)
+        by_wrestler = (self.wrestler_id[order].astype(np.int64) << 32) | np.arange(len(order))
+        return order[np.argsort(by_wrestler)]
+
+    def __len__(self):
+        return len(self.wrestler_id)
+
+    def __repr__(self):
+        return f"<ParticipantResults(rows={len(self)})>"
+
+
+def wrestler_names(store: ColumnarStore, wrestler_ids: np.ndarray) -> list:
+    rows = store.wrestlers.positions(wrestler_ids)
+    names = store.wrestlers["name"]
+    return [names[row] if row != NULL_INT else None for row in rows.tolist()]
+
+
+def win_percentages(store: ColumnarStore, min_matches: int = 1, match_type: str = None, promotion_id: int = None,
+                    limit: int = None) -> list:
+    """Wins, losses and win percentage (of decided matches) per wrestler, best first."""
+    results = ParticipantResults(store, match_type, promotion_id)
+    by_wrestler = Grouping(results.wrestler_id)
+    (wrestler_ids,), matches = by_wrestler.keys, by_wrestler.count()
+    wins, decided = by_wrestler.sum(results.won), by_wrestler.sum(results.decided)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        percentage = np.where(decided > 0, 100 * wins / decided, 0.0)
+    keep = matches >= min_matches
+    order = np.lexsort((-matches[keep], -percentage[keep]))[:limit]
+    wrestler_ids, matches, wins, decided, percentage = (column[keep][order] for column in
+                                                        (wrestler_ids, matches, wins, decided, percentage))
+    return [{"wrestler_id": wrestler_id, "name": name, "matches": int(count), "wins": int(won),
+             "losses": int(total - won), "win_pct": round(float(pct), 1)}
+            for wrestler_id, name, count, won, total, pct in zip(
+                wrestler_ids.tolist(), wrestler_names(store, wrestler_ids), matches, wins, decided, percentage)]
+
+
+def win_streaks(store: ColumnarStore, match_type: str = None, limit: int = None) -> list:
+    """Longest and current run of consecutive wins per wrestler, longest first."""
+    results = ParticipantResults(store, match_type)
+    order = results.chronological()
+    wrestler_ids = results.wrestler_id[order]
+    runs = run_lengths(results.won[order], wrestler_ids)
+    by_wrestler = Grouping(wrestler_ids)
+    (distinct,), longest = by_wrestler.keys, by_wrestler.max(runs)
+    current = runs[last_of_groups(wrestler_ids)]
+    order = np.lexsort((-current, -longest))[:limit]
+    return [{"wrestler_id": wrestler_id, "name": name, "longest": int(best), "current": int(now)}
+            for wrestler_id, name, best, now in zip(distinct[order].tolist(), wrestler_names(store, distinct[order]),
+                                                    longest[order], current[order])]
+
+
+def rolling_win_rate(store: ColumnarStore, wrestler_id: int, window: int = 10) -> list:
+    """A wrestler's win percentage over their last window decided matches, after each of their matches."""
+    results = ParticipantResults(store)
+    mine = results.wrestler_id == wrestler_id
+    order = np.lexsort((results.match_id[mine], results.card_position[mine], results.day[mine]))
+    decided = results.decided[mine][order]
+    won = results.won[mine][order][decided]
+    days = results.day[mine][order][decided]
+    rates = rolling_mean(won, window) * 100 if len(won) else np.zeros(0)
+    return [{"date": _date(day), "win_pct": round(float(rate), 1)} for day, rate in zip(days.tolist(), rates)]
+
+
+def rating_by_promotion_year(store: ColumnarStore, match_type: str = None) -> list:
+    """Average match rating per promotion and year, over the rated matches."""
+    matches = store.matches
+    keep = (matches["day"] != NULL_DAY) & ~np.isnan(matches["rating"])
+    if match_type is not None:
+        keep &= matches["match_type"] == MATCH_TYPE.code(match_type)
+    by_promotion_year = Grouping(matches["promotion_id"][keep], days_to_years(matches["day"][keep]))
+    (promotion_ids, years) = by_promotion_year.keys
+    average, rated = by_promotion_year.mean(matches["rating"][keep]), by_promotion_year.count()
+    return [{"promotion_id": int(promotion_id), "year": int(year), "rated_matches": int(count),
+             "avg_rating": round(float(rating), 2)}
+            for promotion_id, year, count, rating in zip(promotion_ids, years, rated, average)]
+
+
+def reign_lengths(store: ColumnarStore, today: date = None, limit: int = None) -> list:
+    """Title reigns by length in days, longest first; a reign without a date_lost runs until today."""
+    reigns = store.reigns
+    today = (today or date.today()).toordinal() - EPOCH_ORDINAL
+    won = reigns["day_won"]
+    lost = np.where(reigns["day_lost"] != NULL_DAY, reigns["day_lost"], today)
+    keep = won != NULL_DAY
+    days = (lost - won)[keep]
+    order = np.argsort(-days, kind="stable")[:limit]
+    rows = np.flatnonzero(keep)[order]
+    return [{"reign_id": int(reigns["id"][row]), "championship_id": int(reigns["championship_id"][row]),
+             "champion_id": int(reigns["champion_id"][row]), "reign_number": int(reigns["reign_number"][row]),
+             "won": _date(int(reigns["day_won"][row])), "lost": _date(int(reigns["day_lost"][row])),
+             "days": int(length), "defenses": _int(int(reigns["defenses"][row]))}
+            for row, length in zip(rows.tolist(), days[order])]
+
+
+def _int(value: int):
+    return value if value != NULL_INT else None
+
+
+def _date(day: int):
+    return date.fromordinal(day + EPOCH_ORDINAL) if day != NULL_DAY else None
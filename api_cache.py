@@ -0,0 +1,176 @@
+# api_cache.py
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from database.change_feed import tags_for
+from utils.metrics import get_metrics
+
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "4096"))
+# Upper bound on staleness should a change notification ever be missed
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "300"))
+
+CACHE_LOOKUPS = get_metrics().counter(
+    "api_cache_lookups_total", "Response cache lookups, by result (hit, miss, coalesced)", ("result",))
+CACHE_INVALIDATED = get_metrics().counter("api_cache_invalidated_total", "Responses dropped by change notifications")
+
+
+class CachedResponse:
+    """A serialized response body and the tags of the rows it was built from."""
+
+    def __init__(self, body: bytes, tags: frozenset, expires_at: float):
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.tags = tags
+        self.expires_at = expires_at
+
+    def __repr__(self):
+        return f"<CachedResponse(etag={self.etag}, bytes={len(self.body)}, tags={len(self.tags)})>"
+
+
+class ResponseCache:
+    """
+    LRU cache of response bodies with a TTL, invalidated by tag: a response is
+    stored with the tags of what it was built from ("wrestler:42", "wrestlers")
+    and dropped as soon as any of them is published as changed.
+
+    Concurrent misses on the same key share one load, so a popular page that
+    was just invalidated runs its query once, not once per waiting request.
+    Only touched from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, max_size: int = API_CACHE_SIZE, ttl: float = API_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidated = 0
+        self._entries = OrderedDict()
+        self._keys_by_tag = {}
+        self._pending = {}
+        # Bumped by every invalidation; a load that overlapped one may have read old rows and isn't stored
+        self._generation = 0
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, body: bytes, tags) -> CachedResponse:
+        self._remove(key)
+        entry = CachedResponse(body, frozenset(tags), time.monotonic() + self.ttl)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+        return entry
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def invalidate(self, tags) -> int:
+        """Drop every response carrying any of tags (all of them if tags is None). Returns how many."""
+        self._generation += 1
+        if tags is None:
+            keys = list(self._entries)
+        else:
+            keys = {key for tag in tags for key in self._keys_by_tag.get(tag, ())}
+        for key in keys:
+            self._remove(key)
+        self.invalidated += len(keys)
+        CACHE_INVALIDATED.inc(len(keys))
+        return len(keys)
+
+    def on_change(self, kind: str, ids: list):
+        """Change feed subscriber."""
+        self.invalidate(tags_for(kind, ids))
+
+    async def fetch(self, key: str, load) -> tuple:
+        """
+        Returns (CachedResponse, "hit" | "miss" | "coalesced"). On a miss,
+        load() is awaited for (body bytes, tags); exceptions (e.g. a 404) are
+        passed to every waiting request and nothing is cached.
+        """
+        while True:
+            entry = self.get(key)
+            if entry is not None:
+                self.hits += 1
+                CACHE_LOOKUPS.inc(result="hit")
+                return entry, "hit"
+            pending = self._pending.get(key)
+            if pending is None:
+                break
+            try:
+                entry = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # The request running the load went away (client disconnect): take over unless we are too
+                if asyncio.current_task().cancelling() or not pending.cancelled():
+                    raise
+                continue
+            self.coalesced += 1
+            CACHE_LOOKUPS.inc(result="coalesced")
+            return entry, "coalesced"
+
+        self.misses += 1
+        CACHE_LOOKUPS.inc(result="miss")
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        generation = self._generation
+        try:
+            body, tags = await load()
+            if generation == self._generation:
+                entry = self.put(key, body, tags)
+            else:
+                entry = CachedResponse(body, frozenset(tags), time.monotonic())
+            future.set_result(entry)
+            return entry, "miss"
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, there may be no one else waiting on it
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "ttl": self.ttl, "hits": self.hits,
+                "misses": self.misses, "coalesced": self.coalesced, "invalidated": self.invalidated}
+
+
+def not_modified(if_none_match: str, etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak validators compare equal)."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,47 @@
+# benchmarks/corpus.py
+
+import json
+import os
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+MANIFEST = "manifest.json"
+
+
+class Fixture:
+    """
+    One saved Cagematch page: the file it is stored in, its page type and the
+    url it came from. Profiles also record the wrestler's name, see
+    StubCagematch.content_for.
+    """
+
+    def __init__(self, file: str, page_type: str, url: str, content: bytes = None, name: str = None):
+        self.file = file
+        self.page_type = page_type
+        self.url = url
+        self.content = content
+        self.name = name
+
+    def __repr__(self):
+        return f"<Fixture(file='{self.file}', page_type='{self.page_type}', bytes={len(self.content or b'')})>"
+
+
+def load_manifest(fixtures_dir: str = FIXTURES_DIR) -> list:
+    with open(os.path.join(fixtures_dir, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(entries: list, fixtures_dir: str = FIXTURES_DIR):
+    with open(os.path.join(fixtures_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2)
+        f.write("\n")
+
+
+def load_corpus(fixtures_dir: str = FIXTURES_DIR) -> dict:
+    """{page type: [Fixture]} for every page in the manifest, in manifest order."""
+    corpus = {}
+    for entry in load_manifest(fixtures_dir):
+        with open(os.path.join(fixtures_dir, entry["file"]), "rb") as f:
+            content = f.read()
+        corpus.setdefault(entry["page_type"], []).append(
+            Fixture(entry["file"], entry["page_type"], entry["url"], content, entry.get("name")))
+    return corpus
@@ -0,0 +1,124 @@
+# benchmarks/stub_server.py
+
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.corpus import load_corpus
+from scrapers.page_cache import classify_url
+
+
+def _later_page(url: str) -> bool:
+    """True for the second and later pages of a paginated listing (s=100, s=200...)."""
+    offset = parse_qs(urlsplit(url).query).get("s", ["0"])[0]
+    return offset.isdigit() and int(offset) > 0
+
+
+def _nr(url: str):
+    nr = parse_qs(urlsplit(url).query).get("nr", [""])[0]
+    return int(nr) if nr.isdigit() else None
+
+
+class StubCagematch:
+    """
+    Local HTTP server answering Cagematch urls from the fixture corpus, with a
+    configurable delay per response so scrapes can be timed against a
+    realistic (and repeatable) network instead of the live site.
+
+    Requests are routed by page type: every profile url gets one of the profile
+    fixtures (picked by the nr= id, so the same wrestler always gets the same
+    page), every titles url one of the titles fixtures, and so on. Later pages
+    of a listing get the fixtures recorded from a later page when there are any.
+    """
+
+    def __init__(self, corpus: dict = None, latency: float = 0.0, jitter: float = 0.0,
+                 host: str = "127.0.0.1", port: int = 0, seed: int = 7):
+        self.corpus = corpus if corpus is not None else load_corpus()
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                fixture = stub.route(self.path)
+                stub.wait()
+                if fixture is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                content = stub.content_for(fixture, self.path)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+    def route(self, path: str):
+        """The fixture served for a request path, or None for a 404."""
+        page_type = classify_url(path)
+        with self._lock:
+            self.requests[page_type] += 1
+        fixtures = self.corpus.get(page_type)
+        if not fixtures:
+            return None
+        later = _later_page(path)
+        fixtures = [fixture for fixture in fixtures if _later_page(fixture.url) == later] or fixtures
+        return fixtures[(_nr(path) or 0) % len(fixtures)]
+
+    def content_for(self, fixture, path: str) -> bytes:
+        """
+        The fixture's body. Wrestler names are unique, so a profile served for
+        another wrestler than the one it was recorded from gets the id appended
+        to the name; otherwise a scrape of 100 wrestlers would write a handful.
+        """
+        nr = _nr(path)
+        if fixture.name is None or nr is None or nr == _nr(fixture.url):
+            return fixture.content
+        return fixture.content.replace(fixture.name.encode(), f"{fixture.name} {nr}".encode())
+
+    def wait(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._random.uniform(0, self.jitter)
+            time.sleep(self.latency + extra)
+
+    def start(self) -> "StubCagematch":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-cagematch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
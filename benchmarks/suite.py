@@ -0,0 +1,475 @@
+# benchmarks/suite.py
+
+import asyncio
+import contextlib
+import io
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, delete, func, select, update
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import api_queries
+from database.api_queries import WRESTLER_COLUMNS
+from database.async_db import async_database_url
+from database.models import Base, Gimmick, PageFingerprint, Promotion, Wrestler
+from database.promotion_resolver import get_promotion_resolver
+from database.refresh import RefreshWriter
+from database.snapshot import SNAPSHOT_TABLES, SnapshotReader, SnapshotSession, build_snapshot
+from scrapers.fetcher import BASE_URL, Fetcher, set_fetcher
+from scrapers.gimmick_scraper import extract_alter_egos, extract_dates_and_promotions, get_last_page_url, gimmick_writer
+from scrapers.html_parser import PARSER_BACKEND, parse_page
+from scrapers.promotion_scraper import extract_promotions
+from scrapers.wrestler_scraper import (
+    extract_roster_links,
+    extract_title_stats,
+    extract_wrestler_profile,
+    scrape_top_100_wrestlers,
+    wrestler_writer,
+)
+from questions.engine import get_question_engine
+from utils.parsers import parse_date, parse_height, parse_weight, parse_years_active
+
+REPORT_VERSION = 1
+# Rows written per DB write-path sample
+DB_ROWS = 500
+# Fixture wrestlers written to a real database use cagematch ids from here up, and are removed again
+BENCH_ID_BASE = 900_000_000
+# An in-memory SQLite database per sample: write paths are timed without touching real data
+THROWAWAY_DATABASE_URL = "sqlite://"
+# Median slowdown reported as a regression by compare_reports
+REGRESSION_THRESHOLD = 0.10
+# Stage settings that must match for two timings to be compared (SQLite vs PostgreSQL, stub latency...)
+COMPARABLE_KEYS = ("pages", "bytes", "inputs", "rows", "dialect", "latency", "jitter")
+
+EXTRACTORS = {
+    "profile": lambda soup, url: (extract_wrestler_profile(soup, url), extract_alter_egos(soup)),
+    "titles": lambda soup, url: extract_title_stats(soup),
+    "match_history": lambda soup, url: (extract_dates_and_promotions(soup), get_last_page_url(soup, url)),
+    "roster": lambda soup, url: extract_roster_links(soup),
+    "promotion_list": lambda soup, url: extract_promotions(soup),
+}
+
+# The read API's queries, timed on the snapshot and on PostgreSQL directly
+SNAPSHOT_READS = {
+    "wrestlers_page": lambda session, wrestler_id: api_queries.wrestlers_page(session),
+    "wrestler": lambda session, wrestler_id: api_queries.fetch_one(
+        session, WRESTLER_COLUMNS, Wrestler.id == wrestler_id),
+    "wrestler_gimmicks": lambda session, wrestler_id: api_queries.wrestler_gimmicks(session, wrestler_id),
+    "promotion_ranking": lambda session, wrestler_id: api_queries.promotion_stats_ranked(session, "wrestler_count"),
+    "question": lambda session, wrestler_id: get_question_engine().ask(session, "who has the most title reigns"),
+}
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Fresh interpreters timed by bench_startup: the CLI's own help must not pull in the scraping or DB stack
+STARTUP_COMMANDS = {
+    "startup.cli_help": ["grapsmuse.py", "--help"],
+    "startup.scrape_wrestlers_help": ["grapsmuse.py", "scrape", "wrestlers", "--help"],
+    "startup.import_scrapers": ["-c", "import scrapers.wrestler_scraper, scrapers.gimmick_scraper"],
+}
+
+# utils/parsers functions and the profile labels their inputs are read from
+VALUE_PARSERS = {
+    "parse_height": (parse_height, "Height"),
+    "parse_weight": (parse_weight, "Weight"),
+    "parse_years_active": (parse_years_active, "In-ring experience"),
+    "parse_date": (parse_date, None),
+}
+
+
+def summarize(samples: list, **extra) -> dict:
+    """Timing summary in seconds; medians are what compare_reports goes by."""
+    ordered = sorted(samples)
+    summary = {
+        "n": len(ordered),
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))],
+        "max": ordered[-1],
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+    summary.update(extra)
+    return summary
+
+
+@contextlib.contextmanager
+def quiet():
+    """The scrapers report progress with print; keep it out of the timings and the output."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_parse(corpus: dict, repeat: int) -> dict:
+    """parse.<page type>: building the (partial) tree, extract.<page type>: the extractor over it; per page."""
+    stages = {}
+    for page_type, extractor in EXTRACTORS.items():
+        fixtures = corpus.get(page_type)
+        if not fixtures:
+            continue
+        parse_times, extract_times = [], []
+        with quiet():
+            for fixture in fixtures:
+                extractor(parse_page(fixture.content, page_type), fixture.url)
+        for _ in range(repeat):
+            for fixture in fixtures:
+                start = time.perf_counter()
+                soup = parse_page(fixture.content, page_type)
+                parse_times.append(time.perf_counter() - start)
+                with quiet():
+                    start = time.perf_counter()
+                    extractor(soup, fixture.url)
+                    extract_times.append(time.perf_counter() - start)
+        pages = len(fixtures)
+        page_bytes = sum(len(fixture.content) for fixture in fixtures)
+        stages[f"parse.{page_type}"] = summarize(parse_times, pages=pages, bytes=page_bytes)
+        stages[f"extract.{page_type}"] = summarize(extract_times, pages=pages)
+    return stages
+
+
+def parser_inputs(corpus: dict) -> dict:
+    """The raw strings each utils/parsers function sees in the corpus, {function name: [str]}."""
+    inputs = {name: [] for name in VALUE_PARSERS}
+    labels = {label: name for name, (_, label) in VALUE_PARSERS.items() if label}
+    for fixture in corpus.get("profile", ()):
+        soup = parse_page(fixture.content, "profile")
+        for row in soup.find_all("div", class_="InformationBoxRow"):
+            label = row.find("div", class_="InformationBoxTitle")
+            value = row.find("div", class_="InformationBoxContents")
+            if not label or not value:
+                continue
+            label, value = label.get_text(strip=True), value.get_text(strip=True)
+            for prefix, name in labels.items():
+                if prefix in label:
+                    inputs[name].append(value)
+            if "Beginning of in-ring career" in label or "End of in-ring career" in label:
+                inputs["parse_date"].append(value)
+    for fixture in corpus.get("match_history", ()):
+        for row in parse_page(fixture.content, "match_history").select("table.TBase.TableBorderColor tr"):
+            cells = row.find_all("td")
+            if len(cells) >= 3:
+                inputs["parse_date"].append(cells[1].get_text(strip=True))
+    return inputs
+
+
+def bench_parsers(corpus: dict, repeat: int, loops: int = 200) -> dict:
+    """parsers.<function>: seconds per call, over every matching string in the corpus."""
+    stages = {}
+    for name, inputs in parser_inputs(corpus).items():
+        if not inputs:
+            continue
+        parse = VALUE_PARSERS[name][0]
+        samples = []
+        for value in inputs:
+            parse(value)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                for value in inputs:
+                    parse(value)
+            samples.append((time.perf_counter() - start) / (loops * len(inputs)))
+        stages[f"parsers.{name}"] = summarize(samples, inputs=len(inputs))
+    return stages
+
+
+def open_database(database_url: str):
+    """A session on database_url; the throwaway SQLite database gets the tables the write paths use."""
+    engine = create_engine(database_url, future=True)
+    if engine.dialect.name == "sqlite":
+        Base.metadata.create_all(engine, tables=[table.__table__ for table in
+                                                 (Promotion, Wrestler, Gimmick, PageFingerprint)])
+    session = sessionmaker(bind=engine)()
+    # The shared resolver may hold ids from another database
+    get_promotion_resolver().load(session)
+    return engine, session
+
+
+def remove_bench_rows(session):
+    wrestlers = select(Wrestler.id).where(Wrestler.cagematch_id >= BENCH_ID_BASE).scalar_subquery()
+    session.execute(delete(Gimmick).where(Gimmick.wrestler_id.in_(wrestlers)))
+    session.execute(delete(Wrestler).where(Wrestler.cagematch_id >= BENCH_ID_BASE))
+    session.commit()
+
+
+def wrestler_records(corpus: dict, count: int) -> list:
+    """count wrestler records cycling through the profile and titles fixtures, each a distinct wrestler."""
+    with quiet():
+        profiles = [extract_wrestler_profile(parse_page(fixture.content, "profile"), fixture.url)
+                    for fixture in corpus["profile"]]
+        titles = [extract_title_stats(parse_page(fixture.content, "titles")) for fixture in corpus["titles"]]
+    records = []
+    for n in range(count):
+        record = dict(profiles[n % len(profiles)])
+        record["titles_won"], record["title_reigns"], record["is_champion"] = titles[n % len(titles)]
+        record["cagematch_id"] = BENCH_ID_BASE + n
+        record["name"] = f"{record['name']} {n}"
+        records.append(record)
+    return records
+
+
+def gimmick_records(corpus: dict, wrestler_ids: list) -> list:
+    """Each wrestler's alter egos from the profile fixtures, dated from the match history fixtures."""
+    with quiet():
+        alter_egos = [extract_alter_egos(parse_page(fixture.content, "profile")) or []
+                      for fixture in corpus["profile"]]
+        history = [extract_dates_and_promotions(parse_page(fixture.content, "match_history"))
+                   for fixture in corpus["match_history"]]
+    dates = [entry for page in history for entry in page]
+    records = []
+    for n, wrestler_id in enumerate(wrestler_ids):
+        for gimmick_name, _ in alter_egos[n % len(alter_egos)]:
+            records.append({
+                "wrestler_id": wrestler_id,
+                "gimmick_name": gimmick_name,
+                "debut_promotion_name": dates[-1][1],
+                "is_default": False,
+                "date_created": dates[-1][0],
+                "last_seen": dates[0][0],
+            })
+    return records
+
+
+def bench_db(corpus: dict, repeat: int, database_url: str = THROWAWAY_DATABASE_URL, rows: int = DB_ROWS) -> dict:
+    """
+    db.<write path>: one batch of rows through the writers the scrapers use,
+    including promotion resolution and the stats refresh hooks (PostgreSQL only).
+    """
+    records = wrestler_records(corpus, rows)
+    samples = {"db.wrestlers.insert": [], "db.wrestlers.refresh_unchanged": [],
+               "db.wrestlers.refresh_changed": [], "db.gimmicks.insert": []}
+    written = {}
+    dialect = None
+
+    def timed(name, writer, batch):
+        start = time.perf_counter()
+        with writer:
+            for record in batch:
+                writer.add(dict(record))
+        samples[name].append(time.perf_counter() - start)
+        written[name] = len(batch)
+        return writer
+
+    for _ in range(repeat):
+        engine, session = open_database(database_url)
+        dialect = engine.dialect.name
+        try:
+            remove_bench_rows(session)
+            writer = timed("db.wrestlers.insert", wrestler_writer(session, len(records)), records)
+            timed("db.wrestlers.refresh_unchanged",
+                  wrestler_writer(session, len(records), writer_class=RefreshWriter), records)
+            changed = [dict(record, years_active=(record["years_active"] or 0) + 1) for record in records]
+            timed("db.wrestlers.refresh_changed",
+                  wrestler_writer(session, len(records), writer_class=RefreshWriter), changed)
+            wrestler_ids = [writer.id_for(record["cagematch_id"]) for record in records]
+            gimmicks = gimmick_records(corpus, wrestler_ids)
+            timed("db.gimmicks.insert", gimmick_writer(session, len(gimmicks)), gimmicks)
+            remove_bench_rows(session)
+        finally:
+            session.close()
+            engine.dispose()
+
+    return {name: summarize(times, rows=written[name], rows_per_second=written[name] / statistics.median(times),
+                            dialect=dialect)
+            for name, times in samples.items()}
+
+
+def bench_scrape(stub, repeat: int) -> dict:
+    """
+    scrape.top_100_wrestlers: scrape_top_100_wrestlers end to end against the
+    stub server (roster, profile and titles pages), written to a throwaway
+    SQLite database so fixture wrestlers never reach a real one.
+    """
+    if not BASE_URL.startswith(stub.base_url):
+        raise RuntimeError(f"Scrapers point at {BASE_URL}, set CAGEMATCH_BASE_URL={stub.base_url} before importing them")
+    samples, pages, written = [], 0, 0
+    for _ in range(repeat):
+        engine, session = open_database(THROWAWAY_DATABASE_URL)
+        # A fresh fetcher per run: no page cache, no adaptive limits carried over from the last run
+        fetcher = Fetcher(cache=None)
+        set_fetcher(fetcher)
+        before = sum(stub.requests.values())
+        try:
+            with quiet():
+                start = time.perf_counter()
+                scrape_top_100_wrestlers(session)
+                samples.append(time.perf_counter() - start)
+            written = session.scalar(select(func.count()).select_from(Wrestler))
+        finally:
+            fetcher.close()
+            session.close()
+            engine.dispose()
+        pages = sum(stub.requests.values()) - before
+    return {"scrape.top_100_wrestlers": summarize(
+        samples, pages=pages, wrestlers=written, pages_per_second=pages / statistics.median(samples),
+        latency=stub.latency, jitter=stub.jitter)}
+
+
+def snapshot_source(corpus: dict, directory: str, rows: int) -> str:
+    """A SQLite source database holding rows fixture wrestlers and their gimmicks."""
+    url = f"sqlite:///{directory}/source.sqlite"
+    engine = create_engine(url, future=True)
+    Base.metadata.create_all(engine, tables=list(SNAPSHOT_TABLES))
+    engine.dispose()
+    engine, session = open_database(url)
+    try:
+        with quiet():
+            records = wrestler_records(corpus, rows)
+            with wrestler_writer(session, len(records)) as wrestlers:
+                for record in records:
+                    wrestlers.add(record)
+            gimmicks = gimmick_records(corpus, [wrestlers.id_for(record["cagematch_id"]) for record in records])
+            with gimmick_writer(session, len(gimmicks)) as writer:
+                for record in gimmicks:
+                    writer.add(record)
+    finally:
+        session.close()
+        engine.dispose()
+    return url
+
+
+async def time_reads(session, wrestler_id: int, repeat: int, loops: int) -> dict:
+    samples = {name: [] for name in SNAPSHOT_READS}
+    for name, read in SNAPSHOT_READS.items():
+        await read(session, wrestler_id)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                await read(session, wrestler_id)
+            samples[name].append((time.perf_counter() - start) / loops)
+    return samples
+
+
+async def time_postgres_reads(database_url: str, wrestler_id: int, repeat: int, loops: int) -> dict:
+    engine = create_async_engine(async_database_url(database_url), pool_size=1)
+    try:
+        async with engine.connect() as connection:
+            return await time_reads(connection, wrestler_id, repeat, loops)
+    finally:
+        await engine.dispose()
+
+
+def bench_snapshot(corpus: dict, repeat: int, database_url: str = THROWAWAY_DATABASE_URL, rows: int = DB_ROWS,
+                   loops: int = 20) -> dict:
+    """
+    snapshot.build.*: building the SQLite read snapshot from scratch, again with
+    nothing changed and (on the throwaway source) after a one-row change.
+    snapshot.read.*: the read API's queries on the snapshot, and postgres.read.*
+    the same queries over asyncpg, when database_url is a PostgreSQL database.
+    The throwaway source is a SQLite file of fixture wrestlers; a real database
+    is only read.
+    """
+    stages = {}
+    with tempfile.TemporaryDirectory() as directory:
+        throwaway = database_url == THROWAWAY_DATABASE_URL
+        source_url = snapshot_source(corpus, directory, rows) if throwaway else database_url
+        source = create_engine(source_url, future=True)
+        path = os.path.join(directory, "snapshot.sqlite")
+        try:
+            build_snapshot(source, path, full=True)
+            builds = {"snapshot.build.full": [], "snapshot.build.unchanged": []}
+            if throwaway:
+                builds["snapshot.build.one_row_changed"] = []
+            for _ in range(repeat):
+                builds["snapshot.build.full"].append(build_snapshot(source, path, full=True).seconds)
+                builds["snapshot.build.unchanged"].append(build_snapshot(source, path).seconds)
+                if throwaway:
+                    with source.begin() as connection:
+                        connection.execute(update(Wrestler).where(Wrestler.id == select(func.min(Wrestler.id))
+                                                                  .scalar_subquery())
+                                           .values(years_active=func.coalesce(Wrestler.years_active, 0) + 1))
+                    builds["snapshot.build.one_row_changed"].append(build_snapshot(source, path).seconds)
+            with source.connect() as connection:
+                wrestler_id = connection.scalar(select(func.min(Wrestler.id)))
+                copied = sum(connection.scalar(select(func.count()).select_from(table)) for table in SNAPSHOT_TABLES)
+            for name, times in builds.items():
+                stages[name] = summarize(times, rows=copied, dialect=source.dialect.name)
+
+            reader = SnapshotReader(path)
+            with reader.connect() as connection:
+                reads = asyncio.run(time_reads(SnapshotSession(connection), wrestler_id, repeat, loops))
+            reader.engine().dispose()
+            for name, times in reads.items():
+                stages[f"snapshot.read.{name}"] = summarize(times, rows=copied, dialect="sqlite")
+            if source.dialect.name == "postgresql":
+                reads = asyncio.run(time_postgres_reads(database_url, wrestler_id, repeat, loops))
+                for name, times in reads.items():
+                    stages[f"postgres.read.{name}"] = summarize(times, rows=copied, dialect="postgresql")
+        finally:
+            source.dispose()
+    return stages
+
+
+def bench_startup(repeat: int) -> dict:
+    """
+    startup.*: wall time of a fresh interpreter running each STARTUP_COMMANDS
+    entry, without DATABASE_URL, so an import that connects or needs the
+    database fails the stage instead of hiding in the timing.
+    """
+    env = {name: value for name, value in os.environ.items() if name not in ("DATABASE_URL", "ASYNC_DATABASE_URL")}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    stages = {}
+    for name, args in STARTUP_COMMANDS.items():
+        command = [sys.executable, *args]
+        # Warm the OS file cache and write the bytecode, so every sample starts equally cold
+        subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, capture_output=True)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=REPO_ROOT, env=env, check=True, capture_output=True)
+            samples.append(time.perf_counter() - start)
+        stages[name] = summarize(samples)
+    return stages
+
+
+def git_revision() -> dict:
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "branch": git("rev-parse", "--abbrev-ref", "HEAD"),
+            "dirty": bool(status) if status is not None else None}
+
+
+def build_report(stages: dict, settings: dict) -> dict:
+    return {
+        "version": REPORT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": git_revision(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "machine": platform.machine(), "html_parser": PARSER_BACKEND},
+        "settings": settings,
+        "stages": stages,
+    }
+
+
+def compare_reports(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """
+    [(stage, baseline median, current median, relative change, verdict)] for
+    the stages both reports have; verdict is "slower", "faster" or "same"
+    depending on whether the median moved by more than threshold, or
+    "not comparable" when the stage ran on a different corpus, database or
+    stub latency.
+    """
+    rows = []
+    for stage, summary in current["stages"].items():
+        previous = baseline["stages"].get(stage)
+        if previous is None:
+            continue
+        before, after = previous["median"], summary["median"]
+        change = (after - before) / before if before else 0.0
+        if any(previous.get(key) != summary.get(key) for key in COMPARABLE_KEYS):
+            verdict = "not comparable"
+        else:
+            verdict = "slower" if change > threshold else "faster" if change < -threshold else "same"
+        rows.append((stage, before, after, change, verdict))
+    return rows
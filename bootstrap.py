@@ -1,9 +1,14 @@
 # bootstrap.py
 
-from database.db_utils import init_db, get_session
-from scrapers.promotion_scraper import scrape_promotions_list, save_promotions_to_db
+import argparse
+
+from utils.cli import add_fetcher_arguments
+from utils.metrics import add_metrics_arguments, write_metrics_report
 
 def bootstrap():
+    from database.db_utils import init_db, get_session
+    from scrapers.promotion_scraper import scrape_promotions_list, save_promotions_to_db
+
     print("📦 Initializing database...")
     init_db()
 
@@ -14,5 +19,18 @@ def bootstrap():
 
     print(f"✅ Inserted {len(promotions)} promotions. Bootstrap complete.")
 
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Initialize the database and load promotions")
+    add_fetcher_arguments(parser)
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from scrapers.fetcher import configure_fetcher
+
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+    bootstrap()
+    if args.metrics_report:
+        write_metrics_report(args.metrics_report)
+
 if __name__ == "__main__":
-    bootstrap()
\ No newline at end of file
+    main()
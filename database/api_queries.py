@@ -0,0 +1,87 @@
+# database/api_queries.py
+
+from sqlalchemy import select
+
+from database.models import DecadeStats, Gimmick, Promotion, PromotionStats, Wrestler, WrestlerStats
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+WRESTLER_COLUMNS = tuple(Wrestler.__table__.columns)
+GIMMICK_COLUMNS = tuple(Gimmick.__table__.columns)
+PROMOTION_COLUMNS = tuple(Promotion.__table__.columns)
+WRESTLER_STATS_COLUMNS = tuple(WrestlerStats.__table__.columns)
+PROMOTION_STATS_COLUMNS = (*PromotionStats.__table__.columns, Promotion.name)
+DECADE_STATS_COLUMNS = tuple(DecadeStats.__table__.columns)
+# Columns /stats/promotions can be ranked by
+PROMOTION_STATS_ORDERS = ("wrestler_count", "active_count", "champion_count", "title_reigns", "titles_won",
+                          "gimmick_debut_count", "event_count")
+
+
+async def fetch_page(session, columns: tuple, key, after: int = None, limit: int = DEFAULT_PAGE_SIZE,
+                     filters: tuple = ()) -> dict:
+    """
+    Keyset pagination: the next page starts right after the last key of this one,
+    so page 1000 costs the same index range scan as page 1 (OFFSET would read
+    and discard every row before it). Returns {"items": [...], "next_after": key or None}.
+    """
+    stmt = select(*columns).where(*filters).order_by(key).limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(key > after)
+    rows = [dict(row) for row in (await session.execute(stmt)).mappings()]
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    return {"items": items, "next_after": items[-1][key.name] if has_more else None}
+
+
+async def fetch_one(session, columns: tuple, *filters):
+    row = (await session.execute(select(*columns).where(*filters))).mappings().first()
+    return dict(row) if row is not None else None
+
+
+async def wrestlers_page(session, after: int = None, limit: int = DEFAULT_PAGE_SIZE, promotion_id: int = None,
+                         is_active: bool = None) -> dict:
+    filters = []
+    if promotion_id is not None:
+        filters.append(Wrestler.promotion_id == promotion_id)
+    if is_active is not None:
+        filters.append(Wrestler.is_active == is_active)
+    return await fetch_page(session, WRESTLER_COLUMNS, Wrestler.id, after, limit, tuple(filters))
+
+
+async def gimmicks_page(session, after: int = None, limit: int = DEFAULT_PAGE_SIZE, wrestler_id: int = None) -> dict:
+    filters = (Gimmick.wrestler_id == wrestler_id,) if wrestler_id is not None else ()
+    return await fetch_page(session, GIMMICK_COLUMNS, Gimmick.id, after, limit, filters)
+
+
+async def promotions_page(session, after: int = None, limit: int = DEFAULT_PAGE_SIZE) -> dict:
+    return await fetch_page(session, PROMOTION_COLUMNS, Promotion.id, after, limit)
+
+
+async def wrestler_gimmicks(session, wrestler_id: int) -> list:
+    stmt = select(*GIMMICK_COLUMNS).where(Gimmick.wrestler_id == wrestler_id).order_by(Gimmick.date_created, Gimmick.id)
+    return [dict(row) for row in (await session.execute(stmt)).mappings()]
+
+
+async def wrestler_stats(session, wrestler_id: int):
+    return await fetch_one(session, WRESTLER_STATS_COLUMNS, WrestlerStats.wrestler_id == wrestler_id)
+
+
+async def promotion_stats(session, promotion_id: int):
+    stmt = (select(*PROMOTION_STATS_COLUMNS).join(Promotion, Promotion.id == PromotionStats.promotion_id)
+            .where(PromotionStats.promotion_id == promotion_id))
+    row = (await session.execute(stmt)).mappings().first()
+    return dict(row) if row is not None else None
+
+
+async def promotion_stats_ranked(session, order: str, limit: int = DEFAULT_PAGE_SIZE) -> list:
+    """Promotions ranked by a precomputed stat, largest first."""
+    stmt = (select(*PROMOTION_STATS_COLUMNS).join(Promotion, Promotion.id == PromotionStats.promotion_id)
+            .order_by(getattr(PromotionStats, order).desc(), PromotionStats.promotion_id).limit(limit))
+    return [dict(row) for row in (await session.execute(stmt)).mappings()]
+
+
+async def decade_stats(session) -> list:
+    stmt = select(*DECADE_STATS_COLUMNS).order_by(DecadeStats.debut_decade)
+    return [dict(row) for row in (await session.execute(stmt)).mappings()]
+
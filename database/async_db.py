@@ -0,0 +1,75 @@
+# database/async_db.py
+
+import os
+import threading
+
+from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from database.instrumentation import instrument_engine
+
+load_dotenv()
+
+# Pool for the API process: enough connections for the expected request concurrency,
+# recycled before PostgreSQL or a proxy drops them as idle
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+API_MAX_OVERFLOW = int(os.getenv("API_MAX_OVERFLOW", "10"))
+API_POOL_TIMEOUT = float(os.getenv("API_POOL_TIMEOUT", "10"))
+API_POOL_RECYCLE = int(os.getenv("API_POOL_RECYCLE", "1800"))
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for asyncpg, e.g. postgresql+psycopg2:// -> postgresql+asyncpg://."""
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+# Bound to the engine on first use, so importing the API doesn't open a pool
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False)
+
+_async_engine = None
+_async_engine_lock = threading.Lock()
+
+
+def database_configured() -> bool:
+    """Whether ASYNC_DATABASE_URL or DATABASE_URL is set; without either the API can only serve a snapshot."""
+    return bool(os.getenv("ASYNC_DATABASE_URL") or os.getenv("DATABASE_URL"))
+
+
+def get_async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL with the asyncpg driver; raises if neither is set."""
+    if os.getenv("ASYNC_DATABASE_URL"):
+        return os.getenv("ASYNC_DATABASE_URL")
+    if not database_configured():
+        raise RuntimeError("DATABASE_URL is not set (export it or add it to .env)")
+    return async_database_url(os.getenv("DATABASE_URL"))
+
+
+def get_async_engine():
+    """Returns the API's engine, creating it and its pool on first use."""
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                engine = create_async_engine(
+                    get_async_database_url(),
+                    pool_size=API_POOL_SIZE,
+                    max_overflow=API_MAX_OVERFLOW,
+                    pool_timeout=API_POOL_TIMEOUT,
+                    pool_recycle=API_POOL_RECYCLE,
+                    pool_pre_ping=True,
+                )
+                instrument_engine(engine.sync_engine)
+                AsyncSessionLocal.configure(bind=engine)
+                _async_engine = engine
+    return _async_engine
+
+
+async def get_async_session():
+    """FastAPI dependency: one AsyncSession per request, returned to the pool afterwards."""
+    get_async_engine()
+    async with AsyncSessionLocal() as session:
+        yield session
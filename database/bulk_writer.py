@@ -0,0 +1,179 @@
+# database/bulk_writer.py
+
+import time
+
+from sqlalchemy import inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from utils.metrics import get_metrics
+
+DEFAULT_BATCH_SIZE = 500
+
+WRITE_SECONDS = get_metrics().histogram(
+    "db_write_seconds", "Time to write and commit one batch (hooks included), by table and writer",
+    ("entity", "writer"))
+ROWS_WRITTEN = get_metrics().counter(
+    "db_rows_written_total", "Rows written by the batch writers, by table and operation", ("entity", "operation"))
+
+
+def dialect_insert(session, model):
+    """INSERT construct for the session's dialect (ON CONFLICT needs the dialect-specific one)."""
+    if session.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def insert_rows(session, model, rows: list, conflict_keys: tuple) -> tuple:
+    """
+    Insert rows with a single INSERT ... ON CONFLICT (conflict_keys) DO NOTHING RETURNING
+    statement. Rows whose key already existed are left untouched and looked up in one
+    extra SELECT; a row conflicting on any other unique constraint raises. Rows with a
+    NULL in their key never conflict and are all inserted.
+    Returns ({key tuple: id} for every row whose key isn't all NULL, [ids of the rows inserted]).
+    """
+    if not rows:
+        return {}, []
+
+    key_columns = [getattr(model, key) for key in conflict_keys]
+    unique_rows = {}
+    # A NULL in the key never conflicts, so those rows are only deduplicated when identical
+    unkeyed = {}
+    for row in rows:
+        key = tuple(row[key] for key in conflict_keys)
+        if None in key:
+            unkeyed.setdefault(tuple(sorted(row.items(), key=lambda item: item[0])), row)
+        else:
+            unique_rows.setdefault(key, row)
+
+    stmt = (
+        dialect_insert(session, model)
+        .values(list(unique_rows.values()) + list(unkeyed.values()))
+        .on_conflict_do_nothing(index_elements=list(conflict_keys))
+        .returning(model.id, *key_columns)
+    )
+    returned = session.execute(stmt).all()
+    ids = {tuple(row[1:]): row[0] for row in returned if any(value is not None for value in row[1:])}
+
+    missing = [key for key in unique_rows if key not in ids]
+    if missing:
+        existing = session.execute(
+            select(model.id, *key_columns).where(tuple_(*key_columns).in_(missing))
+        )
+        ids.update({tuple(row[1:]): row[0] for row in existing})
+    return ids, [row[0] for row in returned]
+
+
+class BulkWriter:
+    """
+    Buffers scraped records for one model and writes them in batches, one
+    INSERT and one commit per batch instead of a query + commit per entity.
+
+    A batch stays buffered until its commit succeeds. If it fails, it is
+    rolled back and its records are retried one transaction each, so a bad
+    record only costs itself: it is passed to on_error(record, error) and
+    the rest of the batch is written.
+    """
+
+    def __init__(self, session, model, conflict_keys: tuple, batch_size: int = DEFAULT_BATCH_SIZE,
+                 prepare=None, keep_ids: bool = True, on_write=None, on_error=None):
+        self.session = session
+        self.model = model
+        self.conflict_keys = conflict_keys
+        self.batch_size = batch_size
+        # Optional hook turning a buffered batch of records into insertable rows
+        self.prepare = prepare
+        self.columns = set(inspect(model).column_attrs.keys())
+        # Streaming crawls turn keep_ids off so memory doesn't grow with the number of rows written
+        self.keep_ids = keep_ids
+        # Optional hook called with (session, ids of the rows inserted or changed) inside each batch's
+        # transaction, before the commit
+        self.on_write = on_write
+        # Optional hook called with (record, exception) for every record that could not be written
+        self.on_error = on_error
+        self.ids = {}
+        self.written = 0
+        self.failed = 0
+        self._buffer = []
+
+    @property
+    def buffered(self) -> list:
+        """Records added but not committed yet."""
+        return self._buffer
+
+    def add(self, record: dict):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> dict:
+        """Write everything buffered and commit. Returns {key tuple: id} for the flushed batch."""
+        if not self._buffer:
+            return {}
+        start = time.perf_counter()
+        try:
+            ids, counts = self._commit(self._buffer)
+        except Exception:
+            ids, counts = self._commit_one_by_one(self._buffer)
+        self._buffer = []
+        self._tally(counts)
+        self._record_write(start, **counts)
+        if self.keep_ids:
+            self.ids.update(ids)
+        return ids
+
+    def _commit(self, records: list) -> tuple:
+        """Prepare, write and commit records in one transaction: ({key tuple: id}, {operation: rows})."""
+        try:
+            if self.prepare:
+                records = self.prepare(self.session, records)
+            ids, counts = self._write(records)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return ids, counts
+
+    def _commit_one_by_one(self, records: list) -> tuple:
+        ids, counts = {}, {}
+        for record in records:
+            try:
+                record_ids, record_counts = self._commit([record])
+            except Exception as e:
+                self.failed += 1
+                key = tuple(record.get(key) for key in self.conflict_keys)
+                print(f"❌ Failed to write {self.model.__tablename__} {key}: {type(e).__name__}: {str(e).splitlines()[0]}")
+                if self.on_error:
+                    self.on_error(record, e)
+                continue
+            ids.update(record_ids)
+            for operation, rows in record_counts.items():
+                counts[operation] = counts.get(operation, 0) + rows
+        return ids, counts
+
+    def _write(self, records: list) -> tuple:
+        """The batch's statements and on_write hook, without committing: ({key tuple: id}, {operation: rows})."""
+        rows = [{k: v for k, v in record.items() if k in self.columns} for record in records]
+        ids, inserted = insert_rows(self.session, self.model, rows, self.conflict_keys)
+        if self.on_write:
+            # Rows whose key already existed were left untouched, so only the inserted ones changed
+            self.on_write(self.session, inserted)
+        return ids, {"insert": len(inserted)}
+
+    def _tally(self, counts: dict):
+        self.written += sum(counts.values())
+
+    def _record_write(self, start: float, **rows_by_operation):
+        entity = self.model.__tablename__
+        WRITE_SECONDS.observe(time.perf_counter() - start, entity=entity, writer=type(self).__name__)
+        for operation, rows in rows_by_operation.items():
+            ROWS_WRITTEN.inc(rows, entity=entity, operation=operation)
+
+    def id_for(self, *key):
+        return self.ids.get(tuple(key))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
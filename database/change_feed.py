@@ -0,0 +1,93 @@
+# database/change_feed.py
+
+import asyncio
+import json
+import os
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+# PostgreSQL NOTIFY channel the API process listens on to keep its in-memory caches current
+CHANGES_CHANNEL = os.getenv("CHANGES_CHANNEL", "grapsmuse_changes")
+# NOTIFY payloads must stay under 8000 bytes
+IDS_PER_MESSAGE = 500
+# Sent when too much changed to list, e.g. after a full stats rebuild
+RESET = "*"
+# Seconds between attempts to re-open a dropped LISTEN connection
+LISTEN_RETRY_DELAY = 2.0
+
+
+def entity_tag(kind: str, entity_id) -> str:
+    """Tag of a response built from one row, e.g. "wrestler:42"."""
+    return f"{kind}:{entity_id}"
+
+
+def collection_tag(kind: str) -> str:
+    """Tag of a response built from many rows of a kind (lists, rankings), e.g. "wrestlers"."""
+    return f"{kind}s"
+
+
+def publish(session, kind: str, ids):
+    """
+    Announce that rows of kind changed. The NOTIFY is queued in the session's
+    transaction, so listeners hear about it only once the batch commits, and
+    not at all if it rolls back.
+    """
+    ids = sorted({entity_id for entity_id in ids if entity_id is not None})
+    if not ids or session.get_bind().dialect.name != "postgresql":
+        return
+    for start in range(0, len(ids), IDS_PER_MESSAGE):
+        payload = json.dumps({"kind": kind, "ids": ids[start:start + IDS_PER_MESSAGE]})
+        session.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANGES_CHANNEL, "payload": payload})
+
+
+def publish_reset(session):
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                        {"channel": CHANGES_CHANNEL, "payload": json.dumps({"kind": RESET, "ids": []})})
+
+
+def tags_for(kind: str, ids: list):
+    """Cache tags to invalidate for a change, or None to drop everything."""
+    if kind == RESET:
+        return None
+    return [collection_tag(kind)] + [entity_tag(kind, entity_id) for entity_id in ids]
+
+
+def listen_dsn(url: str) -> str:
+    """A SQLAlchemy URL as a plain libpq DSN asyncpg can connect with."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def listen(url: str, on_change):
+    """
+    Keep a LISTEN connection open on the change feed and call on_change(kind, ids)
+    for every message. Notifications sent while the connection was down are
+    lost, so on_change(RESET, []) is called each time it (re)connects.
+    """
+    # Only the API process listens; writers publish through their own session
+    import asyncpg
+
+    def on_notify(connection, pid, channel, payload):
+        message = json.loads(payload)
+        on_change(message["kind"], message["ids"])
+
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(listen_dsn(url))
+            closed = asyncio.get_running_loop().create_future()
+            connection.add_termination_listener(lambda _: closed.done() or closed.set_result(None))
+            await connection.add_listener(CHANGES_CHANNEL, on_notify)
+            on_change(RESET, [])
+            print(f"👂 Listening for changes on {CHANGES_CHANNEL}")
+            await closed
+            print("⚠️ Change feed connection closed, reconnecting")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ Change feed connection failed: {e!r}")
+        finally:
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(LISTEN_RETRY_DELAY)
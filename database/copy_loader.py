@@ -0,0 +1,315 @@
+# database/copy_loader.py
+
+import csv
+import io
+import time
+
+from sqlalchemy import select, text
+
+from database.bulk_writer import ROWS_WRITTEN, WRITE_SECONDS, insert_rows
+from database.models import EVENT_TYPES, VICTORY_TYPES, Arena, TagTeam, Wrestler
+from database.promotion_resolver import get_promotion_resolver
+from database.stats import refresh_wrestler_stats
+from utils.cli import EVENT_BATCH_SIZE as DEFAULT_BATCH_SIZE
+
+# Staging tables: plain columns COPY can fill, dropped at the end of each batch's transaction
+STAGE_EVENTS = ("stage_events", [
+    ("cagematch_id", "int"), ("name", "varchar"), ("promotion_id", "int"), ("date_of_event", "date"),
+    ("event_type_id", "int"), ("arena_id", "int"), ("attendance", "int"),
+])
+STAGE_MATCHES = ("stage_matches", [
+    ("event_id", "int"), ("promotion_id", "int"), ("date", "date"), ("match_type", "varchar"),
+    ("stipulation", "varchar"), ("title_defense", "boolean"), ("victor_id", "int"), ("victory_type_id", "int"),
+    ("match_length", "time"), ("position_on_event_card", "int"), ("victor_team_number", "int"),
+    ("match_notes", "text"),
+])
+STAGE_PARTICIPANTS = ("stage_participants", [
+    ("match_id", "int"), ("wrestler_id", "int"), ("tag_team_id", "int"), ("participant_number", "int"),
+    ("team_number", "int"), ("cagematch_id", "int"), ("name", "varchar"),
+])
+
+MERGE_EVENTS = """
+    INSERT INTO events (cagematch_id, name, promotion_id, date_of_event, event_type_id, arena_id, attendance,
+                        updated_at)
+    SELECT cagematch_id, name, promotion_id, date_of_event, event_type_id, arena_id, attendance, LOCALTIMESTAMP
+    FROM stage_events
+    ON CONFLICT (cagematch_id) DO UPDATE SET
+        name = EXCLUDED.name, promotion_id = EXCLUDED.promotion_id, date_of_event = EXCLUDED.date_of_event,
+        event_type_id = EXCLUDED.event_type_id, arena_id = EXCLUDED.arena_id, attendance = EXCLUDED.attendance,
+        updated_at = EXCLUDED.updated_at
+    RETURNING id, cagematch_id
+"""
+
+MERGE_MATCHES = """
+    INSERT INTO matches (event_id, promotion_id, date, match_type, stipulation, title_defense, victor_id,
+                         victory_type_id, match_length, position_on_event_card, victor_team_number, match_notes)
+    SELECT event_id, promotion_id, date, match_type::match_type, stipulation::stipulation, title_defense,
+           victor_id, victory_type_id, match_length, position_on_event_card, victor_team_number, match_notes
+    FROM stage_matches
+    ON CONFLICT (event_id, position_on_event_card) DO UPDATE SET
+        promotion_id = EXCLUDED.promotion_id, date = EXCLUDED.date, match_type = EXCLUDED.match_type,
+        stipulation = EXCLUDED.stipulation, title_defense = EXCLUDED.title_defense,
+        victor_id = EXCLUDED.victor_id, victory_type_id = EXCLUDED.victory_type_id,
+        match_length = EXCLUDED.match_length, victor_team_number = EXCLUDED.victor_team_number,
+        match_notes = EXCLUDED.match_notes
+    RETURNING id, event_id, position_on_event_card
+"""
+
+# A re-scraped card can be shorter than the stored one: drop what is no longer on it (and unset it as headliner;
+# SET_HEADLINERS then points the event at its new main event)
+DELETE_STALE_MATCHES = """
+    WITH stale AS (
+        SELECT m.id FROM matches m
+        WHERE m.event_id IN (SELECT DISTINCT event_id FROM stage_matches)
+          AND NOT EXISTS (SELECT 1 FROM stage_matches s
+                          WHERE s.event_id = m.event_id AND s.position_on_event_card = m.position_on_event_card)
+    ), removed_participants AS (
+        DELETE FROM match_participants WHERE match_id IN (SELECT id FROM stale)
+    ), unset_headliners AS (
+        UPDATE events SET headliner_match_id = NULL WHERE headliner_match_id IN (SELECT id FROM stale)
+    )
+    DELETE FROM matches WHERE id IN (SELECT id FROM stale)
+"""
+
+MERGE_PARTICIPANTS = """
+    INSERT INTO match_participants (match_id, wrestler_id, tag_team_id, participant_number, team_number,
+                                    cagematch_id, name)
+    SELECT match_id, wrestler_id, tag_team_id, participant_number, team_number, cagematch_id, name
+    FROM stage_participants
+    ON CONFLICT (match_id, participant_number) DO UPDATE SET
+        wrestler_id = EXCLUDED.wrestler_id, tag_team_id = EXCLUDED.tag_team_id,
+        team_number = EXCLUDED.team_number, cagematch_id = EXCLUDED.cagematch_id, name = EXCLUDED.name
+"""
+
+DELETE_STALE_PARTICIPANTS = """
+    DELETE FROM match_participants p
+    WHERE p.match_id IN (SELECT DISTINCT match_id FROM stage_participants)
+      AND NOT EXISTS (SELECT 1 FROM stage_participants s
+                      WHERE s.match_id = p.match_id AND s.participant_number = p.participant_number)
+"""
+
+SET_HEADLINERS = """
+    UPDATE events e SET headliner_match_id = m.id
+    FROM matches m
+    WHERE m.event_id = e.id AND m.position_on_event_card = 0 AND e.id = ANY(:event_ids)
+      AND e.headliner_match_id IS DISTINCT FROM m.id
+"""
+
+# Linking changes the cards it touches, so their events are marked updated as well
+RELINK_PARTICIPANTS = """
+    WITH linked AS (
+        UPDATE match_participants p SET wrestler_id = w.id
+        FROM wrestlers w
+        WHERE p.wrestler_id IS NULL AND p.cagematch_id = w.cagematch_id
+        RETURNING p.match_id, p.wrestler_id
+    ), touched AS (
+        UPDATE events SET updated_at = LOCALTIMESTAMP
+        WHERE id IN (SELECT event_id FROM matches WHERE id IN (SELECT match_id FROM linked))
+    )
+    SELECT wrestler_id FROM linked
+"""
+
+# Wrestlers and promotions whose stats a re-load can change, read before the merge replaces the cards
+STORED_EVENT_GROUPS = """
+    SELECT e.promotion_id, p.wrestler_id
+    FROM events e
+    LEFT JOIN matches m ON m.event_id = e.id
+    LEFT JOIN match_participants p ON p.match_id = m.id
+    WHERE e.cagematch_id = ANY(:cagematch_ids)
+"""
+
+
+def copy_rows(session, table: str, columns: list, rows):
+    """Stream rows into table with COPY FROM STDIN, inside the session's transaction."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    buffer.seek(0)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def stage(session, staging: tuple, rows):
+    table, columns = staging
+    session.execute(text(
+        f"CREATE TEMP TABLE {table} ({', '.join(f'{name} {kind}' for name, kind in columns)}) ON COMMIT DROP"
+    ))
+    copy_rows(session, table, [name for name, _ in columns], rows)
+
+
+def relink_participants(session) -> int:
+    """Fill in wrestler_id for participants whose wrestler has been scraped since. Returns rows linked."""
+    wrestler_ids = session.execute(text(RELINK_PARTICIPANTS)).scalars().all()
+    refresh_wrestler_stats(session, wrestler_ids)
+    session.commit()
+    return len(wrestler_ids)
+
+
+def _type_id(types: tuple, value: str):
+    return types.index(value) + 1 if value in types else None
+
+
+class CopyLoader:
+    """
+    Loads scraped events with their cards into events / matches / match_participants.
+
+    Each batch is COPYed into temporary staging tables and merged with
+    INSERT ... ON CONFLICT, so re-loading an event updates it in place. Wrestler,
+    tag team, arena and promotion ids are resolved from in-memory maps; tag teams
+    and arenas seen for the first time are created in one insert per batch.
+    Participants whose wrestler isn't in the database yet keep their cagematch_id
+    and can be linked later with relink_participants. The stats of every wrestler
+    and promotion a batch touches are refreshed in the same transaction.
+    PostgreSQL only.
+    """
+
+    def __init__(self, session, batch_size: int = DEFAULT_BATCH_SIZE):
+        if session.get_bind().dialect.name != "postgresql":
+            raise RuntimeError("CopyLoader needs PostgreSQL (COPY and temporary staging tables)")
+        self.session = session
+        self.batch_size = batch_size
+        self.counts = {"events": 0, "matches": 0, "participants": 0}
+        self.seconds = 0.0
+        self._buffer = []
+        self.load_maps()
+
+    def load_maps(self):
+        """(Re)load the cagematch_id -> id maps used to resolve participants."""
+        self.wrestler_ids = dict(self.session.execute(
+            select(Wrestler.cagematch_id, Wrestler.id).where(Wrestler.cagematch_id.is_not(None))).all())
+        self.tag_team_ids = dict(self.session.execute(
+            select(TagTeam.cagematch_id, TagTeam.id).where(TagTeam.cagematch_id.is_not(None))).all())
+        self.arena_ids = {(name, country): arena_id for arena_id, name, country in self.session.execute(
+            select(Arena.id, Arena.name, Arena.country)).all()}
+        self.session.commit()
+
+    def add(self, event: dict):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def _promotion_ids(self, events: list) -> dict:
+        """{event cagematch_id: promotion id}, preferring the promotion's cagematch id over its name."""
+        resolver = get_promotion_resolver()
+        by_cagematch_id = {event["promotion_cagematch_id"]: resolver.id_for_cagematch_id(
+            self.session, event["promotion_cagematch_id"]) for event in events if event["promotion_cagematch_id"]}
+        by_name = resolver.resolve_many(self.session, [
+            event["promotion_name"] for event in events if not by_cagematch_id.get(event["promotion_cagematch_id"])])
+        return {event["cagematch_id"]: by_cagematch_id.get(event["promotion_cagematch_id"])
+                or by_name.get(event["promotion_name"]) for event in events}
+
+    def _new_ids(self, model, known: dict, rows: dict, conflict_keys: tuple) -> dict:
+        """Insert the rows whose key isn't in known yet; returns {key: id} for them."""
+        missing = [row for key, row in rows.items() if key not in known]
+        ids, _ = insert_rows(self.session, model, missing, conflict_keys)
+        return {key if len(conflict_keys) > 1 else key[0]: row_id for key, row_id in ids.items()}
+
+    def flush(self) -> dict:
+        """COPY and merge everything buffered in one transaction. Returns {event cagematch_id: id}."""
+        if not self._buffer:
+            return {}
+        # A later copy of the same event wins; ON CONFLICT can't touch a row twice in one statement
+        events = list({event["cagematch_id"]: event for event in self._buffer if event["cagematch_id"]}.values())
+        self._buffer = []
+        start = time.perf_counter()
+        # The resolver commits on its own, so promotions are settled before the batch transaction
+        promotion_ids = self._promotion_ids(events)
+
+        try:
+            arenas = {(event["arena"]["name"], event["arena"]["country"]): event["arena"]
+                      for event in events if event["arena"] and event["arena"]["name"]}
+            new_arenas = self._new_ids(Arena, self.arena_ids, arenas, ("name", "country"))
+            arena_ids = {**self.arena_ids, **new_arenas}
+
+            teams = {}
+            for event in events:
+                for match in event["matches"]:
+                    for participant in match["participants"]:
+                        if participant["tag_team_cagematch_id"]:
+                            teams[participant["tag_team_cagematch_id"]] = {
+                                "cagematch_id": participant["tag_team_cagematch_id"],
+                                "name": participant["tag_team_name"]}
+            new_teams = self._new_ids(TagTeam, self.tag_team_ids, teams, ("cagematch_id",))
+            tag_team_ids = {**self.tag_team_ids, **new_teams}
+
+            stored = self.session.execute(text(STORED_EVENT_GROUPS),
+                                          {"cagematch_ids": [event["cagematch_id"] for event in events]}).all()
+            stage(self.session, STAGE_EVENTS, ((
+                event["cagematch_id"], event["name"], promotion_ids[event["cagematch_id"]], event["date_of_event"],
+                _type_id(EVENT_TYPES, event["event_type"]),
+                arena_ids.get((event["arena"]["name"], event["arena"]["country"])) if event["arena"] else None,
+                event["attendance"],
+            ) for event in events))
+            event_ids = {cagematch_id: event_id for event_id, cagematch_id in
+                         self.session.execute(text(MERGE_EVENTS))}
+
+            match_rows = []
+            for event in events:
+                for match in event["matches"]:
+                    winners = [self.wrestler_ids.get(participant["cagematch_id"])
+                               for participant in match["participants"] if participant["team_number"] == 1]
+                    victor_id = winners[0] if match["victor_team_number"] == 1 and len(winners) == 1 else None
+                    match_rows.append((
+                        event_ids[event["cagematch_id"]], promotion_ids[event["cagematch_id"]],
+                        event["date_of_event"], match["match_type"], match["stipulation"], match["title_defense"],
+                        victor_id, _type_id(VICTORY_TYPES, match["victory_type"]), match["match_length"],
+                        match["position_on_event_card"], match["victor_team_number"], match["match_notes"],
+                    ))
+            stage(self.session, STAGE_MATCHES, match_rows)
+            match_ids = {(event_id, position): match_id for match_id, event_id, position in
+                         self.session.execute(text(MERGE_MATCHES))}
+            self.session.execute(text(DELETE_STALE_MATCHES))
+
+            participant_rows = []
+            for event in events:
+                event_id = event_ids[event["cagematch_id"]]
+                for match in event["matches"]:
+                    match_id = match_ids[(event_id, match["position_on_event_card"])]
+                    for participant in match["participants"]:
+                        participant_rows.append((
+                            match_id, self.wrestler_ids.get(participant["cagematch_id"]),
+                            tag_team_ids.get(participant["tag_team_cagematch_id"]),
+                            participant["participant_number"], participant["team_number"],
+                            participant["cagematch_id"], participant["name"],
+                        ))
+            stage(self.session, STAGE_PARTICIPANTS, participant_rows)
+            self.session.execute(text(MERGE_PARTICIPANTS))
+            self.session.execute(text(DELETE_STALE_PARTICIPANTS))
+
+            self.session.execute(text(SET_HEADLINERS), {"event_ids": list(event_ids.values())})
+            refresh_wrestler_stats(
+                self.session,
+                {wrestler_id for _, wrestler_id in stored} | {row[1] for row in participant_rows},
+                {promotion_id for promotion_id, _ in stored} | set(promotion_ids.values()))
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        # Only remember new ids once they are committed
+        self.arena_ids.update(new_arenas)
+        self.tag_team_ids.update(new_teams)
+        self.counts["events"] += len(event_ids)
+        self.counts["matches"] += len(match_rows)
+        self.counts["participants"] += len(participant_rows)
+        seconds = time.perf_counter() - start
+        self.seconds += seconds
+        WRITE_SECONDS.observe(seconds, entity="events", writer="CopyLoader")
+        for entity, rows in (("events", len(event_ids)), ("matches", len(match_rows)),
+                             ("match_participants", len(participant_rows))):
+            ROWS_WRITTEN.inc(rows, entity=entity, operation="merge")
+        return event_ids
+
+    @property
+    def rows(self) -> int:
+        return sum(self.counts.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,101 @@
+# database/crawl_state.py
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from database.bulk_writer import dialect_insert
+from database.models import CrawlCheckpoint, CrawlFrontier
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_FRESHNESS = timedelta(days=7)
+
+
+def enqueue(session, urls: list, kind: str):
+    """Add urls to the frontier as pending; urls already known keep their state."""
+    if not urls:
+        return
+    rows = [{"url": url, "kind": kind, "status": PENDING, "attempts": 0} for url in dict.fromkeys(urls)]
+    session.execute(dialect_insert(session, CrawlFrontier).values(rows).on_conflict_do_nothing())
+    session.commit()
+
+
+def stale_urls(session, urls: list, fresh_for: timedelta = DEFAULT_FRESHNESS) -> list:
+    """Return the urls that weren't fetched successfully within the freshness window, in order."""
+    if not urls:
+        return []
+    cutoff = datetime.now() - fresh_for
+    fresh = set(session.scalars(
+        select(CrawlFrontier.url).where(
+            CrawlFrontier.url.in_(urls),
+            CrawlFrontier.status == DONE,
+            CrawlFrontier.last_fetched_at >= cutoff,
+        )
+    ))
+    return [url for url in urls if url not in fresh]
+
+
+def unfinished_urls(session, kind: str) -> list:
+    """Pending urls left over from an interrupted run."""
+    return list(session.scalars(
+        select(CrawlFrontier.url)
+        .where(CrawlFrontier.kind == kind, CrawlFrontier.status == PENDING)
+        .order_by(CrawlFrontier.id)
+    ))
+
+
+def failed_urls(session, kind: str, max_attempts: int = None) -> list:
+    query = select(CrawlFrontier.url).where(CrawlFrontier.kind == kind, CrawlFrontier.status == FAILED)
+    if max_attempts is not None:
+        query = query.where(CrawlFrontier.attempts < max_attempts)
+    return list(session.scalars(query.order_by(CrawlFrontier.id)))
+
+
+def mark_done(session, urls: list):
+    if not urls:
+        return
+    session.execute(
+        update(CrawlFrontier)
+        .where(CrawlFrontier.url.in_(urls))
+        .values(status=DONE, attempts=CrawlFrontier.attempts + 1,
+                last_fetched_at=datetime.now(), last_error=None)
+    )
+    session.commit()
+
+
+def mark_failed(session, url: str, error: str):
+    session.execute(
+        update(CrawlFrontier)
+        .where(CrawlFrontier.url == url)
+        .values(status=FAILED, attempts=CrawlFrontier.attempts + 1,
+                last_fetched_at=datetime.now(), last_error=error[:1000])
+    )
+    session.commit()
+
+
+def requeue_failed(session, kind: str = None) -> int:
+    """Put failed urls back to pending. Returns how many were re-queued."""
+    stmt = update(CrawlFrontier).where(CrawlFrontier.status == FAILED).values(status=PENDING)
+    if kind is not None:
+        stmt = stmt.where(CrawlFrontier.kind == kind)
+    count = session.execute(stmt).rowcount
+    session.commit()
+    return count
+
+
+def get_checkpoint(session, name: str, default: int = 0) -> int:
+    checkpoint = session.get(CrawlCheckpoint, name)
+    return checkpoint.value if checkpoint else default
+
+
+def set_checkpoint(session, name: str, value: int):
+    stmt = dialect_insert(session, CrawlCheckpoint).values(name=name, value=value, updated_at=datetime.now())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CrawlCheckpoint.name],
+        set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+    )
+    session.execute(stmt)
+    session.commit()
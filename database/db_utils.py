@@ -1,38 +1,65 @@
 # database/db_utils.py
 
+import os
+import threading
+
+from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.exc import NoResultFound
+
+from database.instrumentation import instrument_engine
+from database.migrate import upgrade
 from database.models import Base, Promotion
-from dotenv import load_dotenv
-import os
+from database.promotion_resolver import get_promotion_resolver
+
+# Bound to the engine on first use, so importing a scraper needs no database
+Session = scoped_session(sessionmaker())
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_database_url() -> str:
+    """DATABASE_URL from the environment or .env; raises if it isn't set."""
+    load_dotenv()
+    url = os.getenv("DATABASE_URL")
+    if not url:
+        raise RuntimeError("DATABASE_URL is not set (export it or add it to .env)")
+    return url
+
 
+def get_engine():
+    """Returns the process-wide engine, creating it (and its pool) on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = instrument_engine(create_engine(get_database_url(), echo=False, future=True))
+                Session.configure(bind=engine)
+                _engine = engine
+    return _engine
 
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Create engine and session
-engine = create_engine(DATABASE_URL, echo=False, future=True)
-Session = scoped_session(sessionmaker(bind=engine))
+def __getattr__(name: str):
+    # `from database.db_utils import engine` keeps working, creating the engine at that point
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_session():
     """Returns a new SQLAlchemy session."""
+    get_engine()
     return Session()
 
 
 def init_db():
-    """Create tables based on models."""
+    """Create tables based on models, then bring existing tables up to date with the migrations."""
+    engine = get_engine()
     Base.metadata.create_all(engine)
+    upgrade(engine)
 
 
 def get_or_create_promotion(session, name: str) -> Promotion:
     """Gets an existing promotion by name, or creates it."""
-    try:
-        promotion = session.query(Promotion).filter_by(name=name).one()
-    except NoResultFound:
-        promotion = Promotion(name=name)
-        session.add(promotion)
-        session.commit()
-        session.refresh(promotion)
-    return promotion
+    return session.get(Promotion, get_promotion_resolver().resolve(session, name))
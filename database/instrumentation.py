@@ -0,0 +1,57 @@
+# database/instrumentation.py
+
+import functools
+import re
+import time
+
+from sqlalchemy import event
+
+from utils.metrics import get_metrics
+
+STATEMENT_SECONDS = get_metrics().histogram(
+    "db_statement_seconds", "SQL statement execution time, by operation and the table it targets",
+    ("operation", "entity"))
+COMMITS = get_metrics().counter("db_commits_total", "Transactions committed")
+
+# The target of a write, at the start of the statement or after its WITH clause
+WRITE_TARGET = re.compile(r'^(?:WITH\b.*\)\s*)?(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)', re.I | re.S)
+READ_SOURCE = re.compile(r'\bFROM\s+"?(\w+)', re.I)
+
+
+@functools.lru_cache(maxsize=1024)
+def classify_statement(statement: str) -> tuple:
+    """(operation, table) of a SQL statement, e.g. ("insert", "wrestlers"); "-" when it reads no table."""
+    statement = statement.strip()
+    write = WRITE_TARGET.match(statement)
+    if write:
+        return write.group(1).split()[0].lower(), write.group(2).lower()
+    keyword = statement.split(None, 1)[0].lower() if statement else "-"
+    operation = "select" if keyword == "with" else keyword
+    source = READ_SOURCE.search(statement) if operation == "select" else None
+    return operation, source.group(1).lower() if source else "-"
+
+
+def instrument_engine(engine):
+    """Time every statement run through engine (sync, or an AsyncEngine's sync_engine) and count commits."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("statement_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["statement_started"].pop()
+        operation, entity = classify_statement(statement)
+        STATEMENT_SECONDS.observe(time.perf_counter() - started, operation=operation, entity=entity)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get("statement_started"):
+            context.connection.info["statement_started"].pop()
+
+    @event.listens_for(engine, "commit")
+    def commit(conn):
+        COMMITS.inc()
+
+    return engine
@@ -0,0 +1,147 @@
+# database/job_queue.py
+
+from datetime import timedelta
+
+from sqlalchemy import case, func, select, update
+
+from database.bulk_writer import dialect_insert
+from database.models import ScrapeJob
+from utils.cli import JOB_LEASE_SECONDS
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Job kinds
+ROSTER_PAGE = "roster_page"
+PROMOTIONS = "promotions"
+WRESTLER_PROFILE = "wrestler_profile"
+TITLES = "titles"
+GIMMICK = "gimmick"
+JOB_KINDS = (ROSTER_PAGE, PROMOTIONS, WRESTLER_PROFILE, TITLES, GIMMICK)
+
+LEASE = timedelta(seconds=JOB_LEASE_SECONDS)
+MAX_ATTEMPTS = 5
+
+# Leases are compared against the database clock, so workers on different
+# machines don't need synchronised clocks. Every function commits.
+
+
+def enqueue(session, kind: str, urls: list, payloads: list = None) -> int:
+    """Add jobs as pending; a (kind, url) already queued keeps its state. Returns how many were new."""
+    if not urls:
+        return 0
+    payloads = payloads or [None] * len(urls)
+    rows = {}
+    for url, payload in zip(urls, payloads):
+        rows.setdefault(url, {"kind": kind, "url": url, "payload": payload, "status": PENDING,
+                              "attempts": 0, "created_at": func.now()})
+    stmt = dialect_insert(session, ScrapeJob).values(list(rows.values())).on_conflict_do_nothing()
+    count = len(session.execute(stmt.returning(ScrapeJob.id)).all())
+    session.commit()
+    return count
+
+
+def claim(session, worker_id: str, limit: int = 1, kinds: list = None, lease: timedelta = LEASE) -> list:
+    """
+    Lease up to limit pending jobs to worker_id. Returns rows with id, kind, url,
+    payload and attempts.
+    FOR UPDATE SKIP LOCKED lets any number of workers claim concurrently without
+    blocking on, or double-claiming, each other's rows.
+    """
+    candidates = select(ScrapeJob.id).where(ScrapeJob.status == PENDING)
+    if kinds:
+        candidates = candidates.where(ScrapeJob.kind.in_(kinds))
+    candidates = candidates.order_by(ScrapeJob.id).limit(limit).with_for_update(skip_locked=True)
+
+    stmt = (
+        update(ScrapeJob)
+        .where(ScrapeJob.id.in_(candidates.scalar_subquery()))
+        .values(status=RUNNING, worker_id=worker_id, attempts=ScrapeJob.attempts + 1,
+                leased_until=func.now() + lease, heartbeat_at=func.now())
+        .returning(ScrapeJob.id, ScrapeJob.kind, ScrapeJob.url, ScrapeJob.payload, ScrapeJob.attempts)
+    )
+    jobs = session.execute(stmt).all()
+    session.commit()
+    return sorted(jobs, key=lambda job: job.id)
+
+
+def heartbeat(session, worker_id: str, job_ids: list, lease: timedelta = LEASE) -> int:
+    """Extend the lease of jobs the worker still holds. Returns how many it still owns."""
+    if not job_ids:
+        return 0
+    count = session.execute(
+        update(ScrapeJob)
+        .where(ScrapeJob.id.in_(job_ids), ScrapeJob.worker_id == worker_id, ScrapeJob.status == RUNNING)
+        .values(leased_until=func.now() + lease, heartbeat_at=func.now())
+    ).rowcount
+    session.commit()
+    return count
+
+
+def complete(session, worker_id: str, job_ids: list):
+    if not job_ids:
+        return
+    session.execute(
+        update(ScrapeJob)
+        .where(ScrapeJob.id.in_(job_ids), ScrapeJob.worker_id == worker_id)
+        .values(status=DONE, finished_at=func.now(), leased_until=None, last_error=None)
+    )
+    session.commit()
+
+
+def fail(session, worker_id: str, job_id: int, error: str, max_attempts: int = MAX_ATTEMPTS):
+    """Put a job back to pending, or mark it failed once it has used max_attempts."""
+    session.execute(
+        update(ScrapeJob)
+        .where(ScrapeJob.id == job_id, ScrapeJob.worker_id == worker_id)
+        .values(status=_retry_status(max_attempts), leased_until=None, finished_at=func.now(),
+                last_error=error[:1000])
+    )
+    session.commit()
+
+
+def requeue_expired(session, max_attempts: int = MAX_ATTEMPTS) -> int:
+    """Release running jobs whose worker stopped heartbeating. Returns how many were released."""
+    count = session.execute(
+        update(ScrapeJob)
+        .where(ScrapeJob.status == RUNNING, ScrapeJob.leased_until < func.now())
+        .values(status=_retry_status(max_attempts), worker_id=None, leased_until=None,
+                last_error="lease expired")
+    ).rowcount
+    session.commit()
+    return count
+
+
+def requeue_failed(session, kind: str = None) -> int:
+    """Give failed jobs a fresh set of attempts. Returns how many were re-queued."""
+    stmt = update(ScrapeJob).where(ScrapeJob.status == FAILED).values(status=PENDING, attempts=0)
+    if kind is not None:
+        stmt = stmt.where(ScrapeJob.kind == kind)
+    count = session.execute(stmt).rowcount
+    session.commit()
+    return count
+
+
+def queue_counts(session) -> dict:
+    """{(kind, status): count} over the whole queue."""
+    rows = session.execute(
+        select(ScrapeJob.kind, ScrapeJob.status, func.count()).group_by(ScrapeJob.kind, ScrapeJob.status)
+    ).all()
+    session.commit()
+    return {(kind, status): count for kind, status, count in rows}
+
+
+def has_open_jobs(session, kinds: list = None) -> bool:
+    """True while any job is pending or running, i.e. more work may still appear."""
+    query = select(ScrapeJob.id).where(ScrapeJob.status.in_([PENDING, RUNNING]))
+    if kinds:
+        query = query.where(ScrapeJob.kind.in_(kinds))
+    found = session.execute(query.limit(1)).first() is not None
+    session.commit()
+    return found
+
+
+def _retry_status(max_attempts: int):
+    return case((ScrapeJob.attempts >= max_attempts, FAILED), else_=PENDING)
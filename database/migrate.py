@@ -0,0 +1,63 @@
+# database/migrate.py
+
+from pathlib import Path
+
+from sqlalchemy import func, insert, select
+
+from database.models import SchemaMigration
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+# pg_advisory_lock key, so job queue workers starting together don't migrate twice
+MIGRATION_LOCK_ID = 4817001
+
+
+def available_migrations() -> list:
+    """Returns [(version, path)] for every migrations/NNNN_name.sql, oldest first."""
+    return [(path.stem, path) for path in sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9][0-9]_*.sql"))]
+
+
+def applied_migrations(connection) -> dict:
+    """Returns {version: applied_at} for the migrations already run against this database."""
+    SchemaMigration.__table__.create(connection, checkfirst=True)
+    return dict(connection.execute(select(SchemaMigration.version, SchemaMigration.applied_at)).all())
+
+
+def pending_migrations(engine) -> list:
+    with engine.connect() as connection:
+        applied = applied_migrations(connection)
+        connection.commit()
+    return [(version, path) for version, path in available_migrations() if version not in applied]
+
+
+def upgrade(engine) -> list:
+    """
+    Run every pending migration, each in its own transaction together with its
+    schema_migrations row, so a failed migration leaves nothing half applied.
+    Migrations are idempotent SQL; a database created from the current init.sql
+    just records them. Returns the versions that were applied.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    applied_now = []
+    with engine.connect() as connection:
+        connection.execute(select(func.pg_advisory_lock(MIGRATION_LOCK_ID)))
+        try:
+            applied = applied_migrations(connection)
+            connection.commit()
+            for version, path in available_migrations():
+                if version in applied:
+                    continue
+                with connection.begin():
+                    # A raw cursor runs the whole multi-statement script without bind parameter parsing
+                    cursor = connection.connection.cursor()
+                    try:
+                        cursor.execute(path.read_text())
+                    finally:
+                        cursor.close()
+                    connection.execute(insert(SchemaMigration).values(version=version))
+                print(f"🛠️ Applied migration {version}")
+                applied_now.append(version)
+        finally:
+            connection.execute(select(func.pg_advisory_unlock(MIGRATION_LOCK_ID)))
+            connection.commit()
+    return applied_now
@@ -0,0 +1,73 @@
+-- Bring databases created from an older init.sql, or by Base.metadata.create_all,
+-- in line with database/models.py. Every step checks the catalog first, so this
+-- is a no-op on a database created from the current init.sql.
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM information_schema.columns
+             WHERE table_name = 'gimmicks' AND column_name = 'promotion_id')
+     AND NOT EXISTS (SELECT 1 FROM information_schema.columns
+                     WHERE table_name = 'gimmicks' AND column_name = 'debut_promotion_id') THEN
+    ALTER TABLE "gimmicks" RENAME COLUMN "promotion_id" TO "debut_promotion_id";
+  END IF;
+END $$;
+
+ALTER TABLE "gimmicks" ALTER COLUMN "date_created" TYPE date USING "date_created"::date;
+ALTER TABLE "gimmicks" ALTER COLUMN "last_seen" TYPE date USING "last_seen"::date;
+ALTER TABLE "matches" ALTER COLUMN "match_rating" TYPE double precision;
+
+ALTER TABLE "tag_teams" ADD COLUMN IF NOT EXISTS "stable_id_nullable" int;
+ALTER TABLE "tag_teams" ADD COLUMN IF NOT EXISTS "gimmick_wrestler_one_id_nullable" int;
+ALTER TABLE "tag_teams" ADD COLUMN IF NOT EXISTS "gimmick_wrestler_two_id_nullable" int;
+ALTER TABLE "tag_teams" ADD COLUMN IF NOT EXISTS "cagematch_id" int;
+ALTER TABLE "events" ADD COLUMN IF NOT EXISTS "name" varchar;
+ALTER TABLE "events" ADD COLUMN IF NOT EXISTS "cagematch_id" int;
+ALTER TABLE "match_participants" ADD COLUMN IF NOT EXISTS "cagematch_id" int;
+ALTER TABLE "match_participants" ADD COLUMN IF NOT EXISTS "name" varchar;
+
+-- Unique constraints and foreign keys, added under a fixed name unless a
+-- constraint of the same kind already covers exactly those columns
+CREATE OR REPLACE FUNCTION pg_temp.has_constraint(tbl regclass, kind "char", cols text[]) RETURNS boolean AS $$
+  SELECT EXISTS (
+    SELECT 1 FROM pg_constraint c
+    WHERE c.conrelid = tbl AND c.contype = kind
+      AND ARRAY(SELECT a.attname::text FROM unnest(c.conkey) k JOIN pg_attribute a
+                ON a.attrelid = c.conrelid AND a.attnum = k ORDER BY a.attname) =
+          ARRAY(SELECT unnest(cols) ORDER BY 1)
+  )
+$$ LANGUAGE sql;
+
+DO $$
+DECLARE
+  uniques text[][] := ARRAY[
+    ['gimmicks', 'unique_gimmick_per_wrestler', 'wrestler_id,gimmick_name'],
+    ['tag_teams', 'tag_teams_cagematch_id_key', 'cagematch_id'],
+    ['events', 'events_cagematch_id_key', 'cagematch_id'],
+    ['arenas', 'unique_arena_per_country', 'name,country'],
+    ['matches', 'unique_match_per_card_position', 'event_id,position_on_event_card'],
+    ['match_participants', 'unique_participant_per_match', 'match_id,participant_number']
+  ];
+  foreign_keys text[][] := ARRAY[
+    ['gimmicks', 'debut_promotion_id', 'promotions'],
+    ['tag_teams', 'stable_id_nullable', 'stables'],
+    ['tag_teams', 'gimmick_wrestler_one_id_nullable', 'gimmicks'],
+    ['tag_teams', 'gimmick_wrestler_two_id_nullable', 'gimmicks'],
+    ['matches', 'title_id_nullable', 'championships'],
+    ['match_participants', 'trio_id', 'trios'],
+    ['championship_history', 'championship_id', 'championships']
+  ];
+  i int;
+BEGIN
+  FOR i IN 1 .. array_length(uniques, 1) LOOP
+    IF NOT pg_temp.has_constraint(uniques[i][1]::regclass, 'u', string_to_array(uniques[i][3], ',')) THEN
+      EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I UNIQUE (%s)', uniques[i][1], uniques[i][2],
+                     (SELECT string_agg(quote_ident(col), ', ') FROM unnest(string_to_array(uniques[i][3], ',')) col));
+    END IF;
+  END LOOP;
+  FOR i IN 1 .. array_length(foreign_keys, 1) LOOP
+    IF NOT pg_temp.has_constraint(foreign_keys[i][1]::regclass, 'f', ARRAY[foreign_keys[i][2]]) THEN
+      EXECUTE format('ALTER TABLE %I ADD FOREIGN KEY (%I) REFERENCES %I (id)',
+                     foreign_keys[i][1], foreign_keys[i][2], foreign_keys[i][3]);
+    END IF;
+  END LOOP;
+END $$;
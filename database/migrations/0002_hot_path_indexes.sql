@@ -0,0 +1,26 @@
+-- Indexes for the lookups the scrapers, resolvers and job queue run on every batch.
+-- Run runners/check_query_plans.py after changing any of these.
+
+CREATE INDEX IF NOT EXISTS "idx_promotions_name" ON "promotions" ("name");
+
+CREATE INDEX IF NOT EXISTS "idx_wrestlers_promotion_id" ON "wrestlers" ("promotion_id");
+
+CREATE INDEX IF NOT EXISTS "idx_events_promotion_date" ON "events" ("promotion_id", "date_of_event");
+
+CREATE INDEX IF NOT EXISTS "idx_match_participants_wrestler" ON "match_participants" ("wrestler_id")
+  WHERE "wrestler_id" IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS "idx_match_participants_tag_team" ON "match_participants" ("tag_team_id")
+  WHERE "tag_team_id" IS NOT NULL;
+
+-- relink_participants only ever looks at participants without a wrestler
+CREATE INDEX IF NOT EXISTS "idx_match_participants_unlinked" ON "match_participants" ("cagematch_id")
+  WHERE "wrestler_id" IS NULL;
+
+CREATE INDEX IF NOT EXISTS "idx_crawl_frontier_kind_status" ON "crawl_frontier" ("kind", "status", "id");
+
+CREATE INDEX IF NOT EXISTS "idx_scrape_jobs_claim" ON "scrape_jobs" ("status", "id");
+
+-- requeue_expired scans running jobs by lease
+CREATE INDEX IF NOT EXISTS "idx_scrape_jobs_leases" ON "scrape_jobs" ("leased_until")
+  WHERE "status" = 'running';
@@ -0,0 +1,7 @@
+-- Case-insensitive name lookups from the question engine (questions/compiler.py)
+
+CREATE INDEX IF NOT EXISTS "idx_wrestlers_lower_name" ON "wrestlers" (lower("name"));
+
+CREATE INDEX IF NOT EXISTS "idx_gimmicks_lower_name" ON "gimmicks" (lower("gimmick_name"));
+
+CREATE INDEX IF NOT EXISTS "idx_promotions_lower_name" ON "promotions" (lower("name"));
@@ -0,0 +1,59 @@
+-- Precomputed per-wrestler, per-promotion, per-decade and per-gimmick aggregates (database/stats.py).
+-- Backfill existing data afterwards with: python runners/refresh_stats.py --all
+
+CREATE TABLE IF NOT EXISTS "wrestler_stats" (
+  "wrestler_id" integer PRIMARY KEY REFERENCES "wrestlers" ("id") ON DELETE CASCADE,
+  "promotion_id" integer,
+  "debut_year" integer,
+  "debut_decade" integer,
+  "debut_age" integer,
+  "title_reigns" integer,
+  "titles_won" integer,
+  "years_active" integer,
+  "is_active" boolean,
+  "is_champion" boolean,
+  "gimmick_count" integer NOT NULL DEFAULT 0,
+  "match_count" integer NOT NULL DEFAULT 0,
+  "win_count" integer NOT NULL DEFAULT 0,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS "promotion_stats" (
+  "promotion_id" integer PRIMARY KEY REFERENCES "promotions" ("id") ON DELETE CASCADE,
+  "wrestler_count" integer NOT NULL DEFAULT 0,
+  "active_count" integer NOT NULL DEFAULT 0,
+  "champion_count" integer NOT NULL DEFAULT 0,
+  "title_reigns" integer NOT NULL DEFAULT 0,
+  "titles_won" integer NOT NULL DEFAULT 0,
+  "max_title_reigns" integer,
+  "avg_height_cm" float,
+  "avg_weight_kg" float,
+  "avg_debut_age" float,
+  "gimmick_debut_count" integer NOT NULL DEFAULT 0,
+  "event_count" integer NOT NULL DEFAULT 0,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS "decade_stats" (
+  "debut_decade" integer PRIMARY KEY,
+  "wrestler_count" integer NOT NULL DEFAULT 0,
+  "avg_debut_age" float,
+  "avg_title_reigns" float,
+  "avg_years_active" float,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS "gimmick_stats" (
+  "gimmick_id" integer PRIMARY KEY REFERENCES "gimmicks" ("id") ON DELETE CASCADE,
+  "wrestler_id" integer,
+  "debut_promotion_id" integer,
+  "days_used" integer,
+  "is_default" boolean,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS "idx_wrestler_stats_promotion_id" ON "wrestler_stats" ("promotion_id");
+
+CREATE INDEX IF NOT EXISTS "idx_wrestler_stats_debut_decade" ON "wrestler_stats" ("debut_decade");
+
+CREATE INDEX IF NOT EXISTS "idx_gimmicks_debut_promotion_id" ON "gimmicks" ("debut_promotion_id");
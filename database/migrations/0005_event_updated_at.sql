@@ -0,0 +1,7 @@
+-- When an event's card (its matches or their participants) was last written by the
+-- CopyLoader or relinked, so the columnar analytics store can reload changed cards
+-- instead of only appending new rows (analytics/columnar.py)
+
+ALTER TABLE "events" ADD COLUMN IF NOT EXISTS "updated_at" timestamp;
+
+CREATE INDEX IF NOT EXISTS "idx_events_updated_at" ON "events" ("updated_at");
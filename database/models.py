@@ -1,11 +1,18 @@
 
-from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    Column, Integer, String, Boolean, Date, DateTime, Time, Float, Text, Enum, ForeignKey, UniqueConstraint, Index, JSON,
+    func, text,
+)
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
 
 class Promotion(Base):
     __tablename__ = "promotions"
+    __table_args__ = (
+        # PromotionResolver looks names up in bulk
+        Index("idx_promotions_name", "name"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
@@ -26,6 +33,9 @@ class Promotion(Base):
 
 class Wrestler(Base):
     __tablename__ = "wrestlers"
+    __table_args__ = (
+        Index("idx_wrestlers_promotion_id", "promotion_id"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False, unique=True)
@@ -63,18 +73,403 @@ class Wrestler(Base):
 
 class Gimmick(Base):
     __tablename__ = "gimmicks"
+    __table_args__ = (
+        UniqueConstraint("wrestler_id", "gimmick_name", name="unique_gimmick_per_wrestler"),
+    )
 
     id = Column(Integer, primary_key=True)
     wrestler_id = Column(Integer, ForeignKey("wrestlers.id"))
     gimmick_name = Column(String)
     debut_promotion_id = Column(Integer, ForeignKey("promotions.id"))
     is_default = Column(Boolean)
-    date_created = Column(DateTime)
-    last_seen = Column(DateTime)
+    date_created = Column(Date)
+    last_seen = Column(Date)
 
     # Relationships
     wrestler = relationship("Wrestler", back_populates="gimmicks")
     debut_promotion = relationship("Promotion", back_populates="gimmicks")
 
     def __repr__(self):
-        return f"<Gimmick(name='{self.gimmick_name}', wrestler_id={self.wrestler_id})>"
\ No newline at end of file
+        return f"<Gimmick(name='{self.gimmick_name}', wrestler_id={self.wrestler_id})>"
+
+
+# Case-insensitive name lookups (questions/compiler.py)
+Index("idx_wrestlers_lower_name", func.lower(Wrestler.name))
+Index("idx_gimmicks_lower_name", func.lower(Gimmick.gimmick_name))
+Index("idx_promotions_lower_name", func.lower(Promotion.name))
+# Gimmicks that debuted in a promotion (promotion_stats refresh)
+Index("idx_gimmicks_debut_promotion_id", Gimmick.debut_promotion_id)
+
+
+MATCH_TYPES = ("SINGLES", "TAG", "TRIOS", "THREE_WAY", "FOUR_WAY", "FIVE_WAY", "SIX_WAY",
+               "THREE_WAY_TAG", "FOUR_WAY_TAG", "BATTLE_ROYALE")
+STIPULATIONS = ("STANDARD", "ELIMINATION", "NO_DQ", "TABLES", "LADDER")
+# events.event_type_id and matches.victory_type_id store 1-based positions in these tuples
+EVENT_TYPES = ("NON_TELE", "TV", "PPV", "PLE")
+VICTORY_TYPES = ("CLEAN", "DISQUALIFICATION", "COUNT_OUT", "DRAW", "ITEM_RETRIEVAL")
+CHAMPIONSHIP_TYPES = ("SINGLES", "TAG", "TRIOS", "TROPHY_TOURNAMENT")
+CHAMPIONSHIP_STATUSES = ("PRIMARY", "SECONDARY", "TERTIARY", "RETIRED", "VACANT")
+
+
+class Stable(Base):
+    __tablename__ = "stables"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    promotion_id = Column(Integer, ForeignKey("promotions.id"))
+    is_active = Column(Boolean)
+    years_active = Column(Integer)
+    date_founded = Column(Date)
+    date_disbanded = Column(Date)
+
+    def __repr__(self):
+        return f"<Stable(name='{self.name}', is_active={self.is_active})>"
+
+
+class StableMember(Base):
+    __tablename__ = "stable_members"
+
+    id = Column(Integer, primary_key=True)
+    stable_id = Column(Integer, ForeignKey("stables.id"))
+    wrestler_id = Column(Integer, ForeignKey("wrestlers.id"))
+    gimmick_id_nullable = Column(Integer, ForeignKey("gimmicks.id"))
+    date_joined = Column(Date)
+    date_removed_nullable = Column(Date)
+    is_leader = Column(Boolean)
+
+    def __repr__(self):
+        return f"<StableMember(stable_id={self.stable_id}, wrestler_id={self.wrestler_id})>"
+
+
+class Trio(Base):
+    __tablename__ = "trios"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    promotion_id = Column(Integer, ForeignKey("promotions.id"))
+    stable_id_nullable = Column(Integer, ForeignKey("stables.id"))
+    debut_date = Column(Date)
+    is_active = Column(Boolean)
+
+    def __repr__(self):
+        return f"<Trio(name='{self.name}', is_active={self.is_active})>"
+
+
+class TrioMember(Base):
+    __tablename__ = "trio_members"
+
+    id = Column(Integer, primary_key=True)
+    trio_id = Column(Integer, ForeignKey("trios.id"))
+    wrestler_id = Column(Integer, ForeignKey("wrestlers.id"))
+    gimmick_id = Column(Integer, ForeignKey("gimmicks.id"))
+    joined_date = Column(Date)
+    left_date = Column(Date)
+    is_primary_lineup = Column(Boolean)
+
+    def __repr__(self):
+        return f"<TrioMember(trio_id={self.trio_id}, wrestler_id={self.wrestler_id})>"
+
+
+class Championship(Base):
+    __tablename__ = "championships"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    promotion_id = Column(Integer, ForeignKey("promotions.id"))
+    championship_type = Column(Enum(*CHAMPIONSHIP_TYPES, name="championship_type"))
+    current_champion_id = Column(Integer, ForeignKey("gimmicks.id"))
+    championship_status_id = Column(Enum(*CHAMPIONSHIP_STATUSES, name="championship_status"))
+    is_active = Column(Boolean)
+    created_at = Column(Date)
+
+    def __repr__(self):
+        return f"<Championship(name='{self.name}', promotion_id={self.promotion_id})>"
+
+
+class TagTeam(Base):
+    __tablename__ = "tag_teams"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    wrestler_one_id = Column(Integer, ForeignKey("wrestlers.id"))
+    wrestler_two_id = Column(Integer, ForeignKey("wrestlers.id"))
+    stable_id_nullable = Column(Integer, ForeignKey("stables.id"))
+    gimmick_wrestler_one_id_nullable = Column(Integer, ForeignKey("gimmicks.id"))
+    gimmick_wrestler_two_id_nullable = Column(Integer, ForeignKey("gimmicks.id"))
+    cagematch_id = Column(Integer, unique=True)
+
+    def __repr__(self):
+        return f"<TagTeam(name='{self.name}', cagematch_id={self.cagematch_id})>"
+
+
+class Arena(Base):
+    __tablename__ = "arenas"
+    __table_args__ = (
+        UniqueConstraint("name", "country", name="unique_arena_per_country"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    country = Column(String, nullable=False)
+    city = Column(String)
+    state = Column(String)
+    capacity = Column(Integer)
+    last_visited = Column(Date)
+    last_promotion_id = Column(Integer, ForeignKey("promotions.id"))
+
+    def __repr__(self):
+        return f"<Arena(name='{self.name}', city='{self.city}', country='{self.country}')>"
+
+
+class Event(Base):
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("idx_events_promotion_date", "promotion_id", "date_of_event"),
+        Index("idx_events_updated_at", "updated_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String)
+    promotion_id = Column(Integer, ForeignKey("promotions.id"))
+    date_of_event = Column(Date)
+    event_type_id = Column(Integer)
+    headliner_match_id = Column(Integer, ForeignKey("matches.id", use_alter=True))
+    arena_id = Column(Integer, ForeignKey("arenas.id"))
+    attendance = Column(Integer)
+    cagematch_id = Column(Integer, unique=True)
+    # When the card (its matches or their participants) was last written, for loaders that re-read changed cards
+    updated_at = Column(DateTime)
+
+    matches = relationship("Match", back_populates="event", foreign_keys="Match.event_id")
+
+    def __repr__(self):
+        return f"<Event(name='{self.name}', date_of_event={self.date_of_event}, cagematch_id={self.cagematch_id})>"
+
+
+class Match(Base):
+    __tablename__ = "matches"
+    __table_args__ = (
+        UniqueConstraint("event_id", "position_on_event_card", name="unique_match_per_card_position"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id"))
+    promotion_id = Column(Integer, ForeignKey("promotions.id"))
+    date = Column(Date)
+    match_type = Column(Enum(*MATCH_TYPES, name="match_type"))
+    stipulation = Column(Enum(*STIPULATIONS, name="stipulation"))
+    title_defense = Column(Boolean)
+    title_id_nullable = Column(Integer, ForeignKey("championships.id"))
+    champion_id_nullable = Column(Integer)
+    victor_id = Column(Integer)
+    victory_type_id = Column(Integer)
+    match_length = Column(Time)
+    match_rating = Column(Float)
+    position_on_event_card = Column(Integer)
+    victor_team_number = Column(Integer)
+    match_notes = Column(Text)
+
+    event = relationship("Event", back_populates="matches", foreign_keys=[event_id])
+    participants = relationship("MatchParticipant", back_populates="match")
+
+    def __repr__(self):
+        return (f"<Match(event_id={self.event_id}, position_on_event_card={self.position_on_event_card}, "
+                f"match_type='{self.match_type}')>")
+
+
+class MatchParticipant(Base):
+    __tablename__ = "match_participants"
+    __table_args__ = (
+        UniqueConstraint("match_id", "participant_number", name="unique_participant_per_match"),
+        Index("idx_match_participants_wrestler", "wrestler_id", postgresql_where=text("wrestler_id IS NOT NULL")),
+        Index("idx_match_participants_tag_team", "tag_team_id", postgresql_where=text("tag_team_id IS NOT NULL")),
+        # relink_participants only looks at participants without a wrestler
+        Index("idx_match_participants_unlinked", "cagematch_id", postgresql_where=text("wrestler_id IS NULL")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    match_id = Column(Integer, ForeignKey("matches.id"))
+    wrestler_id = Column(Integer, ForeignKey("wrestlers.id"))
+    tag_team_id = Column(Integer, ForeignKey("tag_teams.id"))
+    trio_id = Column(Integer, ForeignKey("trios.id"))
+    participant_number = Column(Integer)
+    team_number = Column(Integer)
+    # Kept for participants that aren't in the wrestlers table yet, so they can be linked later
+    cagematch_id = Column(Integer)
+    name = Column(String)
+
+    match = relationship("Match", back_populates="participants")
+
+    def __repr__(self):
+        return (f"<MatchParticipant(match_id={self.match_id}, wrestler_id={self.wrestler_id}, "
+                f"team_number={self.team_number})>")
+
+
+class ChampionshipHistory(Base):
+    __tablename__ = "championship_history"
+
+    id = Column(Integer, primary_key=True)
+    championship_id = Column(Integer, ForeignKey("championships.id"))
+    champion_id = Column(Integer)
+    reign_number = Column(Integer)
+    date_won = Column(Date)
+    match_id = Column(Integer, ForeignKey("matches.id"))
+    last_title_defense_date = Column(Date)
+    last_title_defense_match_id = Column(Integer, ForeignKey("matches.id"))
+    number_of_defenses = Column(Integer)
+    date_lost = Column(Date)
+
+    def __repr__(self):
+        return (f"<ChampionshipHistory(championship_id={self.championship_id}, champion_id={self.champion_id}, "
+                f"reign_number={self.reign_number})>")
+
+class CrawlFrontier(Base):
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (
+        Index("idx_crawl_frontier_kind_status", "kind", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    url = Column(String, nullable=False, unique=True)
+    kind = Column(String, nullable=False)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    last_fetched_at = Column(DateTime)
+    last_error = Column(String)
+
+    def __repr__(self):
+        return f"<CrawlFrontier(url='{self.url}', status='{self.status}', attempts={self.attempts})>"
+
+
+class CrawlCheckpoint(Base):
+    __tablename__ = "crawl_checkpoints"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False)
+    updated_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<CrawlCheckpoint(name='{self.name}', value={self.value})>"
+
+
+class PageFingerprint(Base):
+    __tablename__ = "page_fingerprints"
+
+    url = Column(String, primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    updated_at = Column(DateTime)
+
+    def __repr__(self):
+        return f"<PageFingerprint(url='{self.url}', fingerprint='{self.fingerprint[:12]}')>"
+
+
+class ScrapeJob(Base):
+    __tablename__ = "scrape_jobs"
+    __table_args__ = (
+        UniqueConstraint("kind", "url", name="unique_job_per_url"),
+        Index("idx_scrape_jobs_claim", "status", "id"),
+        Index("idx_scrape_jobs_leases", "leased_until", postgresql_where=text("status = 'running'")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    url = Column(String, nullable=False)
+    payload = Column(JSON)
+    status = Column(String, nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String)
+    leased_until = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    created_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    last_error = Column(String)
+
+    def __repr__(self):
+        return f"<ScrapeJob(kind='{self.kind}', url='{self.url}', status='{self.status}', attempts={self.attempts})>"
+
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(String, primary_key=True)
+    applied_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    def __repr__(self):
+        return f"<SchemaMigration(version='{self.version}', applied_at={self.applied_at})>"
+
+
+# Precomputed aggregates, refreshed incrementally by database/stats.py after each write batch
+
+class WrestlerStats(Base):
+    __tablename__ = "wrestler_stats"
+    __table_args__ = (
+        Index("idx_wrestler_stats_promotion_id", "promotion_id"),
+        Index("idx_wrestler_stats_debut_decade", "debut_decade"),
+    )
+
+    wrestler_id = Column(Integer, ForeignKey("wrestlers.id", ondelete="CASCADE"), primary_key=True)
+    promotion_id = Column(Integer)
+    debut_year = Column(Integer)
+    debut_decade = Column(Integer)
+    debut_age = Column(Integer)
+    title_reigns = Column(Integer)
+    titles_won = Column(Integer)
+    years_active = Column(Integer)
+    is_active = Column(Boolean)
+    is_champion = Column(Boolean)
+    gimmick_count = Column(Integer, nullable=False, default=0)
+    match_count = Column(Integer, nullable=False, default=0)
+    win_count = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    def __repr__(self):
+        return f"<WrestlerStats(wrestler_id={self.wrestler_id}, matches={self.match_count}, wins={self.win_count})>"
+
+
+class PromotionStats(Base):
+    __tablename__ = "promotion_stats"
+
+    promotion_id = Column(Integer, ForeignKey("promotions.id", ondelete="CASCADE"), primary_key=True)
+    wrestler_count = Column(Integer, nullable=False, default=0)
+    active_count = Column(Integer, nullable=False, default=0)
+    champion_count = Column(Integer, nullable=False, default=0)
+    title_reigns = Column(Integer, nullable=False, default=0)
+    titles_won = Column(Integer, nullable=False, default=0)
+    max_title_reigns = Column(Integer)
+    avg_height_cm = Column(Float)
+    avg_weight_kg = Column(Float)
+    avg_debut_age = Column(Float)
+    gimmick_debut_count = Column(Integer, nullable=False, default=0)
+    event_count = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    def __repr__(self):
+        return f"<PromotionStats(promotion_id={self.promotion_id}, wrestlers={self.wrestler_count})>"
+
+
+class DecadeStats(Base):
+    __tablename__ = "decade_stats"
+
+    debut_decade = Column(Integer, primary_key=True)
+    wrestler_count = Column(Integer, nullable=False, default=0)
+    avg_debut_age = Column(Float)
+    avg_title_reigns = Column(Float)
+    avg_years_active = Column(Float)
+    refreshed_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    def __repr__(self):
+        return f"<DecadeStats(debut_decade={self.debut_decade}, wrestlers={self.wrestler_count})>"
+
+
+class GimmickStats(Base):
+    __tablename__ = "gimmick_stats"
+
+    gimmick_id = Column(Integer, ForeignKey("gimmicks.id", ondelete="CASCADE"), primary_key=True)
+    wrestler_id = Column(Integer)
+    debut_promotion_id = Column(Integer)
+    days_used = Column(Integer)
+    is_default = Column(Boolean)
+    refreshed_at = Column(DateTime, nullable=False, server_default=text("now()"))
+
+    def __repr__(self):
+        return f"<GimmickStats(gimmick_id={self.gimmick_id}, days_used={self.days_used})>"
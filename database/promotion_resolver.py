@@ -0,0 +1,111 @@
+# database/promotion_resolver.py
+
+import threading
+
+from sqlalchemy import func, select, text
+
+from database.bulk_writer import dialect_insert
+from database.models import Promotion
+from utils.metrics import get_metrics
+
+LOOKUPS = get_metrics().counter(
+    "db_promotion_lookups_total", "Promotion names resolved, by whether they were known or had to be created",
+    ("result",))
+CREATE_SECONDS = get_metrics().histogram(
+    "db_promotion_create_seconds", "Time to look up or insert a batch of unknown promotion names")
+
+
+class PromotionResolver:
+    """
+    Serves promotion name -> id (and cagematch_id -> id) lookups from memory.
+    The mapping is preloaded once; unknown names are created in one batch per call.
+    """
+
+    def __init__(self):
+        self._by_name = {}
+        self._by_cagematch_id = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self, session):
+        """(Re)load the full promotions mapping in a single query."""
+        rows = session.execute(select(Promotion.id, Promotion.name, Promotion.cagematch_id).order_by(Promotion.id))
+        with self._lock:
+            self._by_name.clear()
+            self._by_cagematch_id.clear()
+            for promotion_id, name, cagematch_id in rows:
+                # Lowest id wins when several promotions share a name
+                self._by_name.setdefault(name, promotion_id)
+                if cagematch_id is not None:
+                    self._by_cagematch_id[cagematch_id] = promotion_id
+            self._loaded = True
+
+    def remember(self, name: str, promotion_id: int, cagematch_id: int = None):
+        with self._lock:
+            self._by_name.setdefault(name, promotion_id)
+            if cagematch_id is not None:
+                self._by_cagematch_id[cagematch_id] = promotion_id
+
+    def id_for_cagematch_id(self, session, cagematch_id: int):
+        if not self._loaded:
+            self.load(session)
+        return self._by_cagematch_id.get(cagematch_id)
+
+    def resolve(self, session, name: str) -> int:
+        return self.resolve_many(session, [name])[name]
+
+    def resolve_many(self, session, names) -> dict:
+        """Returns {name: promotion id} for every name, creating the missing promotions."""
+        if not self._loaded:
+            self.load(session)
+
+        names = {name for name in names if name}
+        missing = sorted(name for name in names if name not in self._by_name)
+        LOOKUPS.inc(len(names) - len(missing), result="known")
+        if missing:
+            # Serialise creation in this process so two workers can't both insert the same name
+            with self._lock:
+                missing = [name for name in missing if name not in self._by_name]
+                if missing:
+                    LOOKUPS.inc(len(missing), result="created")
+                    with CREATE_SECONDS.time():
+                        self._by_name.update(self._create_missing(session, missing))
+        return {name: self._by_name[name] for name in names}
+
+    def _create_missing(self, session, names: list) -> dict:
+        """
+        Look up or insert the given names in one transaction. On PostgreSQL a
+        transaction-scoped advisory lock per name keeps other processes from
+        inserting the same promotion concurrently; names are locked in sorted
+        order so two batches can't deadlock.
+        """
+        dialect = session.get_bind().dialect.name
+        try:
+            if dialect == "postgresql":
+                for name in names:
+                    session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                                    {"key": f"promotion:{name}"})
+
+            found = dict(session.execute(
+                select(Promotion.name, func.min(Promotion.id))
+                .where(Promotion.name.in_(names))
+                .group_by(Promotion.name)
+            ).all())
+
+            to_insert = [{"name": name} for name in names if name not in found]
+            if to_insert:
+                stmt = dialect_insert(session, Promotion).values(to_insert).returning(Promotion.name, Promotion.id)
+                found.update(dict(session.execute(stmt).all()))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return found
+
+
+_resolver = PromotionResolver()
+
+
+def get_promotion_resolver() -> PromotionResolver:
+    """Returns the process-wide resolver shared by all scrapers."""
+    return _resolver
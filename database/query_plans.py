@@ -0,0 +1,75 @@
+# database/query_plans.py
+
+from datetime import date
+
+from sqlalchemy import func, literal, select, text, tuple_, update
+
+from database import job_queue, stats
+from database.copy_loader import RELINK_PARTICIPANTS
+from database.models import (
+    CrawlFrontier, Event, Gimmick, MatchParticipant, PageFingerprint, Promotion, PromotionStats, ScrapeJob, TagTeam,
+    Wrestler, WrestlerStats,
+)
+from questions.compiler import promotion_ids_named, wrestler_named
+
+# The lookups every scrape, load or worker batch runs. Each must be answerable from an index.
+HOT_QUERIES = {
+    "wrestlers by cagematch_id": select(Wrestler.cagematch_id, Wrestler.id).where(Wrestler.cagematch_id.in_([1, 2])),
+    "wrestlers by promotion": select(Wrestler.id).where(Wrestler.promotion_id == 1),
+    "gimmick duplicate check": select(Gimmick.id, Gimmick.wrestler_id, Gimmick.gimmick_name).where(
+        tuple_(Gimmick.wrestler_id, Gimmick.gimmick_name).in_([(1, "Gimmick")])),
+    "promotions by name": select(Promotion.id, Promotion.name).where(Promotion.name.in_(["WWE", "AEW"])),
+    "wrestler by name": select(Wrestler.id).where(wrestler_named(literal("Undertaker"))),
+    "promotion by name, any case": select(Promotion.id).where(Promotion.id.in_(promotion_ids_named(literal("aew")))),
+    "promotions by cagematch_id": select(Promotion.id).where(Promotion.cagematch_id == 1),
+    "tag teams by cagematch_id": select(TagTeam.id).where(TagTeam.cagematch_id.in_([1, 2])),
+    "events by cagematch_id": select(Event.id).where(Event.cagematch_id.in_([1, 2])),
+    "events of a promotion by date": select(Event.id).where(
+        Event.promotion_id == 1, Event.date_of_event.between(date(2020, 1, 1), date(2020, 12, 31))),
+    "match history of a wrestler": select(MatchParticipant.match_id).where(MatchParticipant.wrestler_id == 1),
+    "matches of a tag team": select(MatchParticipant.match_id).where(MatchParticipant.tag_team_id == 1),
+    "unlinked participants": select(MatchParticipant.id).where(
+        MatchParticipant.wrestler_id.is_(None), MatchParticipant.cagematch_id == 1),
+    "relink participants": text(RELINK_PARTICIPANTS),
+    "page fingerprints": select(PageFingerprint.url, PageFingerprint.fingerprint).where(
+        PageFingerprint.url.in_(["https://example.com/a"])),
+    "frontier pending urls": select(CrawlFrontier.url).where(
+        CrawlFrontier.kind == "wrestler", CrawlFrontier.status == "pending").order_by(CrawlFrontier.id),
+    "job claim": select(ScrapeJob.id).where(ScrapeJob.status == job_queue.PENDING)
+    .order_by(ScrapeJob.id).limit(20).with_for_update(skip_locked=True),
+    "expired job leases": update(ScrapeJob).where(
+        ScrapeJob.status == job_queue.RUNNING, ScrapeJob.leased_until < func.now()).values(worker_id=None),
+    "wrestler stats": select(WrestlerStats).where(WrestlerStats.wrestler_id == 1),
+    "promotion stats": select(PromotionStats).where(PromotionStats.promotion_id == 1),
+    "refresh wrestler stats": text(stats.UPSERT_WRESTLER_STATS).bindparams(wrestler_ids=[1, 2]),
+    "refresh promotion stats": text(stats.UPSERT_PROMOTION_STATS).bindparams(promotion_ids=[1, 2]),
+    "refresh gimmick stats": text(stats.UPSERT_GIMMICK_STATS).bindparams(gimmick_ids=[1, 2]),
+}
+
+
+def plan_for(connection, statement) -> dict:
+    """The JSON plan PostgreSQL would run statement with (EXPLAIN, nothing is executed)."""
+    if not isinstance(statement, type(text(""))):
+        statement = text(str(statement.compile(connection, compile_kwargs={"literal_binds": True})))
+    # Raw SQL keeps its bound values (e.g. the id arrays of the stats refreshes) as parameters
+    params = statement.compile().params
+    return connection.execute(text(f"EXPLAIN (FORMAT JSON) {statement.text}"), params).scalar()[0]["Plan"]
+
+
+def sequential_scans(plan: dict) -> list:
+    """Returns the tables read with a Seq Scan anywhere in the plan tree."""
+    scans = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for child in plan.get("Plans", []):
+        scans.extend(sequential_scans(child))
+    return scans
+
+
+def hot_query_plans(connection) -> dict:
+    """
+    {name: plan} of every HOT_QUERIES entry. Small or empty tables are
+    cheapest to seq scan, so this takes that option away from the planner
+    first: a Seq Scan still showing up means no index can answer the query
+    at all. The setting lasts until the connection's transaction is rolled back.
+    """
+    connection.execute(text("SET enable_seqscan = off"))
+    return {name: plan_for(connection, statement) for name, statement in HOT_QUERIES.items()}
@@ -0,0 +1,128 @@
+# database/refresh.py
+
+import hashlib
+import json
+import time
+from datetime import date, datetime
+
+from sqlalchemy import select, tuple_, update
+
+from database.bulk_writer import BulkWriter, dialect_insert, insert_rows
+from database.models import PageFingerprint
+
+
+def fingerprint(extracted) -> str:
+    """
+    sha256 of what an extractor took from a page (a record, a tuple of stats), not of the
+    page's bytes: the sidebar news and comments change on nearly every fetch.
+    """
+    return hashlib.sha256(json.dumps(extracted, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def load_fingerprints(session, urls: list) -> dict:
+    """Returns {url: fingerprint} for the urls that have one stored."""
+    if not urls:
+        return {}
+    return dict(session.execute(
+        select(PageFingerprint.url, PageFingerprint.fingerprint).where(PageFingerprint.url.in_(urls))
+    ).all())
+
+
+def save_fingerprints(session, fingerprints: dict):
+    """Upsert fingerprints without committing, so they land in the caller's transaction."""
+    if not fingerprints:
+        return
+    now = datetime.now()
+    stmt = dialect_insert(session, PageFingerprint).values(
+        [{"url": url, "fingerprint": value, "updated_at": now} for url, value in fingerprints.items()]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PageFingerprint.url],
+        set_={"fingerprint": stmt.excluded.fingerprint, "updated_at": stmt.excluded.updated_at},
+    )
+    session.execute(stmt)
+
+
+def _same(old, new) -> bool:
+    # Date columns come back as date while the parsers produce datetime
+    if isinstance(new, datetime) and isinstance(old, date) and not isinstance(old, datetime):
+        new = new.date()
+    return old == new
+
+
+class RefreshWriter(BulkWriter):
+    """
+    BulkWriter for incremental refreshes: new rows are inserted, existing rows
+    only get an UPDATE of the columns whose value actually changed, and rows
+    that didn't change are not written at all.
+
+    A record may carry "_fields" (the columns it is authoritative for, e.g. only
+    the profile columns when the titles page didn't change) and "_fingerprints"
+    ({url: fingerprint} of the pages it came from, saved in the same transaction).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updated = 0
+        self.unchanged = 0
+
+    def _write(self, records: list) -> tuple:
+        key_columns = [getattr(self.model, key) for key in self.conflict_keys]
+        compare = sorted(self.columns - set(self.conflict_keys) - {"id"})
+        by_key = {}
+        new_rows = []
+        for record in records:
+            key = tuple(record[key] for key in self.conflict_keys)
+            if None in key:
+                new_rows.append({k: v for k, v in record.items() if k in self.columns})
+            else:
+                by_key[key] = record
+
+        existing = {}
+        if by_key:
+            for row in self.session.execute(
+                select(self.model.id, *key_columns, *[getattr(self.model, c) for c in compare])
+                .where(tuple_(*key_columns).in_(list(by_key)))
+            ).mappings():
+                existing[tuple(row[key] for key in self.conflict_keys)] = row
+
+        ids = {}
+        updates = {}
+        fingerprints = {}
+        unchanged = 0
+        for key, record in by_key.items():
+            fingerprints.update(record.get("_fingerprints") or {})
+            fields = record["_fields"] if "_fields" in record else compare
+            fields = [c for c in fields if c in record and c in self.columns]
+            row = existing.get(key)
+            if row is None:
+                new_rows.append({k: v for k, v in record.items() if k in self.columns})
+                continue
+
+            ids[key] = row["id"]
+            changed = {c: record[c] for c in fields if not _same(row[c], record[c])}
+            if not changed:
+                unchanged += 1
+                continue
+            changed["id"] = row["id"]
+            updates.setdefault(tuple(sorted(changed)), []).append(changed)
+
+        # A multi-row INSERT needs the same columns in every row
+        new_columns = set().union(*new_rows) if new_rows else set()
+        new_rows = [{c: row.get(c) for c in new_columns} for row in new_rows]
+        inserted_ids, inserted = insert_rows(self.session, self.model, new_rows, self.conflict_keys)
+        ids.update(inserted_ids)
+        # One executemany per distinct set of changed columns
+        for params in updates.values():
+            self.session.execute(update(self.model), params)
+        save_fingerprints(self.session, fingerprints)
+        updated = [params["id"] for batch in updates.values() for params in batch]
+        if self.on_write:
+            # Unchanged rows are left out, so their derived data isn't refreshed either
+            self.on_write(self.session, inserted + updated)
+        return ids, {"insert": len(inserted), "update": len(updated), "unchanged": unchanged}
+
+    def _tally(self, counts: dict):
+        self.unchanged += counts.pop("unchanged")
+        self.updated += counts["update"]
+        super()._tally(counts)
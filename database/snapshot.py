@@ -0,0 +1,333 @@
+# database/snapshot.py
+
+import asyncio
+import hashlib
+import os
+import shutil
+import threading
+import time
+from contextlib import asynccontextmanager
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, delete, event, insert, select, text
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from database.models import (
+    DecadeStats, Event, Gimmick, Match, MatchParticipant, Promotion, PromotionStats, Wrestler, WrestlerStats,
+)
+from utils.cli import SNAPSHOT_BLOCK_ROWS
+from utils.metrics import get_metrics
+
+# Where the read API serves from when set; unset, every read goes to PostgreSQL
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+# Bytes of the snapshot file each reader maps into memory instead of reading through the page cache
+SNAPSHOT_MMAP_BYTES = int(os.getenv("SNAPSHOT_MMAP_BYTES", str(1 << 30)))
+# Seconds between checks for a newer snapshot file
+SNAPSHOT_CHECK_INTERVAL = float(os.getenv("SNAPSHOT_CHECK_INTERVAL", "2"))
+# Rebuilt with VACUUM once this share of its pages is free (rows removed by incremental builds)
+SNAPSHOT_VACUUM_FREE_RATIO = 0.25
+
+# The tables the read API and the question engine query; the match tables are copied once populated
+SNAPSHOT_TABLES = tuple(model.__table__ for model in (
+    Promotion, Wrestler, Gimmick, WrestlerStats, PromotionStats, DecadeStats, Event, Match, MatchParticipant,
+))
+
+BUILD_SECONDS = get_metrics().histogram("snapshot_build_seconds", "Time to build and swap in a read snapshot")
+ROWS_COPIED = get_metrics().counter(
+    "snapshot_rows_copied_total", "Rows copied into read snapshots, by table", ("entity",))
+
+# Bookkeeping kept inside the snapshot file itself, so a build only needs the previous file
+snapshot_metadata = MetaData()
+snapshot_blocks = Table(
+    "snapshot_blocks", snapshot_metadata,
+    Column("table_name", String, primary_key=True),
+    Column("block", Integer, primary_key=True),
+    Column("checksum", String, nullable=False),
+)
+snapshot_info = Table(
+    "snapshot_info", snapshot_metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
+# One md5 per block of primary keys, computed next to the data: only the hashes cross the network
+BLOCK_CHECKSUMS = """
+    SELECT {key} / :block_rows AS block, md5(string_agg(t::text, '|' ORDER BY {key})) AS checksum
+    FROM {table} AS t
+    GROUP BY 1
+"""
+
+
+def schema_fingerprint() -> str:
+    """Hash of the snapshot's DDL: a model or migration change makes the next build start from scratch."""
+    dialect = sqlite.dialect()
+    ddl = [str(CreateTable(table).compile(dialect=dialect)) for table in SNAPSHOT_TABLES]
+    ddl += [str(CreateIndex(index).compile(dialect=dialect))
+            for table in SNAPSHOT_TABLES for index in sorted(table.indexes, key=lambda index: index.name)]
+    return hashlib.sha256("\n".join(ddl).encode()).hexdigest()
+
+
+def block_checksums(connection, table, block_rows: int) -> dict:
+    """{block number: checksum} of every block of table's rows in the source database."""
+    key = table.primary_key.columns.values()[0]
+    if connection.dialect.name == "postgresql":
+        rows = connection.execute(text(BLOCK_CHECKSUMS.format(key=key.name, table=table.name)),
+                                  {"block_rows": block_rows})
+        return {block: checksum for block, checksum in rows}
+    digests = {}
+    for row in connection.execute(select(table).order_by(key)):
+        digests.setdefault(row._mapping[key.name] // block_rows, hashlib.md5()).update(repr(tuple(row)).encode())
+    return {block: digest.hexdigest() for block, digest in digests.items()}
+
+
+class SnapshotBuild:
+    """What one build did: per table, the blocks checked and copied and the rows copied."""
+
+    def __init__(self, path: str, full: bool):
+        self.path = path
+        self.full = full
+        self.tables = {}
+        self.seconds = 0.0
+
+    @property
+    def rows_copied(self) -> int:
+        return sum(rows for _, _, rows in self.tables.values())
+
+    def __repr__(self):
+        changed = sum(blocks for _, blocks, _ in self.tables.values())
+        return (f"<SnapshotBuild(path='{self.path}', full={self.full}, blocks_copied={changed}, "
+                f"rows={self.rows_copied})>")
+
+
+def sync_table(source, target, table, block_rows: int) -> tuple:
+    """
+    Bring table's copy in target up to date with source, block by block.
+    Changed blocks are all deleted before any is re-inserted, so a unique name
+    that moved between two blocks never collides with its old copy.
+    """
+    key = table.primary_key.columns.values()[0]
+    current = block_checksums(source, table, block_rows)
+    stored = {block: checksum for block, checksum in target.execute(
+        select(snapshot_blocks.c.block, snapshot_blocks.c.checksum).where(snapshot_blocks.c.table_name == table.name))}
+    changed = sorted(block for block, checksum in current.items() if stored.get(block) != checksum)
+    removed = sorted(set(stored) - set(current))
+
+    for block in changed + removed:
+        target.execute(delete(table).where(key >= block * block_rows, key < (block + 1) * block_rows))
+    rows = 0
+    for block in changed:
+        batch = [dict(row) for row in source.execute(
+            select(table).where(key >= block * block_rows, key < (block + 1) * block_rows)).mappings()]
+        if batch:
+            target.execute(insert(table), batch)
+        rows += len(batch)
+
+    target.execute(delete(snapshot_blocks).where(snapshot_blocks.c.table_name == table.name,
+                                                 snapshot_blocks.c.block.in_(changed + removed)))
+    if changed:
+        target.execute(insert(snapshot_blocks), [
+            {"table_name": table.name, "block": block, "checksum": current[block]} for block in changed])
+    ROWS_COPIED.inc(rows, entity=table.name)
+    return len(current), len(changed), rows
+
+
+def _stored_fingerprint(engine):
+    with engine.connect() as connection:
+        if not engine.dialect.has_table(connection, snapshot_info.name):
+            return None
+        return connection.scalar(select(snapshot_info.c.value).where(snapshot_info.c.key == "schema"))
+
+
+def build_snapshot(source_engine, path: str = SNAPSHOT_PATH, full: bool = False,
+                   block_rows: int = SNAPSHOT_BLOCK_ROWS) -> SnapshotBuild:
+    """
+    Build the read snapshot at path from source_engine and swap it in. The
+    build starts from a copy of the current snapshot and re-copies only the
+    blocks whose checksum changed; the finished file replaces the old one with
+    a rename, so readers see either the old snapshot or the new, never a mix.
+    """
+    if not path:
+        raise RuntimeError("SNAPSHOT_PATH is not set")
+    start = time.perf_counter()
+    path = os.path.abspath(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Private to this build, so concurrent builds never write the same file
+    building = f"{path}.{os.getpid()}.building"
+    if not full and os.path.exists(path):
+        shutil.copyfile(path, building)
+    elif os.path.exists(building):
+        os.remove(building)
+
+    target_engine = create_engine(f"sqlite:///{building}")
+    try:
+        fingerprint = schema_fingerprint()
+        if not full and _stored_fingerprint(target_engine) != fingerprint:
+            full = True
+            target_engine.dispose()
+            if os.path.exists(building):
+                os.remove(building)
+            target_engine = create_engine(f"sqlite:///{building}")
+        report = SnapshotBuild(path, full)
+
+        with target_engine.connect() as connection:
+            # Nobody reads this file until it is renamed into place: skip the journal and the fsyncs
+            connection.exec_driver_sql("PRAGMA journal_mode = OFF")
+            connection.exec_driver_sql("PRAGMA synchronous = OFF")
+            snapshot_metadata.create_all(connection)
+            for table in SNAPSHOT_TABLES:
+                table.create(connection, checkfirst=True)
+            connection.commit()
+
+            with source_engine.connect() as source:
+                # One snapshot of the source for every table: REPEATABLE READ on PostgreSQL
+                if source.dialect.name == "postgresql":
+                    source = source.execution_options(isolation_level="REPEATABLE READ")
+                with source.begin():
+                    for table in SNAPSHOT_TABLES:
+                        report.tables[table.name] = sync_table(source, connection, table, block_rows)
+
+            built_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+            for key, value in (("schema", fingerprint), ("built_at", built_at)):
+                connection.execute(delete(snapshot_info).where(snapshot_info.c.key == key))
+                connection.execute(insert(snapshot_info).values(key=key, value=value))
+            connection.commit()
+
+            connection.exec_driver_sql("ANALYZE")
+            free = connection.exec_driver_sql("PRAGMA freelist_count").scalar()
+            pages = connection.exec_driver_sql("PRAGMA page_count").scalar()
+            if pages and free / pages > SNAPSHOT_VACUUM_FREE_RATIO:
+                connection.exec_driver_sql("VACUUM")
+    except BaseException:
+        target_engine.dispose()
+        if os.path.exists(building):
+            os.remove(building)
+        raise
+    target_engine.dispose()
+
+    os.replace(building, path)
+    report.seconds = time.perf_counter() - start
+    BUILD_SECONDS.observe(report.seconds)
+    return report
+
+
+def print_build(report: SnapshotBuild):
+    print(f"{'table':<20} {'blocks':>7} {'changed':>8} {'rows':>9}")
+    for name, (blocks, changed, rows) in report.tables.items():
+        print(f"{name:<20} {blocks:>7} {changed:>8} {rows:>9}")
+    kind = "Full" if report.full else "Incremental"
+    print(f"📸 {kind} snapshot written to {report.path}: {report.rows_copied} rows copied in {report.seconds:.2f}s")
+
+
+class SnapshotSession:
+    """
+    Stands in for an AsyncSession over a snapshot connection, so the read API's
+    queries and the question engine run unchanged. Statements run in a worker
+    thread and their rows are fetched there, so a slow query or a page fault
+    on the mapped file doesn't stall the event loop.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _execute(self, statement, params):
+        return self.connection.execute(statement, params).freeze()
+
+    async def execute(self, statement, params=None):
+        frozen = await asyncio.to_thread(self._execute, statement, params)
+        return frozen()
+
+    def __repr__(self):
+        return f"<SnapshotSession(connection={self.connection!r})>"
+
+
+class SnapshotReader:
+    """
+    Read-only engine over the snapshot file, reopened when a build swaps in a
+    new file. The file is opened immutable (a build never modifies it, it
+    replaces it), so SQLite skips locking, and memory-mapped.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH, check_interval: float = SNAPSHOT_CHECK_INTERVAL):
+        self.path = os.path.abspath(path)
+        self.check_interval = check_interval
+        self.swaps = 0
+        self._engine = None
+        self._identity = None
+        self._checked_at = 0.0
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """callback() runs after a newer snapshot has been swapped in."""
+        self._subscribers.append(callback)
+
+    def _open(self):
+        engine = create_engine(f"sqlite:///file:{self.path}?mode=ro&immutable=1&uri=true")
+
+        @event.listens_for(engine, "connect")
+        def configure(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"PRAGMA mmap_size = {SNAPSHOT_MMAP_BYTES}")
+            cursor.execute("PRAGMA query_only = ON")
+            cursor.close()
+
+        return engine
+
+    def engine(self):
+        """The engine for the newest snapshot file, checked at most every check_interval seconds."""
+        now = time.monotonic()
+        if self._engine is not None and now - self._checked_at < self.check_interval:
+            return self._engine
+        with self._lock:
+            self._checked_at = now
+            stat = os.stat(self.path)
+            identity = (stat.st_ino, stat.st_mtime_ns)
+            if identity == self._identity:
+                return self._engine
+            old, self._engine, self._identity = self._engine, self._open(), identity
+        if old is not None:
+            # Connections still serving requests finish on the old file; idle ones close now
+            old.dispose(close=False)
+            self.swaps += 1
+            for callback in self._subscribers:
+                callback()
+            print(f"📸 Serving the new snapshot {self.path}")
+        return self._engine
+
+    def connect(self):
+        return self.engine().connect()
+
+    def __repr__(self):
+        return f"<SnapshotReader(path='{self.path}', swaps={self.swaps})>"
+
+
+_reader = None
+
+
+def get_snapshot_reader() -> SnapshotReader:
+    """Returns the process-wide reader of SNAPSHOT_PATH."""
+    global _reader
+    if _reader is None:
+        if not SNAPSHOT_PATH:
+            raise RuntimeError("SNAPSHOT_PATH is not set")
+        _reader = SnapshotReader(SNAPSHOT_PATH)
+    return _reader
+
+
+@asynccontextmanager
+async def snapshot_session():
+    """A SnapshotSession on a pooled snapshot connection, usable like an async_sessionmaker."""
+    with get_snapshot_reader().connect() as connection:
+        yield SnapshotSession(connection)
+
+
+async def get_snapshot_session():
+    """FastAPI dependency: a SnapshotSession on a pooled snapshot connection."""
+    async with snapshot_session() as session:
+        yield session
+
+
+def refresh_snapshot(args, source_engine):
+    """After a scrape: rebuild and swap in the read snapshot, if one is configured and not opted out of."""
+    if SNAPSHOT_PATH and not args.no_snapshot:
+        print_build(build_snapshot(source_engine))
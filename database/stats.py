@@ -0,0 +1,229 @@
+# database/stats.py
+
+from sqlalchemy import select, text
+
+from database.change_feed import publish, publish_reset
+from database.models import Gimmick, Promotion, Wrestler
+from utils.cli import STATS_REBUILD_BATCH_SIZE as REBUILD_BATCH_SIZE
+
+# Each refresh recomputes the rows of just the ids it is given, straight from the base tables,
+# so it is as cheap for a batch of 50 scraped wrestlers as the batch is small. Being the one place
+# that knows everything a write touched, each refresh also publishes its ids on the change feed.
+
+OLD_WRESTLER_GROUPS = """
+    SELECT promotion_id, debut_decade FROM wrestler_stats WHERE wrestler_id = ANY(:wrestler_ids)
+"""
+
+# Counts come from one grouped pass per table rather than a subquery per wrestler:
+# a batch of event cards touches the same busy wrestlers, each with thousands of matches
+UPSERT_WRESTLER_STATS = """
+    WITH played AS (
+        SELECT p.wrestler_id, count(*) AS matches,
+               count(*) FILTER (WHERE m.victor_team_number = p.team_number) AS wins
+        FROM match_participants p JOIN matches m ON m.id = p.match_id
+        WHERE p.wrestler_id = ANY(:wrestler_ids)
+        GROUP BY p.wrestler_id
+    ), named AS (
+        SELECT wrestler_id, count(*) AS gimmicks FROM gimmicks
+        WHERE wrestler_id = ANY(:wrestler_ids)
+        GROUP BY wrestler_id
+    )
+    INSERT INTO wrestler_stats (wrestler_id, promotion_id, debut_year, debut_decade, debut_age, title_reigns,
+                                titles_won, years_active, is_active, is_champion, gimmick_count, match_count,
+                                win_count, refreshed_at)
+    SELECT w.id, w.promotion_id,
+           extract(year FROM w.debut)::int,
+           extract(year FROM w.debut)::int / 10 * 10,
+           w.age - extract(year FROM age(current_date, w.debut))::int,
+           w.title_reigns, w.titles_won, w.years_active, w.is_active, w.is_champion,
+           coalesce(named.gimmicks, 0), coalesce(played.matches, 0), coalesce(played.wins, 0),
+           now()
+    FROM wrestlers w
+    LEFT JOIN played ON played.wrestler_id = w.id
+    LEFT JOIN named ON named.wrestler_id = w.id
+    WHERE w.id = ANY(:wrestler_ids)
+    ON CONFLICT (wrestler_id) DO UPDATE SET
+        promotion_id = EXCLUDED.promotion_id, debut_year = EXCLUDED.debut_year,
+        debut_decade = EXCLUDED.debut_decade, debut_age = EXCLUDED.debut_age,
+        title_reigns = EXCLUDED.title_reigns, titles_won = EXCLUDED.titles_won,
+        years_active = EXCLUDED.years_active, is_active = EXCLUDED.is_active, is_champion = EXCLUDED.is_champion,
+        gimmick_count = EXCLUDED.gimmick_count, match_count = EXCLUDED.match_count,
+        win_count = EXCLUDED.win_count, refreshed_at = EXCLUDED.refreshed_at
+    RETURNING promotion_id, debut_decade
+"""
+
+DELETE_STALE_WRESTLER_STATS = """
+    DELETE FROM wrestler_stats s
+    WHERE s.wrestler_id = ANY(:wrestler_ids) AND NOT EXISTS (SELECT 1 FROM wrestlers w WHERE w.id = s.wrestler_id)
+    RETURNING promotion_id, debut_decade
+"""
+
+# Roster aggregates read the wrestler_stats rows refreshed just before, not the raw tables
+UPSERT_PROMOTION_STATS = """
+    INSERT INTO promotion_stats (promotion_id, wrestler_count, active_count, champion_count, title_reigns,
+                                 titles_won, max_title_reigns, avg_height_cm, avg_weight_kg, avg_debut_age,
+                                 gimmick_debut_count, event_count, refreshed_at)
+    SELECT p.id, count(s.wrestler_id),
+           count(*) FILTER (WHERE s.is_active), count(*) FILTER (WHERE s.is_champion),
+           coalesce(sum(s.title_reigns), 0), coalesce(sum(s.titles_won), 0), max(s.title_reigns),
+           avg(w.height_cm), avg(w.weight_kg), avg(s.debut_age),
+           (SELECT count(*) FROM gimmicks g WHERE g.debut_promotion_id = p.id),
+           (SELECT count(*) FROM events e WHERE e.promotion_id = p.id),
+           now()
+    FROM promotions p
+    LEFT JOIN wrestler_stats s ON s.promotion_id = p.id
+    LEFT JOIN wrestlers w ON w.id = s.wrestler_id
+    WHERE p.id = ANY(:promotion_ids)
+    GROUP BY p.id
+    ON CONFLICT (promotion_id) DO UPDATE SET
+        wrestler_count = EXCLUDED.wrestler_count, active_count = EXCLUDED.active_count,
+        champion_count = EXCLUDED.champion_count, title_reigns = EXCLUDED.title_reigns,
+        titles_won = EXCLUDED.titles_won, max_title_reigns = EXCLUDED.max_title_reigns,
+        avg_height_cm = EXCLUDED.avg_height_cm, avg_weight_kg = EXCLUDED.avg_weight_kg,
+        avg_debut_age = EXCLUDED.avg_debut_age, gimmick_debut_count = EXCLUDED.gimmick_debut_count,
+        event_count = EXCLUDED.event_count, refreshed_at = EXCLUDED.refreshed_at
+"""
+
+UPSERT_DECADE_STATS = """
+    INSERT INTO decade_stats (debut_decade, wrestler_count, avg_debut_age, avg_title_reigns, avg_years_active,
+                              refreshed_at)
+    SELECT debut_decade, count(*), avg(debut_age), avg(title_reigns), avg(years_active), now()
+    FROM wrestler_stats
+    WHERE debut_decade = ANY(:decades)
+    GROUP BY debut_decade
+    ON CONFLICT (debut_decade) DO UPDATE SET
+        wrestler_count = EXCLUDED.wrestler_count, avg_debut_age = EXCLUDED.avg_debut_age,
+        avg_title_reigns = EXCLUDED.avg_title_reigns, avg_years_active = EXCLUDED.avg_years_active,
+        refreshed_at = EXCLUDED.refreshed_at
+"""
+
+# A decade whose last wrestler moved out has no group left to upsert
+DELETE_EMPTY_DECADE_STATS = """
+    DELETE FROM decade_stats d
+    WHERE d.debut_decade = ANY(:decades)
+      AND NOT EXISTS (SELECT 1 FROM wrestler_stats s WHERE s.debut_decade = d.debut_decade)
+"""
+
+OLD_GIMMICK_PROMOTIONS = """
+    SELECT debut_promotion_id FROM gimmick_stats WHERE gimmick_id = ANY(:gimmick_ids)
+"""
+
+# Scraped first / last appearances aren't always in order, so days_used is the span between them
+UPSERT_GIMMICK_STATS = """
+    INSERT INTO gimmick_stats (gimmick_id, wrestler_id, debut_promotion_id, days_used, is_default, refreshed_at)
+    SELECT g.id, g.wrestler_id, g.debut_promotion_id,
+           greatest(g.date_created, g.last_seen) - least(g.date_created, g.last_seen),
+           g.is_default, now()
+    FROM gimmicks g
+    WHERE g.id = ANY(:gimmick_ids)
+    ON CONFLICT (gimmick_id) DO UPDATE SET
+        wrestler_id = EXCLUDED.wrestler_id, debut_promotion_id = EXCLUDED.debut_promotion_id,
+        days_used = EXCLUDED.days_used, is_default = EXCLUDED.is_default, refreshed_at = EXCLUDED.refreshed_at
+    RETURNING wrestler_id, debut_promotion_id
+"""
+
+DELETE_STALE_GIMMICK_STATS = """
+    DELETE FROM gimmick_stats s
+    WHERE s.gimmick_id = ANY(:gimmick_ids) AND NOT EXISTS (SELECT 1 FROM gimmicks g WHERE g.id = s.gimmick_id)
+    RETURNING wrestler_id, debut_promotion_id
+"""
+
+
+def _enabled(session) -> bool:
+    # The refresh SQL is PostgreSQL's (ANY(array), FILTER, date arithmetic)
+    return session.get_bind().dialect.name == "postgresql"
+
+
+def _ids(values) -> list:
+    return sorted({value for value in values if value is not None})
+
+
+def refresh_promotion_stats(session, promotion_ids):
+    """Recompute promotion_stats for promotion_ids. Runs in the caller's transaction."""
+    promotion_ids = _ids(promotion_ids)
+    if promotion_ids and _enabled(session):
+        session.execute(text(UPSERT_PROMOTION_STATS), {"promotion_ids": promotion_ids})
+        publish(session, "promotion", promotion_ids)
+
+
+def refresh_decade_stats(session, decades):
+    """Recompute decade_stats for the given debut decades. Runs in the caller's transaction."""
+    decades = _ids(decades)
+    if decades and _enabled(session):
+        session.execute(text(UPSERT_DECADE_STATS), {"decades": decades})
+        session.execute(text(DELETE_EMPTY_DECADE_STATS), {"decades": decades})
+        publish(session, "decade", decades)
+
+
+def refresh_wrestler_stats(session, wrestler_ids, promotion_ids=()):
+    """
+    Recompute wrestler_stats for wrestler_ids, then the promotion and decade rows
+    they belonged to before and after (a wrestler who changed promotion leaves
+    one and joins another), plus any extra promotion_ids. Runs in the caller's
+    transaction.
+    """
+    if not _enabled(session):
+        return
+    wrestler_ids = _ids(wrestler_ids)
+    promotions, decades = set(promotion_ids), set()
+    if wrestler_ids:
+        params = {"wrestler_ids": wrestler_ids}
+        for statement in (OLD_WRESTLER_GROUPS, UPSERT_WRESTLER_STATS, DELETE_STALE_WRESTLER_STATS):
+            for promotion_id, decade in session.execute(text(statement), params):
+                promotions.add(promotion_id)
+                decades.add(decade)
+        publish(session, "wrestler", wrestler_ids)
+    refresh_promotion_stats(session, promotions)
+    refresh_decade_stats(session, decades)
+
+
+def refresh_gimmick_stats(session, gimmick_ids):
+    """Recompute gimmick_stats for gimmick_ids, then their wrestlers' and debut promotions' rows."""
+    gimmick_ids = _ids(gimmick_ids)
+    if not gimmick_ids or not _enabled(session):
+        return
+    params = {"gimmick_ids": gimmick_ids}
+    wrestlers = set()
+    promotions = {promotion_id for promotion_id, in session.execute(text(OLD_GIMMICK_PROMOTIONS), params)}
+    for statement in (UPSERT_GIMMICK_STATS, DELETE_STALE_GIMMICK_STATS):
+        for wrestler_id, promotion_id in session.execute(text(statement), params):
+            wrestlers.add(wrestler_id)
+            promotions.add(promotion_id)
+    publish(session, "gimmick", gimmick_ids)
+    refresh_wrestler_stats(session, wrestlers, promotions)
+
+
+def rebuild_stats(session, batch_size: int = REBUILD_BATCH_SIZE) -> dict:
+    """
+    Backfill every stats table from scratch, committing per batch: wrestler and
+    gimmick rows first, then each promotion and decade once. Returns row counts.
+    """
+    counts = {"wrestlers": 0, "gimmicks": 0, "promotions": 0}
+    if not _enabled(session):
+        return counts
+
+    for model, statement, key, name in ((Wrestler, UPSERT_WRESTLER_STATS, "wrestler_ids", "wrestlers"),
+                                        (Gimmick, UPSERT_GIMMICK_STATS, "gimmick_ids", "gimmicks")):
+        after = 0
+        while True:
+            ids = session.execute(
+                select(model.id).where(model.id > after).order_by(model.id).limit(batch_size)).scalars().all()
+            if not ids:
+                break
+            session.execute(text(statement), {key: ids})
+            session.commit()
+            counts[name] += len(ids)
+            after = ids[-1]
+
+    promotion_ids = session.execute(select(Promotion.id)).scalars().all()
+    for start in range(0, len(promotion_ids), batch_size):
+        refresh_promotion_stats(session, promotion_ids[start:start + batch_size])
+        session.commit()
+    counts["promotions"] = len(promotion_ids)
+
+    session.execute(text("DELETE FROM decade_stats"))
+    refresh_decade_stats(session, session.execute(text(
+        "SELECT DISTINCT debut_decade FROM wrestler_stats WHERE debut_decade IS NOT NULL")).scalars().all())
+    publish_reset(session)
+    session.commit()
+    return counts
@@ -53,7 +53,7 @@ CREATE TABLE "wrestlers" (
   "is_active" BOOLEAN,
   "years_active" INT,
   "retirement_date" DATE,
-  "cagematch_id" INT,
+  "cagematch_id" INT UNIQUE,
   "title_reigns" INT,
   "titles_won" INT,
   "is_champion" boolean
@@ -63,7 +63,7 @@ CREATE TABLE "gimmicks" (
   "id" serial PRIMARY KEY,
   "wrestler_id" int,
   "gimmick_name" varchar,
-  "promotion_id" int,
+  "debut_promotion_id" int,
   "is_default" boolean,
   "date_created" date,
   "last_seen" date
@@ -76,7 +76,8 @@ CREATE TABLE "tag_teams" (
   "wrestler_two_id" int,
   "stable_id_nullable" int,
   "gimmick_wrestler_one_id_nullable" int,
-  "gimmick_wrestler_two_id_nullable" int
+  "gimmick_wrestler_two_id_nullable" int,
+  "cagematch_id" int UNIQUE
 );
 
 CREATE TABLE "stables" (
@@ -131,12 +132,15 @@ CREATE TABLE "promotions" (
 
 CREATE TABLE "events" (
   "id" serial PRIMARY KEY,
+  "name" varchar,
   "promotion_id" int,
   "date_of_event" date,
   "event_type_id" int,
   "headliner_match_id" int,
   "arena_id" int,
-  "attendance" int
+  "attendance" int,
+  "cagematch_id" int UNIQUE,
+  "updated_at" timestamp
 );
 
 CREATE TABLE "arenas" (
@@ -147,7 +151,8 @@ CREATE TABLE "arenas" (
   "state" varchar,
   "capacity" int,
   "last_visited" date,
-  "last_promotion_id" int
+  "last_promotion_id" int,
+  CONSTRAINT "unique_arena_per_country" UNIQUE ("name", "country")
 );
 
 CREATE TABLE "matches" (
@@ -163,10 +168,11 @@ CREATE TABLE "matches" (
   "victor_id" int,
   "victory_type_id" int,
   "match_length" time,
-  "match_rating" double,
+  "match_rating" double precision,
   "position_on_event_card" int,
   "victor_team_number" int,
-  "match_notes" TEXT
+  "match_notes" TEXT,
+  CONSTRAINT "unique_match_per_card_position" UNIQUE ("event_id", "position_on_event_card")
 );
 
 CREATE TABLE "match_participants" (
@@ -176,7 +182,10 @@ CREATE TABLE "match_participants" (
   "tag_team_id" INT,
   "trio_id" INT,
   "participant_number" INT,
-  "team_number" INT
+  "team_number" INT,
+  "cagematch_id" INT,
+  "name" VARCHAR,
+  CONSTRAINT "unique_participant_per_match" UNIQUE ("match_id", "participant_number")
 );
 
 CREATE TABLE "championship_history" (
@@ -203,6 +212,132 @@ CREATE TABLE "championships" (
   "created_at" date
 );
 
+CREATE TABLE "crawl_frontier" (
+  "id" serial PRIMARY KEY,
+  "url" varchar NOT NULL UNIQUE,
+  "kind" varchar NOT NULL,
+  "status" varchar NOT NULL DEFAULT 'pending',
+  "attempts" int NOT NULL DEFAULT 0,
+  "last_fetched_at" timestamp,
+  "last_error" varchar
+);
+
+CREATE TABLE "crawl_checkpoints" (
+  "name" varchar PRIMARY KEY,
+  "value" int NOT NULL,
+  "updated_at" timestamp
+);
+
+CREATE TABLE "page_fingerprints" (
+  "url" varchar PRIMARY KEY,
+  "fingerprint" varchar(64) NOT NULL,
+  "updated_at" timestamp
+);
+
+CREATE TABLE "scrape_jobs" (
+  "id" serial PRIMARY KEY,
+  "kind" varchar NOT NULL,
+  "url" varchar NOT NULL,
+  "payload" json,
+  "status" varchar NOT NULL DEFAULT 'pending',
+  "attempts" int NOT NULL DEFAULT 0,
+  "worker_id" varchar,
+  "leased_until" timestamp,
+  "heartbeat_at" timestamp,
+  "created_at" timestamp,
+  "finished_at" timestamp,
+  "last_error" varchar,
+  CONSTRAINT "unique_job_per_url" UNIQUE ("kind", "url")
+);
+
+CREATE INDEX "idx_scrape_jobs_claim" ON "scrape_jobs" ("status", "id");
+
+CREATE INDEX "idx_scrape_jobs_leases" ON "scrape_jobs" ("leased_until") WHERE "status" = 'running';
+
+CREATE INDEX "idx_promotions_name" ON "promotions" ("name");
+
+CREATE INDEX "idx_wrestlers_promotion_id" ON "wrestlers" ("promotion_id");
+
+CREATE INDEX "idx_events_promotion_date" ON "events" ("promotion_id", "date_of_event");
+
+CREATE INDEX "idx_events_updated_at" ON "events" ("updated_at");
+
+CREATE INDEX "idx_match_participants_wrestler" ON "match_participants" ("wrestler_id") WHERE "wrestler_id" IS NOT NULL;
+
+CREATE INDEX "idx_match_participants_tag_team" ON "match_participants" ("tag_team_id") WHERE "tag_team_id" IS NOT NULL;
+
+CREATE INDEX "idx_match_participants_unlinked" ON "match_participants" ("cagematch_id") WHERE "wrestler_id" IS NULL;
+
+CREATE INDEX "idx_crawl_frontier_kind_status" ON "crawl_frontier" ("kind", "status", "id");
+
+CREATE INDEX "idx_wrestlers_lower_name" ON "wrestlers" (lower("name"));
+
+CREATE INDEX "idx_gimmicks_lower_name" ON "gimmicks" (lower("gimmick_name"));
+
+CREATE INDEX "idx_promotions_lower_name" ON "promotions" (lower("name"));
+
+CREATE TABLE "schema_migrations" (
+  "version" varchar PRIMARY KEY,
+  "applied_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE "wrestler_stats" (
+  "wrestler_id" integer PRIMARY KEY,
+  "promotion_id" integer,
+  "debut_year" integer,
+  "debut_decade" integer,
+  "debut_age" integer,
+  "title_reigns" integer,
+  "titles_won" integer,
+  "years_active" integer,
+  "is_active" boolean,
+  "is_champion" boolean,
+  "gimmick_count" integer NOT NULL DEFAULT 0,
+  "match_count" integer NOT NULL DEFAULT 0,
+  "win_count" integer NOT NULL DEFAULT 0,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE "promotion_stats" (
+  "promotion_id" integer PRIMARY KEY,
+  "wrestler_count" integer NOT NULL DEFAULT 0,
+  "active_count" integer NOT NULL DEFAULT 0,
+  "champion_count" integer NOT NULL DEFAULT 0,
+  "title_reigns" integer NOT NULL DEFAULT 0,
+  "titles_won" integer NOT NULL DEFAULT 0,
+  "max_title_reigns" integer,
+  "avg_height_cm" float,
+  "avg_weight_kg" float,
+  "avg_debut_age" float,
+  "gimmick_debut_count" integer NOT NULL DEFAULT 0,
+  "event_count" integer NOT NULL DEFAULT 0,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE "decade_stats" (
+  "debut_decade" integer PRIMARY KEY,
+  "wrestler_count" integer NOT NULL DEFAULT 0,
+  "avg_debut_age" float,
+  "avg_title_reigns" float,
+  "avg_years_active" float,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE TABLE "gimmick_stats" (
+  "gimmick_id" integer PRIMARY KEY,
+  "wrestler_id" integer,
+  "debut_promotion_id" integer,
+  "days_used" integer,
+  "is_default" boolean,
+  "refreshed_at" timestamp NOT NULL DEFAULT now()
+);
+
+CREATE INDEX "idx_wrestler_stats_promotion_id" ON "wrestler_stats" ("promotion_id");
+
+CREATE INDEX "idx_wrestler_stats_debut_decade" ON "wrestler_stats" ("debut_decade");
+
+CREATE INDEX "idx_gimmicks_debut_promotion_id" ON "gimmicks" ("debut_promotion_id");
+
 COMMENT ON COLUMN "trios"."stable_id_nullable" IS 'If this trio is a subset of a stable';
 
 COMMENT ON COLUMN "trio_members"."is_primary_lineup" IS 'True if this member is part of the standard trio lineup';
@@ -223,19 +358,27 @@ COMMENT ON COLUMN "matches"."match_rating" IS 'Wrestling Observer Newsletter bas
 
 COMMENT ON COLUMN "matches"."position_on_event_card" IS '0 is main event, +1 for distance from the main event';
 
+COMMENT ON COLUMN "match_participants"."cagematch_id" IS 'Cagematch id of the wrestler, kept so participants not yet in wrestlers can be linked later';
+
 COMMENT ON COLUMN "championships"."championship_type" IS 'Enum: SINGLES, TAG, TRIOS, TROPHY/TOURNEY';
 
 COMMENT ON COLUMN "championships"."current_champion_id" IS 'Wrestler''s Gimmick ID';
 
 COMMENT ON COLUMN "championships"."championship_status_id" IS 'Enum: Primary, Secondary, Tertiary';
 
+COMMENT ON COLUMN "crawl_frontier"."status" IS 'pending, done or failed';
+
+COMMENT ON COLUMN "page_fingerprints"."fingerprint" IS 'sha256 of the page body the stored rows were extracted from';
+
+COMMENT ON COLUMN "scrape_jobs"."status" IS 'pending, running, done or failed';
+
+COMMENT ON COLUMN "scrape_jobs"."leased_until" IS 'A running job whose lease expired belongs to a dead worker and is requeued';
+
 ALTER TABLE "wrestlers" ADD FOREIGN KEY ("promotion_id") REFERENCES "promotions" ("id");
 
 ALTER TABLE "gimmicks" ADD FOREIGN KEY ("wrestler_id") REFERENCES "wrestlers" ("id");
 
-ALTER TABLE "gimmicks" ADD FOREIGN KEY ("gimmick_id") REFERENCES "gimmicks" ("id");
-
-ALTER TABLE "gimmicks" ADD FOREIGN KEY ("promotion_id") REFERENCES "promotions" ("id");
+ALTER TABLE "gimmicks" ADD FOREIGN KEY ("debut_promotion_id") REFERENCES "promotions" ("id");
 
 ALTER TABLE gimmicks ADD CONSTRAINT unique_gimmick_per_wrestler UNIQUE (wrestler_id, gimmick_name);
 
@@ -298,3 +441,9 @@ ALTER TABLE "championship_history" ADD FOREIGN KEY ("last_title_defense_match_id
 ALTER TABLE "championships" ADD FOREIGN KEY ("promotion_id") REFERENCES "promotions" ("id");
 
 ALTER TABLE "championships" ADD FOREIGN KEY ("current_champion_id") REFERENCES "gimmicks" ("id");
+
+ALTER TABLE "wrestler_stats" ADD FOREIGN KEY ("wrestler_id") REFERENCES "wrestlers" ("id") ON DELETE CASCADE;
+
+ALTER TABLE "promotion_stats" ADD FOREIGN KEY ("promotion_id") REFERENCES "promotions" ("id") ON DELETE CASCADE;
+
+ALTER TABLE "gimmick_stats" ADD FOREIGN KEY ("gimmick_id") REFERENCES "gimmicks" ("id") ON DELETE CASCADE;
@@ -0,0 +1,74 @@
+# grapsmuse.py
+
+import argparse
+import importlib
+import sys
+
+# Subcommand -> (module with a main(argv, prog), summary). Nothing is imported until a
+# subcommand runs, so `grapsmuse --help` starts without SQLAlchemy, requests or bs4; the
+# runners in turn import them only after parsing their arguments (see utils/cli.py), so
+# `grapsmuse scrape wrestlers --help` doesn't load them either.
+COMMANDS = {
+    "bootstrap": ("bootstrap", "Initialize the database and load promotions"),
+    "migrate": ("runners.migrate", "Show or apply the versioned schema migrations"),
+    "snapshot": ("runners.build_snapshot", "Build the read-only SQLite snapshot the API can serve from"),
+    "analytics": ("runners.analytics_report", "Print win percentages, streaks, ratings and reign lengths"),
+    "head-to-head": ("runners.head_to_head", "Look up head-to-head records, top opponents and opponent chains"),
+    "jobs": ("runners.job_queue", "Seed, work, inspect or requeue the distributed crawl's job queue"),
+    "refresh-stats": ("runners.refresh_stats", "Rebuild or repair the precomputed stats tables"),
+    "check-plans": ("runners.check_query_plans", "Fail if a hot lookup can only be answered with a sequential scan"),
+    "bench": ("runners.bench_suite", "Run the offline benchmark suite"),
+    "bench-parsers": ("runners.bench_parsers", "Benchmark HTML parser backends over cached pages"),
+    "bench-copy-loader": ("runners.bench_copy_loader", "Benchmark the COPY event loader against ORM inserts"),
+    "load-test": ("runners.load_test_api", "Load test the read API"),
+}
+SCRAPE_TARGETS = {
+    "wrestlers": ("runners.scrape_wrestlers", "Scrape the top 100 (or every) wrestler"),
+    "gimmicks": ("runners.scrape_gimmicks", "Scrape the gimmicks of wrestlers already in the database"),
+    "promotions": ("runners.scrape_promotions", "Scrape the promotions list"),
+    "events": ("runners.scrape_events", "Scrape event results"),
+}
+
+
+def run_module(module_name: str, argv: list, prog: str):
+    importlib.import_module(module_name).main(argv, prog=prog)
+
+
+def serve(argv: list, prog: str):
+    parser = argparse.ArgumentParser(prog=prog, description="Serve the read API with uvicorn")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--reload", action="store_true", help="Restart when the code changes")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, reload=args.reload)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="grapsmuse", description="GrapsMuse: scrape Cagematch and serve the stats")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+    # Each subcommand parses its own arguments (and --help), so they are passed through untouched
+    for name, (_, summary) in COMMANDS.items():
+        commands.add_parser(name, help=summary, add_help=False)
+    commands.add_parser("serve", help="Serve the read API with uvicorn", add_help=False)
+    scrape = commands.add_parser("scrape", help="Scrape Cagematch.net into the database")
+    targets = scrape.add_subparsers(dest="target", required=True, metavar="target")
+    for name, (_, summary) in SCRAPE_TARGETS.items():
+        targets.add_parser(name, help=summary, add_help=False)
+    return parser
+
+
+def main(argv: list = None):
+    args, rest = build_parser().parse_known_args(argv)
+    if args.command == "serve":
+        serve(rest, prog="grapsmuse serve")
+    elif args.command == "scrape":
+        run_module(SCRAPE_TARGETS[args.target][0], rest, prog=f"grapsmuse scrape {args.target}")
+    else:
+        run_module(COMMANDS[args.command][0], rest, prog=f"grapsmuse {args.command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
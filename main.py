@@ -1,13 +1,231 @@
-from fastapi import FastAPI
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Literal
 
-app = FastAPI()
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+
+from api_cache import get_response_cache, not_modified
+from database import api_queries
+from database.api_queries import (
+    DEFAULT_PAGE_SIZE, GIMMICK_COLUMNS, MAX_PAGE_SIZE, PROMOTION_COLUMNS, PROMOTION_STATS_ORDERS, WRESTLER_COLUMNS,
+)
+from database.async_db import (
+    AsyncSessionLocal, database_configured, get_async_database_url, get_async_engine, get_async_session,
+)
+from database.change_feed import RESET, collection_tag, entity_tag, listen
+from database.models import Gimmick, Promotion, Wrestler
+from database.snapshot import SNAPSHOT_PATH, get_snapshot_reader, get_snapshot_session, snapshot_session
+from questions.engine import get_question_engine
+from questions.parser import QuestionError
+from search.name_index import DEFAULT_RESULTS, MAX_RESULTS, NameSearch
+from utils.metrics import get_metrics
+
+# Reads are served from the SQLite snapshot when SNAPSHOT_PATH is set, from PostgreSQL otherwise
+get_read_session = get_snapshot_session if SNAPSHOT_PATH else get_async_session
+name_search = NameSearch(snapshot_session if SNAPSHOT_PATH else AsyncSessionLocal)
+
+REQUEST_SECONDS = get_metrics().histogram(
+    "api_request_seconds", "Request handling time, by route template, status and response cache result",
+    ("route", "status", "cache"))
+CACHE_ENTRIES = get_metrics().gauge("api_cache_entries", "Responses held in the response cache")
+NAME_INDEX_ENTRIES = get_metrics().gauge("api_name_index_entries", "Names in the in-memory search index")
+
+
+def on_change(kind: str, ids: list):
+    get_response_cache().on_change(kind, ids)
+    if not SNAPSHOT_PATH:
+        # Served from a snapshot, the index follows the snapshot: a change isn't in it until the next build
+        name_search.on_change(kind, ids)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # A snapshot can be served on its own, with no database to pool connections to or listen on
+    async_engine = get_async_engine() if database_configured() or not SNAPSHOT_PATH else None
+    if SNAPSHOT_PATH:
+        # Every cached response and every indexed name may predate the new snapshot
+        get_snapshot_reader().subscribe(lambda: get_response_cache().invalidate(None))
+        get_snapshot_reader().subscribe(lambda: name_search.on_change(RESET, []))
+        get_snapshot_reader().engine()
+    # Built before serving; the change feed's reset on connecting rebuilds it once more in the
+    # background, picking up anything written between this load and the LISTEN
+    await name_search.rebuild()
+    listener = asyncio.create_task(listen(get_async_database_url(), on_change)) if async_engine else None
+    yield
+    if listener is not None:
+        listener.cancel()
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+app = FastAPI(title="Grapsmuse", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_time(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # The route template ("/wrestlers/{wrestler_id}"), not the path, keeps the label set bounded
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(time.perf_counter() - start, route=route.path if route else "unmatched",
+                            status=response.status_code, cache=response.headers.get("X-Cache", "-"))
+    return response
+
+After = Query(None, description="Keyset cursor: the next_after value of the previous page")
+Limit = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+
+def json_response(content) -> Response:
+    """Serialize straight to bytes with orjson, skipping jsonable_encoder (dates and None are native)."""
+    return Response(orjson.dumps(content), media_type="application/json")
+
+
+async def cached(request: Request, load, tags, what: str = None) -> Response:
+    """
+    Serve a GET from the response cache. load() is awaited on a miss; tags are
+    the change-feed tags the content depends on, or a function of the content
+    for lookups whose row id isn't known up front. With what, an empty result
+    is a 404 (never cached).
+    """
+    async def render():
+        content = await load()
+        if content is None and what is not None:
+            raise HTTPException(status_code=404, detail=f"{what} not found")
+        return orjson.dumps(content), tags(content) if callable(tags) else tags
+
+    key = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+    entry, status = await get_response_cache().fetch(key, render)
+    headers = {"ETag": entry.etag, "X-Cache": status}
+    if not_modified(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
 
 
 @app.get("/")
 async def root():
-    return {"message": "Hello World"}
+    return {"message": "Grapsmuse API"}
+
+
+@app.get("/ask")
+async def ask(q: str = Query(..., min_length=1, description='e.g. "how many title reigns does Undertaker have"'),
+              session=Depends(get_read_session)):
+    try:
+        answer, hit, timings = await get_question_engine().ask(session, q)
+    except QuestionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response = json_response(answer)
+    response.headers["Server-Timing"] = ", ".join(f"{stage};dur={seconds * 1000:.3f}" for stage, seconds in timings.items())
+    response.headers["X-Question-Cache"] = "hit" if hit else "miss"
+    return response
+
+
+@app.get("/search")
+async def search_names(q: str = Query(..., min_length=1, description='Name or gimmick, e.g. "undertacker"'),
+                       limit: int = Query(DEFAULT_RESULTS, ge=1, le=MAX_RESULTS)):
+    if not name_search.ready:
+        raise HTTPException(status_code=503, detail="Name index is still loading")
+    start = time.perf_counter()
+    results = name_search.index.search(q, limit)
+    response = json_response({"query": q, "results": results})
+    response.headers["Server-Timing"] = f"search;dur={(time.perf_counter() - start) * 1000:.3f}"
+    return response
+
+
+@app.get("/wrestlers")
+async def list_wrestlers(request: Request, after: int = After, limit: int = Limit, promotion_id: int = None,
+                         is_active: bool = None, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.wrestlers_page(session, after, limit, promotion_id, is_active),
+                        [collection_tag("wrestler")])
+
+
+@app.get("/wrestlers/cagematch/{cagematch_id}")
+async def wrestler_by_cagematch_id(request: Request, cagematch_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.fetch_one(
+        session, WRESTLER_COLUMNS, Wrestler.cagematch_id == cagematch_id),
+        lambda row: [entity_tag("wrestler", row["id"])], "Wrestler")
+
+
+@app.get("/wrestlers/{wrestler_id}")
+async def get_wrestler(request: Request, wrestler_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.fetch_one(session, WRESTLER_COLUMNS, Wrestler.id == wrestler_id),
+                        [entity_tag("wrestler", wrestler_id)], "Wrestler")
+
+
+@app.get("/wrestlers/{wrestler_id}/gimmicks")
+async def list_wrestler_gimmicks(request: Request, wrestler_id: int, session=Depends(get_read_session)):
+    # Gimmick writes publish their wrestlers too, so the wrestler's tag covers new gimmicks
+    return await cached(request, lambda: api_queries.wrestler_gimmicks(session, wrestler_id),
+                        [entity_tag("wrestler", wrestler_id)])
+
+
+@app.get("/gimmicks")
+async def list_gimmicks(request: Request, after: int = After, limit: int = Limit, wrestler_id: int = None,
+                        session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.gimmicks_page(session, after, limit, wrestler_id),
+                        [collection_tag("gimmick")])
+
+
+@app.get("/gimmicks/{gimmick_id}")
+async def get_gimmick(request: Request, gimmick_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.fetch_one(session, GIMMICK_COLUMNS, Gimmick.id == gimmick_id),
+                        [entity_tag("gimmick", gimmick_id)], "Gimmick")
+
+
+@app.get("/promotions")
+async def list_promotions(request: Request, after: int = After, limit: int = Limit,
+                          session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.promotions_page(session, after, limit),
+                        [collection_tag("promotion")])
+
+
+@app.get("/promotions/cagematch/{cagematch_id}")
+async def promotion_by_cagematch_id(request: Request, cagematch_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.fetch_one(
+        session, PROMOTION_COLUMNS, Promotion.cagematch_id == cagematch_id),
+        lambda row: [entity_tag("promotion", row["id"])], "Promotion")
+
+
+@app.get("/promotions/{promotion_id}")
+async def get_promotion(request: Request, promotion_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.fetch_one(
+        session, PROMOTION_COLUMNS, Promotion.id == promotion_id),
+        [entity_tag("promotion", promotion_id)], "Promotion")
+
+
+@app.get("/stats/wrestlers/{wrestler_id}")
+async def get_wrestler_stats(request: Request, wrestler_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.wrestler_stats(session, wrestler_id),
+                        [entity_tag("wrestler", wrestler_id)], "Wrestler stats")
+
+
+@app.get("/stats/promotions")
+async def rank_promotions(request: Request, order: Literal[PROMOTION_STATS_ORDERS] = "wrestler_count",
+                          limit: int = Limit, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.promotion_stats_ranked(session, order, limit),
+                        [collection_tag("promotion")])
+
+
+@app.get("/stats/promotions/{promotion_id}")
+async def get_promotion_stats(request: Request, promotion_id: int, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.promotion_stats(session, promotion_id),
+                        [entity_tag("promotion", promotion_id)], "Promotion stats")
+
+
+@app.get("/stats/decades")
+async def list_decade_stats(request: Request, session=Depends(get_read_session)):
+    return await cached(request, lambda: api_queries.decade_stats(session), [collection_tag("decade")])
+
+
+@app.get("/cache")
+async def cache_stats():
+    return get_response_cache().stats()
 
 
-@app.get("/hello/{name}")
-async def say_hello(name: str):
-    return {"message": f"Hello {name}"}
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: request timings, SQL statement timings per table, cache and index sizes."""
+    CACHE_ENTRIES.set(get_response_cache().stats()["size"])
+    NAME_INDEX_ENTRIES.set(len(name_search.index))
+    return Response(get_metrics().render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
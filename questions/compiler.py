@@ -0,0 +1,132 @@
+# questions/compiler.py
+
+import operator
+
+from sqlalchemy import Float, Integer, String, bindparam, cast, extract, func, literal, select, union
+
+from database.models import Gimmick, Promotion, Wrestler, WrestlerStats
+from questions.parser import Question, Slot
+
+# Rows returned for list questions without "top N"
+LIST_LIMIT = 25
+
+OPERATORS = {"=": operator.eq, ">": operator.gt, "<": operator.lt, ">=": operator.ge, "<=": operator.le}
+NAME_FILTERS = ("wrestler", "promotion", "country")
+# Wrestler metrics precomputed in wrestler_stats (database/stats.py) instead of counted per question
+STATS_COLUMNS = ("match_count", "win_count")
+
+ROW_COLUMNS = {
+    "wrestlers": (Wrestler.id, Wrestler.name, Wrestler.cagematch_id, Wrestler.promotion_id, Wrestler.height_cm,
+                  Wrestler.weight_kg, Wrestler.age, Wrestler.is_active, Wrestler.title_reigns, Wrestler.titles_won),
+    "gimmicks": (Gimmick.id, Gimmick.gimmick_name, Gimmick.wrestler_id, Wrestler.name.label("wrestler_name"),
+                 Gimmick.date_created, Gimmick.last_seen),
+    "promotions": (Promotion.id, Promotion.name, Promotion.country, Promotion.cagematch_id),
+}
+
+
+def param_name(slot: Slot) -> str:
+    return f"p{int(slot)}"
+
+
+def _value(column: str, value):
+    """Slots become bind parameters; constants (True for "active") are part of the template."""
+    if not isinstance(value, Slot):
+        return literal(value)
+    return bindparam(param_name(value), type_=String if column in NAME_FILTERS else Float)
+
+
+def wrestler_named(name):
+    """
+    Case-insensitive match on the wrestler's name, with or without a leading "The",
+    or on any of their gimmicks. A UNION of lookups rather than an OR, so each
+    side is served by its lower(name) expression index.
+    """
+    lowered = func.lower(name)
+    return Wrestler.id.in_(union(
+        select(Wrestler.id).where(func.lower(Wrestler.name).in_([lowered, literal("the ") + lowered])),
+        select(Gimmick.wrestler_id).where(func.lower(Gimmick.gimmick_name) == lowered),
+    ))
+
+
+def promotion_ids_named(name):
+    return select(Promotion.id).where(func.lower(Promotion.name) == func.lower(name)).scalar_subquery()
+
+
+def _wrestler_column(column: str):
+    return getattr(WrestlerStats if column in STATS_COLUMNS else Wrestler, column)
+
+
+def _condition(entity: str, column: str, op: str, value):
+    compare = OPERATORS[op]
+    if column == "wrestler":
+        return wrestler_named(value)
+    if column == "promotion":
+        promotion_column = Gimmick.debut_promotion_id if entity == "gimmicks" else Wrestler.promotion_id
+        return promotion_column.in_(promotion_ids_named(value))
+    if column == "country":
+        return func.lower(Promotion.country) == func.lower(value)
+    if column == "debut_year":
+        return compare(extract("year", Wrestler.debut), value)
+    if entity == "promotions":
+        return compare(getattr(Promotion, column), value)
+    return compare(_wrestler_column(column), value)
+
+
+def _answer_column(question: Question):
+    if question.select == "promotion_name":
+        return Promotion.name
+    if question.entity == "promotions":
+        return getattr(Promotion, question.select)
+    return _wrestler_column(question.select)
+
+
+def compile_question(question: Question) -> tuple:
+    """
+    Compile a Question to a SQL statement whose literals are bind parameters p0, p1, ...
+    Returns (statement, kind): kind is "aggregate" (one value), "value" (name, value rows)
+    or "rows" (entity rows).
+    """
+    base = {"wrestlers": Wrestler, "gimmicks": Gimmick, "promotions": Promotion}[question.entity]
+
+    if question.aggregate == "count":
+        stmt, kind = select(func.count(base.id).label("value")), "aggregate"
+    elif question.aggregate is not None:
+        value = getattr(func, question.aggregate)(_answer_column(question))
+        if question.aggregate == "avg":
+            # numeric -> float, so the answer serializes as a plain JSON number
+            value = cast(value, Float)
+        stmt, kind = select(value.label("value")), "aggregate"
+    elif question.select is not None:
+        label = Promotion.name if question.entity == "promotions" else Wrestler.name
+        stmt, kind = select(label.label("name"), _answer_column(question).label("value")), "value"
+    else:
+        stmt, kind = select(*ROW_COLUMNS[question.entity]), "rows"
+
+    stmt = stmt.select_from(base)
+    if question.entity == "gimmicks":
+        stmt = stmt.join(Wrestler, Wrestler.id == Gimmick.wrestler_id)
+    elif question.select == "promotion_name":
+        stmt = stmt.join(Promotion, Promotion.id == Wrestler.promotion_id)
+    columns = {question.select, *(column for column, _, _ in question.filters), (question.order or (None,))[0]}
+    if question.entity != "promotions" and columns & set(STATS_COLUMNS):
+        stmt = stmt.join(WrestlerStats, WrestlerStats.wrestler_id == Wrestler.id)
+
+    for column, op, value in question.filters:
+        stmt = stmt.where(_condition(question.entity, column, op, _value(column, value)))
+
+    if question.order is not None:
+        column, descending = question.order
+        order_column = getattr(Promotion, column) if question.entity == "promotions" else _wrestler_column(column)
+        stmt = stmt.where(order_column.is_not(None)).order_by(order_column.desc() if descending else order_column)
+    if kind != "aggregate":
+        if isinstance(question.limit, Slot):
+            stmt = stmt.limit(bindparam(param_name(question.limit), type_=Integer))
+        else:
+            stmt = stmt.limit(LIST_LIMIT if question.limit is None else question.limit)
+        if question.order is None:
+            stmt = stmt.order_by(base.id)
+    return stmt, kind
+
+
+def bind_literals(literals: list) -> dict:
+    return {param_name(Slot(index)): value for index, value in enumerate(literals)}
@@ -0,0 +1,108 @@
+# questions/engine.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from questions.compiler import bind_literals, compile_question
+from questions.parser import lex, parse
+
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", "512"))
+
+
+class CompiledQuestion:
+    """A parsed and compiled question shape, shared by every question with that shape."""
+
+    def __init__(self, shape: str, question, statement, kind: str):
+        self.shape = shape
+        self.question = question
+        self.statement = statement
+        self.kind = kind
+
+    def __repr__(self):
+        return f"<CompiledQuestion(shape='{self.shape}', kind='{self.kind}')>"
+
+
+class TemplateCache:
+    """LRU cache of CompiledQuestions keyed by question shape."""
+
+    def __init__(self, max_size: int = QUESTION_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, shape: str):
+        with self._lock:
+            template = self._templates.get(shape)
+            if template is None:
+                self.misses += 1
+                return None
+            self._templates.move_to_end(shape)
+            self.hits += 1
+            return template
+
+    def put(self, template: CompiledQuestion):
+        with self._lock:
+            self._templates[template.shape] = template
+            self._templates.move_to_end(template.shape)
+            while len(self._templates) > self.max_size:
+                self._templates.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._templates), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+
+class QuestionEngine:
+    """
+    Answers questions in three timed stages: parse (lex, then parse on a cache
+    miss), compile (on a cache miss) and execute. Questions that differ only in
+    their names and numbers hit the same cached template and statement, and the
+    identical SQL text lets the driver reuse its prepared statement.
+    """
+
+    def __init__(self, cache_size: int = QUESTION_CACHE_SIZE):
+        self.cache = TemplateCache(cache_size)
+
+    def prepare(self, text: str) -> tuple:
+        """Returns (CompiledQuestion, bind parameters, cache hit, {stage: seconds})."""
+        start = time.perf_counter()
+        shape, literals = lex(text)
+        template = self.cache.get(shape)
+        hit = template is not None
+        question = template.question if hit else parse(shape)
+        parsed = time.perf_counter()
+        if not hit:
+            statement, kind = compile_question(question)
+            template = CompiledQuestion(shape, question, statement, kind)
+            self.cache.put(template)
+        compiled = time.perf_counter()
+        return template, bind_literals(literals), hit, {"parse": parsed - start, "compile": compiled - parsed}
+
+    async def ask(self, session, text: str) -> tuple:
+        """Answer a question on an AsyncSession. Returns (answer dict, cache hit, {stage: seconds})."""
+        template, params, hit, timings = self.prepare(text)
+        start = time.perf_counter()
+        rows = [dict(row) for row in (await session.execute(template.statement, params)).mappings()]
+        timings["execute"] = time.perf_counter() - start
+
+        if template.kind in ("aggregate", "value"):
+            answer = rows[0]["value"] if rows else None
+        else:
+            answer = [row.get("name") or row.get("gimmick_name") for row in rows]
+        return {"question": text, "shape": template.shape, "answer": answer, "rows": rows}, hit, timings
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_question_engine() -> QuestionEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = QuestionEngine()
+        return _engine
@@ -0,0 +1,363 @@
+# questions/parser.py
+
+import re
+
+TOKEN = re.compile(r"\d+(?:\.\d+)?|[A-Za-z][A-Za-z0-9]*(?:[.\-&][A-Za-z0-9]+)*|'s\b")
+NAME = "<name>"
+NUM = "<num>"
+
+# Everything else in a question is a literal: a wrestler, promotion or country name
+VOCABULARY = {
+    "how", "many", "much", "old", "tall", "heavy", "weigh", "when", "did", "does", "do", "is", "are", "was",
+    "were", "has", "have", "had", "hold", "held", "the", "a", "an", "of", "in", "from", "at", "for", "with", "who",
+    "which", "what", "whose", "list", "show", "me", "all", "give", "find", "wrestler", "wrestlers", "gimmick",
+    "gimmicks", "promotion", "promotions", "company", "companies", "title", "titles", "reign", "reigns", "won",
+    "championships", "champion", "champions", "active", "inactive", "retired", "over", "above", "under", "below",
+    "more", "less", "than", "least", "most", "fewest", "taller", "shorter", "heavier", "lighter", "older",
+    "younger", "tallest", "shortest", "heaviest", "lightest", "oldest", "youngest", "cm", "kg", "years", "year",
+    "age", "height", "weight", "debut", "debuted", "after", "before", "since", "top", "average", "avg", "total",
+    "number", "matches", "wins", "win", "been", "and", "'s", "currently", "still", "there", "by", "wrestling", "name", "names", "wrestle",
+}
+# Filler the parser may leave unconsumed
+FILLER = {
+    "did", "does", "do", "is", "are", "was", "were", "has", "have", "had", "hold", "held", "the", "a", "an", "of",
+    "in", "from", "at", "for", "with", "who", "which", "what", "whose", "list", "show", "me", "all", "give", "find",
+    "won", "there", "by", "been", "and", "'s", "name", "names", "wrestle", "wrestling", "currently", "still",
+}
+
+# Counted stats, longest phrase first
+METRICS = (
+    (("title", "reigns"), "title_reigns"),
+    (("titles", "won"), "titles_won"),
+    (("years", "active"), "years_active"),
+    (("matches", "won"), "win_count"),
+    (("wins",), "win_count"),
+    (("matches",), "match_count"),
+    (("reigns",), "title_reigns"),
+    (("titles",), "titles_won"),
+    (("championships",), "titles_won"),
+    (("years",), "years_active"),
+)
+# Physical attributes, by name, unit or comparative
+ATTRIBUTES = {
+    "height": "height_cm", "tall": "height_cm", "cm": "height_cm", "taller": "height_cm", "shorter": "height_cm",
+    "weight": "weight_kg", "heavy": "weight_kg", "kg": "weight_kg", "heavier": "weight_kg", "lighter": "weight_kg",
+    "age": "age", "old": "age", "older": "age", "younger": "age",
+}
+COMPARATORS = {
+    "over": ">", "above": ">", "more": ">", "taller": ">", "heavier": ">", "older": ">", "after": ">",
+    "under": "<", "below": "<", "less": "<", "shorter": "<", "lighter": "<", "younger": "<", "before": "<",
+    "since": ">=", "least": ">=",
+}
+SUPERLATIVES = {
+    "tallest": ("height_cm", True), "shortest": ("height_cm", False),
+    "heaviest": ("weight_kg", True), "lightest": ("weight_kg", False),
+    "oldest": ("age", True), "youngest": ("age", False),
+}
+AGGREGATES = {"average": "avg", "avg": "avg", "total": "sum"}
+ENTITIES = {
+    "wrestler": "wrestlers", "wrestlers": "wrestlers", "champion": "wrestlers", "champions": "wrestlers",
+    "gimmick": "gimmicks", "gimmicks": "gimmicks",
+    "promotion": "promotions", "promotions": "promotions", "company": "promotions", "companies": "promotions",
+}
+
+
+class QuestionError(ValueError):
+    """The question could not be understood."""
+
+
+class Slot(int):
+    """Position of a literal in lex()'s literal list, as opposed to a constant filter value."""
+
+    def __repr__(self):
+        return f"Slot({int(self)})"
+
+
+class Question:
+    """
+    Intermediate form of a question:
+    entity     wrestlers, gimmicks or promotions
+    select     column that answers the question, None for whole rows
+    aggregate  count, avg or sum, or None
+    filters    [(column, operator, Slot or constant)]
+    order      (column, descending) or None
+    limit      int, Slot or None for the default
+    """
+
+    def __init__(self, entity: str = "wrestlers"):
+        self.entity = entity
+        self.select = None
+        self.aggregate = None
+        self.filters = []
+        self.order = None
+        self.limit = None
+
+    def __repr__(self):
+        return (f"<Question(entity='{self.entity}', select={self.select!r}, aggregate={self.aggregate!r}, "
+                f"filters={self.filters!r}, order={self.order!r}, limit={self.limit!r})>")
+
+
+def _joins_name(words: list, index: int, after_name: bool, title_case: bool) -> bool:
+    """Vocabulary words that are part of a name: "The Undertaker", "Ring of Honor", "Big Show"."""
+    word, lowered = words[index], words[index].lower()
+    following = words[index + 1] if index + 1 < len(words) else ""
+    starts_name = following[:1].isupper() and following.lower() not in VOCABULARY
+    if lowered in ("of", "and"):
+        return after_name and starts_name
+    if lowered == "show":
+        # "Big Show", "big show": "show me" never follows a name
+        return after_name
+    if index == 0 or not word[:1].isupper() or lowered == "'s":
+        return False
+    if lowered in ("the", "all"):
+        return starts_name
+    # In "How Many Reigns Does Big Show Have" capitals say nothing about names
+    return after_name and not title_case
+
+
+def lex(question: str) -> tuple:
+    """
+    Split a question into its shape and its literals:
+    "active wrestlers over 200cm in AEW" -> ("active wrestlers over <num> cm in <name>", [200, "AEW"]).
+    Questions of the same shape share one parsed and compiled template.
+    """
+    words = TOKEN.findall(question)
+    title_case = all(word[:1].isupper() for word in words if word[:1].isalpha())
+    tokens, literals = [], []
+    for index, word in enumerate(words):
+        lowered = word.lower()
+        after_name = tokens[-1:] == [NAME]
+        if word[0].isdigit() and after_name:
+            # A number right after a name is part of it: "Wrestler 22"
+            literals[-1] = f"{literals[-1]} {word}"
+        elif word[0].isdigit():
+            tokens.append(NUM)
+            literals.append(float(word) if "." in word else int(word))
+        elif lowered in VOCABULARY and not _joins_name(words, index, after_name, title_case):
+            tokens.append(lowered)
+        elif after_name:
+            literals[-1] = f"{literals[-1]} {word}"
+        else:
+            tokens.append(NAME)
+            literals.append(word)
+    if not tokens:
+        raise QuestionError("Empty question")
+    return " ".join(tokens), literals
+
+
+def _metric_at(tokens: list, index: int) -> tuple:
+    """(column, token count) of the stat named at tokens[index], or (None, 0)."""
+    for words, column in METRICS:
+        if tuple(tokens[index:index + len(words)]) == words:
+            return column, len(words)
+    return None, 0
+
+
+def _entity(tokens: list) -> str:
+    return next((ENTITIES[token] for token in tokens if token in ENTITIES), "wrestlers")
+
+
+# Clauses: clause(tokens, index, question, slots) -> indexes of the tokens it consumed, or None if it doesn't apply
+
+def _name(tokens, index, question, slots):
+    previous = tokens[index - 1] if index > 0 else None
+    following = tokens[index + 1] if index + 1 < len(tokens) else None
+    column = "country" if question.entity == "promotions" else "promotion"
+    if previous in ("in", "from", "at") or (previous == "for" and question.select == "promotion_name"):
+        question.filters.append((column, "=", slots[index]))
+        return {index - 1, index}
+    if following in ENTITIES:
+        # "AEW wrestlers", "Japanese promotions"
+        question.filters.append((column, "=", slots[index]))
+        return {index}
+    question.filters.append(("wrestler", "=", slots[index]))
+    return {index}
+
+
+def _comparison(tokens, index, question, slots):
+    token = tokens[index]
+    if token == "least" and tokens[index - 1:index] != ["at"]:
+        return None
+    position = index + 1
+    if tokens[position:position + 1] == ["than"]:
+        position += 1
+    if tokens[position:position + 1] != [NUM]:
+        return None
+    consumed = set(range(index, position + 1))
+    unit = tokens[position + 1] if position + 1 < len(tokens) else None
+
+    column, width = _metric_at(tokens, position + 1)
+    if "debut" in tokens or "debuted" in tokens:
+        column, width = "debut_year", 0
+        consumed |= {position for position, word in enumerate(tokens) if word in ("debut", "debuted")}
+    elif unit in ("years", "year") and (token in ("older", "younger") or tokens[position + 2:position + 3] == ["old"]):
+        column, width = "age", 2 if tokens[position + 2:position + 3] == ["old"] else 1
+    elif column is None and unit in ("cm", "kg"):
+        column, width = ATTRIBUTES[unit], 1
+    elif column is None and token in ATTRIBUTES:
+        column, width = ATTRIBUTES[token], 0
+    if column is None:
+        raise QuestionError(f"Don't know what '{token}' compares")
+    question.filters.append((column, COMPARATORS[token], slots[position]))
+    return consumed | set(range(position + 1, position + 1 + width))
+
+
+def _flag(tokens, index, question, slots):
+    token = tokens[index]
+    if token in ("active", "currently", "still"):
+        if ("is_active", "=", True) not in question.filters:
+            question.filters.append(("is_active", "=", True))
+    elif token in ("inactive", "retired"):
+        question.filters.append(("is_active", "=", False))
+    elif question.entity != "wrestlers":
+        return None
+    elif tokens[0] in ("is", "was") and NAME in tokens:
+        # "is Undertaker a champion"
+        question.select = "is_champion"
+    else:
+        question.filters.append(("is_champion", "=", True))
+    return {index}
+
+
+def _superlative(tokens, index, question, slots):
+    question.order = SUPERLATIVES[tokens[index]]
+    if question.limit is None:
+        question.limit = 1
+    return {index}
+
+
+def _top(tokens, index, question, slots):
+    if tokens[index + 1:index + 2] != [NUM]:
+        return None
+    question.limit = slots[index + 1]
+    return {index, index + 1}
+
+
+def _most(tokens, index, question, slots):
+    column, width = _metric_at(tokens, index + 1)
+    if column is None:
+        return None
+    question.order = (column, tokens[index] == "most")
+    if question.limit is None:
+        question.limit = 1
+    return set(range(index, index + 1 + width))
+
+
+def _aggregate(tokens, index, question, slots):
+    column, width = _metric_at(tokens, index + 1)
+    if column is None and index + 1 < len(tokens) and tokens[index + 1] in ATTRIBUTES:
+        column, width = ATTRIBUTES[tokens[index + 1]], 1
+    if column is None:
+        raise QuestionError(f"Don't know how to take the {tokens[index]} of that")
+    question.aggregate, question.select = AGGREGATES[tokens[index]], column
+    return set(range(index, index + 1 + width))
+
+
+def _how(tokens, index, question, slots):
+    following = tokens[index + 1] if index + 1 < len(tokens) else None
+    if following == "many":
+        column, width = _metric_at(tokens, index + 2)
+        consumed = set(range(index, index + 2 + width))
+        won = next((position for position in range(index + 2 + width, len(tokens))
+                    if tokens[position] in ("won", "win")), None)
+        if column == "match_count" and won is not None:
+            # "how many matches has Kane won"
+            column = "win_count"
+            consumed.add(won)
+        if column is not None:
+            # "how many title reigns does Undertaker have"
+            question.select = column
+            return consumed
+        question.aggregate = "count"
+        return {index, index + 1}
+    if following in ("old", "tall", "heavy"):
+        question.select = ATTRIBUTES[following]
+        return {index, index + 1}
+    if following == "much" and "weigh" in tokens:
+        question.select = "weight_kg"
+        return {index, index + 1, tokens.index("weigh")}
+    return None
+
+
+def _when(tokens, index, question, slots):
+    debut = [position for position, token in enumerate(tokens) if token in ("debut", "debuted")]
+    if not debut:
+        return None
+    question.select = "debut"
+    return {index, *debut}
+
+
+def _what(tokens, index, question, slots):
+    # "what promotion is Undertaker in", "which company does Undertaker wrestle for"
+    if tokens[index + 1:index + 2] not in (["promotion"], ["company"]) or NAME not in tokens:
+        return None
+    if tokens[index + 2:index + 3] not in (["is"], ["does"], ["was"], ["did"]):
+        return None
+    question.entity, question.select = "wrestlers", "promotion_name"
+    return {index, index + 1}
+
+
+def _possessive(tokens, index, question, slots):
+    # "Undertaker's title reigns", "Kenny Omega's height"
+    column, width = _metric_at(tokens, index + 1)
+    if column is None and index + 1 < len(tokens) and tokens[index + 1] in ("height", "weight", "age", "debut"):
+        column, width = ATTRIBUTES.get(tokens[index + 1], tokens[index + 1]), 1
+    if column is None or question.select is not None:
+        return None
+    question.select = column
+    return set(range(index, index + 1 + width))
+
+
+def _number_of(tokens, index, question, slots):
+    if tokens[index + 1:index + 2] != ["of"]:
+        return None
+    question.aggregate = "count"
+    return {index, index + 1}
+
+
+CLAUSES = {
+    NAME: _name,
+    **{token: _comparison for token in COMPARATORS},
+    **{token: _flag for token in ("active", "currently", "still", "inactive", "retired", "champion", "champions")},
+    **{token: _superlative for token in SUPERLATIVES},
+    "top": _top,
+    "most": _most,
+    "fewest": _most,
+    **{token: _aggregate for token in AGGREGATES},
+    "how": _how,
+    "when": _when,
+    "what": _what,
+    "which": _what,
+    "number": _number_of,
+    "'s": _possessive,
+}
+
+
+def parse(shape: str) -> Question:
+    """Parse a lexed question shape. Raises QuestionError unless every word and literal is accounted for."""
+    tokens = shape.split(" ")
+    literal_positions = [index for index, token in enumerate(tokens) if token in (NAME, NUM)]
+    slots = {index: Slot(number) for number, index in enumerate(literal_positions)}
+    question = Question(_entity(tokens))
+
+    used = set()
+    for index, token in enumerate(tokens):
+        if index in used or token not in CLAUSES:
+            continue
+        consumed = CLAUSES[token](tokens, index, question, slots)
+        if consumed:
+            used |= consumed
+
+    unknown = [token for index, token in enumerate(tokens)
+               if index not in used and token not in FILLER and token not in ENTITIES]
+    if unknown:
+        raise QuestionError(f"Didn't understand: {' '.join(unknown)}")
+    if question.select is None and question.aggregate is None and not question.filters and question.order is None:
+        raise QuestionError("Nothing to look up")
+
+    one_wrestler = any(column == "wrestler" for column, _, _ in question.filters) and question.entity == "wrestlers"
+    if question.select not in (None, "is_champion", "debut", "promotion_name") and question.aggregate is None \
+            and not one_wrestler:
+        # "how many title reigns in AEW" is a total, "how tall are AEW wrestlers" an average
+        question.aggregate = "sum" if question.select in dict(METRICS).values() else "avg"
+    return question
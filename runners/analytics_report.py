@@ -0,0 +1,62 @@
+import argparse
+import time
+
+
+def format_duration(seconds: float) -> str:
+    return f"{seconds * 1e6:.0f} µs" if seconds < 0.001 else f"{seconds * 1000:.1f} ms"
+
+
+def print_rows(title: str, rows: list, seconds: float):
+    print(f"\n{title} ({format_duration(seconds)})")
+    if not rows:
+        print("  (no data)")
+        return
+    columns = list(rows[0])
+    widths = [max(len(column), *(len(str(row[column])) for row in rows)) for column in columns]
+    print("  " + "  ".join(f"{column:>{width}}" for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  " + "  ".join(f"{str(row[column]):>{width}}" for column, width in zip(columns, widths)))
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Load matches, participants, title reigns and wrestlers into columnar arrays "
+                               "and print win percentages, streaks, match ratings and reign lengths")
+    parser.add_argument("--match-type", help="Only count matches of this type (SINGLES, TAG, ...)")
+    parser.add_argument("--min-matches", type=int, default=10, help="Leave wrestlers with fewer matches out")
+    parser.add_argument("--limit", type=int, default=10, help="Rows per leaderboard")
+    parser.add_argument("--wrestler", type=int, help="Also print this wrestler's rolling win percentage")
+    parser.add_argument("--window", type=int, default=10, help="Decided matches per rolling window")
+    args = parser.parse_args(argv)
+
+    from analytics import stats
+    from analytics.columnar import load_store
+    from database.db_utils import get_engine
+    from database.models import MATCH_TYPES
+
+    if args.match_type is not None and args.match_type not in MATCH_TYPES:
+        parser.error(f"--match-type: choose from {', '.join(MATCH_TYPES)}")
+    start = time.perf_counter()
+    store, loaded = load_store(get_engine())
+    print(f"📊 Loaded {', '.join(f'{rows} {name}' for name, rows in loaded.items())} "
+          f"({store.nbytes / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+    reports = [
+        ("🏆 Win percentage", lambda: stats.win_percentages(store, args.min_matches, args.match_type,
+                                                            limit=args.limit)),
+        ("🔥 Win streaks", lambda: stats.win_streaks(store, args.match_type, limit=args.limit)),
+        ("⭐ Average match rating by promotion and year", lambda: stats.rating_by_promotion_year(
+            store, args.match_type)),
+        ("👑 Longest title reigns", lambda: stats.reign_lengths(store, limit=args.limit)),
+    ]
+    if args.wrestler is not None:
+        reports.append((f"📈 Rolling win percentage of wrestler {args.wrestler} (last {args.window})",
+                        lambda: stats.rolling_win_rate(store, args.wrestler, args.window)))
+    for title, report in reports:
+        start = time.perf_counter()
+        rows = report()
+        print_rows(title, rows, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import argparse
+import random
+import time
+from datetime import date, time as dtime, timedelta
+
+from utils.cli import EVENT_BATCH_SIZE
+
+# Synthetic events use cagematch ids from here up, and are removed again afterwards
+BENCH_ID_BASE = 900_000_000
+
+
+def synthetic_events(count: int, wrestler_cagematch_ids: list, seed: int = 7) -> list:
+    """Events shaped like real cards: 6-10 matches of 2-8 participants, some of them tag teams."""
+    from database.models import EVENT_TYPES
+
+    rng = random.Random(seed)
+    pool = wrestler_cagematch_ids or list(range(BENCH_ID_BASE, BENCH_ID_BASE + 2000))
+    events = []
+    for n in range(count):
+        matches = []
+        card_size = rng.randint(6, 10)
+        for index in range(card_size):
+            teams, size = rng.choice([(2, 1), (2, 1), (2, 2), (3, 1), (4, 1), (2, 3)])
+            participants = []
+            for team in range(1, teams + 1):
+                tag_team = BENCH_ID_BASE + rng.randint(0, 300) if size > 1 else None
+                for _ in range(size):
+                    participants.append({
+                        "cagematch_id": rng.choice(pool), "name": f"Wrestler {len(participants)}",
+                        "tag_team_cagematch_id": tag_team, "tag_team_name": f"Bench Team {tag_team}" if tag_team else None,
+                        "team_number": team, "participant_number": len(participants) + 1,
+                    })
+            matches.append({
+                "position_on_event_card": card_size - 1 - index,
+                "match_type": {(2, 1): "SINGLES", (2, 2): "TAG", (3, 1): "THREE_WAY", (4, 1): "FOUR_WAY",
+                               (2, 3): "TRIOS"}[(teams, size)],
+                "stipulation": "STANDARD", "title_defense": rng.random() < 0.1,
+                "match_length": dtime(0, rng.randint(2, 40), rng.randint(0, 59)),
+                "victory_type": "CLEAN", "victor_team_number": 1, "match_notes": "Bench Match",
+                "participants": participants,
+            })
+        events.append({
+            "cagematch_id": BENCH_ID_BASE + n, "name": f"Bench Event {n}",
+            "date_of_event": date(2000, 1, 1) + timedelta(days=n % 9000),
+            "promotion_name": "Bench Promotion", "promotion_cagematch_id": None,
+            "event_type": rng.choice(EVENT_TYPES), "arena": None, "attendance": rng.randint(100, 20000),
+            "matches": matches,
+        })
+    return events
+
+
+def count_rows(events: list) -> int:
+    return sum(1 + len(event["matches"]) + sum(len(match["participants"]) for match in event["matches"])
+               for event in events)
+
+
+def load_with_orm(session, events: list, loader):
+    """One ORM object and one commit per event, the way scrape_wrestler_profile used to write."""
+    from database.models import EVENT_TYPES, Event, Match, MatchParticipant
+
+    promotion_ids = loader._promotion_ids(events)
+    for event in events:
+        row = Event(cagematch_id=event["cagematch_id"], name=event["name"],
+                    promotion_id=promotion_ids[event["cagematch_id"]], date_of_event=event["date_of_event"],
+                    event_type_id=EVENT_TYPES.index(event["event_type"]) + 1, attendance=event["attendance"])
+        session.add(row)
+        session.flush()
+        for match in event["matches"]:
+            match_row = Match(event_id=row.id, promotion_id=row.promotion_id, date=event["date_of_event"],
+                              match_type=match["match_type"], stipulation=match["stipulation"],
+                              title_defense=match["title_defense"], match_length=match["match_length"],
+                              position_on_event_card=match["position_on_event_card"],
+                              victor_team_number=match["victor_team_number"], match_notes=match["match_notes"])
+            session.add(match_row)
+            session.flush()
+            for participant in match["participants"]:
+                session.add(MatchParticipant(
+                    match_id=match_row.id, wrestler_id=loader.wrestler_ids.get(participant["cagematch_id"]),
+                    participant_number=participant["participant_number"], team_number=participant["team_number"],
+                    cagematch_id=participant["cagematch_id"], name=participant["name"]))
+        session.commit()
+
+
+def cleanup(session):
+    from sqlalchemy import delete, select
+
+    from database.models import Event, Match, MatchParticipant, TagTeam
+
+    events = select(Event.id).where(Event.cagematch_id >= BENCH_ID_BASE).scalar_subquery()
+    matches = select(Match.id).where(Match.event_id.in_(events)).scalar_subquery()
+    session.execute(delete(MatchParticipant).where(MatchParticipant.match_id.in_(matches)))
+    session.execute(Event.__table__.update().where(Event.cagematch_id >= BENCH_ID_BASE).values(headliner_match_id=None))
+    session.execute(delete(Match).where(Match.event_id.in_(events)))
+    session.execute(delete(Event).where(Event.cagematch_id >= BENCH_ID_BASE))
+    session.execute(delete(TagTeam).where(TagTeam.cagematch_id >= BENCH_ID_BASE))
+    session.commit()
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Benchmark the COPY event loader against row-by-row ORM inserts")
+    parser.add_argument("--events", type=int, default=2000, help="Synthetic events to load with COPY")
+    parser.add_argument("--orm-events", type=int, default=100, help="Synthetic events to load through the ORM")
+    parser.add_argument("--batch-size", type=int, default=EVENT_BATCH_SIZE, help="Events per COPY batch")
+    parser.add_argument("--keep", action="store_true", help="Leave the synthetic rows in the database")
+    args = parser.parse_args(argv)
+
+    from sqlalchemy import select
+
+    from database.copy_loader import CopyLoader
+    from database.db_utils import get_session, init_db
+    from database.models import Wrestler
+
+    init_db()
+    session = get_session()
+    cleanup(session)
+    wrestler_ids = list(session.scalars(select(Wrestler.cagematch_id).where(Wrestler.cagematch_id.is_not(None))))
+    events = synthetic_events(args.events, wrestler_ids)
+    loader = CopyLoader(session, args.batch_size)
+
+    results = []
+    orm_events = events[:args.orm_events]
+    if orm_events:
+        start = time.perf_counter()
+        load_with_orm(session, orm_events, loader)
+        results.append(("orm, row by row", count_rows(orm_events), time.perf_counter() - start))
+        cleanup(session)
+
+    start = time.perf_counter()
+    for event in events:
+        loader.add(event)
+    loader.flush()
+    results.append(("copy + merge", count_rows(events), time.perf_counter() - start))
+
+    # Same events again: everything goes through the ON CONFLICT update path
+    start = time.perf_counter()
+    for event in events:
+        loader.add(event)
+    loader.flush()
+    results.append(("copy + merge, reload", count_rows(events), time.perf_counter() - start))
+
+    print(f"{'strategy':<22} {'rows':>9} {'seconds':>8} {'rows/s':>10}")
+    for label, rows, seconds in results:
+        print(f"{label:<22} {rows:>9} {seconds:>8.2f} {rows / seconds:>10,.0f}")
+
+    if not args.keep:
+        cleanup(session)
+
+
+if __name__ == "__main__":
+    main()
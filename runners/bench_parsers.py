@@ -0,0 +1,89 @@
+import argparse
+import contextlib
+import io
+import statistics
+import time
+import tracemalloc
+
+# (label, backend, restrict to the extractor's regions)
+CONFIGS = [
+    ("html.parser full", "html.parser", False),
+    ("html.parser partial", "html.parser", True),
+    ("lxml full", "lxml", False),
+    ("lxml partial", "lxml", True),
+]
+
+
+def extractors() -> dict:
+    """page type -> extract(soup, url), the extractors each backend's output is compared with."""
+    from scrapers.gimmick_scraper import extract_alter_egos, extract_dates_and_promotions, get_last_page_url
+    from scrapers.wrestler_scraper import extract_title_stats, extract_wrestler_profile
+
+    return {
+        "profile": lambda soup, url: (extract_wrestler_profile(soup, url), extract_alter_egos(soup)),
+        "titles": lambda soup, url: extract_title_stats(soup),
+        "match_history": lambda soup, url: (extract_dates_and_promotions(soup), get_last_page_url(soup, url)),
+    }
+
+
+def load_corpus(cache, page_types, per_type: int) -> dict:
+    """Group cached pages by page type, at most per_type pages each."""
+    from scrapers.page_cache import classify_url
+
+    corpus = {page_type: [] for page_type in page_types}
+    urls = [row[0] for row in cache._db.execute("SELECT url FROM pages ORDER BY url")]
+    for url in urls:
+        page_type = classify_url(url)
+        if page_type in corpus and len(corpus[page_type]) < per_type:
+            page = cache.get(url)
+            if page:
+                corpus[page_type].append((url, page.content))
+    return corpus
+
+
+def bench_config(pages: list, page_type: str, extract, backend: str, partial: bool):
+    from scrapers.html_parser import parse_page
+
+    parse_times = []
+    peak = 0
+    outputs = []
+    for url, content in pages:
+        tracemalloc.start()
+        start = time.perf_counter()
+        soup = parse_page(content, page_type if partial else None, backend=backend)
+        parse_times.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            outputs.append(extract(soup, url))
+    return statistics.mean(parse_times), peak, outputs
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Benchmark HTML parser backends over cached Cagematch pages")
+    parser.add_argument("--per-type", type=int, default=50, help="Pages to benchmark per page type")
+    args = parser.parse_args(argv)
+
+    from scrapers.page_cache import PageCache
+
+    extract = extractors()
+    corpus = load_corpus(PageCache(offline=True), extract, args.per_type)
+    for page_type, pages in corpus.items():
+        if not pages:
+            print(f"⚠️ No cached {page_type} pages, run a scrape first.")
+            continue
+
+        print(f"\n📄 {page_type} ({len(pages)} pages)")
+        baseline = None
+        for label, backend, partial in CONFIGS:
+            mean_time, peak, outputs = bench_config(pages, page_type, extract[page_type], backend, partial)
+            if baseline is None:
+                baseline = outputs
+            status = "identical" if outputs == baseline else "MISMATCH"
+            print(f"  {label:<22} {mean_time * 1000:8.2f} ms/page  peak {peak / 1024:8.1f} KiB  {status}")
+
+
+if __name__ == "__main__":
+    main()
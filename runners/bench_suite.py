@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import sys
+
+STAGES = ("parse", "parsers", "db", "scrape", "snapshot", "startup")
+
+
+def print_stages(stages: dict):
+    print(f"{'stage':<34} {'n':>5} {'median':>11} {'p95':>11} {'min':>11}")
+    for name, summary in stages.items():
+        print(f"{name:<34} {summary['n']:>5} {format_seconds(summary['median']):>11} "
+              f"{format_seconds(summary['p95']):>11} {format_seconds(summary['min']):>11}")
+
+
+def print_comparison(rows: list, baseline: dict):
+    revision = baseline.get("git", {}).get("commit") or "?"
+    print(f"\n📊 Against {revision[:12]} ({baseline.get('created_at', '?')})")
+    print(f"{'stage':<34} {'before':>11} {'after':>11} {'change':>8}")
+    for stage, before, after, change, verdict in rows:
+        marker = {"slower": " 🐢", "faster": " 🚀", "not comparable": " (not comparable)"}.get(verdict, "")
+        print(f"{stage:<34} {format_seconds(before):>11} {format_seconds(after):>11} {change:>+8.1%}{marker}")
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.2f} µs"
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Offline benchmark suite: parsing, value parsers, DB write paths, an end-to-end scrape over "
+                    "the recorded fixture corpus, the read snapshot and cold starts, written as a JSON report "
+                    "comparable across commits")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="Stages to run")
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per parse / parser / DB stage")
+    parser.add_argument("--scrape-repeat", type=int, default=3, help="End-to-end scrapes to time")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub server delay per response, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay per response, up to this")
+    parser.add_argument("--db-rows", type=int, default=500, help="Rows per DB write-path sample")
+    parser.add_argument("--database-url", default="sqlite://",
+                        help="Database for the write paths (default: a throwaway in-memory SQLite database); "
+                             "on a real database the fixture rows are removed afterwards, and the read "
+                             "snapshot is built from it and compared with querying it directly")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="A previous report to compare medians against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative median change reported as slower / faster")
+    parser.add_argument("--fail-on-regression", action="store_true",
+                        help="Exit with status 1 if any stage got slower than --threshold")
+    args = parser.parse_args(argv)
+
+    from benchmarks.corpus import load_corpus
+    from benchmarks.stub_server import StubCagematch
+
+    corpus = load_corpus()
+    stub = StubCagematch(corpus, latency=args.latency, jitter=args.jitter).start()
+    # The scrapers build their urls from CAGEMATCH_BASE_URL at import, so they may only be imported now
+    os.environ["CAGEMATCH_BASE_URL"] = stub.base_url
+    from benchmarks import suite
+
+    stages = {}
+    try:
+        if "parse" in args.stages:
+            print("📄 Parsing fixture pages...")
+            stages.update(suite.bench_parse(corpus, args.repeat))
+        if "parsers" in args.stages:
+            print("🔢 Timing utils/parsers...")
+            stages.update(suite.bench_parsers(corpus, args.repeat))
+        if "db" in args.stages:
+            print("💾 Timing DB write paths...")
+            stages.update(suite.bench_db(corpus, args.repeat, args.database_url, args.db_rows))
+        if "scrape" in args.stages:
+            print(f"🌐 Scraping the top 100 wrestlers from the stub server ({args.latency * 1000:.0f} ms latency)...")
+            stages.update(suite.bench_scrape(stub, args.scrape_repeat))
+        if "snapshot" in args.stages:
+            print("📸 Building the read snapshot and timing reads on it...")
+            stages.update(suite.bench_snapshot(corpus, args.repeat, args.database_url, args.db_rows))
+        if "startup" in args.stages:
+            print("⏱️ Timing cold starts of the CLI and the scrapers...")
+            stages.update(suite.bench_startup(args.repeat))
+    finally:
+        stub.stop()
+
+    settings = {name: getattr(args, name) for name in
+                ("stages", "repeat", "scrape_repeat", "latency", "jitter", "db_rows")}
+    report = suite.build_report(stages, settings)
+    print()
+    print_stages(stages)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"\n✅ Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = suite.compare_reports(baseline, report, args.threshold)
+        print_comparison(rows, baseline)
+        if args.fail_on_regression and any(verdict == "slower" for *_, verdict in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import argparse
+
+from utils.cli import SNAPSHOT_BLOCK_ROWS
+from utils.metrics import add_metrics_arguments, write_metrics_report
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Build the read-only SQLite snapshot the API serves from, copying only changed blocks")
+    parser.add_argument("--path", help="Snapshot file (default: SNAPSHOT_PATH)")
+    parser.add_argument("--full", action="store_true", help="Rebuild from scratch instead of from the current snapshot")
+    parser.add_argument("--block-rows", type=int, default=SNAPSHOT_BLOCK_ROWS, help="Rows per checksummed block")
+    add_metrics_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from database.db_utils import get_engine
+    from database.snapshot import SNAPSHOT_PATH, build_snapshot, print_build
+
+    path = args.path or SNAPSHOT_PATH
+    if not path:
+        parser.error("set SNAPSHOT_PATH or pass --path")
+    print_build(build_snapshot(get_engine(), path, full=args.full, block_rows=args.block_rows))
+    if args.metrics_report:
+        write_metrics_report(args.metrics_report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import argparse
+import json
+import sys
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Fail if any hot lookup can only be answered with a sequential scan")
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args(argv)
+
+    from database.db_utils import get_engine, init_db
+    from database.query_plans import hot_query_plans, sequential_scans
+
+    init_db()
+    failures = 0
+    with get_engine().connect() as connection:
+        plans = hot_query_plans(connection)
+        connection.rollback()
+    for name, plan in plans.items():
+        scans = sequential_scans(plan)
+        if scans:
+            failures += 1
+            print(f"❌ {name}: sequential scan on {', '.join(scans)}")
+        else:
+            print(f"✅ {name}")
+        if args.verbose or scans:
+            print(json.dumps(plan, indent=2))
+
+    if failures:
+        print(f"❌ {failures} of {len(plans)} hot queries fall back to a sequential scan.")
+        sys.exit(1)
+    print(f"✅ All {len(plans)} hot queries use an index.")
+
+
+if __name__ == "__main__":
+    main()
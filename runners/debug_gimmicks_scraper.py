@@ -1,16 +1,13 @@
 
-from scrapers.gimmick_scraper import get_gimmick_match_dates
+from scrapers.gimmick_scraper import extract_alter_egos, get_gimmick_match_dates_many
+from scrapers.fetcher import BASE_URL, configure_fetcher, fetch
 from database.db_utils import get_session
 from database.models import Wrestler
-import requests
-from bs4 import BeautifulSoup
+from scrapers.html_parser import parse_page
+from utils.cli import add_fetcher_arguments
+import argparse
 import re
 
-BASE_URL = "https://www.cagematch.net"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-}
-
 
 def extract_cagematch_id_from_url(url: str) -> int:
     match = re.search(r"id=2&nr=(\d+)", url)
@@ -19,30 +16,17 @@ def extract_cagematch_id_from_url(url: str) -> int:
 
 def debug_scrape_gimmicks(wrestler_id: int, cagematch_id: int):
     profile_url = f"{BASE_URL}/?id=2&nr={cagematch_id}"
-    response = requests.get(profile_url, headers=HEADERS)
-    soup = BeautifulSoup(response.content, "html.parser")
-
-    alter_ego_section = soup.find("div", class_="InformationBoxTitle", string="Alter egos:")
-    if not alter_ego_section:
-        print("🔍 No alter egos found.")
-        return
-
-    alter_ego_table = alter_ego_section.find_parent("div", class_="InformationBoxRow")
-    if not alter_ego_table:
-        print("⚠️ Alter ego table structure unexpected.")
+    response = fetch(profile_url)
+    gimmicks = extract_alter_egos(parse_page(response.content, "profile"))
+    if gimmicks is None:
         return
 
-    gimmick_links = alter_ego_table.find_all("a", href=True)
-    for link in gimmick_links:
-        gimmick_name = link.text.strip()
-        gimmick_url = BASE_URL + "/" + link["href"].lstrip("/")
+    all_dates = get_gimmick_match_dates_many([url for _, url in gimmicks])
+    for (gimmick_name, gimmick_url), dates in zip(gimmicks, all_dates):
         gimmick_cagematch_id = extract_cagematch_id_from_url(gimmick_url)
-
-        if "&page=4" not in gimmick_url:
-            gimmick_url += "&page=4"
-
         try:
-            dates = get_gimmick_match_dates(gimmick_url)
+            if isinstance(dates, Exception):
+                raise dates
 
             print(f"\n🧪 Gimmick Preview:")
             print(f"  Wrestler ID      : {wrestler_id}")
@@ -59,6 +43,11 @@ def debug_scrape_gimmicks(wrestler_id: int, cagematch_id: int):
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    add_fetcher_arguments(parser)
+    args = parser.parse_args()
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+
     session = get_session()
     test_cagematch_id = 932  # Batista
     wrestler = session.query(Wrestler).filter_by(cagematch_id=test_cagematch_id).first()
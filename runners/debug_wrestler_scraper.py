@@ -1,7 +1,16 @@
+import argparse
+
 from scrapers.wrestler_scraper import scrape_wrestler_profile
+from scrapers.fetcher import configure_fetcher
+from utils.cli import add_fetcher_arguments
 from database.db_utils import get_session
 
 def main():
+    parser = argparse.ArgumentParser()
+    add_fetcher_arguments(parser)
+    args = parser.parse_args()
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+
     session = get_session()
     url = "https://www.cagematch.net/?id=2&nr=761&gimmick=Undertaker"  # change this as needed
     wrestler_model = scrape_wrestler_profile(url, session)
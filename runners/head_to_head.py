@@ -0,0 +1,87 @@
+import argparse
+import time
+
+from runners.analytics_report import format_duration, print_rows
+
+
+def resolve_wrestler(store, text: str) -> int:
+    """A wrestler id, or the id of the wrestler with this name (case-insensitive); None if there is none."""
+    if text.isdigit():
+        return int(text)
+    wanted = text.strip().casefold()
+    for wrestler_id, name in zip(store.wrestlers["id"].tolist(), store.wrestlers["name"]):
+        if name and name.casefold() == wanted:
+            return wrestler_id
+    return None
+
+
+def timed_query(query, repeat: int) -> tuple:
+    """(result, best seconds per call) of query() run repeat times."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = query()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def with_names(store, rows: list) -> list:
+    from analytics.stats import wrestler_names
+
+    names = wrestler_names(store, [row["wrestler_id"] for row in rows])
+    return [{"wrestler_id": row.pop("wrestler_id"), "name": name, **row} for row, name in zip(rows, names)]
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Index head-to-head records of every pair of wrestlers and look up one "
+                               "wrestler's record against another, top opponents or partners, and opponent chains")
+    parser.add_argument("wrestler", help="Wrestler id or name")
+    parser.add_argument("--vs", help="Print the record against this wrestler (id or name)")
+    parser.add_argument("--path", help="Print the shortest chain of opponents to this wrestler (id or name)")
+    parser.add_argument("--by", default="meetings",
+                        help="Rank the top list by this count: meetings, wins, losses, draws or partnered")
+    parser.add_argument("--top", type=int, default=10, help="Rows in the top list")
+    parser.add_argument("--repeat", type=int, default=100, help="Runs per lookup when timing it")
+    args = parser.parse_args(argv)
+
+    from analytics.columnar import load_store
+    from analytics.head_to_head import COUNT_COLUMNS, HeadToHeadIndex
+    from analytics.stats import wrestler_names
+    from database.db_utils import get_engine
+
+    if args.by not in COUNT_COLUMNS:
+        parser.error(f"--by: choose from {', '.join(COUNT_COLUMNS)}")
+    start = time.perf_counter()
+    store, loaded = load_store(get_engine())
+    print(f"📊 Loaded {loaded['participants']} participants of {loaded['matches']} matches "
+          f"in {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    index = HeadToHeadIndex.build(store)
+    print(f"🕸️ Indexed {len(index)} pairs of {len(index.nodes)} wrestlers ({index.nbytes / 1e6:.1f} MB) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    wrestler_ids = {}
+    for option, text in (("wrestler", args.wrestler), ("--vs", args.vs), ("--path", args.path)):
+        if text is not None:
+            wrestler_ids[option] = resolve_wrestler(store, text)
+            if wrestler_ids[option] is None:
+                parser.error(f"{option}: no wrestler named {text!r}")
+    wrestler_id = wrestler_ids["wrestler"]
+    name = wrestler_names(store, [wrestler_id])[0] or wrestler_id
+
+    rows, seconds = timed_query(lambda: index.top(wrestler_id, args.top, args.by), args.repeat)
+    print_rows(f"🤼 {name}: top {args.top} by {args.by}", with_names(store, rows), seconds)
+    if args.vs is not None:
+        other_id = wrestler_ids["--vs"]
+        record, seconds = timed_query(lambda: index.record(wrestler_id, other_id), args.repeat)
+        print_rows(f"⚔️ {name} vs {wrestler_names(store, [other_id])[0] or other_id}",
+                   with_names(store, [record] if record else []), seconds)
+    if args.path is not None:
+        path, seconds = timed_query(lambda: index.opponent_path(wrestler_id, wrestler_ids["--path"]), args.repeat)
+        print(f"\n🔗 Opponent chain ({format_duration(seconds)})")
+        print("  " + (" → ".join(str(name) for name in wrestler_names(store, path)) if path else "(none)"))
+
+
+if __name__ == "__main__":
+    main()
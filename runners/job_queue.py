@@ -0,0 +1,99 @@
+import argparse
+import multiprocessing
+import os
+from datetime import timedelta
+
+from utils.cli import FETCH_BATCH_SIZE, JOB_LEASE_SECONDS, POLL_INTERVAL, add_fetcher_arguments
+from utils.metrics import add_metrics_arguments, write_metrics_report
+
+
+def run_worker(args):
+    from database.db_utils import get_engine, get_session
+    from scrapers.fetcher import configure_fetcher
+    from scrapers.job_worker import JobWorker
+    from scrapers.parse_pool import configure_parse_pool
+
+    # Forked workers must not share the parent's pooled connections
+    get_engine().dispose(close=False)
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+    # Each worker process already is one of N parallel parsers
+    configure_parse_pool(1 if args.processes > 1 else args.parse_workers)
+    worker = JobWorker(get_session(), kinds=args.kinds, batch_size=args.batch_size,
+                       lease=timedelta(seconds=args.lease), poll_interval=args.poll)
+    worker.run(drain=not args.forever, max_jobs=args.max_jobs)
+    if args.metrics_report:
+        # One report per worker process; metrics aren't shared between processes
+        write_metrics_report(f"{args.metrics_report}.{os.getpid()}" if args.processes > 1 else args.metrics_report)
+
+
+def print_status(session):
+    from database import job_queue
+
+    counts = job_queue.queue_counts(session)
+    statuses = (job_queue.PENDING, job_queue.RUNNING, job_queue.DONE, job_queue.FAILED)
+    print(f"{'kind':<18}" + "".join(f"{status:>9}" for status in statuses))
+    for kind in job_queue.JOB_KINDS:
+        print(f"{kind:<18}" + "".join(f"{counts.get((kind, status), 0):>9}" for status in statuses))
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Distributed Cagematch crawl backed by a PostgreSQL job queue")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed = commands.add_parser("seed", help="Queue the promotions list and the first roster page")
+    seed.add_argument("--max-pages", type=int, help="Only walk this many roster pages")
+
+    work = commands.add_parser("work", help="Claim and run jobs until the queue is drained")
+    add_fetcher_arguments(work)
+    add_metrics_arguments(work)
+    work.add_argument("--processes", type=int, default=1, help="Worker processes to start on this machine")
+    work.add_argument("--parse-workers", type=int, default=1,
+                      help="Parser processes per worker when running a single worker process")
+    work.add_argument("--kinds", nargs="+", help="Only run these job kinds (roster_page, gimmick, ...)")
+    work.add_argument("--batch-size", type=int, default=FETCH_BATCH_SIZE, help="Jobs claimed at a time")
+    work.add_argument("--lease", type=float, default=JOB_LEASE_SECONDS,
+                      help="Seconds a claimed job stays leased without a heartbeat")
+    work.add_argument("--poll", type=float, default=POLL_INTERVAL, help="Seconds between polls of an empty queue")
+    work.add_argument("--max-jobs", type=int, help="Stop after this many jobs")
+    work.add_argument("--forever", action="store_true", help="Keep polling after the queue is drained")
+
+    commands.add_parser("status", help="Show job counts per kind and status")
+
+    requeue = commands.add_parser("requeue", help="Release expired leases and retry failed jobs")
+    requeue.add_argument("--kind", help="Only retry failed jobs of this kind (roster_page, gimmick, ...)")
+    args = parser.parse_args(argv)
+
+    from database import job_queue
+    from database.db_utils import get_session, init_db
+    from scrapers.job_worker import seed_jobs
+
+    if args.command == "work" and args.kinds and not set(args.kinds) <= set(job_queue.JOB_KINDS):
+        parser.error(f"--kinds: choose from {', '.join(job_queue.JOB_KINDS)}")
+    if args.command == "requeue" and args.kind is not None and args.kind not in job_queue.JOB_KINDS:
+        parser.error(f"--kind: choose from {', '.join(job_queue.JOB_KINDS)}")
+
+    init_db()
+    session = get_session()
+    if args.command == "seed":
+        print(f"🌱 Queued {seed_jobs(session, args.max_pages)} jobs.")
+    elif args.command == "work":
+        if args.processes > 1:
+            processes = [multiprocessing.Process(target=run_worker, args=(args,)) for _ in range(args.processes)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+        else:
+            run_worker(args)
+        print_status(session)
+    elif args.command == "status":
+        print_status(session)
+    elif args.command == "requeue":
+        expired = job_queue.requeue_expired(session)
+        failed = job_queue.requeue_failed(session, args.kind)
+        print(f"🔁 Released {expired} expired and re-queued {failed} failed jobs.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values: list, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def build_paths(base_url: str, sample: int) -> dict:
+    """Request mix per endpoint, built from ids the API itself hands out."""
+    import requests
+
+    wrestlers = requests.get(f"{base_url}/wrestlers", params={"limit": sample}, timeout=30).json()
+    promotions = requests.get(f"{base_url}/promotions", params={"limit": sample}, timeout=30).json()
+    wrestler_ids = [row["id"] for row in wrestlers["items"]] or [1]
+    cagematch_ids = [row["cagematch_id"] for row in wrestlers["items"] if row["cagematch_id"]] or [1]
+    promotion_ids = [row["id"] for row in promotions["items"]] or [1]
+    cursors = [None] + wrestler_ids[::50]
+    return {
+        "wrestlers page": ["/wrestlers?limit=50" + (f"&after={cursor}" if cursor else "") for cursor in cursors],
+        "wrestler": [f"/wrestlers/{wrestler_id}" for wrestler_id in wrestler_ids],
+        "wrestler by cagematch_id": [f"/wrestlers/cagematch/{cagematch_id}" for cagematch_id in cagematch_ids],
+        "wrestler gimmicks": [f"/wrestlers/{wrestler_id}/gimmicks" for wrestler_id in wrestler_ids],
+        "gimmicks page": ["/gimmicks?limit=50"],
+        "promotions page": ["/promotions?limit=50"],
+        "promotion": [f"/promotions/{promotion_id}" for promotion_id in promotion_ids],
+    }
+
+
+def run(base_url: str, paths: dict, concurrency: int, duration: float, seed: int = 7) -> tuple:
+    """Hammer the API from concurrency threads for duration seconds. Returns (latencies by endpoint, errors, seconds)."""
+    import requests
+
+    latencies = {name: [] for name in paths}
+    errors = {name: 0 for name in paths}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        session = requests.Session()
+        names = list(paths)
+        local = {name: [] for name in names}
+        failed = {name: 0 for name in names}
+        while time.perf_counter() < deadline:
+            name = rng.choice(names)
+            start = time.perf_counter()
+            try:
+                ok = session.get(base_url + rng.choice(paths[name]), timeout=30).status_code < 500
+            except requests.RequestException:
+                ok = False
+            local[name].append(time.perf_counter() - start)
+            failed[name] += not ok
+        with lock:
+            for name in names:
+                latencies[name].extend(local[name])
+                errors[name] += failed[name]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Load test the read API and report p50/p99 latency and requests/sec")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Where uvicorn main:app is listening")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent client threads")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds to keep sending requests")
+    parser.add_argument("--sample", type=int, default=500, help="Wrestlers and promotions to draw request ids from")
+    args = parser.parse_args(argv)
+    base_url = args.base_url.rstrip("/")
+
+    paths = build_paths(base_url, args.sample)
+    print(f"🔥 {args.concurrency} clients for {args.duration:.0f}s against {base_url}")
+    latencies, errors, seconds = run(base_url, paths, args.concurrency, args.duration)
+
+    print(f"{'endpoint':<26} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, values in latencies.items():
+        print(f"{name:<26} {len(values):>9} {errors[name]:>7} "
+              f"{percentile(values, 0.5) * 1000:>8.1f} {percentile(values, 0.99) * 1000:>8.1f}")
+    everything = [value for values in latencies.values() for value in values]
+    print(f"{'all':<26} {len(everything):>9} {sum(errors.values()):>7} "
+          f"{percentile(everything, 0.5) * 1000:>8.1f} {percentile(everything, 0.99) * 1000:>8.1f}")
+    print(f"📈 {len(everything) / seconds:,.0f} requests/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+
+
+def print_status():
+    from database.db_utils import get_engine
+    from database.migrate import applied_migrations, available_migrations
+
+    with get_engine().connect() as connection:
+        applied = applied_migrations(connection)
+        connection.commit()
+    for version, _ in available_migrations():
+        applied_at = applied.get(version)
+        print(f"{version:<40} {applied_at:%Y-%m-%d %H:%M:%S}" if applied_at else f"{version:<40} pending")
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Apply the versioned schema migrations in database/migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="List the migrations and when each was applied")
+    commands.add_parser("upgrade", help="Create missing tables and apply every pending migration")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        print_status()
+    elif args.command == "upgrade":
+        from database.db_utils import get_engine, init_db
+        from database.migrate import pending_migrations
+
+        pending = pending_migrations(get_engine())
+        init_db()
+        print(f"✅ Schema is up to date ({len(pending)} migrations applied).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import argparse
+import os
+
+from benchmarks.corpus import FIXTURES_DIR, load_manifest, save_manifest
+from scrapers.fetcher import Fetcher
+from scrapers.html_parser import parse_page
+from scrapers.page_cache import PageCache
+from scrapers.wrestler_scraper import extract_wrestler_profile
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-record the benchmark fixture corpus from the urls in its manifest")
+    parser.add_argument("--from-cache", action="store_true",
+                        help="Take the pages from the on-disk page cache instead of the network")
+    parser.add_argument("--page-types", nargs="+", help="Only re-record these page types")
+    args = parser.parse_args()
+
+    fetcher = Fetcher(cache=PageCache(offline=True) if args.from_cache else None)
+    entries = load_manifest()
+    try:
+        for entry in entries:
+            if args.page_types and entry["page_type"] not in args.page_types:
+                continue
+            try:
+                content = fetcher.fetch(entry["url"]).content
+            except Exception as e:
+                print(f"❌ {entry['url']}: {e!r}")
+                continue
+            with open(os.path.join(FIXTURES_DIR, entry["file"]), "wb") as f:
+                f.write(content)
+            if entry["page_type"] == "profile":
+                # The stub server makes this name unique per wrestler it serves the page for
+                entry["name"] = extract_wrestler_profile(parse_page(content, "profile"), entry["url"])["name"]
+            print(f"✅ {entry['file']} ({len(content) / 1024:.0f} KiB) from {entry['url']}")
+    finally:
+        fetcher.close()
+    save_manifest(entries)
+
+
+if __name__ == "__main__":
+    main()
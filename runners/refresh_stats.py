@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from utils.cli import STATS_REBUILD_BATCH_SIZE
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(
+        prog=prog, description="Refresh the precomputed stats tables. Scrapes keep them current; "
+                               "this backfills them or repairs specific rows.")
+    parser.add_argument("--all", action="store_true", help="Rebuild every stats row from the base tables")
+    parser.add_argument("--wrestler", type=int, nargs="*", default=[], help="Wrestler ids to refresh")
+    parser.add_argument("--gimmick", type=int, nargs="*", default=[], help="Gimmick ids to refresh")
+    parser.add_argument("--batch-size", type=int, default=STATS_REBUILD_BATCH_SIZE,
+                        help="Wrestlers / gimmicks recomputed per statement with --all")
+    args = parser.parse_args(argv)
+    if not (args.all or args.wrestler or args.gimmick):
+        parser.error("pass --all, --wrestler or --gimmick")
+
+    from database.db_utils import get_session, init_db
+    from database.stats import rebuild_stats, refresh_gimmick_stats, refresh_wrestler_stats
+
+    init_db()
+    session = get_session()
+    start = time.perf_counter()
+    try:
+        if args.all:
+            counts = rebuild_stats(session, args.batch_size)
+            print(f"📊 Rebuilt stats for {counts['wrestlers']} wrestlers, {counts['gimmicks']} gimmicks "
+                  f"and {counts['promotions']} promotions.")
+        else:
+            refresh_wrestler_stats(session, args.wrestler)
+            refresh_gimmick_stats(session, args.gimmick)
+            session.commit()
+            print(f"📊 Refreshed stats for {len(args.wrestler)} wrestlers and {len(args.gimmick)} gimmicks.")
+    finally:
+        session.close()
+    print(f"✅ Done in {time.perf_counter() - start:.2f}s.")
+
+
+if __name__ == "__main__":
+    main()
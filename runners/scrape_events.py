@@ -0,0 +1,59 @@
+import argparse
+from itertools import islice
+
+from utils.cli import EVENT_BATCH_SIZE, add_fetcher_arguments, add_parse_pool_arguments, add_snapshot_arguments
+from utils.metrics import add_metrics_arguments, write_metrics_report
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Scrape events and their match cards from Cagematch.net")
+    add_fetcher_arguments(parser)
+    add_parse_pool_arguments(parser)
+    add_metrics_arguments(parser)
+    add_snapshot_arguments(parser)
+    parser.add_argument("--promotion", type=int, nargs="*", default=[],
+                        help="Cagematch ids of the promotions whose events to scrape")
+    parser.add_argument("--event", type=int, nargs="*", default=[], help="Cagematch ids of single events")
+    parser.add_argument("--max-pages", type=int, help="Event list pages to walk per promotion")
+    parser.add_argument("--limit", type=int, help="Stop after this many events")
+    parser.add_argument("--batch-size", type=int, default=EVENT_BATCH_SIZE, help="Events per COPY batch")
+    parser.add_argument("--relink", action="store_true",
+                        help="Link participants to wrestlers scraped since their event was loaded")
+    args = parser.parse_args(argv)
+
+    from database.copy_loader import relink_participants
+    from database.db_utils import get_engine, get_session, init_db
+    from database.snapshot import refresh_snapshot
+    from scrapers.event_scraper import get_event_url, iter_event_links, scrape_events
+    from scrapers.fetcher import configure_fetcher
+    from scrapers.parse_pool import configure_parse_pool
+
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+    configure_parse_pool(args.parse_workers)
+
+    print("📦 Initializing database (if needed)...")
+    init_db()
+    session = get_session()
+
+    def links():
+        for event_id in args.event:
+            yield get_event_url(event_id)
+        for promotion_id in args.promotion:
+            yield from iter_event_links(promotion_id, args.max_pages)
+
+    print("🏟️ Scraping events from Cagematch.net...")
+    loader = scrape_events(session, islice(links(), args.limit), args.batch_size)
+    rate = loader.rows / loader.seconds if loader.seconds else 0
+    print(f"💾 Loaded {loader.counts['events']} events, {loader.counts['matches']} matches and "
+          f"{loader.counts['participants']} participants ({rate:,.0f} rows/s in the loader).")
+
+    if args.relink:
+        print(f"🔗 Linked {relink_participants(session)} participants to wrestlers.")
+    refresh_snapshot(args, get_engine())
+    if args.metrics_report:
+        write_metrics_report(args.metrics_report)
+    print("✅ Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+
+from utils.cli import add_fetcher_arguments, add_snapshot_arguments
+from utils.metrics import add_metrics_arguments, write_metrics_report
+
+
+def wrestlers_to_scrape(session, missing_only: bool, limit: int = None) -> list:
+    from sqlalchemy import exists, select
+
+    from database.models import Gimmick, Wrestler
+
+    query = select(Wrestler.id, Wrestler.cagematch_id, Wrestler.name).where(Wrestler.cagematch_id.is_not(None))
+    if missing_only:
+        query = query.where(~exists().where(Gimmick.wrestler_id == Wrestler.id))
+    return session.execute(query.order_by(Wrestler.id).limit(limit)).all()
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Scrape the gimmicks of wrestlers already in the database")
+    add_fetcher_arguments(parser)
+    add_metrics_arguments(parser)
+    add_snapshot_arguments(parser)
+    parser.add_argument("--missing", action="store_true", help="Only wrestlers without any gimmicks yet")
+    parser.add_argument("--limit", type=int, help="Scrape at most this many wrestlers")
+    args = parser.parse_args(argv)
+
+    from database.db_utils import get_engine, get_session, init_db
+    from database.snapshot import refresh_snapshot
+    from scrapers.fetcher import configure_fetcher
+    from scrapers.gimmick_scraper import gimmick_writer, scrape_gimmicks_for_wrestler
+
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+
+    print("📦 Initializing database (if needed)...")
+    init_db()
+
+    session = get_session()
+    wrestlers = wrestlers_to_scrape(session, args.missing, args.limit)
+    print(f"🎭 Scraping gimmicks for {len(wrestlers)} wrestlers...")
+    # One writer for the whole run so gimmicks are written in batches across wrestlers
+    writer = gimmick_writer(session)
+    for wrestler_id, cagematch_id, name in wrestlers:
+        try:
+            scrape_gimmicks_for_wrestler(wrestler_id, cagematch_id, session, writer)
+        except Exception as e:
+            print(f"❌ Failed to scrape gimmicks for {name}: {e}")
+    writer.flush()
+
+    refresh_snapshot(args, get_engine())
+    if args.metrics_report:
+        write_metrics_report(args.metrics_report)
+    print(f"✅ Done. Saved {writer.written} gimmicks.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+
+from utils.cli import add_fetcher_arguments, add_snapshot_arguments
+from utils.metrics import add_metrics_arguments, write_metrics_report
+
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Scrape the promotions list from Cagematch.net")
+    add_fetcher_arguments(parser)
+    add_metrics_arguments(parser)
+    add_snapshot_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from database.db_utils import get_engine, get_session, init_db
+    from database.snapshot import refresh_snapshot
+    from scrapers.fetcher import configure_fetcher
+    from scrapers.promotion_scraper import save_promotions_to_db, scrape_promotions_list
+
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+
+    print("📦 Initializing database (if needed)...")
+    init_db()
+
+    print("🌍 Scraping promotions from Cagematch.net...")
+    promotions = scrape_promotions_list()
+    save_promotions_to_db(promotions, get_session())
+
+    refresh_snapshot(args, get_engine())
+    if args.metrics_report:
+        write_metrics_report(args.metrics_report)
+    print(f"✅ Done. {len(promotions)} promotions scraped.")
+
+
+if __name__ == "__main__":
+    main()
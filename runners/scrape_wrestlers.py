@@ -1,14 +1,65 @@
-from scrapers.wrestler_scraper import scrape_top_100_wrestlers
-from database.db_utils import get_session, init_db
+import argparse
+from datetime import timedelta
+
+from utils.cli import STREAM_WORKERS, add_fetcher_arguments, add_parse_pool_arguments, add_snapshot_arguments
+from utils.metrics import add_metrics_arguments, write_metrics_report
+
+def main(argv: list = None, prog: str = None):
+    parser = argparse.ArgumentParser(prog=prog, description="Scrape the top 100 wrestlers from Cagematch.net")
+    add_fetcher_arguments(parser)
+    add_parse_pool_arguments(parser)
+    add_metrics_arguments(parser)
+    add_snapshot_arguments(parser)
+    parser.add_argument("--with-gimmicks", action="store_true",
+                        help="Also scrape every wrestler's gimmicks, sharing pages between the extractors")
+    parser.add_argument("--report", action="store_true", help="Print the per-wrestler request report")
+    parser.add_argument("--all", action="store_true", help="Stream the full worker database instead of the top 100")
+    parser.add_argument("--limit", type=int, help="Stream at most this many wrestlers from the worker database")
+    parser.add_argument("--workers", type=int, default=STREAM_WORKERS, help="Profile workers when streaming")
+    parser.add_argument("--resume", action="store_true",
+                        help="Checkpoint into the crawl frontier and continue where the last run stopped")
+    parser.add_argument("--fresh-hours", type=float, default=7 * 24,
+                        help="With --resume, skip wrestlers fetched within this many hours")
+    parser.add_argument("--retry-failed", action="store_true", help="Only re-run wrestlers that failed before")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Update existing rows, skipping pages whose content hasn't changed")
+    args = parser.parse_args(argv)
+    streaming = args.all or args.limit or args.resume or args.retry_failed
+    if args.refresh and not (streaming or args.with_gimmicks):
+        parser.error("--refresh needs --with-gimmicks or a streaming option (--all, --limit, --resume, --retry-failed)")
+
+    from database.db_utils import get_engine, get_session, init_db
+    from database.snapshot import refresh_snapshot
+    from scrapers.fetcher import configure_fetcher, print_host_stats
+    from scrapers.parse_pool import configure_parse_pool
+    from scrapers.roster_stream import stream_roster
+    from scrapers.wrestler_pipeline import print_fetch_report, scrape_wrestlers_with_gimmicks
+    from scrapers.wrestler_scraper import get_top_wrestlers, scrape_top_100_wrestlers
+
+    configure_fetcher(use_cache=not args.no_cache, offline=args.offline)
+    configure_parse_pool(args.parse_workers)
 
-def main():
     print("📦 Initializing database (if needed)...")
     init_db()
 
-    print("🤼 Scraping top 100 wrestlers from Cagematch.net...")
+    print("🤼 Scraping wrestlers from Cagematch.net...")
     session = get_session()
-    scrape_top_100_wrestlers(session)
+    if streaming:
+        limit = args.limit or (None if args.all or args.retry_failed else 100)
+        stream_roster(session, limit=limit, workers=args.workers, with_gimmicks=args.with_gimmicks,
+                      resume=args.resume, fresh_for=timedelta(hours=args.fresh_hours),
+                      retry_failed=args.retry_failed, refresh=args.refresh)
+    elif args.with_gimmicks:
+        report = scrape_wrestlers_with_gimmicks(get_top_wrestlers(), session, refresh=args.refresh)
+        if args.report:
+            print_fetch_report(report)
+            print_host_stats()
+    else:
+        scrape_top_100_wrestlers(session)
 
+    refresh_snapshot(args, get_engine())
+    if args.metrics_report:
+        write_metrics_report(args.metrics_report)
     print("✅ Done.")
 
 if __name__ == "__main__":
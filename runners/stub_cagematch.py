@@ -0,0 +1,28 @@
+import argparse
+import threading
+
+from benchmarks.stub_server import StubCagematch
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve the benchmark fixture corpus as a local Cagematch; point scrapers at it with "
+                    "CAGEMATCH_BASE_URL=http://127.0.0.1:<port>")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="Delay per response, in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay per response, up to this")
+    args = parser.parse_args()
+
+    stub = StubCagematch(latency=args.latency, jitter=args.jitter, port=args.port).start()
+    print(f"🧪 Stub Cagematch on {stub.base_url} ({args.latency * 1000:.0f} ms latency), Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.stop()
+        print(f"🛑 Served {sum(stub.requests.values())} requests: {dict(stub.requests)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+from database.copy_loader import CopyLoader, DEFAULT_BATCH_SIZE
+from scrapers.fetcher import BASE_URL, fetch, fetch_many
+from scrapers.html_parser import EXTRACT_SECONDS, parse_page
+from scrapers.parse_pool import parse_many
+from utils.parsers import parse_date
+from utils.metrics import timed
+from bs4 import NavigableString
+from datetime import time
+import re
+
+EVENT_LIST_PAGE_SIZE = 100
+# Event pages fetched and parsed together
+EVENT_FETCH_BATCH = 20
+
+# Cagematch link ids: 2 = wrestler, 28 = tag team, 29 = stable
+WRESTLER_LINK = re.compile(r"id=2&nr=(\d+)")
+TEAM_LINK = re.compile(r"id=(?:28|29)&nr=(\d+)")
+# Separators inside a MatchResults line
+RESULT_TOKENS = re.compile(r"(\(|\)|\bdefeats?\b|\bvs\.|\band\b)")
+MATCH_LENGTH = re.compile(r"\((?:(\d+):)?(\d+):(\d{2})\)")
+
+SINGLES_BY_COUNT = {3: "THREE_WAY", 4: "FOUR_WAY", 5: "FIVE_WAY", 6: "SIX_WAY"}
+TAG_BY_COUNT = {2: "TAG", 3: "THREE_WAY_TAG", 4: "FOUR_WAY_TAG"}
+
+
+def extract_event_id(url: str) -> int:
+    match = re.search(r"id=1&nr=(\d+)", url)
+    return int(match.group(1)) if match else None
+
+
+def get_event_url(event_id: int) -> str:
+    return f"{BASE_URL}/?id=1&nr={event_id}"
+
+
+def get_event_list_url(promotion_cagematch_id: int, page: int = 0) -> str:
+    return f"{BASE_URL}/?id=8&nr={promotion_cagematch_id}&page=4&s={page * EVENT_LIST_PAGE_SIZE}"
+
+
+@timed(EXTRACT_SECONDS, page_type="event_list", extractor="event_links")
+def extract_event_links(soup) -> list:
+    table = soup.find("table", class_="TBase")
+    if table is None:
+        return []
+    links = []
+    for link in table.find_all("a", href=True):
+        event_id = extract_event_id(link["href"])
+        if event_id is not None:
+            links.append(get_event_url(event_id))
+    return list(dict.fromkeys(links))
+
+
+def iter_event_links(promotion_cagematch_id: int, max_pages: int = None):
+    """Yield the event urls of a promotion, newest first, one results page at a time."""
+    page = 0
+    while max_pages is None or page < max_pages:
+        response = fetch(get_event_list_url(promotion_cagematch_id, page))
+        links = extract_event_links(parse_page(response.content, "event_list"))
+        yield from links
+        if len(links) < EVENT_LIST_PAGE_SIZE:
+            return
+        page += 1
+
+
+def parse_location(location: str) -> tuple:
+    """Split "City, State, Country" into (city, state, country)."""
+    parts = [part.strip() for part in location.split(",") if part.strip()]
+    if not parts:
+        return None, None, None
+    country = parts[-1]
+    city = parts[0] if len(parts) > 1 else None
+    state = parts[1] if len(parts) > 2 else None
+    return city, state, country
+
+
+def classify_event_type(type_text: str) -> str:
+    type_text = (type_text or "").lower()
+    if "premium live event" in type_text:
+        return "PLE"
+    if "pay per view" in type_text or "pay-per-view" in type_text:
+        return "PPV"
+    if "tv" in type_text:
+        return "TV"
+    return "NON_TELE"
+
+
+def classify_stipulation(match_type_text: str) -> str:
+    text = match_type_text.lower()
+    if "elimination" in text:
+        return "ELIMINATION"
+    if "ladder" in text:
+        return "LADDER"
+    if "tables" in text:
+        return "TABLES"
+    if "no dq" in text or "no disqualification" in text or "street fight" in text or "hardcore" in text:
+        return "NO_DQ"
+    return "STANDARD"
+
+
+def classify_match_type(team_sizes: list, match_type_text: str = "") -> str:
+    if "battle royal" in match_type_text.lower():
+        return "BATTLE_ROYALE"
+    if len(team_sizes) < 2:
+        return None
+    size = max(team_sizes)
+    if size == 1:
+        if len(team_sizes) == 2:
+            return "SINGLES"
+        return SINGLES_BY_COUNT.get(len(team_sizes), "BATTLE_ROYALE")
+    if size == 2:
+        return TAG_BY_COUNT.get(len(team_sizes))
+    if size == 3 and len(team_sizes) == 2:
+        return "TRIOS"
+    return None
+
+
+def classify_victory(result_text: str, has_winner: bool) -> str:
+    text = result_text.lower()
+    if not has_winner:
+        return "DRAW" if "draw" in text or "no contest" in text else None
+    if "by dq" in text or "disqualification" in text:
+        return "DISQUALIFICATION"
+    if "count out" in text or "countout" in text:
+        return "COUNT_OUT"
+    return "CLEAN"
+
+
+def parse_match_length(result_text: str):
+    match = MATCH_LENGTH.search(result_text)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    minutes, seconds = int(minutes), int(seconds)
+    hours = int(hours or 0) + minutes // 60
+    return time(hours % 24, minutes % 60, seconds)
+
+
+def extract_participants(results) -> tuple:
+    """
+    Walk a MatchResults line ("A & B defeat C (w/ D) & E (12:34)") and return
+    (participants, has_winner). Wrestlers after a tag team or stable link and
+    inside its parentheses are credited to that team. Team 1 is the winning side.
+    """
+    participants = []
+    team = 1
+    has_winner = False
+    group = pending_group = None
+    group_members = 0
+    depth = 0
+
+    def add(cagematch_id, name, team_link=None):
+        participants.append({
+            "cagematch_id": cagematch_id,
+            "name": name,
+            "tag_team_cagematch_id": team_link["cagematch_id"] if team_link else None,
+            "tag_team_name": team_link["name"] if team_link else None,
+            "team_number": team,
+        })
+
+    for node in results.children:
+        if not isinstance(node, NavigableString):
+            if node.name != "a" or depth > (1 if group else 0):
+                continue
+            href = node.get("href", "")
+            wrestler = WRESTLER_LINK.search(href)
+            team_link = TEAM_LINK.search(href)
+            if wrestler:
+                add(int(wrestler.group(1)), node.get_text(strip=True), group)
+                group_members += 1
+            elif team_link:
+                pending_group = {"cagematch_id": int(team_link.group(1)), "name": node.get_text(strip=True)}
+            continue
+
+        for token in RESULT_TOKENS.split(str(node)):
+            if token == "(":
+                if pending_group is not None and depth == 0:
+                    group, group_members = pending_group, 0
+                depth += 1
+                pending_group = None
+            elif token == ")":
+                depth = max(0, depth - 1)
+                if depth == 0 and group is not None:
+                    if not group_members:
+                        add(None, None, group)
+                    group = None
+            elif depth > 0:
+                continue
+            elif token.startswith("defeat") or token in ("vs.", "and"):
+                if pending_group is not None:
+                    # A team credited without its members
+                    add(None, None, pending_group)
+                    pending_group = None
+                if token.startswith("defeat"):
+                    has_winner = True
+                team += 1
+            elif token.strip() and pending_group is not None and token.strip() not in ("&", ","):
+                add(None, None, pending_group)
+                pending_group = None
+
+    if pending_group is not None:
+        add(None, None, pending_group)
+    for number, participant in enumerate(participants, start=1):
+        participant["participant_number"] = number
+    return participants, has_winner
+
+
+def extract_match(match_div, position: int) -> dict:
+    type_div = match_div.find("div", class_="MatchType")
+    results = match_div.find("div", class_="MatchResults")
+    match_type_text = type_div.get_text(" ", strip=True) if type_div else ""
+    result_text = results.get_text(" ", strip=True) if results else ""
+
+    participants, has_winner = extract_participants(results) if results else ([], False)
+    team_sizes = {}
+    for participant in participants:
+        team_sizes[participant["team_number"]] = team_sizes.get(participant["team_number"], 0) + 1
+
+    return {
+        "position_on_event_card": position,
+        "match_type": classify_match_type(list(team_sizes.values()), match_type_text),
+        "stipulation": classify_stipulation(match_type_text),
+        "title_defense": "title match" in match_type_text.lower(),
+        "match_length": parse_match_length(result_text),
+        "victory_type": classify_victory(result_text, has_winner),
+        "victor_team_number": 1 if has_winner else None,
+        "match_notes": match_type_text or None,
+        "participants": participants,
+    }
+
+
+@timed(EXTRACT_SECONDS, page_type="event", extractor="event")
+def extract_event(soup, url: str) -> dict:
+    """Pull an event and its full card out of a parsed event page."""
+    info = {}
+    for row in soup.find_all("div", class_="InformationBoxRow"):
+        label = row.find("div", class_="InformationBoxTitle")
+        value = row.find("div", class_="InformationBoxContents")
+        if label and value:
+            info[label.get_text(strip=True).rstrip(":")] = value
+
+    def text(label):
+        return info[label].get_text(strip=True) if label in info else None
+
+    promotion_link = info["Promotion"].find("a", href=True) if "Promotion" in info else None
+    promotion_id = re.search(r"id=8&nr=(\d+)", promotion_link["href"]) if promotion_link else None
+    promotion_logo = promotion_link.find("img", title=True) if promotion_link else None
+    promotion_name = promotion_logo["title"].strip() if promotion_logo else text("Promotion")
+    city, state, country = parse_location(text("Location") or "")
+    attendance = re.sub(r"\D", "", text("Attendance") or "")
+
+    # The card is listed opener first; position 0 is the main event
+    match_divs = soup.find_all("div", class_="Match")
+    matches = [extract_match(match_div, len(match_divs) - 1 - index) for index, match_div in enumerate(match_divs)]
+
+    return {
+        "cagematch_id": extract_event_id(url),
+        "name": text("Name of the event"),
+        "date_of_event": parse_date(text("Date") or ""),
+        "promotion_name": promotion_name or None,
+        "promotion_cagematch_id": int(promotion_id.group(1)) if promotion_id else None,
+        "event_type": classify_event_type(text("Type")),
+        "arena": {"name": text("Arena"), "city": city, "state": state, "country": country or "Unknown"}
+        if text("Arena") else None,
+        "attendance": int(attendance) if attendance else None,
+        "matches": matches,
+    }
+
+
+def parse_event(content: bytes, url: str) -> dict:
+    """Parse task for scrapers.parse_pool: raw event page -> event dict with its matches."""
+    return extract_event(parse_page(content, "event"), url)
+
+
+def scrape_events(session, links, batch_size: int = DEFAULT_BATCH_SIZE) -> CopyLoader:
+    """
+    Fetch, parse and load events. Pages are fetched EVENT_FETCH_BATCH at a time,
+    parsed in the parse pool and handed to a CopyLoader, which COPYs every
+    batch_size events into the database. Returns the loader for its counters.
+    """
+    loader = CopyLoader(session, batch_size)
+    batch = []
+
+    def load(urls):
+        pages = fetch_many(urls, return_exceptions=True)
+        fetched = [(url, page) for url, page in zip(urls, pages) if not isinstance(page, Exception)]
+        for url, page in zip(urls, pages):
+            if isinstance(page, Exception):
+                print(f"❌ Failed to fetch {url}: {page}")
+        for (url, _), event in zip(fetched, parse_many(parse_event, [page.content for _, page in fetched],
+                                                       [url for url, _ in fetched], return_exceptions=True)):
+            if isinstance(event, Exception):
+                print(f"❌ Failed to parse {url}: {event}")
+                continue
+            loader.add(event)
+            print(f"✅ Parsed {event['name']} ({len(event['matches'])} matches)")
+
+    for link in links:
+        batch.append(link)
+        if len(batch) >= EVENT_FETCH_BATCH:
+            load(batch)
+            batch = []
+    if batch:
+        load(batch)
+    loader.flush()
+    return loader
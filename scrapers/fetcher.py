@@ -0,0 +1,267 @@
+# scrapers/fetcher.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scrapers.page_cache import CacheMiss, PageCache, classify_url
+from scrapers.rate_control import (
+    MAX_RETRIES,
+    RETRY_STATUSES,
+    THROTTLE_STATUSES,
+    HostController,
+    backoff_delay,
+    retry_after_seconds,
+)
+from utils.metrics import get_metrics
+
+# Overridable so the scrapers can be pointed at a local stub server
+BASE_URL = os.getenv("CAGEMATCH_BASE_URL", "https://www.cagematch.net").rstrip("/")
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
+}
+
+MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "8"))
+# Ceiling for the adaptive per-host concurrency limit
+MAX_PER_HOST = int(os.getenv("SCRAPER_MAX_PER_HOST", "4"))
+REQUEST_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "30"))
+USE_CACHE = os.getenv("SCRAPER_CACHE", "1") != "0"
+
+FETCH_SECONDS = get_metrics().histogram(
+    "scrape_fetch_seconds", "Page fetch time, by page type and source (network or the page cache)",
+    ("page_type", "source"))
+FETCH_BYTES = get_metrics().counter(
+    "scrape_fetch_bytes_total", "Page bytes received, by page type and source", ("page_type", "source"))
+FETCH_RESPONSES = get_metrics().counter(
+    "scrape_fetch_responses_total", "Fetches by page type and final HTTP status (error when none came back)",
+    ("page_type", "status"))
+FETCH_RETRIES = get_metrics().counter(
+    "scrape_fetch_retries_total", "Requests retried, by page type and reason (HTTP status or connection)",
+    ("page_type", "reason"))
+
+
+class FetchRecorder:
+    """Thread-safe log of the fetches made inside a Fetcher.record() block."""
+
+    def __init__(self):
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def add(self, entry: dict):
+        with self._lock:
+            self.entries.append(entry)
+
+
+class Fetcher:
+    """Thread-pooled HTTP client that shares keep-alive connections between scrapers."""
+
+    def __init__(self, max_workers: int = MAX_WORKERS, max_per_host: int = MAX_PER_HOST,
+                 timeout: float = REQUEST_TIMEOUT, headers: dict = None, cache: PageCache = None,
+                 max_retries: int = MAX_RETRIES):
+        self.timeout = timeout
+        self.max_per_host = max_per_host
+        self.max_retries = max_retries
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or HEADERS)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._controllers = {}
+        self._recorders = []
+        self._lock = threading.Lock()
+
+    def controller_for(self, url: str) -> HostController:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._controllers:
+                self._controllers[host] = HostController(host, self.max_per_host)
+            return self._controllers[host]
+
+    def host_stats(self) -> list:
+        with self._lock:
+            controllers = list(self._controllers.values())
+        return [controller.stats() for controller in controllers]
+
+    def fetch(self, url: str) -> requests.Response:
+        """Fetch a single url, serving it from the page cache when possible."""
+        start = time.perf_counter()
+        page_type = classify_url(url)
+        try:
+            response = self._fetch(url)
+        except Exception as e:
+            FETCH_RESPONSES.inc(page_type=page_type, status="error")
+            self._notify(url, time.perf_counter() - start, None, e)
+            raise
+        # elapsed is time-to-response on the wire, excluding the wait for a host slot
+        from_cache = getattr(response, "from_cache", False)
+        seconds = time.perf_counter() - start if from_cache else response.elapsed.total_seconds()
+        source = "cache" if from_cache else "network"
+        FETCH_SECONDS.observe(seconds, page_type=page_type, source=source)
+        FETCH_BYTES.inc(len(response.content), page_type=page_type, source=source)
+        FETCH_RESPONSES.inc(page_type=page_type, status=response.status_code)
+        self._notify(url, seconds, response, None)
+        return response
+
+    def _fetch(self, url: str) -> requests.Response:
+        if self.cache is None:
+            return self._get(url)
+
+        cached = self.cache.get(url)
+        if cached and (self.cache.offline or cached.is_fresh()):
+            return cached.to_response()
+        if self.cache.offline:
+            raise CacheMiss(f"{url} is not in the page cache (offline mode)")
+
+        response = self._get(url, headers=cached.revalidation_headers() if cached else None)
+        if response.status_code == 304 and cached:
+            self.cache.touch(url)
+            return cached.to_response()
+        if response.status_code == 200:
+            self.cache.put(url, response)
+        return response
+
+    def _get(self, url: str, headers: dict = None) -> requests.Response:
+        """
+        GET through the host's rate controller. Throttled (429/503), 5xx and
+        connection failures are retried with jittered backoff; whatever is left
+        after the last retry raises, as does any other error status or request
+        error.
+        """
+        controller = self.controller_for(url)
+        for attempt in range(self.max_retries + 1):
+            response = error = None
+            with controller.slot():
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                    controller.record_failure(throttled=True)
+                except Exception:
+                    # Not worth retrying (bad redirect, broken body, invalid URL), but it still
+                    # has to count: if this was the half-open probe the circuit waits on it
+                    controller.record_failure(throttled=False)
+                    raise
+                else:
+                    if response.status_code in RETRY_STATUSES:
+                        controller.record_failure(throttled=response.status_code in THROTTLE_STATUSES)
+                    else:
+                        # 4xx other than 429 are the page's problem, not the host's
+                        controller.record_success(response.elapsed.total_seconds())
+                        if response.status_code != 304:
+                            response.raise_for_status()
+                        return response
+
+            if attempt < self.max_retries:
+                delay = backoff_delay(attempt, retry_after_seconds(response))
+                reason = error if error is not None else f"HTTP {response.status_code}"
+                FETCH_RETRIES.inc(page_type=classify_url(url),
+                                  reason="connection" if error is not None else response.status_code)
+                print(f"⏳ {reason} for {url}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        if error is not None:
+            raise error
+        response.raise_for_status()
+
+    def _notify(self, url, seconds, response, error):
+        if not self._recorders:
+            return
+        entry = {
+            "url": url,
+            "seconds": seconds,
+            "from_cache": getattr(response, "from_cache", False),
+            "status": response.status_code if response is not None else None,
+            "error": repr(error) if error else None,
+        }
+        for recorder in list(self._recorders):
+            recorder.add(entry)
+
+    @contextmanager
+    def record(self):
+        """Collect an entry for every fetch made while the block is active."""
+        recorder = FetchRecorder()
+        with self._lock:
+            self._recorders.append(recorder)
+        try:
+            yield recorder
+        finally:
+            with self._lock:
+                self._recorders.remove(recorder)
+
+    def fetch_many(self, urls: list, return_exceptions: bool = False) -> list:
+        """
+        Fetch urls in parallel and return the responses in the same order.
+        With return_exceptions=True a failed fetch yields its exception instead of raising.
+        """
+        futures = [self._pool.submit(self.fetch, url) for url in urls]
+        results = []
+        for future in futures:
+            if return_exceptions:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(e)
+            else:
+                results.append(future.result())
+        return results
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> Fetcher:
+    """Returns the process-wide shared Fetcher, creating it on first use."""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = Fetcher(cache=PageCache() if USE_CACHE else None)
+        return _fetcher
+
+
+def set_fetcher(fetcher: Fetcher):
+    """Replace the shared Fetcher (e.g. with one configured for a stub server)."""
+    global _fetcher
+    with _fetcher_lock:
+        _fetcher = fetcher
+
+
+def configure_fetcher(use_cache: bool = True, offline: bool = False) -> Fetcher:
+    """Install a shared Fetcher with the page cache enabled, disabled or in offline replay mode."""
+    if offline and not use_cache:
+        raise ValueError("Offline mode needs the page cache")
+    fetcher = Fetcher(cache=PageCache(offline=offline) if use_cache else None)
+    set_fetcher(fetcher)
+    return fetcher
+
+
+def print_host_stats():
+    print(f"{'host':<28} {'limit':>5} {'requests':>8} {'throttled':>9} {'errors':>6} {'latency':>8} circuit")
+    for row in get_fetcher().host_stats():
+        latency = f"{row['latency'] * 1000:.0f}ms" if row['latency'] is not None else "-"
+        print(f"{row['host']:<28} {row['limit']:>5} {row['requests']:>8} {row['throttled']:>9} "
+              f"{row['errors']:>6} {latency:>8} {row['circuit']}")
+
+
+def fetch(url: str) -> requests.Response:
+    return get_fetcher().fetch(url)
+
+
+def fetch_many(urls: list, return_exceptions: bool = False) -> list:
+    return get_fetcher().fetch_many(urls, return_exceptions=return_exceptions)
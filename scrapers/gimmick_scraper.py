@@ -1,132 +1,204 @@
 
-import requests
-from bs4 import BeautifulSoup
 from utils.parsers import parse_date
+from utils.metrics import timed
 from database.models import Gimmick
-from database.db_utils import get_or_create_promotion
+from database.promotion_resolver import get_promotion_resolver
 from database.models import Wrestler
+from database.bulk_writer import BulkWriter, DEFAULT_BATCH_SIZE
+from database.stats import refresh_gimmick_stats
+from scrapers.fetcher import BASE_URL, fetch, fetch_many
+from scrapers.html_parser import EXTRACT_SECONDS, call_guarded, parse_page
 import re
 from datetime import datetime
 
-BASE_URL = "https://www.cagematch.net"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-}
-
 
 def extract_cagematch_id_from_url(url: str) -> int:
     match = re.search(r"id=2&nr=(\d+)", url)
     return int(match.group(1)) if match else None
 
 
-def get_gimmick_match_dates(match_history_url: str) -> dict:
-    def get_last_page_url(soup):
-        pager = soup.select_one("div.NavigationPart")
-        if not pager:
-            return match_history_url
-        last_link = pager.find_all("a", href=True)[-1]
-        return BASE_URL + "/" + last_link['href'].lstrip("/")
-
-    def extract_dates_and_promotions(soup):
-        """Return list of (date, promotion_name) pairs from a match listing table"""
-        results = []
-        rows = soup.select("table.TBase.TableBorderColor tr")
-        for row in rows:
-            cells = row.find_all("td")
-            if len(cells) >= 3:
-                date_text = cells[1].get_text(strip=True)
-                date = parse_date(date_text)
-
-                promo_link = cells[2].find("a")
-                promo_img = promo_link.find("img") if promo_link else None
-                promo_name = promo_img["title"].strip() if promo_img and promo_img.has_attr("title") else None
-
-                if date:
-                    results.append((date, promo_name))
-        return results
-
-    # First page
-    r1 = requests.get(match_history_url, headers=HEADERS)
-    s1 = BeautifulSoup(r1.content, "html.parser")
-    first_page_results = extract_dates_and_promotions(s1)
-
-    last_seen = first_page_results[0][0] if first_page_results else None
-
-    # Last page
-    last_page_url = get_last_page_url(s1)
-    if last_page_url == match_history_url:
-        date_created = first_page_results[-1][0] if first_page_results else None
-        promo_name = first_page_results[-1][1] if first_page_results else None
-    else:
-        r2 = requests.get(last_page_url, headers=HEADERS)
-        s2 = BeautifulSoup(r2.content, "html.parser")
-        last_page_results = extract_dates_and_promotions(s2)
-        date_created = last_page_results[-1][0] if last_page_results else None
-        promo_name = last_page_results[-1][1] if last_page_results else None
-
-    return {
-        "date_created": date_created,
-        "last_seen": last_seen,
-        "debut_promotion_name": promo_name
-    }
-
-
-def scrape_gimmicks_for_wrestler(wrestler_id: int, cagematch_id: int, session):
-    profile_url = f"{BASE_URL}/?id=2&nr={cagematch_id}"
-    response = requests.get(profile_url, headers=HEADERS)
-    soup = BeautifulSoup(response.content, "html.parser")
+def get_last_page_url(soup, match_history_url: str) -> str:
+    pager = soup.select_one("div.NavigationPart")
+    if not pager:
+        return match_history_url
+    last_link = pager.find_all("a", href=True)[-1]
+    return BASE_URL + "/" + last_link['href'].lstrip("/")
+
+
+@timed(EXTRACT_SECONDS, page_type="match_history", extractor="dates_and_promotions")
+def extract_dates_and_promotions(soup):
+    """Return list of (date, promotion_name) pairs from a match listing table"""
+    results = []
+    rows = soup.select("table.TBase.TableBorderColor tr")
+    for row in rows:
+        cells = row.find_all("td")
+        if len(cells) >= 3:
+            date_text = cells[1].get_text(strip=True)
+            date = parse_date(date_text)
+
+            promo_link = cells[2].find("a")
+            promo_img = promo_link.find("img") if promo_link else None
+            promo_name = promo_img["title"].strip() if promo_img and promo_img.has_attr("title") else None
 
+            if date:
+                results.append((date, promo_name))
+    return results
+
+
+def get_gimmick_match_dates(match_history_url: str) -> dict:
+    dates = get_gimmick_match_dates_many([match_history_url])[0]
+    if isinstance(dates, Exception):
+        raise dates
+    return dates
+
+
+def get_gimmick_match_dates_many(match_history_urls: list) -> list:
+    """
+    Resolve date_created / last_seen / debut promotion for several gimmicks at once.
+    All first pages are fetched in parallel, then all required last pages.
+    Failed lookups are returned as exceptions in place of the dict.
+    """
+    first_pages = fetch_many(match_history_urls, return_exceptions=True)
+    return match_dates_from_first_pages(match_history_urls, first_pages)
+
+
+def parse_match_history(content: bytes, url: str) -> tuple:
+    """Returns ([(date, promotion name)], last page url) for a match history page."""
+    soup = parse_page(content, "match_history")
+    return extract_dates_and_promotions(soup), get_last_page_url(soup, url)
+
+
+def _map_inline(fn, *iterables) -> list:
+    return [call_guarded(fn, *args) for args in zip(*iterables)]
+
+
+def match_dates_from_first_pages(match_history_urls: list, first_pages: list, map_pages=None) -> list:
+    """
+    Same as get_gimmick_match_dates_many, for first pages that have already been fetched.
+    map_pages(fn, *iterables) -> list runs the page parsing with an exception in place of
+    each page that fails, e.g. parse_many(..., return_exceptions=True) to parse in worker
+    processes; pages are parsed inline by default.
+    """
+    map_pages = map_pages or _map_inline
+    fetched = [i for i, response in enumerate(first_pages) if not isinstance(response, Exception)]
+    parsed = dict(zip(fetched, map_pages(parse_match_history, [first_pages[i].content for i in fetched],
+                                         [match_history_urls[i] for i in fetched])))
+    return match_dates_from_parsed(match_history_urls, [parsed.get(i, response) for i, response in
+                                                        enumerate(first_pages)], map_pages)
+
+
+def match_dates_from_parsed(match_history_urls: list, first_parsed: list, map_pages=None) -> list:
+    """
+    Same as match_dates_from_first_pages, for first pages that have already been parsed:
+    each item is parse_match_history's result for the url, or the exception that stopped it.
+    """
+    map_pages = map_pages or _map_inline
+    first_results = {}
+    last_page_urls = {}
+    for i, result in enumerate(first_parsed):
+        if isinstance(result, Exception):
+            continue
+        page_results, last_page_url = result
+        first_results[i] = page_results
+        if last_page_url != match_history_urls[i]:
+            last_page_urls[i] = last_page_url
+
+    last_pages = dict(zip(last_page_urls, fetch_many(list(last_page_urls.values()), return_exceptions=True)))
+    parsed_last = [i for i, response in last_pages.items() if not isinstance(response, Exception)]
+    last_results = dict(zip(parsed_last, map_pages(
+        parse_match_history, [last_pages[i].content for i in parsed_last],
+        [last_page_urls[i] for i in parsed_last])))
+
+    results = []
+    for i, result in enumerate(first_parsed):
+        failed = next((outcome for outcome in (result, last_pages.get(i), last_results.get(i))
+                       if isinstance(outcome, Exception)), None)
+        if failed is not None:
+            results.append(failed)
+            continue
+
+        first_page_results = first_results[i]
+        last_seen = first_page_results[0][0] if first_page_results else None
+
+        # Last page
+        page_results = last_results[i][0] if i in last_results else first_page_results
+        date_created = page_results[-1][0] if page_results else None
+        promo_name = page_results[-1][1] if page_results else None
+
+        results.append({
+            "date_created": date_created,
+            "last_seen": last_seen,
+            "debut_promotion_name": promo_name
+        })
+    return results
+
+
+@timed(EXTRACT_SECONDS, page_type="profile", extractor="alter_egos")
+def extract_alter_egos(soup):
+    """Return [(gimmick_name, match_history_url)] from a parsed profile page, or None if there are none."""
     alter_ego_section = soup.find("div", class_="InformationBoxTitle", string="Alter egos:")
     if not alter_ego_section:
         print("🔍 No alter egos found.")
-        return
+        return None
 
     alter_ego_table = alter_ego_section.find_parent("div", class_="InformationBoxRow")
     if not alter_ego_table:
         print("⚠️ Alter ego table structure unexpected.")
-        return
-
-    wrestler = session.query(Wrestler).get(wrestler_id)
-    wrestler_name = wrestler.name if wrestler else ""
+        return None
 
-    gimmick_links = alter_ego_table.find_all("a", href=True)
-    for link in gimmick_links:
-        gimmick_name = link.text.strip()
+    gimmicks = []
+    for link in alter_ego_table.find_all("a", href=True):
         gimmick_url = BASE_URL + "/" + link["href"].lstrip("/")
 
-
         # Append &page=4 to force match history view
         if "&page=4" not in gimmick_url:
             gimmick_url += "&page=4"
+        gimmicks.append((link.text.strip(), gimmick_url))
+    return gimmicks
+
+
+def with_debut_promotion_ids(session, records: list) -> list:
+    promotion_ids = get_promotion_resolver().resolve_many(session, [record['debut_promotion_name'] for record in records])
+    for record in records:
+        record['debut_promotion_id'] = promotion_ids.get(record['debut_promotion_name'])
+    return records
+
+
+def gimmick_writer(session, batch_size: int = DEFAULT_BATCH_SIZE) -> BulkWriter:
+    return BulkWriter(session, Gimmick, ("wrestler_id", "gimmick_name"), batch_size,
+                      prepare=with_debut_promotion_ids, on_write=refresh_gimmick_stats)
+
+
+def scrape_gimmicks_for_wrestler(wrestler_id: int, cagematch_id: int, session, writer: BulkWriter = None):
+    """Scrape every alter ego of a wrestler. Pass a shared writer to batch gimmicks across wrestlers."""
+    profile_url = f"{BASE_URL}/?id=2&nr={cagematch_id}"
+    response = fetch(profile_url)
+    gimmicks = extract_alter_egos(parse_page(response.content, "profile"))
+    if gimmicks is None:
+        return
+
+    wrestler = session.get(Wrestler, wrestler_id)
+    wrestler_name = wrestler.name if wrestler else ""
 
-        try:
-            dates = get_gimmick_match_dates(gimmick_url)
-            # Check for duplicate gimmick (by name + wrestler)
-            existing = session.query(Gimmick).filter_by(
-                wrestler_id=wrestler_id,
-                gimmick_name=gimmick_name
-            ).first()
-
-            if existing:
-                print(f"⚠️ Skipping duplicate gimmick: {gimmick_name}")
-                continue
-
-            promotion = get_or_create_promotion(session, dates["debut_promotion_name"]) if dates[
-                "debut_promotion_name"] else None
-            debut_promotion_id = promotion.id if promotion else None
-            is_default = gimmick_name.strip().lower() == wrestler_name.strip().lower()
-
-            gimmick = Gimmick(
-                wrestler_id=wrestler_id,
-                gimmick_name=gimmick_name,
-                debut_promotion_id=debut_promotion_id,
-                is_default=is_default,
-                date_created=dates["date_created"],
-                last_seen=dates["last_seen"]
-            )
-            session.add(gimmick)
-            print(f"✅ Added gimmick: {gimmick_name}")
-        except Exception as e:
-            print(f"❌ Failed to process gimmick '{gimmick_name}': {e}")
-
-    session.commit()
+    own_writer = writer is None
+    if own_writer:
+        writer = gimmick_writer(session)
+
+    all_dates = get_gimmick_match_dates_many([url for _, url in gimmicks])
+    for (gimmick_name, gimmick_url), dates in zip(gimmicks, all_dates):
+        if isinstance(dates, Exception):
+            print(f"❌ Failed to process gimmick '{gimmick_name}': {dates}")
+            continue
+
+        writer.add({
+            "wrestler_id": wrestler_id,
+            "gimmick_name": gimmick_name,
+            "debut_promotion_name": dates["debut_promotion_name"],
+            "is_default": gimmick_name.strip().lower() == wrestler_name.strip().lower(),
+            "date_created": dates["date_created"],
+            "last_seen": dates["last_seen"]
+        })
+        print(f"✅ Queued gimmick: {gimmick_name}")
+
+    if own_writer:
+        writer.flush()
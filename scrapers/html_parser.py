@@ -0,0 +1,70 @@
+# scrapers/html_parser.py
+
+import importlib.util
+import os
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from utils.metrics import get_metrics
+
+
+def _default_backend() -> str:
+    if importlib.util.find_spec("lxml") is not None:
+        return "lxml"
+    return "html.parser"
+
+
+# "lxml" is several times faster than the stdlib "html.parser"; override with SCRAPER_HTML_PARSER
+PARSER_BACKEND = os.getenv("SCRAPER_HTML_PARSER") or _default_backend()
+
+PARSE_SECONDS = get_metrics().histogram(
+    "scrape_parse_seconds", "HTML parse time per page, by page type (full for an untyped parse)", ("page_type",))
+# Observed by the extractors themselves (utils.metrics.timed), whichever scraper calls them
+EXTRACT_SECONDS = get_metrics().histogram(
+    "scrape_extract_seconds", "Time to pull the fields out of a parsed page, by page type and extractor",
+    ("page_type", "extractor"))
+
+
+def _any_class(*names):
+    # The strainer sees the raw class attribute ("TBase TableBorderColor"), so match on whole tokens
+    return re.compile(r"(^|\s)(" + "|".join(names) + r")(\s|$)")
+
+
+# Only the regions each extractor reads are built into the tree, everything else is skipped.
+# Page types match scrapers.page_cache.classify_url.
+PAGE_REGIONS = {
+    # InformationBoxTable holds the profile fields and the alter egos, HeaderBox the fallback name
+    "profile": SoupStrainer("div", attrs={"class": _any_class("InformationBoxTable", "HeaderBox")}),
+    # Caption headings and the TBase tables that follow them
+    "titles": SoupStrainer(["div", "table"], attrs={"class": _any_class("Caption", "TBase")}),
+    # The match listing table plus the pager used to find the last page
+    "match_history": SoupStrainer(["div", "table"], attrs={"class": _any_class("TBase", "NavigationPart")}),
+    "roster": SoupStrainer(["div", "table"], attrs={"class": _any_class("TBase", "NavigationPart")}),
+    "promotion_list": SoupStrainer("table", attrs={"class": _any_class("TBase")}),
+    # The event's information box and every match on its card
+    "event": SoupStrainer("div", attrs={"class": _any_class("InformationBoxTable", "Match")}),
+    "event_list": SoupStrainer(["div", "table"], attrs={"class": _any_class("TBase", "NavigationPart")}),
+}
+
+
+def parse_page(content, page_type: str = None, backend: str = None) -> BeautifulSoup:
+    """
+    Parse a Cagematch page. With a known page_type only the regions its extractor
+    needs are parsed; page_type=None builds the full document tree.
+    """
+    parse_only = PAGE_REGIONS[page_type] if page_type else None
+    with PARSE_SECONDS.time(page_type=page_type or "full"):
+        return BeautifulSoup(content, backend or PARSER_BACKEND, parse_only=parse_only)
+
+
+class ParseError(RuntimeError):
+    """A page whose parse task raised, returned in its result's place so one bad page doesn't sink its batch."""
+
+
+def call_guarded(fn, *args):
+    """fn(*args), or a ParseError describing what it raised (picklable, unlike some extractor exceptions)."""
+    try:
+        return fn(*args)
+    except Exception as e:
+        return ParseError(f"{fn.__name__} failed: {type(e).__name__}: {e}")
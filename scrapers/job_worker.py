@@ -0,0 +1,301 @@
+# scrapers/job_worker.py
+
+import os
+import socket
+import threading
+import time
+import uuid
+from functools import partial
+
+from sqlalchemy import select
+
+from database import job_queue
+from database.db_utils import get_session
+from database.models import Gimmick, Wrestler
+from database.refresh import RefreshWriter
+from database.stats import refresh_gimmick_stats, refresh_wrestler_stats
+from scrapers.fetcher import fetch_many
+from scrapers.gimmick_scraper import match_dates_from_first_pages, with_debut_promotion_ids
+from scrapers.html_parser import parse_page
+from scrapers.parse_pool import parse_many, parse_profile, parse_titles
+from scrapers.promotion_scraper import PROMOTIONS_URL, save_promotions_to_db, scrape_promotions_list
+from scrapers.wrestler_pipeline import PROFILE_FIELDS, TITLE_FIELDS
+from scrapers.wrestler_scraper import (
+    FETCH_BATCH_SIZE,
+    ROSTER_PAGE_SIZE,
+    extract_cagematch_id,
+    extract_roster_links,
+    get_titles_url,
+    roster_page_url,
+    wrestler_writer,
+)
+from utils.cli import POLL_INTERVAL
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def seed_jobs(session, max_pages: int = None) -> int:
+    """Queue the promotions list and the first roster page; every other job is discovered from there."""
+    roster_payload = {"page": 0, "last_page": max_pages - 1 if max_pages else None}
+    return (job_queue.enqueue(session, job_queue.PROMOTIONS, [PROMOTIONS_URL])
+            + job_queue.enqueue(session, job_queue.ROSTER_PAGE, [roster_page_url(0)], [roster_payload]))
+
+
+def _with_wrestler_ids(session, records: list) -> list:
+    """
+    Resolve each gimmick's wrestler. One whose wrestler isn't in the database
+    (yet) fails the batch, so the writer retries the records one by one and
+    only that gimmick's job fails, to be retried later.
+    """
+    cagematch_ids = {record['wrestler_cagematch_id'] for record in records}
+    wrestler_ids = dict(session.execute(
+        select(Wrestler.cagematch_id, Wrestler.id).where(Wrestler.cagematch_id.in_(cagematch_ids))
+    ).all())
+    missing = sorted(cagematch_ids - set(wrestler_ids))
+    if missing:
+        raise LookupError(f"No wrestler with cagematch_id {', '.join(map(str, missing))} in the database")
+    for record in records:
+        record['wrestler_id'] = wrestler_ids[record['wrestler_cagematch_id']]
+    return with_debut_promotion_ids(session, records)
+
+
+def _write_records(make_writer, records_by_job: dict, errors: dict):
+    """
+    Write every job's records in one batch with make_writer(on_error=...).
+    The writer retries a failed batch one record at a time; each record that
+    still fails fails its own job.
+    """
+    jobs_by_record = {}
+
+    def record_failed(record, error):
+        errors[jobs_by_record[id(record)]] = f"Failed to write: {error!r}"
+
+    writer = make_writer(on_error=record_failed)
+    for job_id, records in records_by_job.items():
+        if job_id in errors:
+            continue
+        for record in records:
+            jobs_by_record[id(record)] = job_id
+            writer.add(record)
+    writer.flush()
+
+
+def _fetch_for_jobs(jobs: list, errors: dict) -> dict:
+    """Fetch every job's url at once. Returns {job id: response}; fetch failures go to errors."""
+    urls = {job.id: job.url for job in jobs}
+    responses = dict(zip(urls, fetch_many(list(urls.values()), return_exceptions=True)))
+    for job_id, response in responses.items():
+        if isinstance(response, Exception):
+            errors[job_id] = f"Failed to fetch {urls[job_id]}: {response!r}"
+    return {job_id: response for job_id, response in responses.items() if job_id not in errors}
+
+
+def handle_roster_pages(session, jobs: list) -> dict:
+    errors = {}
+    jobs_by_id = {job.id: job for job in jobs}
+    for job_id, response in _fetch_for_jobs(jobs, errors).items():
+        job = jobs_by_id[job_id]
+        links = extract_roster_links(parse_page(response.content, "roster"))
+        job_queue.enqueue(session, job_queue.WRESTLER_PROFILE, links)
+        page, last_page = job.payload["page"], job.payload.get("last_page")
+        if len(links) == ROSTER_PAGE_SIZE and (last_page is None or page < last_page):
+            job_queue.enqueue(session, job_queue.ROSTER_PAGE, [roster_page_url(page + 1)],
+                              [{"page": page + 1, "last_page": last_page}])
+    return errors
+
+
+def handle_promotions(session, jobs: list) -> dict:
+    save_promotions_to_db(scrape_promotions_list(), session)
+    return {}
+
+
+def handle_profiles(session, jobs: list) -> dict:
+    """Write the profile columns of each wrestler, then queue its titles and gimmick jobs."""
+    errors = {}
+    responses = _fetch_for_jobs(jobs, errors)
+    job_urls = {job.id: job.url for job in jobs if job.id in responses}
+    parsed = {}
+    for job_id, result in zip(job_urls, parse_many(
+            parse_profile, [responses[job_id].content for job_id in job_urls], list(job_urls.values()),
+            return_exceptions=True)):
+        if isinstance(result, Exception):
+            errors[job_id] = f"Failed to parse {job_urls[job_id]}: {result}"
+        else:
+            parsed[job_id] = result
+
+    records = {}
+    for job_id, (data, _) in parsed.items():
+        data['_fields'] = list(PROFILE_FIELDS)
+        records[job_id] = [data]
+    _write_records(partial(wrestler_writer, session, writer_class=RefreshWriter), records, errors)
+
+    titles_urls, gimmick_urls, gimmick_payloads = [], [], []
+    for job_id, (data, alter_egos) in parsed.items():
+        if job_id in errors:
+            continue
+        titles_urls.append(get_titles_url(data['cagematch_id']))
+        wrestler_name = (data['name'] or "").strip().lower()
+        for gimmick_name, gimmick_url in alter_egos:
+            gimmick_urls.append(gimmick_url)
+            gimmick_payloads.append({
+                "wrestler_cagematch_id": data['cagematch_id'],
+                "gimmick_name": gimmick_name,
+                "is_default": gimmick_name.strip().lower() == wrestler_name,
+            })
+    job_queue.enqueue(session, job_queue.TITLES, titles_urls)
+    job_queue.enqueue(session, job_queue.GIMMICK, gimmick_urls, gimmick_payloads)
+    return errors
+
+
+def handle_titles(session, jobs: list) -> dict:
+    errors = {}
+    responses = _fetch_for_jobs(jobs, errors)
+    job_ids = list(responses)
+    stats = parse_many(parse_titles, [responses[job_id].content for job_id in job_ids], return_exceptions=True)
+
+    cagematch_ids = {job.id: extract_cagematch_id(job.url) for job in jobs}
+    records = {}
+    for job_id, result in zip(job_ids, stats):
+        if isinstance(result, Exception):
+            errors[job_id] = f"Failed to parse titles: {result}"
+            continue
+        titles_won, title_reigns, is_champion = result
+        records[job_id] = [{
+            "cagematch_id": cagematch_ids[job_id],
+            "titles_won": titles_won,
+            "title_reigns": title_reigns,
+            "is_champion": is_champion,
+            "_fields": list(TITLE_FIELDS),
+        }]
+    _write_records(partial(RefreshWriter, session, Wrestler, ("cagematch_id",), on_write=refresh_wrestler_stats),
+                   records, errors)
+    return errors
+
+
+def handle_gimmicks(session, jobs: list) -> dict:
+    errors = {}
+    responses = _fetch_for_jobs(jobs, errors)
+    fetched = [job for job in jobs if job.id in responses]
+    all_dates = match_dates_from_first_pages([job.url for job in fetched],
+                                             [responses[job.id] for job in fetched],
+                                             map_pages=partial(parse_many, return_exceptions=True))
+
+    records = {}
+    for job, dates in zip(fetched, all_dates):
+        if isinstance(dates, Exception):
+            errors[job.id] = f"Failed to process gimmick '{job.payload['gimmick_name']}': {dates!r}"
+            continue
+        records[job.id] = [{
+            "wrestler_cagematch_id": job.payload["wrestler_cagematch_id"],
+            "gimmick_name": job.payload["gimmick_name"],
+            "is_default": job.payload["is_default"],
+            "debut_promotion_name": dates["debut_promotion_name"],
+            "date_created": dates["date_created"],
+            "last_seen": dates["last_seen"],
+        }]
+    _write_records(partial(RefreshWriter, session, Gimmick, ("wrestler_id", "gimmick_name"),
+                           prepare=_with_wrestler_ids, on_write=refresh_gimmick_stats),
+                   records, errors)
+    return errors
+
+
+# handler(session, jobs) -> {job id: error message} for the jobs that failed
+JOB_HANDLERS = {
+    job_queue.ROSTER_PAGE: handle_roster_pages,
+    job_queue.PROMOTIONS: handle_promotions,
+    job_queue.WRESTLER_PROFILE: handle_profiles,
+    job_queue.TITLES: handle_titles,
+    job_queue.GIMMICK: handle_gimmicks,
+}
+
+
+class JobWorker:
+    """
+    Claims batches of jobs from the shared queue and runs them. Any number of
+    workers, on any number of machines, can run against the same database; a
+    background thread keeps extending the leases of the jobs being worked on,
+    so only the jobs of a worker that died are handed to someone else.
+    """
+
+    def __init__(self, session, worker_id: str = None, kinds: list = None, batch_size: int = FETCH_BATCH_SIZE,
+                 lease=job_queue.LEASE, poll_interval: float = POLL_INTERVAL):
+        self.session = session
+        self.worker_id = worker_id or default_worker_id()
+        self.kinds = kinds
+        self.batch_size = batch_size
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.completed = 0
+        self.failed = 0
+        self._held = set()
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _heartbeat_loop(self):
+        session = get_session()
+        interval = self.lease.total_seconds() / 3
+        while not self._stop.wait(interval):
+            with self._held_lock:
+                held = list(self._held)
+            try:
+                job_queue.heartbeat(session, self.worker_id, held, self.lease)
+            except Exception as e:
+                session.rollback()
+                print(f"⚠️ Heartbeat failed: {e}")
+
+    def run_batch(self) -> int:
+        """Claim and run one batch. Returns how many jobs were claimed."""
+        jobs = job_queue.claim(self.session, self.worker_id, self.batch_size, self.kinds, self.lease)
+        if not jobs:
+            return 0
+        with self._held_lock:
+            self._held.update(job.id for job in jobs)
+
+        by_kind = {}
+        for job in jobs:
+            by_kind.setdefault(job.kind, []).append(job)
+        try:
+            for kind, kind_jobs in by_kind.items():
+                try:
+                    errors = JOB_HANDLERS[kind](self.session, kind_jobs)
+                except Exception as e:
+                    self.session.rollback()
+                    errors = {job.id: repr(e) for job in kind_jobs}
+
+                for job_id, error in errors.items():
+                    print(f"❌ Job {job_id} ({kind}): {error}")
+                    job_queue.fail(self.session, self.worker_id, job_id, error)
+                done = [job.id for job in kind_jobs if job.id not in errors]
+                job_queue.complete(self.session, self.worker_id, done)
+                self.completed += len(done)
+                self.failed += len(errors)
+        finally:
+            with self._held_lock:
+                self._held.difference_update(job.id for job in jobs)
+        return len(jobs)
+
+    def run(self, drain: bool = True, max_jobs: int = None) -> int:
+        """
+        Work until stopped. With drain the worker exits once no job is pending
+        or running anywhere, i.e. no other worker can still queue more work.
+        Returns the number of jobs completed.
+        """
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        start = time.perf_counter()
+        try:
+            while max_jobs is None or self.completed + self.failed < max_jobs:
+                if self.run_batch():
+                    continue
+                if job_queue.requeue_expired(self.session):
+                    continue
+                if drain and not job_queue.has_open_jobs(self.session, self.kinds):
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            self._stop.set()
+        print(f"🏁 Worker {self.worker_id}: {self.completed} jobs done, {self.failed} failed "
+              f"in {time.perf_counter() - start:.1f}s.")
+        return self.completed
@@ -0,0 +1,191 @@
+# scrapers/page_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", os.path.join(".cache", "pages"))
+CACHE_MAX_BYTES = int(os.getenv("SCRAPER_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# How long a cached page is served without going back to the site, per URL class
+PAGE_TTLS = {
+    "promotion_list": 7 * DAY,
+    "roster": DAY,
+    "profile": 3 * DAY,
+    "titles": 3 * DAY,
+    "match_history": DAY,
+    "event_list": DAY,
+    "event": 7 * DAY,
+    "other": DAY,
+}
+
+
+class CacheMiss(LookupError):
+    """Raised in offline mode when a page has never been cached."""
+
+
+def classify_url(url: str) -> str:
+    """Bucket a Cagematch url into one of the PAGE_TTLS classes."""
+    if "id=8" in url and "view=promotions" in url:
+        return "promotion_list"
+    if "view=workers" in url:
+        return "roster"
+    if "id=8&nr=" in url and "page=4" in url:
+        return "event_list"
+    if "id=1&nr=" in url:
+        return "event"
+    if "page=11" in url:
+        return "titles"
+    if "page=4" in url:
+        return "match_history"
+    if "id=2&nr=" in url:
+        return "profile"
+    return "other"
+
+
+class CachedPage:
+    def __init__(self, url, blob, fetched_at, etag, last_modified, content):
+        self.url = url
+        self.blob = blob
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content = content
+
+    def is_fresh(self, now: float = None) -> bool:
+        age = (now or time.time()) - self.fetched_at
+        return age < PAGE_TTLS[classify_url(self.url)]
+
+    def revalidation_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = 200
+        response._content = self.content
+        response.headers["Content-Type"] = "text/html"
+        response.from_cache = True
+        return response
+
+
+class PageCache:
+    """
+    Content-addressed page store: bodies live under blobs/ keyed by their sha256,
+    a small SQLite index maps url -> blob with the validators needed for revalidation.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES, offline: bool = False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.offline = offline
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, blob TEXT NOT NULL, size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL, last_access REAL NOT NULL,"
+            " etag TEXT, last_modified TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._db.commit()
+
+    def _blob_path(self, blob: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", blob[:2], blob)
+
+    def get(self, url: str):
+        """Returns the CachedPage for url, or None if it isn't cached."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT blob, fetched_at, etag, last_modified FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute("UPDATE pages SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+        blob, fetched_at, etag, last_modified = row
+        try:
+            with open(self._blob_path(blob), "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return None
+        return CachedPage(url, blob, fetched_at, etag, last_modified, content)
+
+    def put(self, url: str, response: requests.Response):
+        content = response.content
+        blob = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(blob)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT blob FROM pages WHERE url = ?", (url,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO pages (url, blob, size, fetched_at, last_access, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, blob, len(content), now, now,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified")),
+            )
+            if old and old[0] != blob:
+                self._drop_blob_if_unused(old[0])
+            self._db.commit()
+            self._evict()
+
+    def touch(self, url: str):
+        """Mark a page as freshly validated (after a 304 Not Modified)."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE pages SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            self._db.commit()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def _drop_blob_if_unused(self, blob: str):
+        in_use = self._db.execute("SELECT 1 FROM pages WHERE blob = ? LIMIT 1", (blob,)).fetchone()
+        if not in_use:
+            try:
+                os.remove(self._blob_path(blob))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """Drop least-recently-used pages until the cache is back under max_bytes."""
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, blob, size in self._db.execute(
+            "SELECT url, blob, size FROM pages ORDER BY last_access"
+        ).fetchall():
+            self._db.execute("DELETE FROM pages WHERE url = ?", (url,))
+            self._drop_blob_if_unused(blob)
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,117 @@
+# scrapers/parse_pool.py
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from scrapers.gimmick_scraper import extract_alter_egos, parse_match_history  # noqa: F401 (parse task)
+from scrapers.html_parser import EXTRACT_SECONDS, PARSE_SECONDS, call_guarded, parse_page
+from scrapers.wrestler_scraper import extract_title_stats, extract_wrestler_profile
+from utils.cli import PARSE_WORKERS
+from utils.metrics import get_metrics
+
+# Pages handed to a worker per round trip
+PARSE_CHUNK_SIZE = 4
+
+# Timings a worker records while running a task; they travel back with its result
+WORKER_HISTOGRAMS = (PARSE_SECONDS, EXTRACT_SECONDS)
+
+POOL_BATCH_SECONDS = get_metrics().histogram(
+    "scrape_parse_pool_batch_seconds", "Wall time of a batch of parse tasks run in the worker processes", ("task",))
+POOL_PAGES = get_metrics().counter(
+    "scrape_parse_pool_pages_total", "Pages parsed in the worker processes, by parse task", ("task",))
+
+
+# Parse tasks. They take raw page bytes and return plain picklable values,
+# so they can run in a worker process without touching the network or the DB.
+# gimmick_scraper.parse_match_history is the match history one.
+
+def parse_profile(content: bytes, url: str) -> tuple:
+    """Returns (wrestler record, [(gimmick name, match history url)]) for a profile page."""
+    soup = parse_page(content, "profile")
+    return extract_wrestler_profile(soup, url), extract_alter_egos(soup) or []
+
+
+def parse_titles(content: bytes) -> tuple:
+    """Returns (titles_won, title_reigns, is_champion) for a titles page."""
+    return extract_title_stats(parse_page(content, "titles"))
+
+
+def _run_in_worker(task, *args) -> tuple:
+    """(task result, the parse and extract timings it recorded) for the parent to merge."""
+    result = task(*args)
+    return result, [histogram.drain() for histogram in WORKER_HISTOGRAMS]
+
+
+class ParsePool:
+    """
+    Runs parse tasks in a pool of worker processes so HTML parsing isn't bound
+    by the GIL shared with the fetch threads. Workers are started on first use.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, chunk_size: int = PARSE_CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs fetch threads can copy held locks
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context("spawn"))
+            return self._executor
+
+    def map(self, fn, *iterables, return_exceptions: bool = False) -> list:
+        """
+        Like Executor.map, returning the results as a list in input order. With
+        return_exceptions a page whose task raises yields a ParseError in its place.
+        """
+        task = partial(call_guarded, fn) if return_exceptions else fn
+        if self.workers <= 1:
+            return list(map(task, *iterables))
+        with POOL_BATCH_SECONDS.time(task=fn.__name__):
+            outputs = list(self._get_executor().map(partial(_run_in_worker, task), *iterables,
+                                                    chunksize=self.chunk_size))
+        results = []
+        for result, timings in outputs:
+            for histogram, samples in zip(WORKER_HISTOGRAMS, timings):
+                histogram.merge(samples)
+            results.append(result)
+        POOL_PAGES.inc(len(results), task=fn.__name__)
+        return results
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """Returns the process-wide shared ParsePool, creating it on first use."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ParsePool()
+        return _parse_pool
+
+
+def configure_parse_pool(workers: int = PARSE_WORKERS) -> ParsePool:
+    """Install a shared ParsePool with the given number of worker processes."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.close()
+        _parse_pool = ParsePool(workers)
+        return _parse_pool
+
+
+def parse_many(fn, *iterables, return_exceptions: bool = False) -> list:
+    return get_parse_pool().map(fn, *iterables, return_exceptions=return_exceptions)
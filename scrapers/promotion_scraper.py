@@ -1,11 +1,14 @@
 
-import requests
-from bs4 import BeautifulSoup
 from database.models import Promotion
+from database.bulk_writer import BulkWriter
+from database.stats import refresh_promotion_stats
+from database.promotion_resolver import get_promotion_resolver
+from scrapers.fetcher import BASE_URL, fetch
+from scrapers.html_parser import EXTRACT_SECONDS, parse_page
+from utils.metrics import timed
 import re
 from datetime import datetime
 
-BASE_URL = "https://www.cagematch.net"
 PROMOTIONS_URL = f"{BASE_URL}/?id=8&view=promotions"
 
 
@@ -45,12 +48,12 @@ def parse_founded_years(founded_str: str) -> tuple:
 
 
 def scrape_promotions_list() -> list:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-    }
-    response = requests.get(PROMOTIONS_URL, headers=headers)
-    soup = BeautifulSoup(response.content, 'html.parser')
+    response = fetch(PROMOTIONS_URL)
+    return extract_promotions(parse_page(response.content, "promotion_list"))
 
+
+@timed(EXTRACT_SECONDS, page_type="promotion_list", extractor="promotions")
+def extract_promotions(soup) -> list:
     # The correct table has class 'TBase TableBorderColor'
     table = soup.find('table', class_='TBase TableBorderColor')
     if table is None:
@@ -91,20 +94,14 @@ def scrape_promotions_list() -> list:
     return promotions
 
 def save_promotions_to_db(promotions: list, session):
+    # Existing promotions (same cagematch_id) are skipped by ON CONFLICT DO NOTHING
+    with BulkWriter(session, Promotion, ("cagematch_id",), on_write=refresh_promotion_stats) as writer:
+        for promo in promotions:
+            writer.add(promo)
+
+    resolver = get_promotion_resolver()
     for promo in promotions:
-        existing = session.query(Promotion).filter_by(cagematch_id=promo['cagematch_id']).first()
-        if existing:
-            continue  # Skip duplicates
-
-        promotion = Promotion(
-            name=promo['name'],
-            country=promo['country'],
-            year_founded=promo['year_founded'],
-            year_disbanded=promo['year_disbanded'],
-            is_active=promo['is_active'],
-            years_active=promo['years_active'],
-            cagematch_id=promo['cagematch_id']
-        )
-        session.add(promotion)
-
-    session.commit()
+        promotion_id = writer.id_for(promo['cagematch_id'])
+        if promotion_id:
+            resolver.remember(promo['name'], promotion_id, promo['cagematch_id'])
+    return writer.ids
@@ -0,0 +1,173 @@
+# scrapers/rate_control.py
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+
+# Statuses that mean "slow down": concurrency is cut and the request retried
+THROTTLE_STATUSES = {429, 503}
+# Other server-side failures worth a retry
+RETRY_STATUSES = THROTTLE_STATUSES | {500, 502, 504}
+
+MAX_RETRIES = int(os.getenv("SCRAPER_RETRIES", "4"))
+BACKOFF_BASE = float(os.getenv("SCRAPER_BACKOFF", "1.0"))
+BACKOFF_CAP = float(os.getenv("SCRAPER_BACKOFF_CAP", "60"))
+
+# Responses slower than this don't earn more concurrency
+LATENCY_TARGET = float(os.getenv("SCRAPER_LATENCY_TARGET", "2.0"))
+DECREASE_FACTOR = 0.5
+
+# The circuit opens when at least BREAKER_MIN_REQUESTS of the last BREAKER_WINDOW
+# requests went out and BREAKER_ERROR_RATE of them failed
+BREAKER_WINDOW = 20
+BREAKER_MIN_REQUESTS = 10
+BREAKER_ERROR_RATE = 0.5
+BREAKER_COOLDOWN = float(os.getenv("SCRAPER_BREAKER_COOLDOWN", "60"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+class HostController:
+    """
+    AIMD concurrency limit and circuit breaker for one host.
+
+    Every healthy response below LATENCY_TARGET grows the limit by 1/limit, about
+    one extra slot per round of requests; a throttled response or a connection
+    failure multiplies it by DECREASE_FACTOR. When too many recent requests failed
+    the circuit opens and requests fail fast for BREAKER_COOLDOWN seconds, after
+    which a single probe request decides whether it closes again.
+    """
+
+    def __init__(self, host: str, max_concurrency: int, min_concurrency: int = 1,
+                 latency_target: float = LATENCY_TARGET, cooldown: float = BREAKER_COOLDOWN):
+        self.host = host
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+
+        self.limit = float(min_concurrency)
+        self.in_flight = 0
+        self.latency = None  # EWMA of response time, seconds
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._outcomes = deque(maxlen=BREAKER_WINDOW)
+        self._opened_at = None
+        self._probing = False
+        self._cond = threading.Condition()
+
+    @property
+    def error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def _check_circuit(self):
+        if self._opened_at is None:
+            return
+        if self._probing or time.monotonic() - self._opened_at < self.cooldown:
+            raise CircuitOpenError(f"Circuit open for {self.host} after {self.error_rate:.0%} failed requests")
+        # Half-open: let exactly one request through to test the host
+        self._probing = True
+
+    def acquire(self):
+        with self._cond:
+            while True:
+                self._check_circuit()
+                if self.in_flight < int(self.limit) or self._probing:
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=1.0)
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def record_success(self, seconds: float):
+        with self._cond:
+            self.requests += 1
+            self.latency = seconds if self.latency is None else 0.8 * self.latency + 0.2 * seconds
+            if seconds <= self.latency_target:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self._outcomes.append(True)
+            if self._opened_at is not None:
+                print(f"🟢 {self.host} recovered, closing the circuit")
+                self._opened_at = None
+                self._probing = False
+                self._outcomes.clear()
+            self._cond.notify_all()
+
+    def record_failure(self, throttled: bool = True):
+        """A failed request; throttled failures (429/503, timeouts) also cut the limit."""
+        with self._cond:
+            self.requests += 1
+            if throttled:
+                self.throttled += 1
+                self.limit = max(self.min_concurrency, self.limit * DECREASE_FACTOR)
+            else:
+                self.errors += 1
+            self._outcomes.append(False)
+            if self._probing:
+                # The probe failed: stay open for another cooldown
+                self._opened_at = time.monotonic()
+                self._probing = False
+            elif (self._opened_at is None and len(self._outcomes) >= BREAKER_MIN_REQUESTS
+                  and self.error_rate >= BREAKER_ERROR_RATE):
+                print(f"🔴 {self.host} is failing ({self.error_rate:.0%} of recent requests), "
+                      f"pausing it for {self.cooldown:.0f}s")
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "host": self.host,
+                "limit": round(self.limit, 2),
+                "requests": self.requests,
+                "throttled": self.throttled,
+                "errors": self.errors,
+                "error_rate": round(self.error_rate, 3),
+                "latency": round(self.latency, 3) if self.latency is not None else None,
+                "circuit": "open" if self.is_open else "closed",
+            }
+
+
+def retry_after_seconds(response) -> float:
+    """The Retry-After header of a response in seconds, or None."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: float = None, base: float = BACKOFF_BASE,
+                  cap: float = BACKOFF_CAP) -> float:
+    """Exponential backoff with full jitter; a Retry-After from the server wins if it is longer."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(cap, retry_after))
+    return delay
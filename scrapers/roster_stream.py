@@ -0,0 +1,206 @@
+# scrapers/roster_stream.py
+
+import queue
+import threading
+import time
+from datetime import timedelta
+from itertools import islice
+
+from database import crawl_state
+from database.db_utils import get_session
+from database.bulk_writer import BulkWriter
+from database.refresh import RefreshWriter
+from scrapers.wrestler_pipeline import (
+    extract_wrestler_batch,
+    gimmick_writer_for,
+    stored_fingerprints,
+    write_wrestler_batch,
+)
+from scrapers.wrestler_scraper import iter_roster_links, iter_roster_pages, wrestler_writer
+from utils.cli import STREAM_WORKERS
+
+# Bounded hand-off queues: the roster walker blocks once this many links are waiting
+LINK_QUEUE_SIZE = 64
+RESULT_QUEUE_SIZE = 16
+
+# Frontier bookkeeping for resumable crawls
+FRONTIER_KIND = "wrestler_profile"
+ROSTER_CHECKPOINT = "roster_page"
+CHECKPOINT_EVERY = 50
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, url: str, error: str):
+        self.url = url
+        self.error = error
+
+
+def _resumable_links(fresh_for: timedelta, max_pages: int = None):
+    """
+    Frontier-backed link source. Runs in the producer thread with its own session:
+    first yields urls left pending by an interrupted run, then walks the roster from
+    the last checkpointed page, queueing every link and yielding only stale ones.
+    """
+    session = get_session()
+    yield from crawl_state.unfinished_urls(session, FRONTIER_KIND)
+
+    start_page = crawl_state.get_checkpoint(session, ROSTER_CHECKPOINT)
+    if start_page:
+        print(f"⏩ Resuming roster walk at page {start_page + 1}")
+    for page, links in iter_roster_pages(start_page, max_pages):
+        crawl_state.enqueue(session, links, FRONTIER_KIND)
+        todo = crawl_state.stale_urls(session, links, fresh_for)
+        crawl_state.set_checkpoint(session, ROSTER_CHECKPOINT, page + 1)
+        yield from todo
+
+    # The whole roster has been walked: the next run starts from the first page again
+    crawl_state.set_checkpoint(session, ROSTER_CHECKPOINT, 0)
+
+
+def _produce_links(links, link_queue: queue.Queue, workers: int, stop: threading.Event, errors: list):
+    try:
+        for link in links:
+            while not stop.is_set():
+                try:
+                    link_queue.put(link, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            if stop.is_set():
+                break
+    except Exception as e:
+        # Handed to stream_roster, which finishes writing what was fetched and then raises it
+        print(f"❌ Roster walk failed: {e}")
+        errors.append(e)
+    finally:
+        for _ in range(workers):
+            link_queue.put(_DONE)
+
+
+def _consume_links(link_queue: queue.Queue, result_queue: queue.Queue, stop: threading.Event,
+                   known_fingerprints=None):
+    try:
+        while True:
+            link = link_queue.get()
+            if link is _DONE:
+                return
+            if stop.is_set():
+                continue
+            try:
+                results = extract_wrestler_batch(
+                    [link], on_error=lambda url, message: result_queue.put(_Failure(url, message)),
+                    known_fingerprints=known_fingerprints)
+                result_queue.put(results)
+            except Exception as e:
+                print(f"❌ Failed to process {link}: {e}")
+                result_queue.put(_Failure(link, repr(e)))
+    finally:
+        result_queue.put(_DONE)
+
+
+def stream_roster(session, limit: int = None, workers: int = STREAM_WORKERS, with_gimmicks: bool = False,
+                  max_pages: int = None, resume: bool = False, fresh_for: timedelta = crawl_state.DEFAULT_FRESHNESS,
+                  retry_failed: bool = False, refresh: bool = False) -> int:
+    """
+    Crawl the worker database as a bounded producer/consumer pipeline:
+    one thread walks the roster pages, `workers` threads fetch and extract
+    wrestlers, and this thread writes them in batches. Profile scraping starts
+    on the first links while later roster pages are still loading, and the
+    bounded queues keep memory flat however large the roster is.
+
+    With resume the crawl goes through the persistent frontier: progress is
+    checkpointed, wrestlers fetched within fresh_for are skipped and a killed
+    run picks up where it stopped. retry_failed only re-runs failed urls.
+    If walking the roster fails, the wrestlers already fetched are still
+    written and the walk's exception is raised afterwards (as RuntimeError).
+    With refresh, pages whose fingerprint is unchanged are skipped and existing
+    rows only get narrow column updates.
+    Returns the number of wrestlers written.
+    """
+    use_frontier = resume or retry_failed
+    if retry_failed:
+        print(f"🔁 Re-queued {crawl_state.requeue_failed(session, FRONTIER_KIND)} failed wrestlers")
+        links = iter(crawl_state.unfinished_urls(session, FRONTIER_KIND))
+    elif resume:
+        links = _resumable_links(fresh_for, max_pages)
+    else:
+        links = iter_roster_links(max_pages=max_pages)
+    if limit is not None:
+        links = islice(links, limit)
+
+    link_queue = queue.Queue(maxsize=LINK_QUEUE_SIZE)
+    result_queue = queue.Queue(maxsize=RESULT_QUEUE_SIZE)
+    stop = threading.Event()
+
+    walk_errors = []
+    threads = [threading.Thread(target=_produce_links, args=(links, link_queue, workers, stop, walk_errors),
+                                daemon=True)]
+    known_fingerprints = stored_fingerprints if refresh else None
+    threads += [threading.Thread(target=_consume_links,
+                                 args=(link_queue, result_queue, stop, known_fingerprints), daemon=True)
+                for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    written_urls = []
+
+    def write_failed(record: dict, error: Exception):
+        # A wrestler that couldn't be written goes back to the frontier as failed, not done
+        if use_frontier and record.get('source_url'):
+            if record['source_url'] in written_urls:
+                written_urls.remove(record['source_url'])
+            crawl_state.mark_failed(session, record['source_url'], repr(error))
+
+    writer_class = RefreshWriter if refresh else BulkWriter
+    wrestlers = wrestler_writer(session, keep_ids=with_gimmicks, writer_class=writer_class, on_error=write_failed)
+    gimmicks = gimmick_writer_for(session, wrestlers, release_ids=True, writer_class=writer_class) \
+        if with_gimmicks else None
+
+    def checkpoint():
+        wrestlers.flush()
+        if gimmicks is not None:
+            gimmicks.flush()
+        crawl_state.mark_done(session, written_urls)
+        written_urls.clear()
+
+    start = time.perf_counter()
+    finished = 0
+    try:
+        while finished < workers:
+            results = result_queue.get()
+            if results is _DONE:
+                finished += 1
+            elif isinstance(results, _Failure):
+                if use_frontier:
+                    crawl_state.mark_failed(session, results.url, results.error)
+            else:
+                if use_frontier:
+                    # Listed before the write, so a record failing in this write can take itself off again
+                    written_urls.extend(data['source_url'] for data, _ in results)
+                write_wrestler_batch(results, wrestlers, gimmicks)
+                if use_frontier and len(written_urls) >= CHECKPOINT_EVERY:
+                    checkpoint()
+    finally:
+        stop.set()
+        # Unblock any consumer still waiting to hand over a result
+        while any(thread.is_alive() for thread in threads[1:]):
+            try:
+                result_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    if use_frontier:
+        checkpoint()
+    else:
+        wrestlers.flush()
+        if gimmicks is not None:
+            gimmicks.flush()
+    if walk_errors:
+        # The wrestlers written so far are marked done; the roster checkpoint still points at the
+        # page that failed and links queued but not scraped stay pending, so --resume carries on
+        raise RuntimeError(f"Roster walk failed after {wrestlers.written} wrestlers were written: "
+                           f"{walk_errors[0]!r}") from walk_errors[0]
+    print(f"💾 Streamed {wrestlers.written} wrestlers in {time.perf_counter() - start:.1f}s.")
+    return wrestlers.written
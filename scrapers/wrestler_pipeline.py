@@ -0,0 +1,241 @@
+# scrapers/wrestler_pipeline.py
+
+import time
+from functools import partial
+
+from database.bulk_writer import BulkWriter
+from database.db_utils import get_session
+from database.refresh import RefreshWriter, fingerprint, load_fingerprints
+from database.stats import refresh_gimmick_stats
+from database.models import Gimmick
+from scrapers.fetcher import fetch_many, get_fetcher
+from scrapers.gimmick_scraper import match_dates_from_parsed, parse_match_history, with_debut_promotion_ids
+from scrapers.parse_pool import parse_many, parse_profile, parse_titles
+from scrapers.wrestler_scraper import FETCH_BATCH_SIZE, extract_cagematch_id, get_titles_url, wrestler_writer
+
+# Wrestler columns each page is authoritative for, used by refresh mode
+PROFILE_FIELDS = ["name", "promotion_id", "height_cm", "weight_kg", "age", "debut", "is_active",
+                  "years_active", "retirement_date"]
+TITLE_FIELDS = ["titles_won", "title_reigns", "is_champion"]
+
+
+def stored_fingerprints(urls: list) -> dict:
+    """known_fingerprints callback for refresh mode, using the calling thread's session."""
+    return load_fingerprints(get_session(), urls)
+
+
+def gimmick_writer_for(session, wrestlers: BulkWriter, release_ids: bool = False,
+                       writer_class=BulkWriter) -> BulkWriter:
+    """
+    Gimmick writer that maps each record's wrestler cagematch_id to the wrestler's row id.
+    With release_ids a wrestler's id is dropped once no buffered gimmick references it,
+    keeping memory flat on streaming crawls. Gimmicks are added right after their wrestler,
+    so a wrestler whose alter egos straddle a flush is still in the buffer and keeps its id.
+    """
+    def prepare(session, records):
+        wrestlers.flush()
+        resolved = []
+        for record in records:
+            record['wrestler_id'] = wrestlers.id_for(record['wrestler_cagematch_id'])
+            if record['wrestler_id'] is not None:
+                resolved.append(record)
+        if release_ids:
+            # The whole buffer, not just records: a failed batch is retried one record at a time
+            referenced = {(record['wrestler_cagematch_id'],) for record in gimmicks.buffered}
+            wrestlers.ids = {key: row_id for key, row_id in wrestlers.ids.items() if key in referenced}
+        return with_debut_promotion_ids(session, resolved)
+
+    gimmicks = writer_class(session, Gimmick, ("wrestler_id", "gimmick_name"), wrestlers.batch_size,
+                            prepare=prepare, keep_ids=not release_ids, on_write=refresh_gimmick_stats)
+    return gimmicks
+
+
+def _report_failure(on_error, url: str, message: str):
+    print(f"❌ {message}")
+    if on_error is not None:
+        on_error(url, message)
+
+
+def extract_wrestler_batch(links: list, on_error=None, known_fingerprints=None) -> list:
+    """
+    Fetch and extract a batch of wrestlers. Returns [(wrestler record, [gimmick records])]
+    for every wrestler that could be scraped; on_error(url, message) is called for the rest.
+    Pages are fetched on the fetcher's threads and parsed in the parse pool's processes,
+    so parsing one batch doesn't hold the GIL the fetch threads need.
+
+    Refresh mode: known_fingerprints(urls) -> {url: fingerprint} of what was extracted
+    from the pages behind the stored rows. Every page is still parsed, but an unchanged
+    extract is not written: unchanged title stats leave the title columns alone, an
+    unchanged first match-history page skips that gimmick (and the fetch of its last
+    page), and an unchanged profile + titles pair yields a record that only resolves the
+    wrestler's id. Records carry _fields / _fingerprints for database.refresh.RefreshWriter.
+    """
+    refresh = known_fingerprints is not None
+
+    # 1. Profiles and titles pages together.
+    titles_urls = {url: get_titles_url(extract_cagematch_id(url)) for url in links}
+    stage_urls = list(dict.fromkeys(links + list(titles_urls.values())))
+    pages = dict(zip(stage_urls, fetch_many(stage_urls, return_exceptions=True)))
+    known = known_fingerprints(stage_urls) if refresh else {}
+
+    fetched = []
+    for url in links:
+        response, titles_page = pages[url], pages[titles_urls[url]]
+        if isinstance(response, Exception):
+            _report_failure(on_error, url, f"Failed to fetch {url}: {response}")
+        elif isinstance(titles_page, Exception):
+            _report_failure(on_error, url, f"Failed to fetch titles for {url}: {titles_page}")
+        else:
+            fetched.append(url)
+
+    # Each profile is parsed once and feeds both the wrestler and the alter-ego extractors.
+    # A page that fails to parse or extract only fails its own wrestler.
+    profiles = {}
+    for url, parsed in zip(fetched, parse_many(parse_profile, [pages[url].content for url in fetched], fetched,
+                                               return_exceptions=True)):
+        if isinstance(parsed, Exception):
+            _report_failure(on_error, url, f"Failed to parse {url}: {parsed}")
+        else:
+            profiles[url] = parsed
+
+    # 2. Every gimmick's first match-history page at once; match_dates_from_parsed
+    #    then fetches all needed last pages in one more batch.
+    gimmick_urls = list(dict.fromkeys(
+        gimmick_url for _, alter_egos in profiles.values() for _, gimmick_url in alter_egos))
+    first_pages = fetch_many(gimmick_urls, return_exceptions=True)
+    fetched_gimmicks = [(url, page) for url, page in zip(gimmick_urls, first_pages)
+                        if not isinstance(page, Exception)]
+    first_parsed = dict(zip(gimmick_urls, first_pages))
+    first_parsed.update(zip((url for url, _ in fetched_gimmicks), parse_many(
+        parse_match_history, [page.content for _, page in fetched_gimmicks], [url for url, _ in fetched_gimmicks],
+        return_exceptions=True)))
+    if refresh:
+        known.update(known_fingerprints(gimmick_urls))
+        gimmick_urls = [url for url in gimmick_urls if isinstance(first_parsed[url], Exception)
+                        or known.get(url) != fingerprint(first_parsed[url])]
+    dates_by_url = dict(zip(gimmick_urls, match_dates_from_parsed(
+        gimmick_urls, [first_parsed[url] for url in gimmick_urls],
+        map_pages=partial(parse_many, return_exceptions=True))))
+
+    # 3. Title stats.
+    title_stats = {}
+    for url, stats in zip(list(profiles), parse_many(
+            parse_titles, [pages[titles_urls[url]].content for url in profiles], return_exceptions=True)):
+        if isinstance(stats, Exception):
+            _report_failure(on_error, url, f"Failed to parse titles for {url}: {stats}")
+            del profiles[url]
+        else:
+            title_stats[url] = stats
+
+    # 4. Assemble the records.
+    results = []
+    for url, (data, alter_egos) in profiles.items():
+        titles_changed = True
+        if refresh:
+            profile_print, titles_print = fingerprint(data), fingerprint(title_stats[url])
+            profile_changed = known.get(url) != profile_print
+            titles_changed = known.get(titles_urls[url]) != titles_print
+            data['_fingerprints'] = {url: profile_print} if profile_changed else {}
+            if titles_changed:
+                data['_fingerprints'][titles_urls[url]] = titles_print
+            data['_fields'] = (list(PROFILE_FIELDS) if profile_changed else []) + \
+                (list(TITLE_FIELDS) if titles_changed else [])
+        data['source_url'] = url
+
+        if titles_changed:
+            data['titles_won'], data['title_reigns'], data['is_champion'] = title_stats[url]
+        else:
+            for field in TITLE_FIELDS:
+                data.pop(field, None)
+
+        gimmick_records = []
+        wrestler_name = (data['name'] or "").strip().lower()
+        for gimmick_name, gimmick_url in alter_egos:
+            if gimmick_url not in dates_by_url:
+                continue  # unchanged since the last refresh
+            dates = dates_by_url[gimmick_url]
+            if isinstance(dates, Exception):
+                print(f"❌ Failed to process gimmick '{gimmick_name}': {dates}")
+                continue
+            record = {
+                "wrestler_cagematch_id": data['cagematch_id'],
+                "gimmick_name": gimmick_name,
+                "debut_promotion_name": dates["debut_promotion_name"],
+                "is_default": gimmick_name.strip().lower() == wrestler_name,
+                "date_created": dates["date_created"],
+                "last_seen": dates["last_seen"],
+            }
+            if refresh:
+                record['_fingerprints'] = {gimmick_url: fingerprint(first_parsed[gimmick_url])}
+            gimmick_records.append(record)
+        results.append((data, gimmick_records))
+    return results
+
+
+def write_wrestler_batch(results: list, wrestlers: BulkWriter, gimmicks: BulkWriter = None):
+    for data, gimmick_records in results:
+        wrestlers.add(data)
+        if gimmicks is not None:
+            for record in gimmick_records:
+                gimmicks.add(record)
+        print(f"✅ Scraped {data['name']} ({len(gimmick_records)} gimmicks)")
+
+
+def fetch_report(entries: list, links: list) -> list:
+    """
+    Per-wrestler request count and summed latency, measured from the fetch
+    recorder, next to an estimate (not a measurement) of what the separate
+    profile / titles / gimmick scrapers would have needed for the same pages:
+    one more request whenever gimmicks were fetched, as they fetch the profile twice.
+    """
+    by_wrestler = {extract_cagematch_id(url): {"url": url, "requests": 0, "network": 0, "seconds": 0.0}
+                   for url in links}
+    for entry in entries:
+        row = by_wrestler.get(extract_cagematch_id(entry["url"]))
+        if row is None:
+            continue
+        row["requests"] += 1
+        row["network"] += 0 if entry["from_cache"] else 1
+        row["seconds"] += entry["seconds"]
+
+    for row in by_wrestler.values():
+        row["estimated_legacy_requests"] = row["requests"] + 1 if row["requests"] > 2 else row["requests"]
+    return list(by_wrestler.values())
+
+
+def scrape_wrestlers_with_gimmicks(links: list, session, batch_size: int = FETCH_BATCH_SIZE,
+                                   refresh: bool = False) -> list:
+    """
+    Scrape wrestlers, their title stats and their gimmicks fetching every distinct
+    page exactly once. With refresh, unchanged pages are skipped and existing rows
+    only get narrow updates. Returns the per-wrestler fetch report.
+    """
+    writer_class = RefreshWriter if refresh else BulkWriter
+    wrestlers = wrestler_writer(session, writer_class=writer_class)
+    gimmicks = gimmick_writer_for(session, wrestlers, writer_class=writer_class)
+    known_fingerprints = stored_fingerprints if refresh else None
+
+    start = time.perf_counter()
+    with get_fetcher().record() as recorder:
+        for i in range(0, len(links), batch_size):
+            batch = extract_wrestler_batch(links[i:i + batch_size], known_fingerprints=known_fingerprints)
+            write_wrestler_batch(batch, wrestlers, gimmicks)
+    wrestlers.flush()
+    gimmicks.flush()
+    wall_seconds = time.perf_counter() - start
+
+    report = fetch_report(recorder.entries, links)
+    requests_made = sum(row["requests"] for row in report)
+    legacy = sum(row["estimated_legacy_requests"] for row in report)
+    fetch_seconds = sum(row["seconds"] for row in report)
+    print(f"💾 Saved {wrestlers.written} wrestlers and {gimmicks.written} gimmicks.")
+    print(f"📊 {requests_made} requests (an estimated {legacy} with separate scrapers), "
+          f"{fetch_seconds:.1f}s of fetch latency in {wall_seconds:.1f}s wall time.")
+    return report
+
+
+def print_fetch_report(report: list):
+    print(f"{'cagematch_id':>12} {'requests':>8} {'network':>8} {'~legacy':>7} {'latency':>9}")
+    for row in report:
+        print(f"{extract_cagematch_id(row['url']) or '-':>12} {row['requests']:>8} {row['network']:>8} "
+              f"{row['estimated_legacy_requests']:>7} {row['seconds'] * 1000:>7.0f}ms")
@@ -1,26 +1,29 @@
 
-import requests
-from bs4 import BeautifulSoup
 from database.models import Wrestler
-from database.db_utils import get_or_create_promotion
+from database.promotion_resolver import get_promotion_resolver
+from database.bulk_writer import BulkWriter, DEFAULT_BATCH_SIZE
+from database.stats import refresh_wrestler_stats
+from scrapers.fetcher import BASE_URL, fetch, fetch_many
+from scrapers.html_parser import EXTRACT_SECONDS, parse_page
 from utils.parsers import parse_height, parse_weight, parse_years_active, parse_date
+from utils.cli import FETCH_BATCH_SIZE
+from utils.metrics import timed
+from itertools import islice
 import re
 
-BASE_URL = "https://www.cagematch.net"
 WORKERS_LIST_URL = f"{BASE_URL}/?id=2&view=workers"
-HEADERS = {
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-}
+ROSTER_PAGE_SIZE = 100
 
 
-def get_top_wrestlers():
-    response = requests.get(WORKERS_LIST_URL, headers=HEADERS)
-    soup = BeautifulSoup(response.content, "html.parser")
+@timed(EXTRACT_SECONDS, page_type="roster", extractor="roster_links")
+def extract_roster_links(soup) -> list:
     table = soup.find("table", class_="TBase")
+    if table is None:
+        return []
     rows = table.find_all("tr")[1:]  # Skip header row
 
     wrestler_links = []
-    for row in rows[:100]:
+    for row in rows:
         cells = row.find_all("td")
         if len(cells) < 3:
             continue
@@ -28,15 +31,51 @@ def get_top_wrestlers():
         if link and "href" in link.attrs:
             full_url = BASE_URL + "/" + link["href"].lstrip("/")
             wrestler_links.append(full_url)
-
     return wrestler_links
 
 
+def roster_page_url(page: int) -> str:
+    return f"{WORKERS_LIST_URL}&s={page * ROSTER_PAGE_SIZE}"
+
+
+def iter_roster_pages(start_page: int = 0, max_pages: int = None):
+    """Walk the paginated worker database, yielding (page number, [profile urls]) per page."""
+    page = start_page
+    while max_pages is None or page < start_page + max_pages:
+        response = fetch(roster_page_url(page))
+        links = extract_roster_links(parse_page(response.content, "roster"))
+        if not links:
+            return
+        yield page, links
+        if len(links) < ROSTER_PAGE_SIZE:
+            return
+        page += 1
+
+
+def iter_roster_links(max_pages: int = None):
+    """
+    Yield profile urls from the worker database one at a time, so callers can
+    start on the first wrestlers before later pages are loaded.
+    """
+    for _, links in iter_roster_pages(max_pages=max_pages):
+        yield from links
+
+
+def get_top_wrestlers():
+    return list(islice(iter_roster_links(), 100))
+
+
+def get_titles_url(wrestler_id) -> str:
+    return f"{BASE_URL}/?id=2&nr={wrestler_id}&page=11"
+
+
 def get_title_stats(wrestler_id):
-    titles_url = f"{BASE_URL}/?id=2&nr={wrestler_id}&page=11"
-    response = requests.get(titles_url, headers=HEADERS)
-    soup = BeautifulSoup(response.content, "html.parser")
+    response = fetch(get_titles_url(wrestler_id))
+    return extract_title_stats(parse_page(response.content, "titles"))
+
 
+@timed(EXTRACT_SECONDS, page_type="titles", extractor="title_stats")
+def extract_title_stats(soup):
     titles_won = 0
     title_reigns = 0
     is_champion = False
@@ -74,9 +113,41 @@ def extract_cagematch_id(url: str):
     return int(match.group(1)) if match else None
 
 
-def scrape_wrestler_profile(url: str, session):
-    response = requests.get(url, headers=HEADERS)
-    soup = BeautifulSoup(response.content, "html.parser")
+def fetch_wrestler_pages(urls: list) -> list:
+    """Fetch the profile and titles pages of every url concurrently, returns [(profile, titles)]."""
+    page_urls = []
+    for url in urls:
+        page_urls.append(url)
+        page_urls.append(get_titles_url(extract_cagematch_id(url)))
+    responses = fetch_many(page_urls, return_exceptions=True)
+    return list(zip(responses[0::2], responses[1::2]))
+
+
+def scrape_wrestler_profile(url: str, session, pages: tuple = None, writer: BulkWriter = None):
+    """
+    Scrape one wrestler. With a writer the record is buffered for the next batch
+    flush and the extracted dict is returned; otherwise it is written immediately.
+    """
+    response, titles_response = pages or fetch_wrestler_pages([url])[0]
+    for page in (response, titles_response):
+        if isinstance(page, Exception):
+            raise page
+
+    data = extract_wrestler_profile(parse_page(response.content, "profile"), url)
+    titles_won, title_reigns, is_champion = extract_title_stats(parse_page(titles_response.content, "titles"))
+    data['titles_won'] = titles_won
+    data['title_reigns'] = title_reigns
+    data['is_champion'] = is_champion
+
+    if writer is not None:
+        writer.add(data)
+        return data
+    return save_wrestler(data, session)
+
+
+@timed(EXTRACT_SECONDS, page_type="profile", extractor="wrestler_profile")
+def extract_wrestler_profile(soup, url: str) -> dict:
+    """Pull the wrestler fields out of a parsed profile page (title stats are left at their defaults)."""
     # Extract all information boxes
     info_boxes = soup.find_all('div', class_='InformationBoxTable')
 
@@ -135,52 +206,44 @@ def scrape_wrestler_profile(url: str, session):
             if h1:
                 data['name'] = h1.get_text(strip=True)
 
-    titles_won, title_reigns, is_champion = get_title_stats(data['cagematch_id'])
-    data['titles_won'] = titles_won
-    data['title_reigns'] = title_reigns
-    data['is_champion'] = is_champion
+    return data
+
+
+def with_promotion_ids(session, records: list) -> list:
+    """Resolve each distinct promotion name in the batch once."""
+    promotion_ids = get_promotion_resolver().resolve_many(session, [record['promotion'] for record in records])
+    for record in records:
+        record['promotion_id'] = promotion_ids.get(record['promotion'])
+    return records
+
+
+def wrestler_writer(session, batch_size: int = DEFAULT_BATCH_SIZE, keep_ids: bool = True,
+                    writer_class=BulkWriter, on_error=None) -> BulkWriter:
+    return writer_class(session, Wrestler, ("cagematch_id",), batch_size, prepare=with_promotion_ids,
+                        keep_ids=keep_ids, on_write=refresh_wrestler_stats, on_error=on_error)
+
 
-    # Check for duplicate by name
-    existing = session.query(Wrestler).filter_by(name=data['name']).first()
-    if existing:
-        print(f"⚠️ Skipping duplicate wrestler: {data['name']}")
-        return existing
-
-    promotion_id = None
-    if data['promotion']:
-        promotion = get_or_create_promotion(session, data['promotion'])
-        promotion_id = promotion.id
-
-    wrestler = Wrestler(
-        name=data['name'],
-        promotion_id=promotion_id,
-        height_cm=data['height_cm'],
-        weight_kg=data['weight_kg'],
-        age=data['age'],
-        debut=data['debut'],
-        is_active=data['is_active'],
-        years_active=data['years_active'],
-        retirement_date=data['retirement_date'],
-        cagematch_id=data['cagematch_id'],
-        title_reigns=data['title_reigns'],
-        titles_won=data['titles_won'],
-        is_champion=data['is_champion']
-    )
-    session.add(wrestler)
-    session.commit()
-    return wrestler
+def save_wrestler(data: dict, session):
+    with wrestler_writer(session) as writer:
+        writer.add(data)
+    return session.get(Wrestler, writer.id_for(data['cagematch_id']))
 
 
 def scrape_top_100_wrestlers(session):
     links = get_top_wrestlers()
-    for link in links:
-        try:
-            print(f"📦 Processing {link}...")
-            scrape_wrestler_profile(link, session)
-        except Exception as e:
-            import traceback
-            print(f"❌ Failed to process {link}")
-            print(f"Error type: {type(e).__name__}")
-            print(f"Error message: {e}")
-            print("Traceback:")
-            traceback.print_exc()
\ No newline at end of file
+    writer = wrestler_writer(session)
+    for start in range(0, len(links), FETCH_BATCH_SIZE):
+        batch = links[start:start + FETCH_BATCH_SIZE]
+        for link, pages in zip(batch, fetch_wrestler_pages(batch)):
+            try:
+                print(f"📦 Processing {link}...")
+                scrape_wrestler_profile(link, session, pages, writer)
+            except Exception as e:
+                import traceback
+                print(f"❌ Failed to process {link}")
+                print(f"Error type: {type(e).__name__}")
+                print(f"Error message: {e}")
+                print("Traceback:")
+                traceback.print_exc()
+    writer.flush()
+    print(f"💾 Saved {writer.written} wrestlers.")
@@ -0,0 +1,274 @@
+# search/name_index.py
+
+import asyncio
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+from operator import itemgetter
+
+from sqlalchemy import select
+
+from database.change_feed import RESET
+from database.models import Gimmick, Wrestler
+
+DEFAULT_RESULTS = 10
+MAX_RESULTS = 100
+# Minimum trigram similarity for a fuzzy match (pg_trgm's default threshold)
+SIMILARITY_THRESHOLD = 0.3
+# Per-query work bounds: prefix keys walked, trigram postings read, fuzzy candidates scored exactly
+PREFIX_CANDIDATES = 200
+POSTINGS_BUDGET = 4000
+TRIGRAM_CANDIDATES = 50
+
+WORD = re.compile(r"\w+")
+
+
+def normalize(name: str) -> str:
+    """Case- and accent-insensitive key: "The Último Dragón" -> "ultimo dragon"."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    words = WORD.findall("".join(c for c in decomposed if not unicodedata.combining(c)).casefold())
+    # Nobody types the article: "undertaker" should rank "The Undertaker" as an exact match
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words)
+
+
+def padded(key: str) -> str:
+    """Every word padded with two spaces in front and one behind, as pg_trgm does."""
+    return "".join(f"  {word} " for word in key.split())
+
+
+def trigrams(key: str) -> set:
+    """pg_trgm-style trigrams of the padded words."""
+    grams = set()
+    for word in key.split():
+        word = f"  {word} "
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def word_starts(key: str) -> list:
+    """Suffixes of key starting at each word, so "bautista" completes "Dave Bautista"."""
+    return [key] + [key[i + 1:] for i, c in enumerate(key) if c == " "]
+
+
+class NameEntry:
+    """One searchable name: a wrestler's own name or one of their gimmicks."""
+
+    __slots__ = ("name", "key", "wrestler_id", "gimmick_id", "trigram_count")
+
+    def __init__(self, name: str, key: str, wrestler_id: int, gimmick_id, trigram_count: int):
+        self.name = name
+        self.key = key
+        self.wrestler_id = wrestler_id
+        self.gimmick_id = gimmick_id
+        self.trigram_count = trigram_count
+
+    def __repr__(self):
+        return f"<NameEntry(name='{self.name}', wrestler_id={self.wrestler_id}, gimmick_id={self.gimmick_id})>"
+
+
+class NameIndex:
+    """
+    In-memory name search over wrestlers and all of their gimmicks.
+
+    Prefix matches (autocomplete) come from a sorted list of word-start keys
+    searched with bisect: the same ordered walk a prefix trie gives, at a
+    fraction of the memory of a node per character. Misspellings
+    ("undertacker") are found through trigram postings and ranked by trigram
+    similarity. Every gimmick maps back to its wrestler, and each wrestler is
+    returned once, under their best-scoring name.
+    """
+
+    def __init__(self):
+        # entry id -> NameEntry, or None once the name was replaced or removed
+        self._entries = []
+        # ("wrestler" | "gimmick", row id) -> entry id
+        self._by_source = {}
+        # trigram -> entry ids; ids of removed entries linger until the next rebuild and are skipped
+        self._postings = {}
+        # sorted (word-start key, entry id)
+        self._prefixes = []
+        self._wrestler_names = {}
+
+    @classmethod
+    def build(cls, wrestlers, gimmicks) -> "NameIndex":
+        """Index from (id, name) wrestler rows and (id, wrestler_id, gimmick_name) gimmick rows."""
+        index = cls()
+        for wrestler_id, name in wrestlers:
+            index._add("wrestler", wrestler_id, wrestler_id, name)
+        for gimmick_id, wrestler_id, name in gimmicks:
+            index._add("gimmick", gimmick_id, wrestler_id, name)
+        index._prefixes.sort()
+        return index
+
+    def __len__(self):
+        return len(self._by_source)
+
+    def _add(self, kind: str, source_id: int, wrestler_id: int, name: str) -> list:
+        """Index a name without touching the prefix order; returns its prefix keys."""
+        if kind == "wrestler":
+            self._wrestler_names[source_id] = name
+        key = normalize(name or "")
+        if not key or wrestler_id is None:
+            return []
+        grams = trigrams(key)
+        entry_id = len(self._entries)
+        self._entries.append(NameEntry(name, key, wrestler_id, source_id if kind == "gimmick" else None, len(grams)))
+        self._by_source[(kind, source_id)] = entry_id
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+        prefixes = [(start, entry_id) for start in word_starts(key)]
+        self._prefixes.extend(prefixes)
+        return prefixes
+
+    def add(self, kind: str, source_id: int, wrestler_id: int, name: str):
+        """Add or replace the name of a wrestler (kind "wrestler") or gimmick (kind "gimmick")."""
+        entry_id = self._by_source.get((kind, source_id))
+        if entry_id is not None:
+            entry = self._entries[entry_id]
+            if entry.name == name and entry.wrestler_id == wrestler_id:
+                return
+            self.remove(kind, source_id)
+        # _add appended to the prefix list; move those keys to their sorted place
+        for prefix in self._add(kind, source_id, wrestler_id, name):
+            self._prefixes.pop()
+            bisect.insort(self._prefixes, prefix)
+
+    def remove(self, kind: str, source_id: int):
+        if kind == "wrestler":
+            self._wrestler_names.pop(source_id, None)
+        entry_id = self._by_source.pop((kind, source_id), None)
+        if entry_id is None:
+            return
+        entry, self._entries[entry_id] = self._entries[entry_id], None
+        for start in word_starts(entry.key):
+            position = bisect.bisect_left(self._prefixes, (start, entry_id))
+            if position < len(self._prefixes) and self._prefixes[position] == (start, entry_id):
+                del self._prefixes[position]
+
+    def _prefix_scores(self, key: str) -> dict:
+        """{entry id: score} for names with a word starting with key: 1.5-2 from the first word, 1-1.5 later."""
+        scores = {}
+        position = bisect.bisect_left(self._prefixes, (key,))
+        for start, entry_id in self._prefixes[position:position + PREFIX_CANDIDATES]:
+            if not start.startswith(key):
+                break
+            entry = self._entries[entry_id]
+            # Longer overlap ranks higher, and exactly the name scores 2
+            score = (1.5 if start == entry.key else 1.0) + 0.5 * len(key) / len(entry.key)
+            scores[entry_id] = max(score, scores.get(entry_id, 0.0))
+        return scores
+
+    def _fuzzy_scores(self, key: str, scores: dict):
+        """Add trigram similarity (0.3-1) for entries not already scored as prefixes."""
+        # An entry reaching the threshold shares at least `needed` of the query's trigrams, so it holds
+        # one of the len - needed + 1 rarest: only those postings are read, rarest first, within budget
+        grams = trigrams(key)
+        needed = max(1, math.ceil(SIMILARITY_THRESHOLD * len(grams)))
+        candidates = Counter()
+        budget = POSTINGS_BUDGET
+        for gram in sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))[:len(grams) - needed + 1]:
+            postings = self._postings.get(gram, ())
+            if len(postings) > budget and candidates:
+                break
+            candidates.update(postings)
+            budget -= len(postings)
+        for entry_id, _ in heapq.nlargest(TRIGRAM_CANDIDATES, candidates.items(), key=itemgetter(1)):
+            entry = self._entries[entry_id]
+            if entry is None or entry_id in scores:
+                continue
+            # Joined padded words only add "x  " / "   " triples across word ends, which no query has
+            text = padded(entry.key)
+            shared = sum(gram in text for gram in grams)
+            similarity = shared / (len(grams) + entry.trigram_count - shared)
+            if similarity >= SIMILARITY_THRESHOLD:
+                scores[entry_id] = similarity
+
+    def search(self, query: str, limit: int = DEFAULT_RESULTS) -> list:
+        """
+        Wrestlers matching query, best first: [{"wrestler_id", "name", "matched",
+        "gimmick_id", "score"}], where matched is the name or gimmick that matched.
+        """
+        key = normalize(query)
+        if not key:
+            return []
+        scores = self._prefix_scores(key)
+        # Prefix scores are all above any similarity, so fuzzy matches only matter for an unfilled page
+        if len({self._entries[entry_id].wrestler_id for entry_id in scores}) < limit:
+            self._fuzzy_scores(key, scores)
+        best = {}
+        for entry_id, score in scores.items():
+            entry = self._entries[entry_id]
+            # A wrestler's own name wins a tie with one of their gimmicks
+            rank = (score, entry.gimmick_id is None, -len(entry.key))
+            if entry.wrestler_id not in best or rank > best[entry.wrestler_id][0]:
+                best[entry.wrestler_id] = (rank, entry)
+        ranked = heapq.nlargest(limit, best.values(), key=itemgetter(0))
+        return [{
+            "wrestler_id": entry.wrestler_id,
+            "name": self._wrestler_names.get(entry.wrestler_id, entry.name),
+            "matched": entry.name,
+            "gimmick_id": entry.gimmick_id,
+            "score": round(rank[0], 3),
+        } for rank, entry in ranked]
+
+
+class NameSearch:
+    """
+    Keeps a NameIndex in step with the database: built at startup, then fed
+    the wrestler and gimmick ids scrapers publish on the change feed. Updates
+    and rebuilds run one at a time, in the order they were announced.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+        self.index = NameIndex()
+        self.ready = False
+        self._lock = asyncio.Lock()
+        self._tasks = set()
+
+    async def rebuild(self):
+        async with self._lock:
+            async with self.session_factory() as session:
+                wrestlers = (await session.execute(select(Wrestler.id, Wrestler.name))).all()
+                gimmicks = (await session.execute(
+                    select(Gimmick.id, Gimmick.wrestler_id, Gimmick.gimmick_name))).all()
+            # Building is pure CPU work; keep the event loop serving requests meanwhile
+            self.index = await asyncio.to_thread(NameIndex.build, wrestlers, gimmicks)
+            self.ready = True
+            print(f"🔎 Name index built: {len(wrestlers)} wrestlers, {len(gimmicks)} gimmicks")
+
+    async def apply(self, kind: str, ids: list):
+        """Re-read the named wrestlers or gimmicks and update (or drop) their index entries."""
+        async with self._lock:
+            if kind == "wrestler":
+                stmt = select(Wrestler.id, Wrestler.id, Wrestler.name).where(Wrestler.id.in_(ids))
+            else:
+                stmt = select(Gimmick.id, Gimmick.wrestler_id, Gimmick.gimmick_name).where(Gimmick.id.in_(ids))
+            async with self.session_factory() as session:
+                rows = (await session.execute(stmt)).all()
+            for source_id, wrestler_id, name in rows:
+                self.index.add(kind, source_id, wrestler_id, name)
+            for source_id in set(ids) - {row[0] for row in rows}:
+                self.index.remove(kind, source_id)
+
+    def on_change(self, kind: str, ids: list):
+        """Change feed subscriber."""
+        if kind == RESET:
+            update = self.rebuild()
+        elif kind in ("wrestler", "gimmick"):
+            update = self.apply(kind, ids)
+        else:
+            return
+        task = asyncio.create_task(update)
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"❌ Name index update failed: {task.exception()!r}")
@@ -0,0 +1,71 @@
+import os
+from datetime import date
+
+import pytest
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from database.models import Base, Event, Gimmick, Match, MatchParticipant, PageFingerprint, Promotion, Wrestler
+from database.promotion_resolver import get_promotion_resolver
+
+
+@pytest.fixture
+def session():
+    """A session on a throwaway in-memory SQLite database with the tables the scraper writers use."""
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in
+                                             (Promotion, Wrestler, Gimmick, PageFingerprint)])
+    session = sessionmaker(bind=engine)()
+    # The shared resolver may hold ids from another database
+    get_promotion_resolver().load(session)
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def engine():
+    """A throwaway in-memory SQLite engine with every table, for the analytics loaders."""
+    engine = create_engine("sqlite://", future=True)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def add_card():
+    """add_card(session, event_id, updated_at, matches) adds an event with its matches and participants."""
+    def add_card(session, event_id: int, stamp, matches: dict):
+        """An event stamped updated_at=stamp, with {match_id: (victor_team, [(participant_id, wrestler_id, team)])}."""
+        day = date(2020, 1, event_id)
+        session.add(Event(id=event_id, name=f"Event {event_id}", date_of_event=day, updated_at=stamp))
+        for position, (match_id, (victor_team, participants)) in enumerate(matches.items()):
+            session.add(Match(id=match_id, event_id=event_id, date=day, match_type="SINGLES",
+                              position_on_event_card=position, victor_team_number=victor_team))
+            for number, (participant_id, wrestler_id, team) in enumerate(participants, 1):
+                session.add(MatchParticipant(id=participant_id, match_id=match_id, wrestler_id=wrestler_id,
+                                             participant_number=number, team_number=team))
+
+    return add_card
+
+
+def postgres_configured() -> bool:
+    load_dotenv()
+    return os.getenv("DATABASE_URL", "").startswith("postgresql")
+
+
+@pytest.fixture
+def pg_session():
+    """A session on DATABASE_URL's PostgreSQL database; everything it commits is rolled back afterwards."""
+    if not postgres_configured():
+        pytest.skip("needs a PostgreSQL DATABASE_URL")
+    from database.db_utils import get_engine, init_db
+
+    init_db()
+    with get_engine().connect() as connection:
+        transaction = connection.begin()
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        yield session
+        session.close()
+        transaction.rollback()
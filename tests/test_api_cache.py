@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+
+from api_cache import ResponseCache, not_modified
+
+
+def test_invalidate_drops_every_response_carrying_a_tag():
+    cache = ResponseCache()
+    cache.put("/wrestlers/1", b"1", ["wrestler:1"])
+    cache.put("/wrestlers", b"[1, 2]", ["wrestler:1", "wrestler:2", "wrestlers"])
+    cache.put("/wrestlers/2", b"2", ["wrestler:2"])
+
+    assert cache.invalidate(["wrestler:1"]) == 2
+    assert [cache.get(key) is not None for key in ("/wrestlers/1", "/wrestlers", "/wrestlers/2")] == \
+        [False, False, True]
+    assert cache.invalidate(None) == 1
+
+
+def test_least_recently_used_response_is_dropped_over_max_size():
+    cache = ResponseCache(max_size=2)
+    cache.put("a", b"a", [])
+    cache.put("b", b"b", [])
+    cache.get("a")
+    cache.put("c", b"c", [])
+
+    assert [cache.get(key) is not None for key in "abc"] == [True, False, True]
+
+
+def test_concurrent_misses_share_one_load():
+    cache = ResponseCache()
+    loads = []
+
+    async def load():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return b"body", ["wrestlers"]
+
+    async def fetch_three():
+        return await asyncio.gather(*(cache.fetch("/wrestlers", load) for _ in range(3)))
+
+    results = asyncio.run(fetch_three())
+
+    assert len(loads) == 1
+    assert sorted(result for _, result in results) == ["coalesced", "coalesced", "miss"]
+    assert asyncio.run(cache.fetch("/wrestlers", load))[1] == "hit"
+
+
+def test_a_load_overlapping_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+
+    async def load():
+        cache.invalidate(["wrestler:1"])
+        return b"maybe stale", ["wrestler:1"]
+
+    entry, result = asyncio.run(cache.fetch("/wrestlers/1", load))
+
+    assert (entry.body, result) == (b"maybe stale", "miss")
+    assert cache.get("/wrestlers/1") is None
+
+
+def test_a_failed_load_is_not_cached():
+    cache = ResponseCache()
+
+    async def load():
+        raise LookupError("no such wrestler")
+
+    with pytest.raises(LookupError):
+        asyncio.run(cache.fetch("/wrestlers/9", load))
+    assert cache.get("/wrestlers/9") is None and not cache._pending
+
+
+def test_not_modified():
+    assert not_modified('W/"abc", "def"', '"abc"')
+    assert not_modified("*", '"abc"')
+    assert not not_modified(None, '"abc"') and not not_modified('"def"', '"abc"')
@@ -0,0 +1,85 @@
+from sqlalchemy import select
+
+from database.bulk_writer import BulkWriter, insert_rows
+from database.models import PageFingerprint, Wrestler
+from database.refresh import RefreshWriter
+
+
+def test_insert_rows_looks_up_existing_keys_and_inserts_the_rest(session):
+    session.add(Wrestler(cagematch_id=1, name="Existing"))
+    session.commit()
+    existing_id = session.scalar(select(Wrestler.id))
+
+    ids, inserted = insert_rows(session, Wrestler, [
+        {"cagematch_id": 1, "name": "Existing, renamed"},
+        {"cagematch_id": 2, "name": "New"},
+        {"cagematch_id": 2, "name": "New, again in the batch"},
+    ], ("cagematch_id",))
+
+    assert ids[(1,)] == existing_id
+    assert inserted == [ids[(2,)]]
+    # The existing row is left untouched, the key repeated in the batch is inserted once
+    assert session.execute(select(Wrestler.cagematch_id, Wrestler.name).order_by(Wrestler.id)).all() == [
+        (1, "Existing"), (2, "New")]
+
+
+def test_insert_rows_inserts_every_row_with_a_null_key(session):
+    rows = [{"cagematch_id": None, "name": "Unknown 1"}, {"cagematch_id": None, "name": "Unknown 2"},
+            {"cagematch_id": None, "name": "Unknown 1"}]
+
+    ids, inserted = insert_rows(session, Wrestler, rows, ("cagematch_id",))
+
+    # NULL keys never conflict, only identical rows are collapsed, and none of them has a key to map
+    assert ids == {}
+    assert len(inserted) == 2
+    assert sorted(session.scalars(select(Wrestler.name))) == ["Unknown 1", "Unknown 2"]
+
+
+def test_flush_writes_a_failed_batch_one_record_at_a_time(session):
+    failed = []
+    writer = BulkWriter(session, Wrestler, ("cagematch_id",), on_error=lambda record, e: failed.append(record))
+    records = [{"cagematch_id": 1, "name": "First"}, {"cagematch_id": 2, "name": None},
+               {"cagematch_id": 3, "name": "Third"}]
+    for record in records:
+        writer.add(record)
+
+    ids = writer.flush()
+
+    assert failed == [records[1]]
+    assert sorted(ids) == [(1,), (3,)]
+    assert (writer.written, writer.failed, writer.buffered) == (2, 1, [])
+    assert sorted(session.scalars(select(Wrestler.cagematch_id))) == [1, 3]
+
+
+def test_on_write_gets_only_the_rows_inserted(session):
+    session.add(Wrestler(cagematch_id=1, name="Existing"))
+    session.commit()
+    existing_id = session.scalar(select(Wrestler.id))
+    written = []
+    writer = BulkWriter(session, Wrestler, ("cagematch_id",), on_write=lambda _, ids: written.extend(ids))
+
+    writer.add({"cagematch_id": 1, "name": "Existing"})
+    writer.add({"cagematch_id": 2, "name": "New"})
+    ids = writer.flush()
+
+    assert written == [ids[(2,)]]
+    assert ids[(1,)] == existing_id
+
+
+def test_refresh_writer_updates_only_changed_columns_it_is_authoritative_for(session):
+    session.add_all([Wrestler(cagematch_id=1, name="Same", age=30), Wrestler(cagematch_id=2, name="Older", age=40)])
+    session.commit()
+    written = []
+    writer = RefreshWriter(session, Wrestler, ("cagematch_id",), on_write=lambda _, ids: written.extend(ids))
+
+    writer.add({"cagematch_id": 1, "name": "Same", "age": 30})
+    writer.add({"cagematch_id": 2, "name": "Renamed", "age": 41, "_fields": ["age"],
+                "_fingerprints": {"https://example.com/2": "abc"}})
+    writer.add({"cagematch_id": 3, "name": "New", "age": 20})
+    writer.flush()
+
+    rows = session.execute(select(Wrestler.cagematch_id, Wrestler.name, Wrestler.age).order_by(Wrestler.id)).all()
+    assert rows == [(1, "Same", 30), (2, "Older", 41), (3, "New", 20)]
+    assert (writer.written, writer.updated, writer.unchanged) == (2, 1, 1)
+    assert sorted(written) == sorted(session.scalars(select(Wrestler.id).where(Wrestler.cagematch_id > 1)))
+    assert session.scalar(select(PageFingerprint.fingerprint)) == "abc"
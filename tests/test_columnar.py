@@ -0,0 +1,57 @@
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from analytics.columnar import load_store
+from database.models import Event, Match, MatchParticipant, Wrestler
+
+
+def assert_same(store, full):
+    for name in ("matches", "participants", "reigns", "wrestlers"):
+        for column, values in full.tables[name].columns.items():
+            loaded = store.tables[name][column]
+            if values.dtype == object:
+                assert loaded.tolist() == values.tolist(), (name, column)
+            else:
+                assert np.array_equal(loaded, values, equal_nan=values.dtype.kind == "f"), (name, column)
+
+
+def test_append_new_replaces_the_rows_of_changed_cards(engine, add_card):
+    with Session(engine) as session:
+        session.add_all([Wrestler(id=wrestler_id, name=f"Wrestler {wrestler_id}") for wrestler_id in (10, 20, 30)])
+        add_card(session, 1, datetime(2024, 1, 1), {1: (1, [(1, 10, 1), (2, 20, 2)]),
+                                                     2: (1, [(3, 20, 1), (4, None, 2)])})
+        add_card(session, 2, datetime(2023, 12, 1), {3: (2, [(5, 10, 1), (6, 30, 2)])})
+        session.commit()
+    store, _ = load_store(engine)
+
+    # Event 1 re-merged a day later: match 1 changed victor, match 2 lost its unlinked
+    # participant, and a new card was added
+    with Session(engine) as session:
+        session.execute(update(Match).where(Match.id == 1).values(victor_team_number=2))
+        session.execute(delete(MatchParticipant).where(MatchParticipant.id == 4))
+        session.execute(update(Event).where(Event.id == 1).values(updated_at=datetime(2024, 1, 2)))
+        add_card(session, 3, datetime(2024, 1, 2), {4: (1, [(7, 30, 1), (8, 20, 2)])})
+        session.commit()
+    store, loaded = load_store(engine, store)
+
+    assert loaded["matches"] == 3 and loaded["participants"] == 5
+    assert store.replaced["participants"]["id"].tolist() == [1, 2, 3, 4]
+    assert store.matches["victor_team"].tolist() == [2, 1, 2, 1]
+    assert_same(store, load_store(engine)[0])
+
+
+def test_full_reload(engine, add_card):
+    with Session(engine) as session:
+        add_card(session, 1, None, {1: (1, [(1, None, 1), (2, None, 2)])})
+        session.commit()
+    store, _ = load_store(engine)
+    # Written without a stamp, so only a full reload sees it
+    with Session(engine) as session:
+        session.execute(update(Match).where(Match.id == 1).values(victor_team_number=2))
+        session.commit()
+
+    assert load_store(engine, store)[0].matches["victor_team"].tolist() == [1]
+    assert load_store(engine, store, full=True)[0].matches["victor_team"].tolist() == [2]
@@ -0,0 +1,22 @@
+import time
+
+import pytest
+import requests
+
+from scrapers.fetcher import Fetcher
+
+
+def test_failed_probe_with_an_unretried_error_reopens_the_circuit():
+    fetcher = Fetcher(max_retries=0)
+    url = "http://cagematch.invalid/?id=2"
+    controller = fetcher.controller_for(url)
+    controller._opened_at = time.monotonic() - controller.cooldown - 1  # cooled down: next request probes
+
+    def redirect_loop(*args, **kwargs):
+        raise requests.TooManyRedirects("Exceeded 30 redirects.")
+    fetcher.session.get = redirect_loop
+
+    with pytest.raises(requests.TooManyRedirects):
+        fetcher._get(url)
+    assert controller.is_open
+    assert not controller._probing
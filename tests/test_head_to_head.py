@@ -0,0 +1,60 @@
+from datetime import date, datetime
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+
+from analytics.columnar import load_store
+from analytics.head_to_head import HeadToHeadIndex
+from database.models import Event, Match, MatchParticipant, Wrestler
+
+WRESTLERS = (10, 20, 30, 40)
+
+
+def records(index) -> dict:
+    return {(wrestler_id, other_id): index.record(wrestler_id, other_id)
+            for wrestler_id in WRESTLERS for other_id in WRESTLERS if wrestler_id != other_id}
+
+
+def test_participant_added_to_an_indexed_match_meets_its_opponents(engine, add_card):
+    with Session(engine) as session:
+        session.add_all([Wrestler(id=wrestler_id, name=f"Wrestler {wrestler_id}") for wrestler_id in WRESTLERS])
+        add_card(session, 1, None, {1: (1, [(1, 10, 1), (2, 20, 2)])})
+        session.commit()
+    store, _ = load_store(engine)
+    index = HeadToHeadIndex.build(store)
+
+    # A third man joins match 1 on 10's team, in a row with a new id
+    with Session(engine) as session:
+        session.add(MatchParticipant(id=3, match_id=1, wrestler_id=30, participant_number=3, team_number=1))
+        session.commit()
+    store, _ = load_store(engine, store)
+    index.update(store)
+
+    assert index.record(30, 20)["meetings"] == 1 and index.record(30, 20)["wins"] == 1
+    assert index.record(10, 30)["partnered"] == 1
+    assert records(index) == records(HeadToHeadIndex.build(store))
+
+
+def test_changed_cards_replace_their_old_pairs(engine, add_card):
+    with Session(engine) as session:
+        session.add_all([Wrestler(id=wrestler_id, name=f"Wrestler {wrestler_id}") for wrestler_id in WRESTLERS])
+        add_card(session, 1, datetime(2024, 1, 1), {1: (1, [(1, 10, 1), (2, 20, 2)]),
+                                                     2: (2, [(3, 30, 1), (4, 40, 2)])})
+        add_card(session, 2, datetime(2023, 12, 1), {3: (1, [(5, 10, 1), (6, 20, 2)])})
+        session.commit()
+    store, _ = load_store(engine)
+    index = HeadToHeadIndex.build(store)
+
+    # Event 2 re-merged: 20 won after all; event 1 lost 40 and linked nobody new
+    with Session(engine) as session:
+        session.execute(update(Match).where(Match.id == 3).values(victor_team_number=2))
+        session.execute(delete(MatchParticipant).where(MatchParticipant.id == 4))
+        session.execute(update(Event).where(Event.id.in_([1, 2])).values(updated_at=datetime(2024, 1, 2)))
+        session.commit()
+    store, _ = load_store(engine, store)
+    index.update(store)
+
+    assert index.record(10, 20)["wins"] == 1 and index.record(10, 20)["losses"] == 1
+    assert index.record(10, 20)["last_met"] == date(2020, 1, 2)
+    assert index.record(30, 40) is None
+    assert records(index) == records(HeadToHeadIndex.build(store))
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from database import job_queue
+from database.models import ScrapeJob
+
+# A kind no crawl uses, so jobs already in the database are never claimed
+KIND = "test_kind"
+
+
+def status_of(session, url: str) -> tuple:
+    return session.execute(select(ScrapeJob.status, ScrapeJob.attempts).where(
+        ScrapeJob.kind == KIND, ScrapeJob.url == url)).one()
+
+
+def test_enqueue_keeps_the_state_of_jobs_already_queued(pg_session):
+    assert job_queue.enqueue(pg_session, KIND, ["a", "b", "a"]) == 2
+    job_queue.claim(pg_session, "worker", 1, [KIND])
+
+    assert job_queue.enqueue(pg_session, KIND, ["a", "c"]) == 1
+    assert status_of(pg_session, "a") == (job_queue.RUNNING, 1)
+
+
+def test_claimed_jobs_go_to_one_worker_until_completed(pg_session):
+    job_queue.enqueue(pg_session, KIND, ["a", "b", "c"], [{"page": n} for n in range(3)])
+
+    first = job_queue.claim(pg_session, "first", 2, [KIND])
+    second = job_queue.claim(pg_session, "second", 2, [KIND])
+    job_queue.complete(pg_session, "second", [job.id for job in first])
+    job_queue.complete(pg_session, "first", [job.id for job in first])
+
+    assert [(job.url, job.payload) for job in first] == [("a", {"page": 0}), ("b", {"page": 1})]
+    assert [job.url for job in second] == ["c"]
+    assert [status_of(pg_session, url)[0] for url in "abc"] == [job_queue.DONE, job_queue.DONE, job_queue.RUNNING]
+    assert job_queue.has_open_jobs(pg_session, [KIND])
+
+
+def test_failed_and_expired_jobs_are_retried_until_max_attempts(pg_session):
+    job_queue.enqueue(pg_session, KIND, ["a", "b"])
+
+    job = job_queue.claim(pg_session, "worker", 1, [KIND])[0]
+    job_queue.fail(pg_session, "worker", job.id, "boom", max_attempts=2)
+    assert status_of(pg_session, "a") == (job_queue.PENDING, 1)
+    job = job_queue.claim(pg_session, "worker", 1, [KIND])[0]
+    job_queue.fail(pg_session, "worker", job.id, "boom", max_attempts=2)
+    assert status_of(pg_session, "a") == (job_queue.FAILED, 2)
+
+    # A lease already in the past, as if the worker had died
+    job_queue.claim(pg_session, "dead", 1, [KIND], lease=timedelta(seconds=-1))
+    assert job_queue.heartbeat(pg_session, "other", [job.id]) == 0
+    job_queue.requeue_expired(pg_session)
+    assert status_of(pg_session, "b") == (job_queue.PENDING, 1)
+
+    assert job_queue.requeue_failed(pg_session, KIND) == 1
+    assert status_of(pg_session, "a") == (job_queue.PENDING, 0)
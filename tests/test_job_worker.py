@@ -0,0 +1,36 @@
+from functools import partial
+
+from sqlalchemy import select
+
+from database.models import Gimmick, Wrestler
+from database.refresh import RefreshWriter
+from scrapers.job_worker import _with_wrestler_ids, _write_records
+from scrapers.wrestler_scraper import wrestler_writer
+
+
+def test_a_record_that_fails_to_write_fails_only_its_job(session):
+    records = {1: [{"cagematch_id": 1, "name": "First", "promotion": None}],
+               2: [{"cagematch_id": 2, "name": None, "promotion": None}],
+               3: [{"cagematch_id": 3, "name": "Third", "promotion": None}]}
+    errors = {}
+
+    _write_records(partial(wrestler_writer, session, writer_class=RefreshWriter), records, errors)
+
+    assert list(errors) == [2]
+    assert sorted(session.scalars(select(Wrestler.cagematch_id))) == [1, 3]
+
+
+def test_a_gimmick_of_an_unknown_wrestler_fails_its_job(session):
+    session.add(Wrestler(cagematch_id=1, name="Known"))
+    session.commit()
+    records = {job_id: [{"wrestler_cagematch_id": cagematch_id, "gimmick_name": f"Gimmick {job_id}",
+                         "is_default": False, "debut_promotion_name": None, "date_created": None,
+                         "last_seen": None}]
+               for job_id, cagematch_id in ((1, 1), (2, 99))}
+    errors = {}
+
+    _write_records(partial(RefreshWriter, session, Gimmick, ("wrestler_id", "gimmick_name"),
+                           prepare=_with_wrestler_ids), records, errors)
+
+    assert list(errors) == [2] and "99" in errors[2]
+    assert list(session.scalars(select(Gimmick.gimmick_name))) == ["Gimmick 1"]
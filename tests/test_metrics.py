@@ -0,0 +1,17 @@
+from utils.metrics import Histogram
+
+
+def test_drained_worker_samples_merge_into_the_parent():
+    worker = Histogram("scrape_parse_seconds", "", ("page_type",))
+    parent = Histogram("scrape_parse_seconds", "", ("page_type",))
+    parent.observe(0.002, page_type="titles")
+    worker.observe(0.002, page_type="titles")
+    worker.observe(0.3, page_type="profile")
+
+    parent.merge(worker.drain())
+    parent.merge(worker.drain())  # nothing new recorded: merges nothing
+
+    assert worker.samples() == []
+    by_type = {sample["labels"]["page_type"]: sample for sample in parent.snapshot()}
+    assert by_type["titles"]["count"] == 2 and by_type["titles"]["sum"] == 0.004
+    assert by_type["profile"]["count"] == 1 and by_type["profile"]["buckets"] == {"0.5": 1}
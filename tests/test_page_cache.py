@@ -0,0 +1,65 @@
+import os
+
+import requests
+
+from scrapers.page_cache import DAY, PageCache, classify_url
+
+PROFILE_URL = "https://www.cagematch.net/?id=2&nr=1"
+
+
+def page(content: bytes, etag: str = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    if etag:
+        response.headers["ETag"] = etag
+    return response
+
+
+def blobs(cache: PageCache) -> list:
+    return [name for _, _, names in os.walk(os.path.join(cache.cache_dir, "blobs")) for name in names]
+
+
+def test_put_and_get_keep_the_body_and_validators(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.put(PROFILE_URL, page(b"<html>profile</html>", etag='"v1"'))
+
+    cached = cache.get(PROFILE_URL)
+
+    assert cached.content == b"<html>profile</html>"
+    assert cached.revalidation_headers() == {"If-None-Match": '"v1"'}
+    assert cached.is_fresh() and not cached.is_fresh(cached.fetched_at + 3 * DAY)
+    assert cache.get("https://www.cagematch.net/?id=2&nr=2") is None
+
+
+def test_identical_pages_share_a_blob_and_replaced_blobs_are_removed(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.put(PROFILE_URL, page(b"same"))
+    cache.put("https://www.cagematch.net/?id=2&nr=2", page(b"same"))
+    assert len(blobs(cache)) == 1
+
+    cache.put(PROFILE_URL, page(b"changed"))
+    cache.put("https://www.cagematch.net/?id=2&nr=2", page(b"changed"))
+
+    assert len(blobs(cache)) == 1
+    assert cache.get(PROFILE_URL).content == b"changed"
+
+
+def test_least_recently_used_pages_are_evicted_over_max_bytes(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=25)
+    urls = [f"https://www.cagematch.net/?id=2&nr={nr}" for nr in range(3)]
+    cache.put(urls[0], page(b"0" * 10))
+    cache.put(urls[1], page(b"1" * 10))
+    cache.get(urls[0])
+
+    cache.put(urls[2], page(b"2" * 10))
+
+    assert [cache.get(url) is not None for url in urls] == [True, False, True]
+    assert cache.total_bytes() == 20
+
+
+def test_classify_url():
+    assert classify_url(PROFILE_URL) == "profile"
+    assert classify_url("https://www.cagematch.net/?id=2&nr=1&page=11") == "titles"
+    assert classify_url("https://www.cagematch.net/?id=2&nr=1&page=4") == "match_history"
+    assert classify_url("https://www.cagematch.net/?id=2&view=workers") == "roster"
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+from dotenv import load_dotenv
+
+from database.query_plans import HOT_QUERIES, hot_query_plans, sequential_scans
+
+load_dotenv()
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL", "").startswith("postgresql"),
+                                reason="needs a PostgreSQL DATABASE_URL")
+
+
+@pytest.fixture(scope="module")
+def plans():
+    from database.db_utils import get_engine, init_db
+
+    init_db()
+    with get_engine().connect() as connection:
+        plans = hot_query_plans(connection)
+        connection.rollback()
+    return plans
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_uses_an_index(plans, name):
+    assert sequential_scans(plans[name]) == []
@@ -0,0 +1,46 @@
+import pytest
+
+from questions.parser import Slot, lex, parse
+
+# question -> (literals, entity, select, aggregate, filters, order, limit)
+QUESTIONS = {
+    "how tall are AEW wrestlers":
+        (["AEW"], "wrestlers", "height_cm", "avg", [("promotion", "=", Slot(0))], None, None),
+    "average height of AEW wrestlers":
+        (["AEW"], "wrestlers", "height_cm", "avg", [("promotion", "=", Slot(0))], None, None),
+    "how tall is Kane":
+        (["Kane"], "wrestlers", "height_cm", None, [("wrestler", "=", Slot(0))], None, None),
+    "How Many Reigns Does Big Show Have":
+        (["Big Show"], "wrestlers", "title_reigns", None, [("wrestler", "=", Slot(0))], None, None),
+    "how many title reigns does The Undertaker have":
+        (["The Undertaker"], "wrestlers", "title_reigns", None, [("wrestler", "=", Slot(0))], None, None),
+    "how many matches has Kane won":
+        (["Kane"], "wrestlers", "win_count", None, [("wrestler", "=", Slot(0))], None, None),
+    "how many matches did Kane win":
+        (["Kane"], "wrestlers", "win_count", None, [("wrestler", "=", Slot(0))], None, None),
+    "how many matches has Kane had":
+        (["Kane"], "wrestlers", "match_count", None, [("wrestler", "=", Slot(0))], None, None),
+    "how many AEW champions are there":
+        (["AEW"], "wrestlers", None, "count", [("promotion", "=", Slot(0)), ("is_champion", "=", True)], None, None),
+    "show me active wrestlers over 200cm in AEW":
+        ([200, "AEW"], "wrestlers", None, None,
+         [("is_active", "=", True), ("height_cm", ">", Slot(0)), ("promotion", "=", Slot(1))], None, None),
+    "who is the tallest AEW wrestler":
+        (["AEW"], "wrestlers", None, None, [("promotion", "=", Slot(0))], ("height_cm", True), 1),
+    "top 5 wrestlers with the most matches won":
+        ([5], "wrestlers", None, None, [], ("win_count", True), Slot(0)),
+    "how many promotions in Japan":
+        (["Japan"], "promotions", None, "count", [("country", "=", Slot(0))], None, None),
+}
+
+
+@pytest.mark.parametrize("text", QUESTIONS)
+def test_parse(text):
+    literals, entity, select, aggregate, filters, order, limit = QUESTIONS[text]
+    shape, lexed = lex(text)
+    question = parse(shape)
+
+    assert lexed == literals
+    assert (question.entity, question.select, question.aggregate) == (entity, select, aggregate)
+    assert question.filters == filters
+    assert (question.order, question.limit) == (order, limit)
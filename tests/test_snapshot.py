@@ -0,0 +1,53 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import func, select, text
+
+from conftest import postgres_configured
+from database.snapshot import SNAPSHOT_TABLES, SnapshotReader, SnapshotSession, build_snapshot
+
+
+@pytest.mark.skipif(not postgres_configured(), reason="needs a PostgreSQL DATABASE_URL")
+def test_build_copies_every_table_then_only_what_changed(tmp_path):
+    from database.db_utils import get_engine, init_db
+
+    init_db()
+    path = str(tmp_path / "snapshot.sqlite")
+    full = build_snapshot(get_engine(), path, full=True, block_rows=50)
+    again = build_snapshot(get_engine(), path, block_rows=50)
+
+    reader = SnapshotReader(path)
+    with get_engine().connect() as source, reader.connect() as snapshot:
+        for table in SNAPSHOT_TABLES:
+            count = select(func.count()).select_from(table)
+            assert snapshot.scalar(count) == source.scalar(count), table.name
+    assert full.full and not again.full
+    assert again.rows_copied == 0
+
+
+def write_snapshot(path: str, value: int):
+    building = f"{path}.building"
+    with sqlite3.connect(building) as connection:
+        connection.execute("CREATE TABLE t (value INTEGER)")
+        connection.execute("INSERT INTO t VALUES (?)", (value,))
+    connection.close()
+    os.replace(building, path)
+
+
+def test_reader_swaps_in_a_new_file_and_notifies(tmp_path):
+    path = str(tmp_path / "snapshot.sqlite")
+    write_snapshot(path, 1)
+    reader = SnapshotReader(path, check_interval=0)
+    swapped = []
+    reader.subscribe(lambda: swapped.append(True))
+
+    async def read():
+        with reader.connect() as connection:
+            return (await SnapshotSession(connection).execute(text("SELECT value FROM t"))).scalar()
+
+    assert asyncio.run(read()) == 1
+    write_snapshot(path, 2)
+    assert asyncio.run(read()) == 2
+    assert swapped == [True] and reader.swaps == 1
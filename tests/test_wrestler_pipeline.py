@@ -0,0 +1,47 @@
+from sqlalchemy import select
+
+from database.models import Gimmick, Wrestler
+from scrapers.wrestler_pipeline import gimmick_writer_for, write_wrestler_batch
+from scrapers.wrestler_scraper import wrestler_writer
+
+
+def wrestler(cagematch_id: int, name: str) -> dict:
+    return {"cagematch_id": cagematch_id, "name": name, "promotion": None}
+
+
+def gimmicks_of(cagematch_id: int, count: int) -> list:
+    return [{"wrestler_cagematch_id": cagematch_id, "gimmick_name": f"Gimmick {cagematch_id}-{i}",
+             "debut_promotion_name": None, "is_default": i == 0, "date_created": None, "last_seen": None}
+            for i in range(count)]
+
+
+def test_gimmick_flush_partway_through_alter_egos_keeps_the_wrestler_id(session):
+    # A batch of 4: the first wrestler's 6 alter egos straddle a gimmick flush
+    wrestlers = wrestler_writer(session, batch_size=4)
+    gimmicks = gimmick_writer_for(session, wrestlers, release_ids=True)
+    results = [(wrestler(1, "First"), gimmicks_of(1, 6)), (wrestler(2, "Second"), gimmicks_of(2, 3))]
+
+    write_wrestler_batch(results, wrestlers, gimmicks)
+    wrestlers.flush()
+    gimmicks.flush()
+
+    saved = session.execute(select(Wrestler.cagematch_id, Gimmick.gimmick_name)
+                            .join(Gimmick, Gimmick.wrestler_id == Wrestler.id)).all()
+    assert sorted(name for cagematch_id, name in saved if cagematch_id == 1) == \
+        sorted(record["gimmick_name"] for record in gimmicks_of(1, 6))
+    assert len([name for cagematch_id, name in saved if cagematch_id == 2]) == 3
+    assert gimmicks.written == 9
+
+
+def test_released_ids_do_not_accumulate(session):
+    wrestlers = wrestler_writer(session, batch_size=2)
+    gimmicks = gimmick_writer_for(session, wrestlers, release_ids=True)
+    results = [(wrestler(cagematch_id, f"Wrestler {cagematch_id}"), gimmicks_of(cagematch_id, 2))
+               for cagematch_id in range(1, 11)]
+
+    write_wrestler_batch(results, wrestlers, gimmicks)
+    gimmicks.flush()
+
+    assert gimmicks.written == 20
+    # Only the wrestlers of gimmicks still buffered at the last flush are kept
+    assert len(wrestlers.ids) <= 2
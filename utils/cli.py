@@ -0,0 +1,42 @@
+# utils/cli.py
+
+import os
+
+# Options the runners share, and the defaults they show in --help. Only the standard
+# library is imported here, so a runner can parse its arguments (or print its help)
+# before loading SQLAlchemy, requests or bs4; the modules that use these defaults
+# import them from here.
+
+# Processes that run the extractors; 0 or 1 parses inline on the calling thread
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", str(os.cpu_count() or 1)))
+# Profile workers when streaming the roster
+STREAM_WORKERS = 4
+# Events per COPY round; a card averages ~8 matches and ~20 participants
+EVENT_BATCH_SIZE = 250
+# Rows per checksummed block: a changed row re-copies its whole block, an unchanged block costs one hash
+SNAPSHOT_BLOCK_ROWS = int(os.getenv("SNAPSHOT_BLOCK_ROWS", "1000"))
+# Number of wrestlers whose profile + titles pages are fetched together (and queue jobs claimed at a time)
+FETCH_BATCH_SIZE = 10
+# Seconds a claimed queue job stays leased without a heartbeat
+JOB_LEASE_SECONDS = 300
+# Seconds an idle queue worker waits before polling the queue again
+POLL_INTERVAL = 2.0
+# Wrestlers / gimmicks recomputed per statement when rebuilding the stats tables
+STATS_REBUILD_BATCH_SIZE = 1000
+
+
+def add_fetcher_arguments(parser):
+    parser.add_argument("--offline", action="store_true",
+                        help="Serve pages only from the on-disk cache, never touch the network")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the on-disk page cache")
+
+
+def add_parse_pool_arguments(parser):
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="Processes used to parse pages (1 parses inline)")
+
+
+def add_snapshot_arguments(parser):
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Don't rebuild the read snapshot (SNAPSHOT_PATH) when the run finishes")
@@ -0,0 +1,269 @@
+# utils/metrics.py
+
+import functools
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# METRICS=0 turns every counter and timer into a no-op
+METRICS_ENABLED = os.getenv("METRICS", "1") != "0"
+
+# Seconds, from a cached page (~1ms) to a slow fetch under backoff
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labelnames: tuple, labels: dict) -> tuple:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: tuple, key: tuple, extra: str = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, key)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic total per label combination, e.g. bytes fetched per page type."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> list:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in self.samples()]
+
+    def snapshot(self) -> list:
+        return [{"labels": dict(zip(self.labelnames, key)), "value": value} for key, value in self.samples()]
+
+    def __repr__(self):
+        return f"<Counter(name='{self.name}', series={len(self._values)})>"
+
+
+class Gauge(Counter):
+    """Current value per label combination, set from outside (e.g. cache size at scrape time)."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def __repr__(self):
+        return f"<Gauge(name='{self.name}', series={len(self._values)})>"
+
+
+class Histogram:
+    """
+    Bucketed distribution per label combination, Prometheus-style: cumulative
+    bucket counts plus a sum and count, so rates and quantiles can be derived.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label key -> [per-bucket counts (not cumulative), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = _label_key(self.labelnames, labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            return sorted((key, list(counts), total, count) for key, (counts, total, count) in self._series.items())
+
+    def drain(self) -> list:
+        """Samples recorded since the last drain, clearing them: how a worker process hands its timings back."""
+        with self._lock:
+            series, self._series = self._series, {}
+        return [(key, counts, total, count) for key, (counts, total, count) in series.items()]
+
+    def merge(self, samples: list):
+        """Add samples drained from the same histogram in another process."""
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            for key, counts, total, count in samples:
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+                series[0] = [mine + theirs for mine, theirs in zip(series[0], counts)]
+                series[1] += total
+                series[2] += count
+
+    def _quantile(self, counts: list, count: int, fraction: float) -> float:
+        """Upper bound of the bucket holding the quantile: an estimate, never an underestimate."""
+        rank = fraction * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound if bound != math.inf else self.buckets[-2]
+        return self.buckets[-2]
+
+    def render(self) -> list:
+        lines = []
+        for key, counts, total, count in self.samples():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+    def snapshot(self) -> list:
+        return [{
+            "labels": dict(zip(self.labelnames, key)),
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else None,
+            "p50": self._quantile(counts, count, 0.5),
+            "p95": self._quantile(counts, count, 0.95),
+            "buckets": {_format_value(bound): bucket_count for bound, bucket_count in zip(self.buckets, counts)
+                        if bucket_count},
+        } for key, counts, total, count in self.samples()]
+
+    def __repr__(self):
+        return f"<Histogram(name='{self.name}', series={len(self._series)})>"
+
+
+class MetricsRegistry:
+    """Process-wide set of metrics, exported as Prometheus text or a JSON report."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.started_at = datetime.now(timezone.utc)
+
+    def _get_or_create(self, cls, name: str, help: str, labelnames: tuple, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets=buckets)
+
+    def metrics(self) -> list:
+        with self._lock:
+            return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def render_prometheus(self) -> str:
+        """The Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        return {metric.name: {"type": metric.kind, "help": metric.help, "samples": metric.snapshot()}
+                for metric in self.metrics()}
+
+    def report(self) -> dict:
+        finished_at = datetime.now(timezone.utc)
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "finished_at": finished_at.isoformat(timespec="seconds"),
+            "seconds": (finished_at - self.started_at).total_seconds(),
+            "metrics": self.snapshot(),
+        }
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Returns the process-wide registry every scraper and writer records into."""
+    return _registry
+
+
+def timed(histogram: Histogram, **labels):
+    """Decorator observing each call's duration in histogram, e.g. an extractor's run time per page type."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def write_metrics_report(path: str):
+    """Write the end-of-run JSON report of everything recorded in this process."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(get_metrics().report(), f, indent=2)
+        f.write("\n")
+    print(f"📈 Metrics report written to {path}")
+
+
+def add_metrics_arguments(parser):
+    parser.add_argument("--metrics-report", metavar="PATH",
+                        help="Write fetch / parse / extract / DB timings and counters as JSON when the run ends")